@@ -6,6 +6,7 @@ from fastapi import APIRouter
 from app.api.routes.core.auth import router as auth_router
 from app.api.routes.core.users import router as users_router
 from app.api.routes.core.admin_rbac import router as admin_rbac_router
+from app.api.routes.core.diagnostics import router as diagnostics_router
 from app.api.routes.core import upload, bulk, analytics
 
 # Modules
@@ -18,6 +19,8 @@ from app.api.routes.hr import advances # Check if this exists
 from app.api.routes.inventory import assignments as inventory_assignments
 from app.api.routes.inventory import general as general_inventory
 from app.api.routes.inventory import restricted as restricted_inventory
+from app.api.routes.inventory import kits as inventory_kits
+from app.api.routes.inventory import snapshots as inventory_snapshots
 from app.api.routes.finance import router as finance_router
 from app.api.routes.finance import expenses
 from app.api.routes.finance import exports
@@ -27,6 +30,7 @@ api_router = APIRouter()
 # --- Authentication & Admin (Core) ---
 api_router.include_router(auth_router, prefix="/auth", tags=["Authentication"])
 api_router.include_router(admin_rbac_router, prefix="/admin", tags=["Admin"])
+api_router.include_router(diagnostics_router, prefix="/admin/diagnostics", tags=["Admin"])
 api_router.include_router(users_router, prefix="/users", tags=["Users"])
 
 # --- Core Utilities ---
@@ -52,6 +56,8 @@ api_router.include_router(analytics_hr.router, prefix="/hr", tags=["HR Analytics
 api_router.include_router(inventory_assignments.router, prefix="/inventory-assignments", tags=["Inventory Assignments"])
 api_router.include_router(general_inventory.router, prefix="/general-inventory", tags=["General Inventory"])
 api_router.include_router(restricted_inventory.router, prefix="/restricted-inventory", tags=["Weapons & Restrict"])
+api_router.include_router(inventory_kits.router, prefix="/inventory-kits", tags=["Inventory Kits"])
+api_router.include_router(inventory_snapshots.router, prefix="/inventory-snapshots", tags=["Inventory Snapshots"])
 
 # --- Client ---
 api_router.include_router(client_management, prefix="/client-management", tags=["Client & Contracts"])
@@ -14,6 +14,8 @@ from sqlalchemy.orm import Session
 from pydantic import BaseModel
 
 from app.core.database import get_db
+from app.core.read_replica import get_read_db
+from app.core.numbering import next_document_no
 from app.api.dependencies import require_permission
 from app.models.hr.employee import Employee
 from app.models.hr.employee2 import Employee2
@@ -114,7 +116,7 @@ def _client_public_url(client_id: int, abs_path: str) -> str:
 
 
 def _parse_invoice_number(invoice_number: str) -> dict:
-    # expected: INV-{client_id}-{site_id}-{requirement_id}-{timestamp}
+    # expected: INV-{client_id}-{site_id}-{requirement_id}-{sequence or legacy timestamp}
     try:
         parts = str(invoice_number or "").split("-")
         if len(parts) < 5 or parts[0] != "INV":
@@ -449,7 +451,7 @@ async def compare_client_months(
     client_id: int,
     month1: str,
     month2: str,
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     """Compare client metrics (guards, salary based on attendance) between two months."""
     _get_client(db, client_id)
@@ -462,7 +464,7 @@ async def compare_client_months(
 async def compare_all_clients_months(
     month1: str,
     month2: str,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
 ):
     """Compare client salary totals (based on attendance for allocated guards) between two months for all clients."""
     clients = db.query(Client).order_by(Client.id.desc()).all()
@@ -1371,7 +1373,9 @@ async def complete_requirement(site_id: int, requirement_id: int, db: Session =
         raise HTTPException(status_code=404, detail="Requirement not found")
 
     # Create a paid invoice for this site requirement (monthly amount)
-    invoice_number = f"INV-{site.client_id}-{site_id}-{requirement_id}-{datetime.utcnow().strftime('%Y%m%d%H%M%S')}"
+    # INV-{client_id}-{site_id}-{requirement_id}-{seq}; _parse_invoice_number reads the ids back.
+    # Older invoices end in a 14-digit timestamp, so the 4-digit sequence cannot collide with them.
+    invoice_number = next_document_no(db, f"INV-{site.client_id}-{site_id}-{requirement_id}-")
     billing_period = None
     if req.start_date and req.end_date:
         billing_period = f"{req.start_date.isoformat()} to {req.end_date.isoformat()}"
@@ -8,6 +8,7 @@ from sqlalchemy import func, or_, and_
 from sqlalchemy.orm import Session
 
 from app.core.database import get_db
+from app.core.read_replica import get_read_db
 from app.api.dependencies import require_permission
 from app.models.hr.attendance import AttendanceRecord
 from app.models.hr.employee2 import Employee2
@@ -41,7 +42,7 @@ def _get_month_range(d: date) -> tuple[date, date]:
 async def get_analytics_dashboard(
     from_date: str,
     to_date: str,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
 ):
     """Get comprehensive analytics dashboard data"""
     start = _parse_date(from_date)
@@ -5,6 +5,7 @@ from sqlalchemy.orm import Session
 from typing import List
 
 from app.core.database import get_db
+from app.core.employee_mapping import invalidate_legacy_employee_map
 from app.api.dependencies import require_permission
 from app.models.hr.employee import Employee
 
@@ -34,6 +35,7 @@ async def bulk_delete_employees(
     # Delete found employees
     for employee in employees:
         db.delete(employee)
+    invalidate_legacy_employee_map(db, *found_ids)
     
     db.commit()
     
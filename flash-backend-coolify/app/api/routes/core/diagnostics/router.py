@@ -0,0 +1,87 @@
+from __future__ import annotations
+
+import os
+from dataclasses import asdict
+
+from fastapi import APIRouter, Depends, Query, status
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from app.api.dependencies import require_permission
+from app.core import sql_diagnostics
+from app.core.config import settings
+from app.core.database import get_db, pool_status, read_engine, sqlite_pragmas
+from app.models.core.user import User
+from app.schemas.core.diagnostics import (
+    DatabaseDiagnostics,
+    DatabasePoolStatus,
+    SqlDiagnosticsFindings,
+    SqlDiagnosticsSettings,
+    SqlDiagnosticsUpdate,
+)
+
+router = APIRouter()
+
+
+def _sql_settings() -> SqlDiagnosticsSettings:
+    return SqlDiagnosticsSettings(**asdict(sql_diagnostics.config), worker_pid=os.getpid())
+
+
+@router.get("/sql", response_model=SqlDiagnosticsFindings)
+def get_sql_diagnostics(
+    limit: int = Query(50, ge=1, le=200),
+    _u: User = Depends(require_permission("rbac:admin")),
+) -> SqlDiagnosticsFindings:
+    return SqlDiagnosticsFindings(
+        settings=_sql_settings(),
+        findings=sql_diagnostics.recent_findings(limit),
+    )
+
+
+@router.put("/sql", response_model=SqlDiagnosticsSettings)
+def update_sql_diagnostics(
+    payload: SqlDiagnosticsUpdate,
+    _u: User = Depends(require_permission("rbac:admin")),
+) -> SqlDiagnosticsSettings:
+    """Switch diagnostics without a restart.
+
+    Only the worker process handling this request changes (see ``worker_pid`` in the
+    response); with several workers, repeat the call until each has answered or set
+    ``SQL_DIAGNOSTICS_*`` and restart.
+    """
+
+    for key, value in payload.model_dump(exclude_unset=True).items():
+        if value is not None:
+            setattr(sql_diagnostics.config, key, value)
+    return _sql_settings()
+
+
+@router.delete("/sql/findings", status_code=status.HTTP_204_NO_CONTENT)
+def clear_sql_diagnostics_findings(
+    _u: User = Depends(require_permission("rbac:admin")),
+):
+    sql_diagnostics.clear_findings()
+    return None
+
+
+@router.get("/db", response_model=DatabaseDiagnostics)
+def get_database_diagnostics(
+    db: Session = Depends(get_db),
+    _u: User = Depends(require_permission("rbac:admin")),
+) -> DatabaseDiagnostics:
+    """Pool counters of this worker process and the effective connection settings."""
+
+    dialect = db.get_bind().dialect.name
+    pragmas = {}
+    if dialect == "sqlite":
+        # Read back from the connection rather than echoing settings.
+        for name in sqlite_pragmas():
+            pragmas[name] = db.execute(text(f"PRAGMA {name}")).scalar()
+    return DatabaseDiagnostics(
+        dialect=dialect,
+        pool=DatabasePoolStatus(**pool_status()),
+        read_pool=DatabasePoolStatus(**pool_status(read_engine)) if read_engine is not None else None,
+        statement_timeout_ms=settings.DB_STATEMENT_TIMEOUT_MS,
+        route_statement_timeouts=settings.route_statement_timeouts,
+        sqlite_pragmas=pragmas,
+    )
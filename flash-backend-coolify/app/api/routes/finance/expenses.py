@@ -10,6 +10,7 @@ from sqlalchemy.orm import Session
 
 from app.models.core.user import User
 from app.core.database import get_db
+from app.core.numbering import next_document_no
 from app.models.finance.expense import Expense
 from app.models.finance.finance_account import FinanceAccount
 from app.models.finance.finance_journal_entry import FinanceJournalEntry
@@ -27,25 +28,8 @@ router = APIRouter(dependencies=[Depends(require_permission("accounts:full"))])
 
 def _next_expense_entry_no(db: Session, expense_date: date) -> str:
     """Generate next journal entry number for expense"""
-    ym = expense_date.strftime("%Y%m")
-    prefix = f"EXP-{ym}-"
-
-    last = (
-        db.query(FinanceJournalEntry)
-        .filter(FinanceJournalEntry.entry_no.like(f"{prefix}%"))
-        .order_by(FinanceJournalEntry.id.desc())
-        .first()
-    )
-
-    if not last:
-        return f"{prefix}0001"
-
-    tail = last.entry_no.replace(prefix, "")
-    try:
-        n = int(tail)
-    except ValueError:
-        n = 0
-    return f"{prefix}{n + 1:04d}"
+    prefix = f"EXP-{expense_date.strftime('%Y%m')}-"
+    return next_document_no(db, prefix, seed_column=FinanceJournalEntry.entry_no)
 
 
 def _create_expense_journal_entry(db: Session, expense: Expense) -> FinanceJournalEntry:
@@ -324,45 +308,99 @@ def undo_payment(
         raise HTTPException(status_code=500, detail=f"Failed to undo payment: {str(e)}")
 
 
+def _add_months(d: date, months: int) -> date:
+    # months can be negative
+    y = d.year
+    m = d.month + months
+    while m > 12:
+        y += 1
+        m -= 12
+    while m < 1:
+        y -= 1
+        m += 12
+    return date(y, m, 1)
+
+
 @router.get("/summary/monthly", response_model=ExpenseSummary)
 def get_expense_summary(
     month: Optional[str] = Query(None, description="YYYY-MM format"),
+    trend_months: int = Query(0, ge=0, le=24, description="Also return totals for this many months ending at `month`"),
     db: Session = Depends(get_db),
     _user: User = Depends(require_permission("accounts:full")),
 ):
-    query = db.query(Expense).filter(Expense.is_active == True)
-    
+    m0 = None
     if month:
         try:
             year, month_num = month.split("-")
-            query = query.filter(
-                func.extract("year", Expense.expense_date) == int(year),
-                func.extract("month", Expense.expense_date) == int(month_num)
-            )
+            m0 = date(int(year), int(month_num), 1)
         except ValueError:
             raise HTTPException(status_code=400, detail="Invalid month format. Use YYYY-MM")
 
-    expenses = query.all()
-    
-    total_expenses = sum(e.amount for e in expenses)
-    pending_expenses = sum(e.amount for e in expenses if e.status == "PENDING")
-    approved_expenses = sum(e.amount for e in expenses if e.status == "APPROVED")
-    paid_expenses = sum(e.amount for e in expenses if e.status == "PAID")
-    
-    # Group by category
-    categories = {}
-    for expense in expenses:
-        if expense.category not in categories:
-            categories[expense.category] = Decimal("0")
-        categories[expense.category] += expense.amount
+    anchor = m0 or date.today().replace(day=1)
+    trend_start = _add_months(anchor, -(trend_months - 1)) if trend_months else None
+
+    # One grouped query. Plain range predicates on expense_date so (is_active, expense_date) is usable.
+    # Without `month` the summary is all-time and the trend window is taken from the same rows.
+    query = db.query(
+        Expense.expense_date,
+        Expense.category,
+        Expense.status,
+        func.coalesce(func.sum(Expense.amount), 0),
+        func.count(Expense.id),
+    ).filter(Expense.is_active == True)
+
+    if m0:
+        lower = min(m0, trend_start) if trend_start else m0
+        query = query.filter(Expense.expense_date >= lower, Expense.expense_date < _add_months(m0, 1))
+
+    rows = query.group_by(Expense.expense_date, Expense.category, Expense.status).all()
+
+    zero = Decimal("0")
+    total_expenses = zero
+    pending_expenses = zero
+    approved_expenses = zero
+    paid_expenses = zero
+    expense_count = 0
+    categories: dict[str, Decimal] = {}
+    trend_totals: dict[str, list] = {}
+
+    for d, category, status, amount, count in rows:
+        amount = Decimal(str(amount))
+        if trend_start and d >= trend_start and d < _add_months(anchor, 1):
+            bucket = trend_totals.setdefault(f"{d.year:04d}-{d.month:02d}", [zero, 0])
+            bucket[0] += amount
+            bucket[1] += count
+
+        if m0 and d < m0:
+            continue
+
+        total_expenses += amount
+        expense_count += count
+        if status == "PENDING":
+            pending_expenses += amount
+        elif status == "APPROVED":
+            approved_expenses += amount
+        elif status == "PAID":
+            paid_expenses += amount
+        categories[category] = categories.get(category, zero) + amount
+
+    trend = None
+    if trend_start:
+        trend = []
+        for i in range(trend_months - 1, -1, -1):
+            mm = _add_months(anchor, -i)
+            key = f"{mm.year:04d}-{mm.month:02d}"
+            total, count = trend_totals.get(key, [zero, 0])
+            trend.append({"month": key, "total": total, "count": count})
 
     return ExpenseSummary(
         total_expenses=total_expenses,
         pending_expenses=pending_expenses,
         approved_expenses=approved_expenses,
         paid_expenses=paid_expenses,
-        expense_count=len(expenses),
-        categories=categories
+        expense_count=expense_count,
+        categories=categories,
+        trend=trend,
     )
 
 
@@ -11,6 +11,9 @@ from sqlalchemy.orm import Session
 from sqlalchemy.sql import func
 
 from app.core.database import get_db
+from app.core.read_replica import get_read_db
+from app.core.employee_mapping import get_legacy_employee_ids
+from app.core.inventory_snapshots import end_of_day, inventory_as_of
 from app.models.hr.employee import Employee
 from app.models.hr.employee2 import Employee2
 from app.models.inventory.general_item import GeneralItem
@@ -20,7 +23,7 @@ from app.models.inventory.restricted_item_employee_balance import RestrictedItem
 from app.models.inventory.restricted_item_serial_unit import RestrictedItemSerialUnit
 from app.models.hr.employee_advance import EmployeeAdvance
 from app.models.fleet.vehicle_assignment import VehicleAssignment
-from app.api.routes.hr.payroll import payroll_report
+from app.api.routes.hr.payroll import build_payroll_report
 from app.api.dependencies import require_permission
 
 router = APIRouter(dependencies=[Depends(require_permission("accounts:full"))])
@@ -122,10 +125,10 @@ def _pdf_table(pdf: FPDF, headers: list[str], rows: list[list[str]], col_widths:
 @router.get("/accounts/monthly/pdf")
 async def export_accounts_monthly_pdf(
     month: str,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
 ) -> Response:
     start, end = _parse_month(month)
-    payroll = await payroll_report(month=month, db=db)
+    payroll = await build_payroll_report(month=month, db=db)
 
     payroll_due = 0.0
     payroll_paid = 0.0
@@ -236,12 +239,91 @@ async def export_accounts_monthly_pdf(
     return Response(content=pdf_bytes, media_type="application/pdf", headers={"Content-Disposition": f'attachment; filename="accounts_export_{month}.pdf"'})
 
 
+def _employee_inventory_rows_as_of(db: Session, keys: set[str], as_of: date) -> dict[str, dict[str, list[list[str]]]]:
+    """Same rows as _employee_inventory_rows, reconstructed for the end of ``as_of``."""
+    out: dict[str, dict[str, list[list[str]]]] = {k: {"r_serial": [], "r_qty": [], "g_qty": []} for k in keys}
+    if not keys:
+        return out
+
+    state, _meta = inventory_as_of(db, end_of_day(as_of))
+    items = {("general", it.item_code): it for it in db.query(GeneralItem)}
+    items.update({("restricted", it.item_code): it for it in db.query(RestrictedItem)})
+
+    serial_ids = [uid for uid, (_, _, emp) in state["serials"].items() if emp in keys]
+    serial_numbers = {}
+    if serial_ids:
+        serial_numbers = dict(
+            db.query(RestrictedItemSerialUnit.id, RestrictedItemSerialUnit.serial_number).filter(
+                RestrictedItemSerialUnit.id.in_(serial_ids)
+            )
+        )
+    for uid in serial_ids:
+        code, status, emp = state["serials"][uid]
+        it = items.get(("restricted", code))
+        out[emp]["r_serial"].append(
+            [code, it.name if it else code, serial_numbers.get(uid, "-"), str(status).title(), as_of.isoformat()]
+        )
+
+    for (inventory, emp, code), qty in state["balances"].items():
+        if emp not in keys or qty <= 0:
+            continue
+        it = items.get((inventory, code))
+        row = [code, it.name if it else code, it.unit_name if it else "-", _fmt_money(qty)]
+        out[emp]["r_qty" if inventory == "restricted" else "g_qty"].append(row)
+
+    return out
+
+
+def _employee_inventory_rows(
+    db: Session, keys: set[str], as_of: Optional[date] = None
+) -> dict[str, dict[str, list[list[str]]]]:
+    """Fetch serial, restricted-qty and general-qty rows for many employee keys (3 queries)."""
+    if as_of is not None:
+        return _employee_inventory_rows_as_of(db, keys, as_of)
+
+    out: dict[str, dict[str, list[list[str]]]] = {k: {"r_serial": [], "r_qty": [], "g_qty": []} for k in keys}
+    if not keys:
+        return out
+    key_list = list(keys)
+
+    restricted_serials = (
+        db.query(RestrictedItemSerialUnit, RestrictedItem)
+        .join(RestrictedItem, RestrictedItem.item_code == RestrictedItemSerialUnit.item_code)
+        .filter(RestrictedItemSerialUnit.issued_to_employee_id.in_(key_list))
+        .all()
+    )
+    for su, it in restricted_serials:
+        out[su.issued_to_employee_id]["r_serial"].append(
+            [it.item_code, it.name, su.serial_number, str(su.status).title(), (su.updated_at.strftime("%Y-%m-%d") if su.updated_at else "-")]
+        )
+
+    restricted_qty = db.query(RestrictedItemEmployeeBalance, RestrictedItem).join(RestrictedItem, RestrictedItem.item_code == RestrictedItemEmployeeBalance.item_code).filter(RestrictedItemEmployeeBalance.employee_id.in_(key_list), RestrictedItemEmployeeBalance.quantity_issued > 0).all()
+    for bal, it in restricted_qty:
+        out[bal.employee_id]["r_qty"].append([it.item_code, it.name, it.unit_name, _fmt_money(bal.quantity_issued)])
+
+    general_qty = db.query(GeneralItemEmployeeBalance, GeneralItem).join(GeneralItem, GeneralItem.item_code == GeneralItemEmployeeBalance.item_code).filter(GeneralItemEmployeeBalance.employee_id.in_(key_list), GeneralItemEmployeeBalance.quantity_issued > 0).all()
+    for bal, it in general_qty:
+        out[bal.employee_id]["g_qty"].append([it.item_code, it.name, it.unit_name, _fmt_money(bal.quantity_issued)])
+
+    return out
+
+
+def _employee_inventory_keys(emp: Employee2, legacy_by_id: dict[int, Optional[str]]) -> list[str]:
+    # Inventory may be keyed by the Employee2 identifier or by the mapped legacy employee id.
+    keys = [str(emp.fss_no or emp.serial_no or emp.id).strip()]
+    legacy = legacy_by_id.get(emp.id)
+    if legacy and legacy.strip() not in keys:
+        keys.append(legacy.strip())
+    return keys
+
+
 @router.get("/inventory/employees/pdf")
 async def export_employee_inventory_pdf(
     include_zero: bool = True,
     search: Optional[str] = None,
     start_date: Optional[str] = None,
     end_date: Optional[str] = None,
+    as_of: Optional[date] = None,
     db: Session = Depends(get_db),
 ) -> Response:
     query = db.query(Employee2)
@@ -255,35 +337,22 @@ async def export_employee_inventory_pdf(
         )
     
     employees = query.order_by(Employee2.serial_no.asc()).all()
+    legacy_by_id = get_legacy_employee_ids(db, employees)
+    keys_by_emp = {emp.id: _employee_inventory_keys(emp, legacy_by_id) for emp in employees}
+    inventory = _employee_inventory_rows(db, {k for keys in keys_by_emp.values() for k in keys}, as_of=as_of)
+
     pdf = _pdf_new_portrait()
     first_employee = True
 
     for emp in employees:
         emp_id = str(emp.fss_no or emp.serial_no or emp.id).strip()
         name = str(emp.name or "Unknown")
-        
-        # Fetch inventory - with name-based fallback for legacy IDs
-        # 1. Get legacy IDs if any (matching by name)
-        legacy_ids = {emp_id}
-        old_emp = db.query(Employee).filter(
-            (func.concat(Employee.first_name, " ", Employee.last_name).ilike(name))
-        ).first()
-        if old_emp:
-            legacy_ids.add(str(old_emp.employee_id).strip())
-
-        restricted_serials = (
-            db.query(RestrictedItemSerialUnit, RestrictedItem)
-            .join(RestrictedItem, RestrictedItem.item_code == RestrictedItemSerialUnit.item_code)
-            .filter(RestrictedItemSerialUnit.issued_to_employee_id.in_(list(legacy_ids)))
-            .all()
-        )
-        r_serial_data = [[it.item_code, it.name, su.serial_number, str(su.status).title(), (su.updated_at.strftime("%Y-%m-%d") if su.updated_at else "-")] for su, it in restricted_serials]
-
-        restricted_qty = db.query(RestrictedItemEmployeeBalance, RestrictedItem).join(RestrictedItem, RestrictedItem.item_code == RestrictedItemEmployeeBalance.item_code).filter(RestrictedItemEmployeeBalance.employee_id.in_(list(legacy_ids)), RestrictedItemEmployeeBalance.quantity_issued > 0).all()
-        r_qty_data = [[it.item_code, it.name, it.unit_name, _fmt_money(bal.quantity_issued)] for bal, it in restricted_qty]
 
-        general_qty = db.query(GeneralItemEmployeeBalance, GeneralItem).join(GeneralItem, GeneralItem.item_code == GeneralItemEmployeeBalance.item_code).filter(GeneralItemEmployeeBalance.employee_id.in_(list(legacy_ids)), GeneralItemEmployeeBalance.quantity_issued > 0).all()
-        g_qty_data = [[it.item_code, it.name, it.unit_name, _fmt_money(bal.quantity_issued)] for bal, it in general_qty]
+        r_serial_data, r_qty_data, g_qty_data = [], [], []
+        for k in keys_by_emp[emp.id]:
+            r_serial_data += inventory[k]["r_serial"]
+            r_qty_data += inventory[k]["r_qty"]
+            g_qty_data += inventory[k]["g_qty"]
 
         total = len(r_serial_data) + len(r_qty_data) + len(g_qty_data)
         if not include_zero and total == 0:
@@ -291,7 +360,8 @@ async def export_employee_inventory_pdf(
 
         if not first_employee:
             pdf.add_page()
-        _pdf_header(pdf, title="Employee Inventory Report", subtitle=f"Staff: {name} ({emp_id})")
+        subtitle = f"Staff: {name} ({emp_id})" + (f" - As of {as_of.isoformat()}" if as_of else "")
+        _pdf_header(pdf, title="Employee Inventory Report", subtitle=subtitle)
         first_employee = False
 
         if r_serial_data:
@@ -319,6 +389,7 @@ async def export_employee_inventory_pdf(
 @router.get("/inventory/employee/{employee_id}/pdf")
 async def export_single_employee_inventory_pdf(
     employee_id: str,
+    as_of: Optional[date] = None,
     db: Session = Depends(get_db),
 ) -> Response:
     emp = db.query(Employee2).filter((Employee2.fss_no == employee_id) | (Employee2.serial_no == employee_id) | (Employee2.id == (int(employee_id) if employee_id.isdigit() else -1))).first()
@@ -329,29 +400,17 @@ async def export_single_employee_inventory_pdf(
     name = str(emp.name or "Unknown")
 
     pdf = _pdf_new_portrait()
-    _pdf_header(pdf, title="Individual Staff Inventory", subtitle=f"Staff: {name} (ID: {emp_id})")
-
-    # Fetch inventory - with name-based fallback for legacy IDs
-    legacy_ids = {emp_id}
-    old_emp = db.query(Employee).filter(
-        (func.concat(Employee.first_name, " ", Employee.last_name).ilike(name))
-    ).first()
-    if old_emp:
-        legacy_ids.add(str(old_emp.employee_id).strip())
-
-    restricted_serials = (
-        db.query(RestrictedItemSerialUnit, RestrictedItem)
-        .join(RestrictedItem, RestrictedItem.item_code == RestrictedItemSerialUnit.item_code)
-        .filter(RestrictedItemSerialUnit.issued_to_employee_id.in_(list(legacy_ids)))
-        .all()
-    )
-    r_serial_data = [[it.item_code, it.name, su.serial_number, str(su.status).title(), (su.updated_at.strftime("%Y-%m-%d") if su.updated_at else "-")] for su, it in restricted_serials]
-
-    restricted_qty = db.query(RestrictedItemEmployeeBalance, RestrictedItem).join(RestrictedItem, RestrictedItem.item_code == RestrictedItemEmployeeBalance.item_code).filter(RestrictedItemEmployeeBalance.employee_id.in_(list(legacy_ids)), RestrictedItemEmployeeBalance.quantity_issued > 0).all()
-    r_qty_data = [[it.item_code, it.name, it.unit_name, _fmt_money(bal.quantity_issued)] for bal, it in restricted_qty]
-
-    general_qty = db.query(GeneralItemEmployeeBalance, GeneralItem).join(GeneralItem, GeneralItem.item_code == GeneralItemEmployeeBalance.item_code).filter(GeneralItemEmployeeBalance.employee_id.in_(list(legacy_ids)), GeneralItemEmployeeBalance.quantity_issued > 0).all()
-    g_qty_data = [[it.item_code, it.name, it.unit_name, _fmt_money(bal.quantity_issued)] for bal, it in general_qty]
+    subtitle = f"Staff: {name} (ID: {emp_id})" + (f" - As of {as_of.isoformat()}" if as_of else "")
+    _pdf_header(pdf, title="Individual Staff Inventory", subtitle=subtitle)
+
+    # Fetch inventory - keyed by the Employee2 identifier and the mapped legacy id
+    keys = _employee_inventory_keys(emp, get_legacy_employee_ids(db, [emp]))
+    inventory = _employee_inventory_rows(db, set(keys), as_of=as_of)
+    r_serial_data, r_qty_data, g_qty_data = [], [], []
+    for k in keys:
+        r_serial_data += inventory[k]["r_serial"]
+        r_qty_data += inventory[k]["r_qty"]
+        g_qty_data += inventory[k]["g_qty"]
 
     if r_serial_data:
         _pdf_section_title(pdf, "WEAPONS & SERIALIZED EQUIPMENT")
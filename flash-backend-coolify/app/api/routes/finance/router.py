@@ -3,14 +3,20 @@ from __future__ import annotations
 from datetime import date
 from decimal import Decimal
 
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from sqlalchemy import and_, or_
+from sqlalchemy.orm import Session, selectinload
 from sqlalchemy.sql import func
 
 from app.models.core.user import User
+from app.core.account_balances import apply_entry_to_balances, normal_balance, period_of
 from app.core.database import get_db
+from app.core.numbering import next_document_no
 from app.api.dependencies import require_permission
 from app.models.finance.finance_account import FinanceAccount
+from app.models.finance.finance_account_balance import FinanceAccountBalance
 from app.models.finance.finance_journal_entry import FinanceJournalEntry
 from app.models.finance.finance_journal_line import FinanceJournalLine
 from app.schemas.finance.finance import (
@@ -20,6 +26,8 @@ from app.schemas.finance.finance import (
     FinanceJournalEntry as FinanceJournalEntrySchema,
     FinanceJournalEntryCreate,
     FinanceJournalEntryUpdate,
+    GeneralLedger,
+    TrialBalance,
 )
 
 router = APIRouter(dependencies=[Depends(require_permission("accounts:full"))])
@@ -66,25 +74,39 @@ def _validate_journal_lines(lines: list[FinanceJournalLine]) -> None:
 
 
 def _next_entry_no(db: Session, entry_date: date) -> str:
-    ym = entry_date.strftime("%Y%m")
-    prefix = f"JE-{ym}-"
+    prefix = f"JE-{entry_date.strftime('%Y%m')}-"
+    return next_document_no(db, prefix, seed_column=FinanceJournalEntry.entry_no)
+
+
+def _claim_draft_for_posting(db: Session, entry_id: int) -> bool:
+    """Flip a DRAFT entry to POSTED with one conditional UPDATE.
 
-    last = (
+    Concurrent posts of the same entry serialize on the row (on SQLite, on the write
+    lock); only the request that still finds it DRAFT gets a row count of 1, so the
+    balances are applied exactly once.
+    """
+    flipped = (
         db.query(FinanceJournalEntry)
-        .filter(FinanceJournalEntry.entry_no.like(f"{prefix}%"))
-        .order_by(FinanceJournalEntry.id.desc())
-        .first()
+        .filter(FinanceJournalEntry.id == entry_id, FinanceJournalEntry.status == "DRAFT")
+        .update(
+            {FinanceJournalEntry.status: "POSTED", FinanceJournalEntry.posted_at: func.now()},
+            synchronize_session=False,
+        )
     )
+    return flipped == 1
 
-    if not last:
-        return f"{prefix}0001"
 
-    tail = last.entry_no.replace(prefix, "")
-    try:
-        n = int(tail)
-    except ValueError:
-        n = 0
-    return f"{prefix}{n + 1:04d}"
+def _lock_posted_entry(db: Session, entry_id: int) -> bool:
+    """Write-lock a POSTED entry until the end of the transaction; False if it is not POSTED.
+
+    A no-op UPDATE rather than SELECT ... FOR UPDATE, which SQLite ignores.
+    """
+    locked = (
+        db.query(FinanceJournalEntry)
+        .filter(FinanceJournalEntry.id == entry_id, FinanceJournalEntry.status == "POSTED")
+        .update({FinanceJournalEntry.status: FinanceJournalEntry.status}, synchronize_session=False)
+    )
+    return locked == 1
 
 
 @router.get("/accounts", response_model=list[FinanceAccountSchema])
@@ -206,12 +228,68 @@ def delete_account(
     return {"ok": True}
 
 
+def _parse_journal_cursor(cursor: str) -> tuple[date, int]:
+    try:
+        d, i = cursor.split("_", 1)
+        return date.fromisoformat(d), int(i)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
 @router.get("/journals", response_model=list[FinanceJournalEntrySchema])
 def list_journals(
+    response: Response,
+    from_date: Optional[date] = None,
+    to_date: Optional[date] = None,
+    status: Optional[str] = None,
+    source_type: Optional[str] = None,
+    source_id: Optional[str] = None,
+    account_id: Optional[int] = None,
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor value from the previous page"),
+    limit: int = Query(100, ge=1, le=1000),
     db: Session = Depends(get_db),
     _user: User = Depends(require_permission("accounts:full")),
 ):
-    return db.query(FinanceJournalEntry).order_by(FinanceJournalEntry.id.desc()).all()
+    """Newest first by (entry_date, id). The next page's cursor is returned in X-Next-Cursor."""
+
+    q = db.query(FinanceJournalEntry).options(selectinload(FinanceJournalEntry.lines))
+
+    if from_date:
+        q = q.filter(FinanceJournalEntry.entry_date >= from_date)
+    if to_date:
+        q = q.filter(FinanceJournalEntry.entry_date <= to_date)
+    if status:
+        q = q.filter(FinanceJournalEntry.status == status.upper())
+    if source_type:
+        q = q.filter(FinanceJournalEntry.source_type == source_type)
+    if source_id:
+        q = q.filter(FinanceJournalEntry.source_id == source_id)
+    if account_id is not None:
+        q = q.filter(
+            FinanceJournalEntry.lines.any(FinanceJournalLine.account_id == account_id)
+        )
+
+    if cursor:
+        c_date, c_id = _parse_journal_cursor(cursor)
+        q = q.filter(
+            or_(
+                FinanceJournalEntry.entry_date < c_date,
+                and_(FinanceJournalEntry.entry_date == c_date, FinanceJournalEntry.id < c_id),
+            )
+        )
+
+    rows = (
+        q.order_by(FinanceJournalEntry.entry_date.desc(), FinanceJournalEntry.id.desc())
+        .limit(limit + 1)
+        .all()
+    )
+
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        response.headers["X-Next-Cursor"] = f"{last.entry_date.isoformat()}_{last.id}"
+
+    return rows
 
 
 @router.post("/journals", response_model=FinanceJournalEntrySchema)
@@ -366,8 +444,14 @@ def post_journal(
 
     _validate_journal_lines(entry.lines)
 
-    entry.status = "POSTED"
-    entry.posted_at = func.now()
+    if not _claim_draft_for_posting(db, entry.id):
+        # Posted (or otherwise changed) by a concurrent request since it was read.
+        db.rollback()
+        db.refresh(entry)
+        if entry.status == "POSTED":
+            return entry
+        raise HTTPException(status_code=400, detail="Only DRAFT journal entries can be posted")
+    apply_entry_to_balances(db, entry)
 
     try:
         db.commit()
@@ -391,6 +475,12 @@ def reverse_journal(
     if original.status != "POSTED":
         raise HTTPException(status_code=400, detail="Only POSTED journal entries can be reversed")
 
+    # Lock the original before looking for its reversal, so two concurrent requests
+    # cannot both create one.
+    if not _lock_posted_entry(db, original.id):
+        db.rollback()
+        raise HTTPException(status_code=400, detail="Only POSTED journal entries can be reversed")
+
     existing_reversal = (
         db.query(FinanceJournalEntry)
         .filter(
@@ -400,6 +490,7 @@ def reverse_journal(
         .first()
     )
     if existing_reversal:
+        db.rollback()
         return existing_reversal
 
     entry_no = _next_entry_no(db, original.entry_date)
@@ -409,7 +500,8 @@ def reverse_journal(
         memo=f"Reversal of {original.entry_no}",
         source_type="REVERSAL",
         source_id=str(original.id),
-        status="DRAFT",
+        status="POSTED",
+        posted_at=func.now(),
     )
 
     for ln in original.lines:
@@ -423,7 +515,11 @@ def reverse_journal(
             )
         )
 
+    _validate_journal_lines(reversal.lines)
+
+    # The reversal is created and posted, and its balances applied, in one transaction.
     db.add(reversal)
+    apply_entry_to_balances(db, reversal)
     try:
         db.commit()
     except ValueError as e:
@@ -431,17 +527,192 @@ def reverse_journal(
         raise HTTPException(status_code=400, detail=str(e))
 
     db.refresh(reversal)
+    return reversal
 
-    _validate_journal_lines(reversal.lines)
 
-    reversal.status = "POSTED"
-    reversal.posted_at = func.now()
+def _descendant_ids(accounts: list[FinanceAccount], root_id: int) -> set[int]:
+    children: dict[int, list[int]] = {}
+    for a in accounts:
+        if a.parent_id is not None:
+            children.setdefault(a.parent_id, []).append(a.id)
 
-    try:
-        db.commit()
-    except ValueError as e:
-        db.rollback()
-        raise HTTPException(status_code=400, detail=str(e))
+    out: set[int] = set()
+    stack = [root_id]
+    while stack:
+        cur = stack.pop()
+        if cur in out:
+            continue
+        out.add(cur)
+        stack.extend(children.get(cur, []))
+    return out
 
-    db.refresh(reversal)
-    return reversal
+
+@router.get("/trial-balance", response_model=TrialBalance)
+def trial_balance(
+    period: Optional[str] = Query(None, pattern=r"^\d{4}-\d{2}$", description="Cumulative through YYYY-MM"),
+    db: Session = Depends(get_db),
+    _user: User = Depends(require_permission("accounts:full")),
+):
+    q = db.query(
+        FinanceAccountBalance.account_id,
+        func.coalesce(func.sum(FinanceAccountBalance.debit_total), 0),
+        func.coalesce(func.sum(FinanceAccountBalance.credit_total), 0),
+    )
+    if period:
+        q = q.filter(FinanceAccountBalance.period <= period)
+    totals = {
+        acc_id: (Decimal(str(dr)), Decimal(str(cr)))
+        for acc_id, dr, cr in q.group_by(FinanceAccountBalance.account_id).all()
+    }
+
+    accounts = db.query(FinanceAccount).order_by(FinanceAccount.code.asc()).all()
+    by_id = {a.id: a for a in accounts}
+
+    rollup: dict[int, list[Decimal]] = {a.id: [Decimal("0"), Decimal("0")] for a in accounts}
+    for acc_id, (dr, cr) in totals.items():
+        seen: set[int] = set()
+        cur = by_id.get(acc_id)
+        while cur is not None and cur.id not in seen:
+            seen.add(cur.id)
+            rollup[cur.id][0] += dr
+            rollup[cur.id][1] += cr
+            cur = by_id.get(cur.parent_id) if cur.parent_id is not None else None
+
+    rows = []
+    total_debit = Decimal("0")
+    total_credit = Decimal("0")
+    for a in accounts:
+        dr, cr = totals.get(a.id, (Decimal("0"), Decimal("0")))
+        r_dr, r_cr = rollup[a.id]
+        if r_dr == 0 and r_cr == 0 and not a.is_active:
+            continue
+        total_debit += dr
+        total_credit += cr
+        rows.append(
+            {
+                "account_id": a.id,
+                "code": a.code,
+                "name": a.name,
+                "account_type": a.account_type,
+                "parent_id": a.parent_id,
+                "debit_total": dr,
+                "credit_total": cr,
+                "balance": normal_balance(a.account_type, dr, cr),
+                "rollup_debit_total": r_dr,
+                "rollup_credit_total": r_cr,
+                "rollup_balance": normal_balance(a.account_type, r_dr, r_cr),
+            }
+        )
+
+    return {"period": period, "rows": rows, "total_debit": total_debit, "total_credit": total_credit}
+
+
+@router.get("/general-ledger/{account_id}", response_model=GeneralLedger)
+def general_ledger(
+    account_id: int,
+    from_date: Optional[date] = None,
+    to_date: Optional[date] = None,
+    include_children: bool = False,
+    db: Session = Depends(get_db),
+    _user: User = Depends(require_permission("accounts:full")),
+):
+    acc = db.query(FinanceAccount).filter(FinanceAccount.id == account_id).first()
+    if not acc:
+        raise HTTPException(status_code=404, detail="Account not found")
+
+    if from_date and to_date and from_date > to_date:
+        raise HTTPException(status_code=400, detail="from_date must be on or before to_date")
+
+    account_ids = {acc.id}
+    if include_children:
+        account_ids = _descendant_ids(db.query(FinanceAccount).all(), acc.id)
+
+    opening_dr = Decimal("0")
+    opening_cr = Decimal("0")
+    if from_date:
+        # Whole months before from_date come from the balance table; the partial month from lines.
+        dr, cr = (
+            db.query(
+                func.coalesce(func.sum(FinanceAccountBalance.debit_total), 0),
+                func.coalesce(func.sum(FinanceAccountBalance.credit_total), 0),
+            )
+            .filter(
+                FinanceAccountBalance.account_id.in_(account_ids),
+                FinanceAccountBalance.period < period_of(from_date),
+            )
+            .one()
+        )
+        opening_dr += Decimal(str(dr))
+        opening_cr += Decimal(str(cr))
+
+        if from_date.day > 1:
+            dr, cr = (
+                db.query(
+                    func.coalesce(func.sum(FinanceJournalLine.debit), 0),
+                    func.coalesce(func.sum(FinanceJournalLine.credit), 0),
+                )
+                .join(FinanceJournalEntry, FinanceJournalEntry.id == FinanceJournalLine.entry_id)
+                .filter(
+                    FinanceJournalEntry.status == "POSTED",
+                    FinanceJournalLine.account_id.in_(account_ids),
+                    FinanceJournalEntry.entry_date >= from_date.replace(day=1),
+                    FinanceJournalEntry.entry_date < from_date,
+                )
+                .one()
+            )
+            opening_dr += Decimal(str(dr))
+            opening_cr += Decimal(str(cr))
+
+    q = (
+        db.query(FinanceJournalLine, FinanceJournalEntry)
+        .join(FinanceJournalEntry, FinanceJournalEntry.id == FinanceJournalLine.entry_id)
+        .filter(
+            FinanceJournalEntry.status == "POSTED",
+            FinanceJournalLine.account_id.in_(account_ids),
+        )
+    )
+    if from_date:
+        q = q.filter(FinanceJournalEntry.entry_date >= from_date)
+    if to_date:
+        q = q.filter(FinanceJournalEntry.entry_date <= to_date)
+    q = q.order_by(FinanceJournalEntry.entry_date.asc(), FinanceJournalEntry.id.asc(), FinanceJournalLine.id.asc())
+
+    opening = normal_balance(acc.account_type, opening_dr, opening_cr)
+    running = opening
+    total_debit = Decimal("0")
+    total_credit = Decimal("0")
+    lines = []
+    for ln, entry in q.all():
+        dr = Decimal(str(ln.debit or 0))
+        cr = Decimal(str(ln.credit or 0))
+        total_debit += dr
+        total_credit += cr
+        running += normal_balance(acc.account_type, dr, cr)
+        lines.append(
+            {
+                "line_id": ln.id,
+                "entry_id": entry.id,
+                "entry_no": entry.entry_no,
+                "entry_date": entry.entry_date,
+                "memo": entry.memo,
+                "account_id": ln.account_id,
+                "description": ln.description,
+                "debit": dr,
+                "credit": cr,
+                "balance": running,
+            }
+        )
+
+    return {
+        "account_id": acc.id,
+        "code": acc.code,
+        "name": acc.name,
+        "account_type": acc.account_type,
+        "from_date": from_date,
+        "to_date": to_date,
+        "opening_balance": opening,
+        "closing_balance": running,
+        "total_debit": total_debit,
+        "total_credit": total_credit,
+        "lines": lines,
+    }
@@ -1,17 +1,26 @@
 """Vehicle assignment API routes."""
 
-from datetime import date, datetime
+from datetime import date, datetime, timedelta
 import json
 from typing import List, Optional
 
 from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy import case, func
 from sqlalchemy.orm import Session
 
 from app.core.database import get_db
 from app.api.dependencies import require_permission
+from app.core.fleet_assignment_stats import (
+    assignment_rate,
+    month_bounds,
+    month_of,
+    months_touched,
+    refresh_month_stats,
+)
 from app.models.fleet.vehicle import Vehicle
 from app.models.hr.employee import Employee
 from app.models.fleet.vehicle_assignment import VehicleAssignment
+from app.models.fleet.vehicle_assignment_month_stat import VehicleAssignmentMonthStat
 from app.schemas.fleet.vehicle_assignment import (
     VehicleAssignmentCreate,
     VehicleAssignmentUpdate,
@@ -181,108 +190,127 @@ async def list_assignments(
     return [_serialize_assignment(a) for a in assignments]
 
 
-@router.get("/analytics", response_model=VehicleAssignmentAnalyticsResponse)
-async def assignment_analytics(
-    db: Session = Depends(get_db),
-    period: str = Query(default="day"),
-    day: Optional[date] = Query(default=None),
-    month: Optional[str] = Query(default=None),
-    year: Optional[int] = Query(default=None),
-    vehicle_id: Optional[str] = Query(default=None),
-) -> VehicleAssignmentAnalyticsResponse:
+def _resolve_period(
+    period: str,
+    day: Optional[date],
+    month: Optional[str],
+    year: Optional[int],
+) -> tuple[str, Optional[date], Optional[str], Optional[int], date, date]:
+    """Validate analytics period params. Returns (period, day, month, year, start, end)."""
+
     p = str(period or "day").strip().lower()
     if p not in {"today", "day", "month", "year"}:
         raise HTTPException(status_code=400, detail="Invalid period. Use today|day|month|year")
 
-    if p == "today":
-        day_val = date.today()
-        month_val = None
-        year_val = None
-    elif p == "day":
-        day_val = day or date.today()
-        month_val = None
-        year_val = None
-    elif p == "month":
-        if not month:
-            month_val = date.today().strftime("%Y-%m")
-        else:
-            month_val = month
-        day_val = None
-        year_val = None
+    if p in {"today", "day"}:
+        day_val = date.today() if p == "today" else (day or date.today())
+        return p, day_val, None, None, day_val, day_val + timedelta(days=1)
+
+    if p == "month":
+        month_val = month or date.today().strftime("%Y-%m")
         try:
-            y_s, m_s = month_val.split("-", 1)
-            y_i = int(y_s)
-            m_i = int(m_s)
-            if not (1 <= m_i <= 12):
-                raise ValueError("month out of range")
+            start, end = month_bounds(month_val)
         except Exception:
             raise HTTPException(status_code=400, detail="Invalid month. Use YYYY-MM")
-    else:
-        year_val = year or date.today().year
-        day_val = None
-        month_val = None
+        return p, None, month_val, None, start, end
 
-    q = db.query(VehicleAssignment).filter(VehicleAssignment.status == "Complete")
-    q = q.filter(VehicleAssignment.distance_km.isnot(None))
+    year_val = year or date.today().year
+    return p, None, None, year_val, date(year_val, 1, 1), date(year_val + 1, 1, 1)
 
-    if vehicle_id:
-        q = q.filter(VehicleAssignment.vehicle_id == vehicle_id)
 
-    if day_val is not None:
-        q = q.filter(VehicleAssignment.assignment_date == day_val)
-    elif month_val is not None:
-        y_s, m_s = month_val.split("-", 1)
-        y_i = int(y_s)
-        m_i = int(m_s)
-        start = date(y_i, m_i, 1)
-        end = date(y_i + 1, 1, 1) if m_i == 12 else date(y_i, m_i + 1, 1)
-        q = q.filter(VehicleAssignment.assignment_date >= start)
-        q = q.filter(VehicleAssignment.assignment_date < end)
-    elif year_val is not None:
-        start = date(year_val, 1, 1)
-        end = date(year_val + 1, 1, 1)
-        q = q.filter(VehicleAssignment.assignment_date >= start)
-        q = q.filter(VehicleAssignment.assignment_date < end)
+def _vehicle_totals_query(db: Session, p: str, start: date, end: date, vehicle_id: Optional[str]):
+    """Per-vehicle totals as a subquery (vehicle_id, assignments, total_km, total_amount,
+    avg_rate_per_km, min_cost_per_km, max_cost_per_km).
 
-    rows_raw = q.order_by(VehicleAssignment.vehicle_id.asc(), VehicleAssignment.assignment_date.asc()).all()
-
-    by_vehicle: dict[str, VehicleAssignmentAggRow] = {}
-    for a in rows_raw:
-        vid = a.vehicle_id
-        km = float(a.distance_km or 0)
-        amount = float(a.amount or 0)
-        rate = float(a.rate_per_km) if a.rate_per_km is not None else (amount / km if km > 0 else None)
-
-        agg = by_vehicle.get(vid)
-        if not agg:
-            agg = VehicleAssignmentAggRow(
-                vehicle_id=vid,
-                assignments=0,
-                total_km=0.0,
-                total_amount=0.0,
-                avg_rate_per_km=None,
-                cost_per_km=None,
-            )
-            by_vehicle[vid] = agg
-
-        agg.assignments += 1
-        agg.total_km += km
-        agg.total_amount += amount
+    Year periods sum the monthly stats rows; shorter periods group the assignments.
+    """
 
-        if agg.total_km > 0:
-            agg.cost_per_km = agg.total_amount / agg.total_km
+    if p == "year":
+        S = VehicleAssignmentMonthStat
+        rate_n = func.sum(S.rate_count)
+        q = db.query(
+            S.vehicle_id.label("vehicle_id"),
+            func.sum(S.assignments).label("assignments"),
+            func.sum(S.total_km).label("total_km"),
+            func.sum(S.total_amount).label("total_amount"),
+            case((rate_n > 0, func.sum(S.rate_sum) / rate_n), else_=None).label("avg_rate_per_km"),
+            func.min(S.min_cost_per_km).label("min_cost_per_km"),
+            func.max(S.max_cost_per_km).label("max_cost_per_km"),
+        ).filter(S.month >= month_of(start), S.month < month_of(end))
+        if vehicle_id:
+            q = q.filter(S.vehicle_id == vehicle_id)
+        return q.group_by(S.vehicle_id).subquery()
+
+    rate = assignment_rate()
+    cost = func.coalesce(VehicleAssignment.amount, 0.0) / VehicleAssignment.distance_km
+    q = (
+        db.query(
+            VehicleAssignment.vehicle_id.label("vehicle_id"),
+            func.count(VehicleAssignment.id).label("assignments"),
+            func.sum(VehicleAssignment.distance_km).label("total_km"),
+            func.sum(func.coalesce(VehicleAssignment.amount, 0.0)).label("total_amount"),
+            func.avg(case((rate >= 0, rate), else_=None)).label("avg_rate_per_km"),
+            func.min(cost).label("min_cost_per_km"),
+            func.max(cost).label("max_cost_per_km"),
+        )
+        .filter(VehicleAssignment.status == "Complete")
+        .filter(VehicleAssignment.distance_km > 0)
+        .filter(VehicleAssignment.assignment_date >= start)
+        .filter(VehicleAssignment.assignment_date < end)
+    )
+    if vehicle_id:
+        q = q.filter(VehicleAssignment.vehicle_id == vehicle_id)
+    return q.group_by(VehicleAssignment.vehicle_id).subquery()
 
-        if rate is not None and rate >= 0:
-            if agg.avg_rate_per_km is None:
-                agg.avg_rate_per_km = rate
-            else:
-                agg.avg_rate_per_km = (agg.avg_rate_per_km * (agg.assignments - 1) + rate) / agg.assignments
 
-    rows = sorted(by_vehicle.values(), key=lambda r: (r.vehicle_id))
+@router.get("/analytics", response_model=VehicleAssignmentAnalyticsResponse)
+async def assignment_analytics(
+    db: Session = Depends(get_db),
+    period: str = Query(default="day"),
+    day: Optional[date] = Query(default=None),
+    month: Optional[str] = Query(default=None),
+    year: Optional[int] = Query(default=None),
+    vehicle_id: Optional[str] = Query(default=None),
+) -> VehicleAssignmentAnalyticsResponse:
+    p, day_val, month_val, year_val, start, end = _resolve_period(period, day, month, year)
+
+    agg = _vehicle_totals_query(db, p, start, end, vehicle_id)
+    cost = case((agg.c.total_km > 0, agg.c.total_amount / agg.c.total_km), else_=None)
+    scored = cost.is_(None)
+    rows_raw = (
+        db.query(
+            agg.c.vehicle_id,
+            agg.c.assignments,
+            agg.c.total_km,
+            agg.c.total_amount,
+            agg.c.avg_rate_per_km,
+            cost.label("cost_per_km"),
+            func.row_number().over(partition_by=scored, order_by=(cost.asc(), agg.c.vehicle_id.asc())).label("best_rank"),
+            func.row_number().over(partition_by=scored, order_by=(cost.desc(), agg.c.vehicle_id.asc())).label("worst_rank"),
+        )
+        .order_by(agg.c.vehicle_id.asc())
+        .all()
+    )
 
-    scored = [r for r in rows if r.cost_per_km is not None and r.total_km > 0]
-    best = sorted(scored, key=lambda r: r.cost_per_km or 0)[:5]
-    worst = sorted(scored, key=lambda r: r.cost_per_km or 0, reverse=True)[:5]
+    rows: list[VehicleAssignmentAggRow] = []
+    best: list[tuple[int, VehicleAssignmentAggRow]] = []
+    worst: list[tuple[int, VehicleAssignmentAggRow]] = []
+    for r in rows_raw:
+        row = VehicleAssignmentAggRow(
+            vehicle_id=r.vehicle_id,
+            assignments=int(r.assignments or 0),
+            total_km=float(r.total_km or 0),
+            total_amount=float(r.total_amount or 0),
+            avg_rate_per_km=float(r.avg_rate_per_km) if r.avg_rate_per_km is not None else None,
+            cost_per_km=float(r.cost_per_km) if r.cost_per_km is not None else None,
+        )
+        rows.append(row)
+        if row.cost_per_km is None:
+            continue
+        if r.best_rank <= 5:
+            best.append((r.best_rank, row))
+        if r.worst_rank <= 5:
+            worst.append((r.worst_rank, row))
 
     return VehicleAssignmentAnalyticsResponse(
         period=p,
@@ -291,8 +319,8 @@ async def assignment_analytics(
         year=year_val,
         vehicle_id=vehicle_id,
         rows=rows,
-        best_cost_per_km=best,
-        worst_cost_per_km=worst,
+        best_cost_per_km=[row for _, row in sorted(best, key=lambda t: t[0])],
+        worst_cost_per_km=[row for _, row in sorted(worst, key=lambda t: t[0])],
     )
 
 
@@ -306,152 +334,116 @@ async def assignment_efficiency(
     vehicle_id: Optional[str] = Query(default=None),
     outlier_limit: int = Query(default=20),
 ) -> VehicleAssignmentEfficiencyResponse:
-    p = str(period or "day").strip().lower()
-    if p not in {"today", "day", "month", "year"}:
-        raise HTTPException(status_code=400, detail="Invalid period. Use today|day|month|year")
-
-    if p == "today":
-        day_val = date.today()
-        month_val = None
-        year_val = None
-    elif p == "day":
-        day_val = day or date.today()
-        month_val = None
-        year_val = None
-    elif p == "month":
-        if not month:
-            month_val = date.today().strftime("%Y-%m")
-        else:
-            month_val = month
-        day_val = None
-        year_val = None
-        try:
-            y_s, m_s = month_val.split("-", 1)
-            y_i = int(y_s)
-            m_i = int(m_s)
-            if not (1 <= m_i <= 12):
-                raise ValueError("month out of range")
-        except Exception:
-            raise HTTPException(status_code=400, detail="Invalid month. Use YYYY-MM")
-    else:
-        year_val = year or date.today().year
-        day_val = None
-        month_val = None
+    p, day_val, month_val, year_val, start, end = _resolve_period(period, day, month, year)
 
     if outlier_limit < 1:
         outlier_limit = 1
     if outlier_limit > 200:
         outlier_limit = 200
 
-    q = db.query(VehicleAssignment).filter(VehicleAssignment.status == "Complete")
-    q = q.filter(VehicleAssignment.distance_km.isnot(None))
-
-    if vehicle_id:
-        q = q.filter(VehicleAssignment.vehicle_id == vehicle_id)
-
-    if day_val is not None:
-        q = q.filter(VehicleAssignment.assignment_date == day_val)
-    elif month_val is not None:
-        y_s, m_s = month_val.split("-", 1)
-        y_i = int(y_s)
-        m_i = int(m_s)
-        start = date(y_i, m_i, 1)
-        end = date(y_i + 1, 1, 1) if m_i == 12 else date(y_i, m_i + 1, 1)
-        q = q.filter(VehicleAssignment.assignment_date >= start)
-        q = q.filter(VehicleAssignment.assignment_date < end)
-    elif year_val is not None:
-        start = date(year_val, 1, 1)
-        end = date(year_val + 1, 1, 1)
-        q = q.filter(VehicleAssignment.assignment_date >= start)
-        q = q.filter(VehicleAssignment.assignment_date < end)
-
-    rows_raw = q.order_by(VehicleAssignment.assignment_date.desc(), VehicleAssignment.id.desc()).all()
-
     # Per vehicle baseline
-    v_sum: dict[str, VehicleEfficiencySummaryRow] = {}
-    for a in rows_raw:
-        vid = a.vehicle_id
-        km = float(a.distance_km or 0)
-        amount = float(a.amount or 0)
-        if km <= 0:
-            continue
-        cost_per_km = amount / km
-
-        s = v_sum.get(vid)
-        if not s:
-            s = VehicleEfficiencySummaryRow(
-                vehicle_id=vid,
-                assignments=0,
-                total_km=0.0,
-                total_amount=0.0,
-                avg_cost_per_km=None,
-                min_cost_per_km=None,
-                max_cost_per_km=None,
+    agg = _vehicle_totals_query(db, p, start, end, vehicle_id)
+    vehicle_cost = case((agg.c.total_km > 0, agg.c.total_amount / agg.c.total_km), else_=None)
+    vehicles_sorted: list[VehicleEfficiencySummaryRow] = []
+    for r in db.query(agg, vehicle_cost.label("avg_cost_per_km")).order_by(
+        func.coalesce(vehicle_cost, 0).desc(), agg.c.total_amount.desc()
+    ):
+        n = int(r.assignments or 0)
+        km = float(r.total_km or 0)
+        vehicles_sorted.append(
+            VehicleEfficiencySummaryRow(
+                vehicle_id=r.vehicle_id,
+                assignments=n,
+                total_km=km,
+                total_amount=float(r.total_amount or 0),
+                avg_km_per_trip=(km / n) if n > 0 else None,
+                avg_cost_per_km=float(r.avg_cost_per_km) if r.avg_cost_per_km is not None else None,
+                min_cost_per_km=float(r.min_cost_per_km) if r.min_cost_per_km is not None else None,
+                max_cost_per_km=float(r.max_cost_per_km) if r.max_cost_per_km is not None else None,
             )
-            v_sum[vid] = s
-
-        s.assignments += 1
-        s.total_km += km
-        s.total_amount += amount
-        if s.assignments > 0:
-            s.avg_km_per_trip = s.total_km / float(s.assignments)
-        s.min_cost_per_km = cost_per_km if s.min_cost_per_km is None else min(s.min_cost_per_km, cost_per_km)
-        s.max_cost_per_km = cost_per_km if s.max_cost_per_km is None else max(s.max_cost_per_km, cost_per_km)
-        if s.total_km > 0:
-            s.avg_cost_per_km = s.total_amount / s.total_km
-
-    # Per assignment rows (cost/km vs its vehicle average)
-    per_assignment: list[AssignmentEfficiencyRow] = []
-    for a in rows_raw:
-        km = float(a.distance_km or 0)
-        amount = float(a.amount or 0)
-        if km <= 0:
-            continue
-        rate = float(a.rate_per_km) if a.rate_per_km is not None else (amount / km)
-        cost_per_km = amount / km
+        )
+    v_sum = {v.vehicle_id: v for v in vehicles_sorted}
 
-        base = v_sum.get(a.vehicle_id)
-        v_avg = base.avg_cost_per_km if base else None
-        delta = (cost_per_km - v_avg) if v_avg is not None else None
-
-        per_assignment.append(
-            AssignmentEfficiencyRow(
-                assignment_id=a.id,
-                assignment_date=a.assignment_date,
-                vehicle_id=a.vehicle_id,
-                employee_ids=_serialize_assignment(a).employee_ids,
-                route_from=a.route_from,
-                route_to=a.route_to,
-                distance_km=km,
-                amount=amount,
-                rate_per_km=rate,
-                cost_per_km=cost_per_km,
-                vehicle_avg_cost_per_km=v_avg,
-                delta_vs_vehicle_avg=delta,
-            )
+    def _in_scope(q):
+        q = q.filter(VehicleAssignment.status == "Complete")
+        q = q.filter(VehicleAssignment.distance_km > 0)
+        q = q.filter(VehicleAssignment.assignment_date >= start)
+        q = q.filter(VehicleAssignment.assignment_date < end)
+        if vehicle_id:
+            q = q.filter(VehicleAssignment.vehicle_id == vehicle_id)
+        return q
+
+    # Per assignment cost/km vs its vehicle average, ranked in SQL so only the outliers load
+    amount = func.coalesce(VehicleAssignment.amount, 0.0)
+    cost = amount / VehicleAssignment.distance_km
+    vehicle_avg = func.sum(amount).over(partition_by=VehicleAssignment.vehicle_id) / func.sum(
+        VehicleAssignment.distance_km
+    ).over(partition_by=VehicleAssignment.vehicle_id)
+    ranked = _in_scope(
+        db.query(
+            VehicleAssignment.id.label("assignment_id"),
+            VehicleAssignment.assignment_date.label("assignment_date"),
+            VehicleAssignment.vehicle_id.label("vehicle_id"),
+            VehicleAssignment.employee_ids.label("employee_ids"),
+            VehicleAssignment.route_from.label("route_from"),
+            VehicleAssignment.route_to.label("route_to"),
+            VehicleAssignment.distance_km.label("distance_km"),
+            amount.label("amount"),
+            func.coalesce(VehicleAssignment.rate_per_km, cost).label("rate_per_km"),
+            cost.label("cost_per_km"),
+            vehicle_avg.label("vehicle_avg_cost_per_km"),
+            (cost - vehicle_avg).label("delta_vs_vehicle_avg"),
         )
+    ).subquery()
+
+    def _outliers(descending: bool) -> list[AssignmentEfficiencyRow]:
+        delta = ranked.c.delta_vs_vehicle_avg
+        cpk = ranked.c.cost_per_km
+        order = (delta.desc(), cpk.desc()) if descending else (delta.asc(), cpk.asc())
+        out: list[AssignmentEfficiencyRow] = []
+        for r in (
+            db.query(ranked)
+            .order_by(*order, ranked.c.assignment_date.desc(), ranked.c.assignment_id.desc())
+            .limit(outlier_limit)
+        ):
+            try:
+                employee_ids = json.loads(r.employee_ids or "[]")
+            except json.JSONDecodeError:
+                employee_ids = []
+            out.append(
+                AssignmentEfficiencyRow(
+                    assignment_id=r.assignment_id,
+                    assignment_date=r.assignment_date,
+                    vehicle_id=r.vehicle_id,
+                    employee_ids=employee_ids,
+                    route_from=r.route_from,
+                    route_to=r.route_to,
+                    distance_km=float(r.distance_km),
+                    amount=float(r.amount),
+                    rate_per_km=float(r.rate_per_km),
+                    cost_per_km=float(r.cost_per_km),
+                    vehicle_avg_cost_per_km=float(r.vehicle_avg_cost_per_km),
+                    delta_vs_vehicle_avg=float(r.delta_vs_vehicle_avg),
+                )
+            )
+        return out
 
-    # Sort by delta vs vehicle avg; if vehicle avg missing, fall back to cost_per_km
-    expensive = sorted(
-        per_assignment,
-        key=lambda r: (
-            -(r.delta_vs_vehicle_avg if r.delta_vs_vehicle_avg is not None else r.cost_per_km),
-            -(r.cost_per_km),
-        ),
-    )[:outlier_limit]
-    efficient = sorted(
-        per_assignment,
-        key=lambda r: (
-            (r.delta_vs_vehicle_avg if r.delta_vs_vehicle_avg is not None else r.cost_per_km),
-            (r.cost_per_km),
-        ),
-    )[:outlier_limit]
+    expensive = _outliers(descending=True)
+    efficient = _outliers(descending=False)
 
-    # Employee leaderboard, focusing on expensive assignments
+    # Employee leaderboard, focusing on expensive assignments.
+    # employee_ids is a JSON list, so only the three columns needed are read and summed here.
     expensive_ids = {r.assignment_id for r in expensive}
     emp_sum: dict[str, EmployeeEfficiencySummaryRow] = {}
-    for r in per_assignment:
-        for eid in r.employee_ids:
+    emp_rows = _in_scope(
+        db.query(VehicleAssignment.id, VehicleAssignment.employee_ids, VehicleAssignment.distance_km, amount)
+    )
+    for a_id, employee_ids_raw, km, amt in emp_rows:
+        try:
+            employee_ids = json.loads(employee_ids_raw or "[]")
+        except json.JSONDecodeError:
+            employee_ids = []
+        for eid in employee_ids:
             if not eid:
                 continue
             s = emp_sum.get(eid)
@@ -466,13 +458,15 @@ async def assignment_efficiency(
                 )
                 emp_sum[eid] = s
             s.assignments += 1
-            s.total_km += float(r.distance_km)
-            s.total_amount += float(r.amount)
-            if s.total_km > 0:
-                s.avg_cost_per_km = s.total_amount / s.total_km
-            if r.assignment_id in expensive_ids:
+            s.total_km += float(km)
+            s.total_amount += float(amt)
+            if a_id in expensive_ids:
                 s.expensive_assignments += 1
 
+    for s in emp_sum.values():
+        if s.total_km > 0:
+            s.avg_cost_per_km = s.total_amount / s.total_km
+
     employees_sorted = sorted(
         emp_sum.values(),
         key=lambda e: (
@@ -548,14 +542,6 @@ async def assignment_efficiency(
         ),
     )[:outlier_limit]
 
-    vehicles_sorted = sorted(
-        v_sum.values(),
-        key=lambda v: (
-            -(v.avg_cost_per_km if v.avg_cost_per_km is not None else 0),
-            -float(v.total_amount),
-        ),
-    )
-
     total_km = sum(v.total_km for v in vehicles_sorted)
     total_amount = sum(v.total_amount for v in vehicles_sorted)
     avg_cost = (total_amount / total_km) if total_km > 0 else None
@@ -566,7 +552,7 @@ async def assignment_efficiency(
         month=month_val,
         year=year_val,
         vehicle_id=vehicle_id,
-        assignments=len(per_assignment),
+        assignments=sum(v.assignments for v in vehicles_sorted),
         total_km=float(total_km),
         total_amount=float(total_amount),
         avg_cost_per_km=avg_cost,
@@ -605,6 +591,7 @@ async def update_assignment(
         raise HTTPException(status_code=404, detail="Assignment not found")
 
     update_data = payload.dict(exclude_unset=True)
+    old_date = assignment.assignment_date
 
     # If vehicle_id is changing, validate vehicle exists
     if "vehicle_id" in update_data:
@@ -711,6 +698,8 @@ async def update_assignment(
     for field, value in update_data.items():
         setattr(assignment, field, value)
 
+    db.flush()
+    refresh_month_stats(db, months_touched(old_date, assignment.assignment_date))
     db.commit()
     db.refresh(assignment)
 
@@ -728,7 +717,10 @@ async def delete_assignment(
     if not assignment:
         raise HTTPException(status_code=404, detail="Assignment not found")
 
+    months = months_touched(assignment.assignment_date)
     db.delete(assignment)
+    db.flush()
+    refresh_month_stats(db, months)
     db.commit()
 
     return {"message": "Assignment deleted successfully"}
@@ -7,7 +7,7 @@ from sqlalchemy.orm import Session
 
 from app.core.config import settings
 from app.core.database import get_db
-from app.core.upload_helper import upload_file_with_prefix
+from app.core.upload_helper import delete_upload, upload_file_with_prefix
 from app.models.fleet.vehicle import Vehicle
 from app.models.fleet.vehicle_document import VehicleDocument
 from app.schemas.fleet.vehicle_document import VehicleDocumentOut
@@ -125,8 +125,7 @@ async def delete_vehicle_document(vehicle_id: str, doc_id: int, db: Session = De
         raise HTTPException(status_code=404, detail="Document not found")
 
     try:
-        if doc.path and not doc.path.startswith("http") and os.path.exists(doc.path):
-            os.remove(doc.path)
+        delete_upload(doc.path)
     except Exception:
         pass
 
@@ -2,6 +2,7 @@ from datetime import date as date_type
 from typing import List, Optional
 
 from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy import and_, case, func, or_
 from sqlalchemy.orm import Session
 
 from app.core.database import get_db
@@ -12,8 +13,10 @@ from app.schemas.fleet.fuel_entry import (
     FuelEntryCreate,
     FuelEntryResponse,
     FuelEntryUpdate,
+    FuelAnomalyRow,
     FuelMileageSummary,
     FuelMileageTip,
+    FuelVehicleEfficiencyRow,
 )
 
 
@@ -113,25 +116,227 @@ async def delete_fuel_entry(entry_id: int, db: Session = Depends(get_db)) -> dic
     return {"message": "Fuel entry deleted"}
 
 
+# Interval km/L below this, or below LOW_RATIO of the vehicle's own average, is flagged.
+LOW_KM_PER_LITER = 4.0
+LOW_RATIO = 0.5
+# Interval km/L above HIGH_RATIO x the vehicle average usually means a fill-up was not logged.
+HIGH_RATIO = 2.0
+
+
+def _scoped(q, vehicle_id: Optional[str], from_date: Optional[date_type], to_date: Optional[date_type]):
+    if vehicle_id:
+        q = q.filter(FuelEntry.vehicle_id == vehicle_id)
+    if from_date:
+        q = q.filter(FuelEntry.entry_date >= from_date)
+    if to_date:
+        q = q.filter(FuelEntry.entry_date <= to_date)
+    return q
+
+
+def _intervals(db: Session, vehicle_id, from_date, to_date):
+    """Fill-ups with an odometer reading, each with the previous reading of the same vehicle.
+
+    Distance between two readings is driven on the fuel bought at the later fill-up, so an
+    interval's km/L is ``(odometer - prev_odometer) / liters``. The previous reading is
+    looked up over all of the vehicle's fill-ups, so the first fill-up in the date range
+    still closes the interval that started before it.
+    """
+
+    window = {"partition_by": FuelEntry.vehicle_id, "order_by": (FuelEntry.entry_date.asc(), FuelEntry.id.asc())}
+    lagged = _scoped(
+        db.query(
+            FuelEntry.id.label("entry_id"),
+            FuelEntry.vehicle_id.label("vehicle_id"),
+            FuelEntry.entry_date.label("entry_date"),
+            FuelEntry.liters.label("liters"),
+            func.coalesce(FuelEntry.total_cost, 0.0).label("cost"),
+            FuelEntry.odometer_km.label("odometer_km"),
+            func.lag(FuelEntry.odometer_km).over(**window).label("prev_odometer_km"),
+        ).filter(FuelEntry.odometer_km.isnot(None)),
+        vehicle_id,
+        None,
+        None,
+    ).subquery()
+
+    q = db.query(lagged)
+    if from_date:
+        q = q.filter(lagged.c.entry_date >= from_date)
+    if to_date:
+        q = q.filter(lagged.c.entry_date <= to_date)
+    return q.subquery()
+
+
+def _vehicle_efficiency(db: Session, vehicle_id, from_date, to_date) -> tuple[List[FuelVehicleEfficiencyRow], dict]:
+    """Per-vehicle totals and odometer-interval km/L and cost/km, ranked by km/L in SQL.
+
+    Also returns the fleet's summed interval distance, liters and cost.
+    """
+
+    iv = _intervals(db, vehicle_id, from_date, to_date)
+    delta = iv.c.odometer_km - iv.c.prev_odometer_km
+    valid = and_(iv.c.prev_odometer_km.isnot(None), delta >= 0)
+    odo = (
+        db.query(
+            iv.c.vehicle_id.label("vehicle_id"),
+            func.min(func.coalesce(iv.c.prev_odometer_km, iv.c.odometer_km)).label("start_odometer_km"),
+            func.max(iv.c.odometer_km).label("end_odometer_km"),
+            func.sum(case((valid, delta), else_=0)).label("distance_km"),
+            func.sum(case((valid, iv.c.liters), else_=0.0)).label("interval_liters"),
+            func.sum(case((valid, iv.c.cost), else_=0.0)).label("interval_cost"),
+            func.count(case((valid, 1), else_=None)).label("intervals"),
+        )
+        .group_by(iv.c.vehicle_id)
+        .subquery()
+    )
+    totals = _scoped(
+        db.query(
+            FuelEntry.vehicle_id.label("vehicle_id"),
+            func.count(FuelEntry.id).label("entries"),
+            func.sum(FuelEntry.liters).label("total_liters"),
+            func.sum(func.coalesce(FuelEntry.total_cost, 0.0)).label("total_cost"),
+        ),
+        vehicle_id,
+        from_date,
+        to_date,
+    ).group_by(FuelEntry.vehicle_id).subquery()
+
+    km_per_l = case((odo.c.interval_liters > 0, odo.c.distance_km / odo.c.interval_liters), else_=None)
+    cost_per_km = case((odo.c.distance_km > 0, odo.c.interval_cost / odo.c.distance_km), else_=None)
+    rank = func.rank().over(partition_by=km_per_l.is_(None), order_by=km_per_l.desc())
+
+    rows = (
+        db.query(
+            totals,
+            odo.c.start_odometer_km,
+            odo.c.end_odometer_km,
+            odo.c.distance_km,
+            odo.c.interval_liters,
+            odo.c.interval_cost,
+            odo.c.intervals,
+            km_per_l.label("avg_km_per_liter"),
+            cost_per_km.label("avg_cost_per_km"),
+            rank.label("rank"),
+        )
+        .outerjoin(odo, odo.c.vehicle_id == totals.c.vehicle_id)
+        .all()
+    )
+
+    out = [
+        FuelVehicleEfficiencyRow(
+            rank=int(r.rank) if r.avg_km_per_liter is not None else None,
+            vehicle_id=r.vehicle_id,
+            entries=int(r.entries or 0),
+            total_liters=float(r.total_liters or 0),
+            total_cost=float(r.total_cost or 0),
+            start_odometer_km=r.start_odometer_km,
+            end_odometer_km=r.end_odometer_km,
+            distance_km=float(r.distance_km) if r.intervals else None,
+            avg_km_per_liter=float(r.avg_km_per_liter) if r.avg_km_per_liter is not None else None,
+            avg_cost_per_km=float(r.avg_cost_per_km) if r.avg_cost_per_km is not None else None,
+        )
+        for r in rows
+    ]
+    out.sort(key=lambda v: (v.rank is None, v.rank or 0, v.vehicle_id))
+
+    measured = [r for r in rows if r.intervals]
+    fleet = {
+        "distance_km": float(sum(r.distance_km for r in measured)) if measured else None,
+        "liters": float(sum(r.interval_liters for r in measured)),
+        "cost": float(sum(r.interval_cost for r in measured)),
+    }
+    return out, fleet
+
+
+def _fuel_anomalies(db: Session, vehicle_id, from_date, to_date, limit: int) -> List[FuelAnomalyRow]:
+    """Fill-ups whose odometer interval looks wrong, newest first.
+
+    Flags odometer drops, repeated readings, and km/L far below or above the vehicle's
+    average over the same period.
+    """
+
+    iv = _intervals(db, vehicle_id, from_date, to_date)
+    delta = iv.c.odometer_km - iv.c.prev_odometer_km
+    valid = and_(iv.c.prev_odometer_km.isnot(None), delta >= 0)
+    v_km = func.sum(case((valid, delta), else_=0)).over(partition_by=iv.c.vehicle_id)
+    v_liters = func.sum(case((valid, iv.c.liters), else_=0.0)).over(partition_by=iv.c.vehicle_id)
+    scored = db.query(
+        iv,
+        delta.label("delta_km"),
+        case((and_(valid, iv.c.liters > 0), delta / iv.c.liters), else_=None).label("km_per_liter"),
+        case((v_liters > 0, v_km / v_liters), else_=None).label("vehicle_avg_km_per_liter"),
+    ).subquery()
+
+    kmpl = scored.c.km_per_liter
+    avg = scored.c.vehicle_avg_km_per_liter
+    rows = (
+        db.query(scored)
+        .filter(scored.c.prev_odometer_km.isnot(None))
+        .filter(
+            or_(
+                scored.c.delta_km <= 0,
+                kmpl < LOW_KM_PER_LITER,
+                kmpl < avg * LOW_RATIO,
+                kmpl > avg * HIGH_RATIO,
+            )
+        )
+        .order_by(scored.c.entry_date.desc(), scored.c.entry_id.desc())
+        .limit(limit)
+        .all()
+    )
+
+    out: List[FuelAnomalyRow] = []
+    for r in rows:
+        avg_v = float(r.vehicle_avg_km_per_liter) if r.vehicle_avg_km_per_liter is not None else None
+        kmpl_v = float(r.km_per_liter) if r.km_per_liter is not None else None
+        if r.delta_km < 0:
+            kind = "odometer_decreased"
+            detail = f"Odometer dropped from {r.prev_odometer_km} to {r.odometer_km} km. Please verify readings."
+        elif r.delta_km == 0:
+            kind = "no_distance"
+            detail = f"Odometer did not change since the previous fill-up ({r.odometer_km} km). Check for a duplicate entry."
+        elif avg_v is not None and kmpl_v is not None and kmpl_v > avg_v * HIGH_RATIO:
+            kind = "missing_fill_up"
+            detail = f"{kmpl_v:.2f} km/L is far above this vehicle's {avg_v:.2f} km/L. A fill-up may not have been logged."
+        else:
+            kind = "fuel_spike"
+            detail = f"{kmpl_v:.2f} km/L on {r.entry_date.isoformat()}. Consider checking for leaks, idling, or route issues."
+        out.append(
+            FuelAnomalyRow(
+                entry_id=r.entry_id,
+                vehicle_id=r.vehicle_id,
+                entry_date=r.entry_date,
+                kind=kind,
+                detail=detail,
+                odometer_km=r.odometer_km,
+                prev_odometer_km=r.prev_odometer_km,
+                delta_km=r.delta_km,
+                liters=float(r.liters),
+                km_per_liter=kmpl_v,
+                vehicle_avg_km_per_liter=avg_v,
+            )
+        )
+    return out
+
+
 @router.get("/summary", response_model=FuelMileageSummary)
 async def fuel_mileage_summary(
     db: Session = Depends(get_db),
     vehicle_id: Optional[str] = None,
     from_date: Optional[date_type] = Query(default=None),
     to_date: Optional[date_type] = Query(default=None),
+    anomaly_limit: int = Query(default=50, ge=1, le=500),
 ) -> FuelMileageSummary:
-    q = db.query(FuelEntry)
-    if vehicle_id:
-        q = q.filter(FuelEntry.vehicle_id == vehicle_id)
-    if from_date:
-        q = q.filter(FuelEntry.entry_date >= from_date)
-    if to_date:
-        q = q.filter(FuelEntry.entry_date <= to_date)
+    """Fuel totals plus odometer-based km/L and cost/km for every vehicle in scope.
+
+    Distance is the sum of forward odometer intervals between fill-ups; km/L and cost/km
+    use the fuel bought at the end of each interval. ``vehicles`` ranks all vehicles by
+    km/L and ``anomalies`` lists suspicious fill-ups.
+    """
 
-    entries: List[FuelEntry] = q.order_by(FuelEntry.vehicle_id.asc(), FuelEntry.entry_date.asc(), FuelEntry.id.asc()).all()
+    vehicles, fleet = _vehicle_efficiency(db, vehicle_id, from_date, to_date)
 
     tips: List[FuelMileageTip] = []
-    if not entries:
+    if not vehicles:
         tips.append(FuelMileageTip(level="info", title="No data", detail="Add fuel entries to see analytics."))
         return FuelMileageSummary(
             vehicle_id=vehicle_id,
@@ -143,43 +348,36 @@ async def fuel_mileage_summary(
             tips=tips,
         )
 
-    total_liters = sum(float(e.liters or 0) for e in entries)
-    total_cost = sum(float(e.total_cost or 0) for e in entries)
+    entries = sum(v.entries for v in vehicles)
+    total_liters = sum(v.total_liters for v in vehicles)
+    total_cost = sum(v.total_cost for v in vehicles)
 
     start_odo: Optional[int] = None
     end_odo: Optional[int] = None
-    distance_km: Optional[float] = None
-
-    # Only compute distance-based metrics when a single vehicle is requested.
     if vehicle_id:
-        odo_values = [e.odometer_km for e in entries if e.odometer_km is not None]
-        start_odo = odo_values[0] if odo_values else None
-        end_odo = odo_values[-1] if odo_values else None
-        if start_odo is not None and end_odo is not None and end_odo >= start_odo:
-            distance_km = float(end_odo - start_odo)
-    else:
-        tips.append(
-            FuelMileageTip(
-                level="info",
-                title="Select a vehicle for mileage",
-                detail="Distance, km/L and cost per km are calculated per-vehicle using odometer readings. Select a specific vehicle to see these metrics.",
-            )
-        )
+        start_odo = vehicles[0].start_odometer_km
+        end_odo = vehicles[0].end_odometer_km
+
+    # Fleet figures only use fuel bought at the end of an odometer interval.
+    distance_km: Optional[float] = fleet["distance_km"]
 
     avg_km_per_liter: Optional[float] = None
-    if distance_km is not None and total_liters > 0:
-        avg_km_per_liter = distance_km / total_liters
+    if distance_km is not None and fleet["liters"] > 0:
+        avg_km_per_liter = distance_km / fleet["liters"]
 
     avg_cost_per_km: Optional[float] = None
     if distance_km is not None and distance_km > 0:
-        avg_cost_per_km = total_cost / distance_km
+        avg_cost_per_km = fleet["cost"] / distance_km
 
-    if vehicle_id and any(e.odometer_km is None for e in entries):
+    missing_odo = _scoped(
+        db.query(func.count(FuelEntry.id)).filter(FuelEntry.odometer_km.is_(None)), vehicle_id, from_date, to_date
+    ).scalar()
+    if missing_odo:
         tips.append(
             FuelMileageTip(
                 level="warning",
                 title="Missing odometer readings",
-                detail="Some entries are missing odometer (km). Add it to improve mileage and cost per km accuracy.",
+                detail=f"{missing_odo} entries are missing odometer (km). Add it to improve mileage and cost per km accuracy.",
             )
         )
 
@@ -228,41 +426,30 @@ async def fuel_mileage_summary(
                 )
             )
 
-    # Detect suspicious jumps (simple heuristic)
-    last_by_vehicle: dict[str, FuelEntry] = {}
-    for e in entries:
-        prev = last_by_vehicle.get(e.vehicle_id)
-        last_by_vehicle[e.vehicle_id] = e
-        if not prev:
-            continue
-        if prev.odometer_km is None or e.odometer_km is None:
-            continue
-        if e.odometer_km < prev.odometer_km:
+    anomalies = _fuel_anomalies(db, vehicle_id, from_date, to_date, anomaly_limit)
+    for a in anomalies:
+        if a.kind == "odometer_decreased":
             tips.append(
                 FuelMileageTip(
                     level="warning",
                     title="Odometer decreased",
-                    detail=f"Vehicle {e.vehicle_id} has an odometer drop between entries. Please verify readings.",
+                    detail=f"Vehicle {a.vehicle_id} has an odometer drop between entries. Please verify readings.",
                 )
             )
-            continue
-        delta_km = e.odometer_km - prev.odometer_km
-        if delta_km > 0 and e.liters > 0:
-            km_per_l = delta_km / float(e.liters)
-            if km_per_l < 4:
-                tips.append(
-                    FuelMileageTip(
-                        level="warning",
-                        title="Possible fuel spike",
-                        detail=f"Vehicle {e.vehicle_id} shows {km_per_l:.2f} km/L on {e.entry_date.isoformat()}. Consider checking for leaks, idling, or route issues.",
-                    )
+        elif a.kind == "fuel_spike":
+            tips.append(
+                FuelMileageTip(
+                    level="warning",
+                    title="Possible fuel spike",
+                    detail=f"Vehicle {a.vehicle_id} shows {a.km_per_liter:.2f} km/L on {a.entry_date.isoformat()}. Consider checking for leaks, idling, or route issues.",
                 )
+            )
 
     return FuelMileageSummary(
         vehicle_id=vehicle_id,
         from_date=from_date,
         to_date=to_date,
-        entries=len(entries),
+        entries=entries,
         total_liters=float(total_liters),
         total_cost=float(total_cost),
         start_odometer_km=start_odo,
@@ -270,5 +457,7 @@ async def fuel_mileage_summary(
         distance_km=distance_km,
         avg_km_per_liter=avg_km_per_liter,
         avg_cost_per_km=avg_cost_per_km,
+        vehicles=vehicles,
+        anomalies=anomalies,
         tips=tips,
     )
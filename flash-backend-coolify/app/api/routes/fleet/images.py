@@ -7,7 +7,8 @@ from sqlalchemy.orm import Session
 
 from app.core.config import settings
 from app.core.database import get_db
-from app.core.upload_helper import upload_file_with_prefix
+from app.core.image_variants import variant_url
+from app.core.upload_helper import delete_upload, upload_file_with_prefix
 from app.models.fleet.vehicle import Vehicle
 from app.models.fleet.vehicle_image import VehicleImage
 from app.schemas.fleet.vehicle_image import VehicleImageOut
@@ -49,6 +50,7 @@ async def list_vehicle_images(vehicle_id: str, db: Session = Depends(get_db)) ->
                 vehicle_id=img.vehicle_id,
                 filename=img.filename,
                 url=url,
+                thumbnail_url=variant_url(url, "thumb"),
                 mime_type=img.mime_type,
                 created_at=img.created_at,
                 updated_at=img.updated_at,
@@ -99,6 +101,7 @@ async def upload_vehicle_image(
         vehicle_id=img.vehicle_id,
         filename=img.filename,
         url=url,
+        thumbnail_url=variant_url(url, "thumb"),
         mime_type=img.mime_type,
         created_at=img.created_at,
         updated_at=img.updated_at,
@@ -117,8 +120,7 @@ async def delete_vehicle_image(vehicle_id: str, image_id: int, db: Session = Dep
         raise HTTPException(status_code=404, detail="Image not found")
 
     try:
-        if img.path and not img.path.startswith("http") and os.path.exists(img.path):
-            os.remove(img.path)
+        delete_upload(img.path)
     except Exception:
         pass
 
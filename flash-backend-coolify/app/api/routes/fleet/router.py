@@ -3,6 +3,7 @@
 from typing import List
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session
+from app.core.bulk_import import SkipRow, run_bulk_import
 from app.core.database import get_db
 from app.models.fleet.vehicle import Vehicle
 from app.schemas.fleet.vehicle import VehicleCreate, VehicleResponse, VehicleUpdate
@@ -78,113 +79,65 @@ async def delete_vehicle(vehicle_id: str, db: Session = Depends(get_db)):
     db.commit()
 
 
-@bulk_router.post("/import-bulk")
-async def import_vehicles_bulk(data: List[dict], db: Session = Depends(get_db)):
-    """Import vehicles from JSON data (no auth required for testing)."""
+def _parse_vehicle_import_row(idx: int, item: dict) -> dict:
+    # Skip empty rows
+    if not item.get("A") or not item.get("B"):
+        raise SkipRow()
+
+    # Extract data from JSON structure
+    sr_no = str(item.get("A", "")).strip()
+    vehicle_id = str(item.get("B", "")).strip()
+    user = str(item.get("C", "") or "").strip()
+
+    # Skip header row or empty vehicle_id
+    if vehicle_id.lower() in ["vehicle", ""] or sr_no == "Sr.\nNo":
+        raise SkipRow()
+
+    # Create vehicle with default values
+    return {
+        "vehicle_id": vehicle_id,
+        "vehicle_type": "Motorcycle" if "motorcycle" in user.lower() else "Car",
+        "category": "Pool" if "pool" in user.lower() else "Assigned",
+        "make_model": "Imported Vehicle",
+        "license_plate": vehicle_id,
+        "year": 2024,  # Default year
+        "status": "Active" if "not in use" not in user.lower() else "Inactive",
+        "compliance": "Compliant",
+        "government_permit": "Standard",
+    }
+
+
+def _import_vehicles(data: List[dict], db: Session, dry_run: bool) -> dict:
+    result = run_bulk_import(
+        db,
+        Vehicle,
+        data,
+        _parse_vehicle_import_row,
+        key_columns=("vehicle_id",),
+        dry_run=dry_run,
+    )
+    # Existing vehicles have always been reported as skipped.
     results = {
-        "imported": 0,
-        "skipped": 0,
-        "errors": []
+        "imported": result["created"],
+        "skipped": result["skipped"] + result["duplicates"],
+        "errors": [
+            f"Error importing {data[e['row']].get('B', 'unknown')}: {e['error']}"
+            for e in result["errors"]
+        ],
     }
-    
-    for item in data:
-        try:
-            # Skip empty rows
-            if not item.get("A") or not item.get("B"):
-                results["skipped"] += 1
-                continue
-            
-            # Extract data from JSON structure
-            sr_no = item.get("A", "").strip()
-            vehicle_id = item.get("B", "").strip()
-            user = item.get("C", "").strip()
-            
-            # Skip header row or empty vehicle_id
-            if vehicle_id.lower() in ["vehicle", ""] or sr_no == "Sr.\nNo":
-                results["skipped"] += 1
-                continue
-            
-            # Check if vehicle already exists
-            existing_vehicle = db.query(Vehicle).filter(Vehicle.vehicle_id == vehicle_id).first()
-            if existing_vehicle:
-                results["skipped"] += 1
-                continue
-            
-            # Create vehicle with default values
-            vehicle = Vehicle(
-                vehicle_id=vehicle_id,
-                vehicle_type="Motorcycle" if "motorcycle" in user.lower() else "Car",
-                category="Pool" if "pool" in user.lower() else "Assigned",
-                make_model="Imported Vehicle",
-                license_plate=vehicle_id,
-                year=2024,  # Default year
-                status="Active" if "not in use" not in user.lower() else "Inactive",
-                compliance="Compliant",
-                government_permit="Standard"
-            )
-            
-            db.add(vehicle)
-            db.commit()
-            results["imported"] += 1
-            
-        except Exception as e:
-            results["errors"].append(f"Error importing {item.get('B', 'unknown')}: {str(e)}")
-            db.rollback()
-    
+    if dry_run:
+        results["dry_run"] = True
+        results["preview"] = result["preview"]
     return results
 
 
+@bulk_router.post("/import-bulk")
+async def import_vehicles_bulk(data: List[dict], dry_run: bool = False, db: Session = Depends(get_db)):
+    """Import vehicles from JSON data (no auth required for testing)."""
+    return _import_vehicles(data, db, dry_run)
+
+
 @router.post("/import")
-async def import_vehicles(data: List[dict], db: Session = Depends(get_db)):
+async def import_vehicles(data: List[dict], dry_run: bool = False, db: Session = Depends(get_db)):
     """Import vehicles from JSON data."""
-    results = {
-        "imported": 0,
-        "skipped": 0,
-        "errors": []
-    }
-    
-    for item in data:
-        try:
-            # Skip empty rows
-            if not item.get("A") or not item.get("B"):
-                results["skipped"] += 1
-                continue
-            
-            # Extract data from JSON structure
-            sr_no = item.get("A", "").strip()
-            vehicle_id = item.get("B", "").strip()
-            user = item.get("C", "").strip()
-            
-            # Skip header row or empty vehicle_id
-            if vehicle_id.lower() in ["vehicle", ""] or sr_no == "Sr.\nNo":
-                results["skipped"] += 1
-                continue
-            
-            # Check if vehicle already exists
-            existing_vehicle = db.query(Vehicle).filter(Vehicle.vehicle_id == vehicle_id).first()
-            if existing_vehicle:
-                results["skipped"] += 1
-                continue
-            
-            # Create vehicle with default values
-            vehicle = Vehicle(
-                vehicle_id=vehicle_id,
-                vehicle_type="Motorcycle" if "motorcycle" in user.lower() else "Car",
-                category="Pool" if "pool" in user.lower() else "Assigned",
-                make_model="Imported Vehicle",
-                license_plate=vehicle_id,
-                year=2024,  # Default year
-                status="Active" if "not in use" not in user.lower() else "Inactive",
-                compliance="Compliant",
-                government_permit="Standard"
-            )
-            
-            db.add(vehicle)
-            db.commit()
-            results["imported"] += 1
-            
-        except Exception as e:
-            results["errors"].append(f"Error importing {item.get('B', 'unknown')}: {str(e)}")
-            db.rollback()
-    
-    return results
+    return _import_vehicles(data, db, dry_run)
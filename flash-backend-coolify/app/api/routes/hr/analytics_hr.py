@@ -4,13 +4,15 @@ from typing import List, Optional
 
 from fastapi import APIRouter, Depends, HTTPException
 from pydantic import BaseModel
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
 
 from app.core.database import get_db
+from app.core.employee_mapping import forget_employee2_mappings, get_legacy_employee_ids
 from app.models.hr.attendance import AttendanceRecord
-from app.models.hr.employee import Employee
 from app.models.hr.employee2 import Employee2
 from app.models.hr.employee_inactive import EmployeeInactive
+from app.models.hr.pending_deactivation import PendingDeactivation
 from app.models.inventory.general_item import GeneralItem
 from app.models.inventory.general_item_employee_balance import GeneralItemEmployeeBalance
 from app.models.inventory.restricted_item import RestrictedItem
@@ -77,10 +79,6 @@ class PendingDeactivationResponse(BaseModel):
     salary_calculation: SalaryCalculation
     settlement: Settlement
 
-# In-memory storage for demo (replace with DB table in production)
-_pending_deactivations: List[dict] = []
-_next_id = 1
-
 def _attendance_employee_key(employee: Employee2) -> str:
     # Attendance module uses AttendanceRecord.employee_id (string). In this ERP it is typically
     # fss_no/serial_no or as fallback the numeric DB id as string.
@@ -90,35 +88,9 @@ def _attendance_employee_key(employee: Employee2) -> str:
 def _find_legacy_employee_id(db: Session, employee: Employee2) -> Optional[str]:
     """Inventory modules are keyed by legacy employees.employee_id.
 
-    Try to map Employee2 -> Employee.
+    Resolved through the cached Employee2 -> Employee mapping.
     """
-
-    # 1) Match by CNIC (strongest)
-    cnic = (employee.cnic or "").strip()
-    if cnic:
-        emp = db.query(Employee).filter(Employee.cnic == cnic).first()
-        if emp:
-            return str(emp.employee_id)
-
-    # 2) Match by exact full name
-    name = (employee.name or "").strip().lower()
-    if name:
-        # Employees store first_name/last_name
-        candidates = db.query(Employee).all()
-        for e in candidates:
-            full = f"{(e.first_name or '').strip()} {(e.last_name or '').strip()}".strip().lower()
-            if full and full == name:
-                return str(e.employee_id)
-
-    # 3) If fss_no/serial_no happen to be same as legacy employee_id
-    for v in [employee.fss_no, employee.serial_no]:
-        vv = (v or "").strip()
-        if vv:
-            emp = db.query(Employee).filter(Employee.employee_id == vv).first()
-            if emp:
-                return str(emp.employee_id)
-
-    return None
+    return get_legacy_employee_ids(db, [employee]).get(employee.id)
 
 
 def _get_employee_inventory(db: Session, employee: Employee2) -> List[InventoryItem]:
@@ -337,28 +309,74 @@ def _calculate_settlement(inventory_items: List[InventoryItem], salary_calc: Sal
         net_amount=net_amount
     )
 
-@router.post("/pending-deactivate", response_model=PendingDeactivationResponse)
-async def create_pending_deactivation(
-    employee_id: int,
-    data: PendingDeactivationCreate,
-    db: Session = Depends(get_db)
-):
-    """Create a pending deactivation request for an employee"""
-    global _next_id
-    
-    # Get employee
-    employee = db.query(Employee2).filter(Employee2.id == employee_id).first()
-    if not employee:
-        raise HTTPException(status_code=404, detail="Employee not found")
-    
-    # Check if already pending
-    existing = next((p for p in _pending_deactivations if p["employee_db_id"] == employee_id), None)
+def _primary_bank_account(employee: Employee2) -> tuple[Optional[str], Optional[str]]:
+    try:
+        raw_bank_accounts = getattr(employee, "bank_accounts", None)
+        if not raw_bank_accounts:
+            return None, None
+        parsed = json.loads(raw_bank_accounts)
+        primary = None
+        if isinstance(parsed, list) and parsed:
+            primary = parsed[0]
+        elif isinstance(parsed, dict):
+            primary = parsed
+
+        if isinstance(primary, dict):
+            bank_name = primary.get("bank_name") or primary.get("bank") or primary.get("name")
+            bank_account_number = (
+                primary.get("bank_account_number")
+                or primary.get("account_number")
+                or primary.get("accountNo")
+                or primary.get("account")
+            )
+            return bank_name, bank_account_number
+    except Exception:
+        pass
+    return None, None
+
+
+def _pending_to_response(p: PendingDeactivation) -> PendingDeactivationResponse:
+    return PendingDeactivationResponse(
+        id=p.id,
+        employee_db_id=p.employee_db_id,
+        employee_id=p.employee_id or "",
+        name=p.name or "",
+        serial_no=p.serial_no,
+        fss_no=p.fss_no,
+        rank=p.rank,
+        category=p.category,
+        unit=p.unit,
+        cnic=p.cnic,
+        mobile_no=p.mobile_no,
+        avatar_url=p.avatar_url,
+        bank_name=p.bank_name,
+        bank_account_number=p.bank_account_number,
+        base_salary=p.base_salary,
+        deactivation_date=p.deactivation_date,
+        created_at=(p.created_at.isoformat() if p.created_at else ""),
+        inventory_items=json.loads(p.inventory_items or "[]"),
+        attendance_summary=json.loads(p.attendance_summary or "{}"),
+        salary_calculation=json.loads(p.salary_calculation or "{}"),
+        settlement=json.loads(p.settlement or "{}"),
+    )
+
+
+def create_pending_deactivation_record(
+    db: Session, employee: Employee2, deactivation_date: str
+) -> PendingDeactivationResponse:
+    """Queue an employee for deactivation, storing the settlement snapshot computed now."""
+
+    existing = (
+        db.query(PendingDeactivation.id)
+        .filter(PendingDeactivation.employee_db_id == employee.id)
+        .first()
+    )
     if existing:
         raise HTTPException(status_code=400, detail="Employee already has a pending deactivation")
-    
+
     # Calculate all required data
     inventory_items = _get_employee_inventory(db, employee)
-    attendance_summary = _calculate_attendance_summary(db, employee, data.deactivation_date)
+    attendance_summary = _calculate_attendance_summary(db, employee, deactivation_date)
     salary_calculation = _calculate_salary(db, employee, attendance_summary)
     settlement = _calculate_settlement(inventory_items, salary_calculation)
     employee_identifier = (
@@ -366,77 +384,70 @@ async def create_pending_deactivation(
         or getattr(employee, "serial_no", None)
         or str(getattr(employee, "id", ""))
     )
-
-    bank_name = None
-    bank_account_number = None
+    bank_name, bank_account_number = _primary_bank_account(employee)
+
+    pending = PendingDeactivation(
+        employee_db_id=employee.id,
+        employee_id=employee_identifier or "",
+        name=employee.name or "",
+        serial_no=employee.serial_no,
+        fss_no=employee.fss_no,
+        rank=employee.rank,
+        category=employee.category,
+        unit=employee.unit,
+        cnic=employee.cnic,
+        mobile_no=employee.mobile_no,
+        avatar_url=employee.avatar_url,
+        bank_name=bank_name,
+        bank_account_number=bank_account_number,
+        base_salary=int(float(employee.salary or 0)),
+        deactivation_date=deactivation_date,
+        inventory_items=json.dumps([item.model_dump() for item in inventory_items]),
+        attendance_summary=attendance_summary.model_dump_json(),
+        salary_calculation=salary_calculation.model_dump_json(),
+        settlement=settlement.model_dump_json(),
+    )
+    db.add(pending)
     try:
-        raw_bank_accounts = getattr(employee, "bank_accounts", None)
-        if raw_bank_accounts:
-            parsed = json.loads(raw_bank_accounts)
-            primary = None
-            if isinstance(parsed, list) and parsed:
-                primary = parsed[0]
-            elif isinstance(parsed, dict):
-                primary = parsed
-
-            if isinstance(primary, dict):
-                bank_name = primary.get("bank_name") or primary.get("bank") or primary.get("name")
-                bank_account_number = (
-                    primary.get("bank_account_number")
-                    or primary.get("account_number")
-                    or primary.get("accountNo")
-                    or primary.get("account")
-                )
-    except Exception:
-        bank_name = None
-        bank_account_number = None
-    
-    # Create pending deactivation record
-    pending = {
-        "id": _next_id,
-        "employee_db_id": employee.id,
-        "employee_id": employee_identifier or "",
-        "name": employee.name or "",
-        "serial_no": employee.serial_no,
-        "fss_no": employee.fss_no,
-        "rank": employee.rank,
-        "category": employee.category,
-        "unit": employee.unit,
-        "cnic": employee.cnic,
-        "mobile_no": employee.mobile_no,
-        "avatar_url": employee.avatar_url,
-        "bank_name": bank_name,
-        "bank_account_number": bank_account_number,
-        "base_salary": int(employee.salary or 0),
-        "deactivation_date": data.deactivation_date,
-        "created_at": datetime.now().isoformat(),
-        "inventory_items": [item.dict() for item in inventory_items],
-        "attendance_summary": attendance_summary.dict(),
-        "salary_calculation": salary_calculation.dict(),
-        "settlement": settlement.dict()
-    }
-    
-    _pending_deactivations.append(pending)
-    _next_id += 1
-    
-    return PendingDeactivationResponse(**pending)
+        db.commit()
+    except IntegrityError:
+        # Another worker queued the same employee between our check and insert.
+        db.rollback()
+        raise HTTPException(status_code=400, detail="Employee already has a pending deactivation")
+
+    db.refresh(pending)
+    return _pending_to_response(pending)
+
+
+@router.post("/pending-deactivate", response_model=PendingDeactivationResponse)
+async def create_pending_deactivation(
+    employee_id: int,
+    data: PendingDeactivationCreate,
+    db: Session = Depends(get_db)
+):
+    """Create a pending deactivation request for an employee"""
+    employee = db.query(Employee2).filter(Employee2.id == employee_id).first()
+    if not employee:
+        raise HTTPException(status_code=404, detail="Employee not found")
+
+    return create_pending_deactivation_record(db, employee, data.deactivation_date)
 
 @router.get("/pending-deactivate", response_model=List[PendingDeactivationResponse])
-async def list_pending_deactivations():
+async def list_pending_deactivations(db: Session = Depends(get_db)):
     """List all pending deactivation requests"""
-    return [PendingDeactivationResponse(**p) for p in _pending_deactivations]
+    rows = db.query(PendingDeactivation).order_by(PendingDeactivation.id.asc()).all()
+    return [_pending_to_response(p) for p in rows]
 
 
 @router.post("/pending-deactivate/{pending_id}/move-to-inactive")
 async def move_to_inactive(pending_id: int, db: Session = Depends(get_db)):
     """Move a pending deactivation to inactive employees"""
-    global _pending_deactivations
-    
     try:
         # Find pending record
-        pending = next((p for p in _pending_deactivations if p["id"] == pending_id), None)
-        if not pending:
+        pending_row = db.query(PendingDeactivation).filter(PendingDeactivation.id == pending_id).first()
+        if not pending_row:
             raise HTTPException(status_code=404, detail="Pending deactivation not found")
+        pending = _pending_to_response(pending_row).model_dump()
         
         # Get employee
         employee = db.query(Employee2).filter(Employee2.id == pending["employee_db_id"]).first()
@@ -523,10 +534,12 @@ async def move_to_inactive(pending_id: int, db: Session = Depends(get_db)):
         # Create the inactive employee
         inactive = EmployeeInactive(**inactive_data)
         
-        # Add inactive record and delete active record
+        # Add inactive record, delete active record and clear the pending request together
         try:
             db.add(inactive)
+            forget_employee2_mappings(db, [employee.id])
             db.delete(employee)
+            db.delete(pending_row)
             db.commit()
         except Exception as e:
             db.rollback()
@@ -534,10 +547,7 @@ async def move_to_inactive(pending_id: int, db: Session = Depends(get_db)):
                 status_code=500, 
                 detail=f"Database operation failed: {str(e)}"
             )
-            
-        # Remove from pending deactivations
-        _pending_deactivations = [p for p in _pending_deactivations if p["id"] != pending_id]
-        
+
         return {"message": "Employee moved to inactive successfully"}
         
     except HTTPException:
@@ -550,13 +560,12 @@ async def move_to_inactive(pending_id: int, db: Session = Depends(get_db)):
 
 
 @router.delete("/pending-deactivate/{pending_id}")
-async def reject_pending_deactivation(pending_id: int):
+async def reject_pending_deactivation(pending_id: int, db: Session = Depends(get_db)):
     """Reject a pending deactivation request."""
-    global _pending_deactivations
-
-    pending = next((p for p in _pending_deactivations if p["id"] == pending_id), None)
+    pending = db.query(PendingDeactivation).filter(PendingDeactivation.id == pending_id).first()
     if not pending:
         raise HTTPException(status_code=404, detail="Pending deactivation not found")
 
-    _pending_deactivations = [p for p in _pending_deactivations if p["id"] != pending_id]
+    db.delete(pending)
+    db.commit()
     return {"message": "Pending deactivation rejected"}
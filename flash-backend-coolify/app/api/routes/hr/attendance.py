@@ -2,14 +2,16 @@ from datetime import date, datetime, time
 
 from fastapi import APIRouter, Depends, HTTPException, Query
 from fastapi.responses import Response
-from sqlalchemy import Float, and_, cast, func, or_, String, case
+from sqlalchemy import Float, and_, cast, func, or_, String, case, select
 from sqlalchemy.orm import Session
 
-from app.core.database import get_db
+from app.core.database import dialect_insert, get_db
+from app.core.responses import model_json_response
 from app.api.dependencies import require_permission
 from app.models.hr.attendance import AttendanceRecord
 from app.models.hr.employee import Employee
 from app.models.hr.employee2 import Employee2
+from app.models.hr.employee_last_present import EmployeeLastPresent
 from app.schemas.hr.attendance import AttendanceBulkUpsert, AttendanceList, AttendanceRangeList
 
 from fpdf import FPDF
@@ -42,12 +44,69 @@ def _normalize_status_and_leave_type(status: str | None, leave_type: str | None)
     return st, lt
 
 
+def refresh_last_present_dates(db: Session, employee_ids) -> None:
+    """Recompute EmployeeLastPresent for the given employees inside the current transaction.
+
+    One grouped upsert plus one cleanup delete, regardless of how many days were written.
+    """
+    ids = sorted({str(e).strip() for e in employee_ids if e is not None and str(e).strip()})
+    if not ids:
+        return
+
+    db.flush()
+
+    present = (
+        select(AttendanceRecord.employee_id, func.max(AttendanceRecord.date))
+        .where(
+            AttendanceRecord.employee_id.in_(ids),
+            AttendanceRecord.status.in_(["present", "late"]),
+        )
+        .group_by(AttendanceRecord.employee_id)
+    )
+
+    ins = dialect_insert(db, EmployeeLastPresent)
+    if ins is not None:
+        stmt = ins.from_select(["employee_id", "last_present_date"], present).on_conflict_do_update(
+            index_elements=["employee_id"],
+            set_={"last_present_date": ins.excluded.last_present_date, "updated_at": func.now()},
+        )
+        db.execute(stmt)
+    else:
+        latest = dict(db.execute(present).all())
+        existing = {
+            r.employee_id: r
+            for r in db.query(EmployeeLastPresent).filter(EmployeeLastPresent.employee_id.in_(latest.keys()))
+        }
+        for emp_id, d in latest.items():
+            row = existing.get(emp_id)
+            if row is None:
+                db.add(EmployeeLastPresent(employee_id=emp_id, last_present_date=d))
+            else:
+                row.last_present_date = d
+        db.flush()
+
+    # Employees with no present/late day left (e.g. their only present day was cleared).
+    (
+        db.query(EmployeeLastPresent)
+        .filter(
+            EmployeeLastPresent.employee_id.in_(ids),
+            ~EmployeeLastPresent.employee_id.in_(
+                select(AttendanceRecord.employee_id).where(
+                    AttendanceRecord.employee_id.in_(ids),
+                    AttendanceRecord.status.in_(["present", "late"]),
+                )
+            ),
+        )
+        .delete(synchronize_session=False)
+    )
+
+
 @router.get("/range", response_model=AttendanceRangeList)
 async def list_attendance_range(
     from_date: date,
     to_date: date,
     db: Session = Depends(get_db),
-) -> AttendanceRangeList:
+) -> Response:
     if from_date > to_date:
         raise HTTPException(status_code=400, detail="from_date must be <= to_date")
 
@@ -61,7 +120,7 @@ async def list_attendance_range(
         .all()
     )
 
-    return AttendanceRangeList(from_date=from_date, to_date=to_date, records=records)
+    return model_json_response(AttendanceRangeList(from_date=from_date, to_date=to_date, records=records))
 
 
 @router.get("/employee/{employee_id}")
@@ -715,6 +774,7 @@ async def bulk_upsert_attendance(
             existing.leave_type = leave_type
             existing.fine_amount = rec.fine_amount
 
+    refresh_last_present_dates(db, [rec.employee_id for rec in payload.records])
     db.commit()
 
     records = (
@@ -7,7 +7,7 @@ from sqlalchemy.orm import Session
 
 from app.core.config import settings
 from app.core.database import get_db
-from app.core.upload_helper import upload_file_with_prefix
+from app.core.upload_helper import delete_upload, upload_file_with_prefix
 from app.models.hr.employee import Employee
 from app.models.hr.employee_document import EmployeeDocument
 from app.schemas.hr.employee_document import EmployeeDocumentOut
@@ -123,8 +123,7 @@ async def delete_employee_document(employee_db_id: int, doc_id: int, db: Session
 
     # Only delete local files (B2 files start with http)
     try:
-        if doc.path and not doc.path.startswith("http") and os.path.exists(doc.path):
-            os.remove(doc.path)
+        delete_upload(doc.path)
     except Exception:
         pass
 
@@ -19,7 +19,15 @@ from pypdf import PdfReader, PdfWriter
 from pydantic import BaseModel
 
 from app.core.config import settings
+from app.core.bulk_import import SkipRow, run_bulk_import
 from app.core.database import get_db
+from app.core.employee_mapping import (
+    forget_employee2_mappings,
+    refresh_legacy_employee_map,
+    refresh_unmapped_employees,
+)
+from app.core.image_variants import pdf_image_path, schedule_variants
+from app.core.responses import model_json_response
 from app.api.dependencies import require_permission
 from app.models.finance.payroll_sheet_entry import PayrollSheetEntry
 from app.models.finance.payroll_payment_status import PayrollPaymentStatus
@@ -29,6 +37,8 @@ from app.schemas.hr.employee2 import (
     Employee2Create,
     Employee2Update,
     Employee2List,
+    EMPLOYEE2_FIELD_PRESETS,
+    employee2_projection_list_model,
 )
 from app.models.hr.employee_inactive import EmployeeInactive
 
@@ -42,6 +52,43 @@ UPLOAD_DIR = Path(settings.UPLOADS_DIR) / "employees2"
 UPLOAD_DIR.mkdir(parents=True, exist_ok=True)
 
 
+def _projection(fields: str) -> tuple[list, tuple]:
+    """Resolve a ``fields=`` value (column names and/or preset names) to columns.
+
+    Returns the Employee2 attributes to select and the (name, python type) pairs used to
+    build the response model.
+    """
+
+    table_cols = Employee2.__table__.columns
+    names = ["id"]
+    unknown = []
+    for token in fields.split(","):
+        name = token.strip()
+        if not name:
+            continue
+        if name in EMPLOYEE2_FIELD_PRESETS:
+            names.extend(EMPLOYEE2_FIELD_PRESETS[name])
+        elif name in table_cols:
+            names.append(name)
+        else:
+            unknown.append(name)
+    if unknown:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unknown fields: {', '.join(unknown)}. Use column names or presets: {', '.join(EMPLOYEE2_FIELD_PRESETS)}",
+        )
+
+    names = list(dict.fromkeys(names))
+    typed = []
+    for name in names:
+        try:
+            py_type = table_cols[name].type.python_type
+        except NotImplementedError:
+            py_type = str
+        typed.append((name, py_type))
+    return [getattr(Employee2, n) for n in names], tuple(typed)
+
+
 @router.get("/", response_model=Employee2List)
 async def list_employees2(
     skip: int = 0,
@@ -50,26 +97,23 @@ async def list_employees2(
     category: Optional[str] = None,
     status: Optional[str] = None,
     with_total: bool = True,
+    fields: Optional[str] = None,
     db: Session = Depends(get_db),
 ):
-    """Return a paginated list of Employee2 records."""
-    query = db.query(Employee2).options(
-        load_only(
-            Employee2.id,
-            Employee2.serial_no,
-            Employee2.fss_no,
-            Employee2.rank,
-            Employee2.name,
-            Employee2.mobile_no,
-            Employee2.unit,
-            Employee2.category,
-            Employee2.designation,
-            Employee2.status,
-            Employee2.allocation_status,
-            Employee2.avatar_url,
+    """Return a paginated list of Employee2 records.
+
+    ``fields`` selects only the given columns (comma separated; presets ``grid``,
+    ``picker`` and ``payroll`` expand to their column sets) and returns just those keys
+    plus ``id``. Without it the default grid columns are returned.
+    """
+    if fields:
+        columns, typed = _projection(fields)
+        query = db.query(*columns)
+    else:
+        query = db.query(Employee2).options(
+            load_only(*(getattr(Employee2, n) for n in ("id", *EMPLOYEE2_FIELD_PRESETS["grid"])))
         )
-    )
-    
+
     if search:
         search_term = f"%{search}%"
         query = query.filter(
@@ -88,8 +132,12 @@ async def list_employees2(
     
     total = query.order_by(None).count() if with_total else 0
     employees = query.offset(skip).limit(limit).all()
-    
-    return Employee2List(employees=employees, total=total)
+
+    if fields:
+        list_model = employee2_projection_list_model(typed)
+        return model_json_response(list_model(employees=[dict(r._mapping) for r in employees], total=total))
+
+    return model_json_response(Employee2List(employees=employees, total=total))
 
 
 @router.get("/categories")
@@ -174,6 +222,9 @@ async def create_employee2(
             raise HTTPException(status_code=400, detail="Could not create employee.")
 
     db.refresh(db_employee)
+
+    refresh_legacy_employee_map(db, [db_employee])
+    db.commit()
     
     # Automatically create payroll entry for current month
     _create_payroll_entry_for_new_employee(db_employee, db)
@@ -245,12 +296,57 @@ def _create_payroll_entry_for_new_employee(employee: Employee2, db: Session):
         db.rollback()
 
 
+_IMPORT_JSON_COLUMNS = {
+    "E": "father_name",
+    "F": "salary",
+    "G": "status",
+    "H": "unit",
+    "I": "service_rank",
+    "J": "blood_group",
+    "K": "status2",
+    "L": "unit2",
+    "M": "rank2",
+    "N": "cnic",
+    "O": "dob",
+    "P": "cnic_expiry",
+    "Q": "documents_held",
+    "R": "documents_handed_over_to",
+    "S": "photo_on_doc",
+    "T": "eobi_no",
+    "W": "insurance",
+    "X": "social_security",
+    "Y": "mobile_no",
+    "Z": "home_contact",
+    "AA": "verified_by_sho",
+    "AB": "verified_by_khidmat_markaz",
+    "AC": "domicile",
+    "AD": "verified_by_ssp",
+    "AE": "enrolled",
+    "AF": "re_enrolled",
+    "AG": "village",
+    "AH": "post_office",
+    "AI": "thana",
+    "AJ": "tehsil",
+    "AK": "district",
+    "AL": "duty_location",
+    "AM": "police_trg_ltr_date",
+    "AN": "vaccination_cert",
+    "AO": "vol_no",
+    "AP": "payments",
+}
+
+
 @router.post("/import-json", dependencies=[Depends(require_permission("employees:create"))])
 async def import_from_json(
     file: UploadFile = File(...),
+    dry_run: bool = False,
     db: Session = Depends(get_db),
 ):
-    """Import Employee2 records from JSON file."""
+    """Import Employee2 records from JSON file.
+
+    Rows whose FSS # or CNIC already exists (in the table or earlier in the file) are skipped.
+    With ``dry_run`` nothing is written and a preview of the rows to create is returned.
+    """
     try:
         content = await file.read()
         data = json.loads(content.decode("utf-8"))
@@ -260,96 +356,68 @@ async def import_from_json(
     if not isinstance(data, list):
         raise HTTPException(status_code=400, detail="JSON must be an array of records")
     
-    created = 0
-    skipped = 0
-    errors = []
     current_category = None
-    
-    # Skip header rows (first 2 rows typically)
-    for idx, row in enumerate(data):
-        try:
-            # Get values with fallback
-            a_val = str(row.get("A", "") or "").strip()
-            b_val = str(row.get("B", "") or "").strip()
-            c_val = str(row.get("C", "") or "").strip()
-            d_val = str(row.get("D", "") or "").strip()
-            
-            # Skip header row
-            if a_val == "#" or d_val == "Name":
-                continue
-            
-            # Skip empty number row
-            if a_val == "" and b_val == "" and c_val == "" and d_val == "":
-                continue
-            
-            # Check if this is a category row (no numeric serial, has text in A)
-            if a_val and not a_val.isdigit() and not d_val:
-                current_category = a_val
-                continue
-            
-            # Skip if no name
-            if not d_val:
-                skipped += 1
-                continue
-            
-            employee_data = {
-                "serial_no": a_val or None,
-                "fss_no": b_val or None,
-                "rank": c_val or None,
-                "name": d_val,
-                "father_name": str(row.get("E", "") or "").strip() or None,
-                "salary": str(row.get("F", "") or "").strip() or None,
-                "status": str(row.get("G", "") or "").strip() or None,
-                "unit": str(row.get("H", "") or "").strip() or None,
-                "service_rank": str(row.get("I", "") or "").strip() or None,
-                "blood_group": str(row.get("J", "") or "").strip() or None,
-                "status2": str(row.get("K", "") or "").strip() or None,
-                "unit2": str(row.get("L", "") or "").strip() or None,
-                "rank2": str(row.get("M", "") or "").strip() or None,
-                "cnic": str(row.get("N", "") or "").strip() or None,
-                "dob": str(row.get("O", "") or "").strip() or None,
-                "cnic_expiry": str(row.get("P", "") or "").strip() or None,
-                "documents_held": str(row.get("Q", "") or "").strip() or None,
-                "documents_handed_over_to": str(row.get("R", "") or "").strip() or None,
-                "photo_on_doc": str(row.get("S", "") or "").strip() or None,
-                "eobi_no": str(row.get("T", "") or "").strip() or None,
-                "insurance": str(row.get("W", "") or "").strip() or None,
-                "social_security": str(row.get("X", "") or "").strip() or None,
-                "mobile_no": str(row.get("Y", "") or "").strip() or None,
-                "home_contact": str(row.get("Z", "") or "").strip() or None,
-                "verified_by_sho": str(row.get("AA", "") or "").strip() or None,
-                "verified_by_khidmat_markaz": str(row.get("AB", "") or "").strip() or None,
-                "domicile": str(row.get("AC", "") or "").strip() or None,
-                "verified_by_ssp": str(row.get("AD", "") or "").strip() or None,
-                "enrolled": str(row.get("AE", "") or "").strip() or None,
-                "re_enrolled": str(row.get("AF", "") or "").strip() or None,
-                "village": str(row.get("AG", "") or "").strip() or None,
-                "post_office": str(row.get("AH", "") or "").strip() or None,
-                "thana": str(row.get("AI", "") or "").strip() or None,
-                "tehsil": str(row.get("AJ", "") or "").strip() or None,
-                "district": str(row.get("AK", "") or "").strip() or None,
-                "duty_location": str(row.get("AL", "") or "").strip() or None,
-                "police_trg_ltr_date": str(row.get("AM", "") or "").strip() or None,
-                "vaccination_cert": str(row.get("AN", "") or "").strip() or None,
-                "vol_no": str(row.get("AO", "") or "").strip() or None,
-                "payments": str(row.get("AP", "") or "").strip() or None,
-                "category": current_category,
-            }
-            
-            db_employee = Employee2(**employee_data)
-            db.add(db_employee)
-            created += 1
-            
-        except Exception as e:
-            errors.append(f"Row {idx}: {str(e)}")
-    
-    db.commit()
-    
+
+    def _parse_row(idx: int, row) -> dict:
+        nonlocal current_category
+        if not isinstance(row, dict):
+            raise ValueError("record must be an object")
+
+        # Get values with fallback
+        a_val = str(row.get("A", "") or "").strip()
+        b_val = str(row.get("B", "") or "").strip()
+        c_val = str(row.get("C", "") or "").strip()
+        d_val = str(row.get("D", "") or "").strip()
+
+        # Skip header row
+        if a_val == "#" or d_val == "Name":
+            raise SkipRow(counted=False)
+
+        # Skip empty number row
+        if a_val == "" and b_val == "" and c_val == "" and d_val == "":
+            raise SkipRow(counted=False)
+
+        # Check if this is a category row (no numeric serial, has text in A)
+        if a_val and not a_val.isdigit() and not d_val:
+            current_category = a_val
+            raise SkipRow(counted=False)
+
+        # Skip if no name
+        if not d_val:
+            raise SkipRow()
+
+        employee_data = {
+            "serial_no": a_val or None,
+            "fss_no": b_val or None,
+            "rank": c_val or None,
+            "name": d_val,
+        }
+        for col, field in _IMPORT_JSON_COLUMNS.items():
+            employee_data[field] = str(row.get(col, "") or "").strip() or None
+        employee_data["category"] = current_category
+        return employee_data
+
+    result = run_bulk_import(
+        db,
+        Employee2,
+        data,
+        _parse_row,
+        key_columns=("fss_no", "cnic"),
+        dry_run=dry_run,
+    )
+    if result["created"] and not dry_run:
+        # Rows were inserted in bulk, bypassing the per-employee refresh in create.
+        refresh_unmapped_employees(db)
+        db.commit()
+
     return {
-        "created": created,
-        "skipped": skipped,
-        "errors": errors[:20],  # Limit errors returned
-        "total_rows": len(data),
+        "created": result["created"],
+        "skipped": result["skipped"],
+        "duplicates": result["duplicates"],
+        "errors": [f"Row {e['row']}: {e['error']}" for e in result["errors"][:20]],  # Limit errors returned
+        "total_rows": result["total_rows"],
+        "dry_run": result["dry_run"],
+        "preview": result["preview"],
     }
 
 
@@ -377,6 +445,10 @@ async def update_employee2(
     update_data = employee_update.model_dump(exclude_unset=True)
     for field, value in update_data.items():
         setattr(employee, field, value)
+
+    if {"cnic", "name", "fss_no", "serial_no"} & update_data.keys():
+        db.flush()
+        refresh_legacy_employee_map(db, [employee])
     
     db.commit()
     db.refresh(employee)
@@ -395,6 +467,7 @@ async def delete_employee2(
     if not employee:
         raise HTTPException(status_code=404, detail="Employee not found")
     
+    forget_employee2_mappings(db, [employee.id])
     db.delete(employee)
     db.commit()
     return {"message": "Employee deleted successfully"}
@@ -407,6 +480,7 @@ async def delete_all_employees2(
 ):
     """Delete all Employee2 records (for re-import)."""
     count = db.query(Employee2).delete()
+    forget_employee2_mappings(db)
     db.commit()
     return {"message": f"Deleted {count} employees"}
 
@@ -457,6 +531,7 @@ async def deactivate_employee2(
     
     inactive_emp = EmployeeInactive(**data)
     db.add(inactive_emp)
+    forget_employee2_mappings(db, [employee.id])
     db.delete(employee)
     
     try:
@@ -477,84 +552,14 @@ async def create_pending_deactivation(
 ):
     """Submit an employee to pending deactivation queue"""
     # Forward to HR module
-    from app.api.routes import hr as hr_routes
-    
+    from app.api.routes.hr.analytics_hr import create_pending_deactivation_record
+
     # Get employee
     employee = db.query(Employee2).filter(Employee2.id == employee_id).first()
     if not employee:
         raise HTTPException(status_code=404, detail="Employee not found")
-    
-    # Import HR module functions
-    from app.api.routes.hr.analytics_hr import PendingDeactivationResponse
-    
-    # Check if already pending
-    existing = next((p for p in hr_routes._pending_deactivations if p["employee_db_id"] == employee_id), None)
-    if existing:
-        raise HTTPException(status_code=400, detail="Employee already has a pending deactivation")
-    
-    # Calculate all required data
-    inventory_items = hr_routes._get_employee_inventory(db, employee)
-    attendance_summary = hr_routes._calculate_attendance_summary(db, employee, data.deactivation_date)
-    salary_calculation = hr_routes._calculate_salary(db, employee, attendance_summary)
-    settlement = hr_routes._calculate_settlement(inventory_items, salary_calculation)
-    employee_identifier = (
-        getattr(employee, "fss_no", None)
-        or getattr(employee, "serial_no", None)
-        or str(getattr(employee, "id", ""))
-    )
 
-    bank_name = None
-    bank_account_number = None
-    try:
-        raw_bank_accounts = getattr(employee, "bank_accounts", None)
-        if raw_bank_accounts:
-            parsed = json.loads(raw_bank_accounts)
-            primary = None
-            if isinstance(parsed, list) and parsed:
-                primary = parsed[0]
-            elif isinstance(parsed, dict):
-                primary = parsed
-
-            if isinstance(primary, dict):
-                bank_name = primary.get("bank_name") or primary.get("bank") or primary.get("name")
-                bank_account_number = (
-                    primary.get("bank_account_number")
-                    or primary.get("account_number")
-                    or primary.get("accountNo")
-                    or primary.get("account")
-                )
-    except Exception:
-        bank_name = None
-        bank_account_number = None
-    
-    # Create pending deactivation record
-    pending = {
-        "id": hr_routes._next_id,
-        "employee_db_id": employee.id,
-        "employee_id": employee_identifier or "",
-        "name": employee.name or "",
-        "serial_no": employee.serial_no,
-        "fss_no": employee.fss_no,
-        "rank": employee.rank,
-        "category": employee.category,
-        "unit": employee.unit,
-        "cnic": employee.cnic,
-        "mobile_no": employee.mobile_no,
-        "bank_name": bank_name,
-        "bank_account_number": bank_account_number,
-        "base_salary": int(employee.salary or 0),
-        "deactivation_date": data.deactivation_date,
-        "created_at": datetime.now().isoformat(),
-        "inventory_items": [item.dict() for item in inventory_items],
-        "attendance_summary": attendance_summary.dict(),
-        "salary_calculation": salary_calculation.dict(),
-        "settlement": settlement.dict()
-    }
-    
-    hr_routes._pending_deactivations.append(pending)
-    hr_routes._next_id += 1
-    
-    return PendingDeactivationResponse(**pending)
+    return create_pending_deactivation_record(db, employee, data.deactivation_date)
 
 
 @router.post("/{employee_id}/upload/{field_type}")
@@ -611,6 +616,7 @@ async def upload_employee_file(
         
         with open(file_path, "wb") as buffer:
             buffer.write(content)
+        schedule_variants(file_path)
         
         # Update employee record
         file_url = f"/uploads/employees2/{new_filename}"
@@ -752,7 +758,7 @@ async def export_employee_pdf(
             try:
                 pdf.set_draw_color(229, 231, 235)
                 pdf.ellipse(15, card_y + 4, 30, 30, 'D')
-                pdf.image(str(avatar_path), x=16, y=card_y + 5, w=28, h=28)
+                pdf.image(str(pdf_image_path(avatar_path)), x=16, y=card_y + 5, w=28, h=28)
                 avatar_loaded = True
             except:
                 pass
@@ -822,7 +828,7 @@ async def export_employee_pdf(
                 pdf.set_x(150)
                 pdf.set_draw_color(229, 231, 235)
                 pdf.rect(150, pdf.get_y(), 50, 60, 'D')
-                pdf.image(str(avatar_path), x=151, y=pdf.get_y() + 1, w=48, h=58)
+                pdf.image(str(pdf_image_path(avatar_path)), x=151, y=pdf.get_y() + 1, w=48, h=58)
                 pdf.set_y(pdf.get_y() + 65)
             except:
                 pass
@@ -1096,7 +1102,7 @@ async def export_employee_pdf(
                             pdf.ln(2)
                             
                             # Add fingerprint image
-                            pdf.image(str(file_path), x=20, w=170)
+                            pdf.image(str(pdf_image_path(file_path)), x=20, w=170)
                             pdf.ln(8)
                         except:
                             pdf.set_font("Arial", "I", 9)
@@ -1133,7 +1139,7 @@ async def export_employee_pdf(
                 pdf.ln(2)
                 
                 # Add signature image
-                pdf.image(str(signature_path), x=50, w=100)
+                pdf.image(str(pdf_image_path(signature_path)), x=50, w=100)
                 pdf.ln(8)
             except:
                 pdf.set_font("Arial", "I", 9)
@@ -1184,7 +1190,7 @@ async def export_employee_pdf(
                             pdf.ln(2)
                             
                             # Add image
-                            pdf.image(str(file_path), x=15, w=180)
+                            pdf.image(str(pdf_image_path(file_path)), x=15, w=180)
                             pdf.ln(8)
                         except:
                             pdf.set_font("Arial", "I", 9)
@@ -1,11 +1,13 @@
 from datetime import date, timedelta
 
 from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy import and_, exists
+from sqlalchemy import and_, or_, text
 from sqlalchemy.orm import Session
 
 from app.core.database import get_db
+from app.api.routes.hr.attendance import refresh_last_present_dates
 from app.models.hr.attendance import AttendanceRecord
+from app.models.hr.employee_last_present import EmployeeLastPresent
 from app.models.hr.leave_period import LeavePeriod
 from app.schemas.hr.leave_period import (
     LeavePeriodAlert,
@@ -26,8 +28,89 @@ def _validate_leave_period(from_date: date, to_date: date, leave_type: str) -> N
         raise HTTPException(status_code=400, detail="leave_type must be 'paid' or 'unpaid'")
 
 
-@router.post("/", response_model=LeavePeriodOut)
-async def create_leave_period(payload: LeavePeriodCreate, db: Session = Depends(get_db)) -> LeavePeriod:
+_APPLY_LEAVE_SQL = {
+    "postgresql": """
+        INSERT INTO attendance_records (employee_id, date, status, leave_type)
+        SELECT :employee_id, CAST(d AS date), 'leave', :leave_type
+        FROM generate_series(CAST(:from_date AS date), CAST(:to_date AS date), interval '1 day') AS d
+        ON CONFLICT (employee_id, date) DO UPDATE
+        SET status = 'leave', leave_type = EXCLUDED.leave_type, updated_at = CURRENT_TIMESTAMP
+    """,
+    "sqlite": """
+        WITH RECURSIVE days(d) AS (
+            SELECT :from_date
+            UNION ALL
+            SELECT date(d, '+1 day') FROM days WHERE d < :to_date
+        )
+        INSERT INTO attendance_records (employee_id, date, status, leave_type)
+        SELECT :employee_id, d, 'leave', :leave_type FROM days WHERE true
+        ON CONFLICT (employee_id, date) DO UPDATE
+        SET status = 'leave', leave_type = excluded.leave_type, updated_at = CURRENT_TIMESTAMP
+    """,
+}
+
+
+def _apply_leave_to_attendance(
+    db: Session, employee_id: str, from_date: date, to_date: date, leave_type: str
+) -> None:
+    """Mark every day of a leave period as Leave (L) with a single upsert statement."""
+    sql = _APPLY_LEAVE_SQL.get(db.bind.dialect.name if db.bind is not None else "")
+    if sql is None:
+        # Fallback for dialects without a date series / ON CONFLICT: one prefetch + bulk writes.
+        existing = {
+            r.date: r
+            for r in db.query(AttendanceRecord).filter(
+                AttendanceRecord.employee_id == employee_id,
+                AttendanceRecord.date >= from_date,
+                AttendanceRecord.date <= to_date,
+            )
+        }
+        d = from_date
+        while d <= to_date:
+            att = existing.get(d)
+            if att is None:
+                db.add(AttendanceRecord(employee_id=employee_id, date=d, status="leave", leave_type=leave_type))
+            else:
+                att.status = "leave"
+                att.leave_type = leave_type
+            d = d + timedelta(days=1)
+        return
+
+    db.execute(
+        text(sql),
+        {
+            "employee_id": employee_id,
+            "from_date": from_date.isoformat(),
+            "to_date": to_date.isoformat(),
+            "leave_type": leave_type,
+        },
+    )
+
+
+def _revert_leave_attendance(db: Session, employee_id: str, from_date: date, to_date: date) -> None:
+    """Clear Leave (L) markers in the range with a single UPDATE statement.
+
+    We only touch rows currently marked as leave so manual attendance edits survive.
+    """
+    (
+        db.query(AttendanceRecord)
+        .filter(
+            AttendanceRecord.employee_id == employee_id,
+            AttendanceRecord.date >= from_date,
+            AttendanceRecord.date <= to_date,
+            AttendanceRecord.status == "leave",
+        )
+        .update(
+            {
+                AttendanceRecord.status: "unmarked",
+                AttendanceRecord.leave_type: None,
+            },
+            synchronize_session=False,
+        )
+    )
+
+
+def _add_leave_period(db: Session, payload: LeavePeriodCreate) -> LeavePeriod:
     _validate_leave_period(payload.from_date, payload.to_date, payload.leave_type)
 
     lt = (payload.leave_type or "paid").strip().lower()
@@ -41,38 +124,37 @@ async def create_leave_period(payload: LeavePeriodCreate, db: Session = Depends(
     )
     db.add(rec)
 
-    d = payload.from_date
-    while d <= payload.to_date:
-        existing_att = (
-            db.query(AttendanceRecord)
-            .filter(
-                AttendanceRecord.employee_id == payload.employee_id,
-                AttendanceRecord.date == d,
-            )
-            .first()
-        )
-
-        if not existing_att:
-            db.add(
-                AttendanceRecord(
-                    employee_id=payload.employee_id,
-                    date=d,
-                    status="leave",
-                    leave_type=lt,
-                )
-            )
-        else:
-            # Ensure long leave is reflected in attendance UI as Leave (L)
-            existing_att.status = "leave"
-            existing_att.leave_type = lt
+    # Ensure long leave is reflected in attendance UI as Leave (L)
+    _apply_leave_to_attendance(db, payload.employee_id, payload.from_date, payload.to_date, lt)
+    # Leave may overwrite present days, so the employee's last present date can move back.
+    refresh_last_present_dates(db, [payload.employee_id])
+    return rec
 
-        d = d + timedelta(days=1)
 
+@router.post("/", response_model=LeavePeriodOut)
+async def create_leave_period(payload: LeavePeriodCreate, db: Session = Depends(get_db)) -> LeavePeriod:
+    rec = _add_leave_period(db, payload)
     db.commit()
     db.refresh(rec)
     return rec
 
 
+@router.post("/bulk", response_model=list[LeavePeriodOut])
+async def bulk_create_leave_periods(
+    payload: list[LeavePeriodCreate],
+    db: Session = Depends(get_db),
+) -> list[LeavePeriod]:
+    """Create many leave periods in one transaction (one attendance upsert per period)."""
+    for p in payload:
+        _validate_leave_period(p.from_date, p.to_date, p.leave_type)
+
+    recs = [_add_leave_period(db, p) for p in payload]
+    db.commit()
+    for rec in recs:
+        db.refresh(rec)
+    return recs
+
+
 @router.get("/", response_model=list[LeavePeriodOut])
 async def list_leave_periods(
     employee_id: str | None = None,
@@ -118,23 +200,7 @@ async def delete_leave_period(leave_period_id: int, db: Session = Depends(get_db
         raise HTTPException(status_code=404, detail="Leave period not found")
 
     # Revert attendance markers created for this leave period.
-    # We only touch rows currently marked as leave in this date range.
-    (
-        db.query(AttendanceRecord)
-        .filter(
-            AttendanceRecord.employee_id == rec.employee_id,
-            AttendanceRecord.date >= rec.from_date,
-            AttendanceRecord.date <= rec.to_date,
-            AttendanceRecord.status == "leave",
-        )
-        .update(
-            {
-                AttendanceRecord.status: "unmarked",
-                AttendanceRecord.leave_type: None,
-            },
-            synchronize_session=False,
-        )
-    )
+    _revert_leave_attendance(db, rec.employee_id, rec.from_date, rec.to_date)
 
     db.delete(rec)
     db.commit()
@@ -148,41 +214,37 @@ async def leave_period_alerts(
     db: Session = Depends(get_db),
 ) -> list[LeavePeriodAlert]:
     as_of_date = as_of or date.today()
-    q = db.query(LeavePeriod).filter(LeavePeriod.to_date < as_of_date)
+    # Anti-join against the last-present summary: a guard has returned when they were
+    # marked present/late on any day after the leave ended.
+    q = (
+        db.query(LeavePeriod)
+        .outerjoin(EmployeeLastPresent, EmployeeLastPresent.employee_id == LeavePeriod.employee_id)
+        .filter(LeavePeriod.to_date < as_of_date)
+        .filter(
+            or_(
+                EmployeeLastPresent.employee_id.is_(None),
+                EmployeeLastPresent.last_present_date <= LeavePeriod.to_date,
+            )
+        )
+    )
     if employee_id:
         q = q.filter(LeavePeriod.employee_id == employee_id)
 
     periods = q.order_by(LeavePeriod.to_date.desc()).all()
-    alerts: list[LeavePeriodAlert] = []
-
-    for p in periods:
-        returned = db.query(
-            exists().where(
-                and_(
-                    AttendanceRecord.employee_id == p.employee_id,
-                    AttendanceRecord.date > p.to_date,
-                    AttendanceRecord.status.in_(["present", "late"]),
-                )
-            )
-        ).scalar()
-
-        if returned:
-            continue
-
-        alerts.append(
-            LeavePeriodAlert(
-                leave_period_id=p.id,
-                employee_id=p.employee_id,
-                from_date=p.from_date,
-                to_date=p.to_date,
-                leave_type=p.leave_type,
-                reason=p.reason,
-                last_day=p.to_date,
-                message=(
-                    f"Leave finished on {p.to_date.isoformat()} for employee {p.employee_id}. "
-                    f"Last day was {p.to_date.isoformat()}."
-                ),
-            )
-        )
 
-    return alerts
+    return [
+        LeavePeriodAlert(
+            leave_period_id=p.id,
+            employee_id=p.employee_id,
+            from_date=p.from_date,
+            to_date=p.to_date,
+            leave_type=p.leave_type,
+            reason=p.reason,
+            last_day=p.to_date,
+            message=(
+                f"Leave finished on {p.to_date.isoformat()} for employee {p.employee_id}. "
+                f"Last day was {p.to_date.isoformat()}."
+            ),
+        )
+        for p in periods
+    ]
@@ -12,6 +12,8 @@ from sqlalchemy.orm import Session
 from fpdf import FPDF
 
 from app.core.database import get_db
+from app.core.read_replica import get_read_db
+from app.core.responses import model_json_response
 from app.api.dependencies import require_permission
 from app.models.hr.attendance import AttendanceRecord
 from app.models.hr.employee2 import Employee2
@@ -71,7 +73,7 @@ async def upsert_payment_status(
 
     net_snapshot: float | None = None
     if status == "paid":
-        rep = await payroll_report(month=payload.month, db=db)
+        rep = await build_payroll_report(month=payload.month, db=db)
         match = next((r for r in rep.rows if r.employee_id == payload.employee_id), None)
         if match is not None:
             net_snapshot = float(match.net_pay or 0.0)
@@ -382,8 +384,12 @@ def _build_payroll_pdf(*, title: str, subtitle: str, rows: list[dict], summary:
 @router.get("/report", response_model=PayrollReportResponse)
 async def payroll_report(
     month: str,
-    db: Session = Depends(get_db),
-) -> PayrollReportResponse:
+    db: Session = Depends(get_read_db),
+) -> Response:
+    return model_json_response(await build_payroll_report(month=month, db=db))
+
+
+async def build_payroll_report(month: str, db: Session) -> PayrollReportResponse:
     start, end = _parse_month(month)
     cutoff = datetime.combine(end, time.max)
 
@@ -582,8 +588,14 @@ async def payroll_range_report(
     from_date: str,
     to_date: str,
     month: str = "", # Make it required string, pass empty if needed
-    db: Session = Depends(get_db),
-) -> PayrollReportResponse:
+    db: Session = Depends(get_read_db),
+) -> Response:
+    return model_json_response(
+        await build_payroll_range_report(from_date=from_date, to_date=to_date, month=month, db=db)
+    )
+
+
+async def build_payroll_range_report(from_date: str, to_date: str, month: str, db: Session) -> PayrollReportResponse:
     # month = None # temp fix
     start = _parse_date(from_date, field="from_date")
     end = _parse_date(to_date, field="to_date")
@@ -995,7 +1007,7 @@ async def export_payroll_pdf(
     month: str,
     from_date: str = "",
     to_date: str = "",
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
 ) -> Response:
     # from_date = None
     # to_date = None
@@ -1007,7 +1019,7 @@ async def export_payroll_pdf(
         return f"{n:,.2f}".replace(",", "")
 
     if from_date and to_date:
-        rep = await payroll_range_report(from_date=from_date, to_date=to_date, month=month, db=db)
+        rep = await build_payroll_range_report(from_date=from_date, to_date=to_date, month=month, db=db)
         rep_summary = rep.summary.model_dump() if hasattr(rep.summary, "model_dump") else dict(rep.summary)
         pdf_bytes = _build_payroll_pdf(
             title="Payroll",
@@ -1017,7 +1029,7 @@ async def export_payroll_pdf(
         )
         filename = f"payroll_{from_date}_to_{to_date}.pdf"
     else:
-        report = await payroll_report(month=month, db=db)
+        report = await build_payroll_report(month=month, db=db)
         report_summary = report.summary.model_dump() if hasattr(report.summary, "model_dump") else dict(report.summary)
         pdf_bytes = _build_payroll_pdf(
             title="Payroll",
@@ -1038,7 +1050,7 @@ async def export_payroll_csv(
     month: str,
     from_date: str = "",
     to_date: str = "",
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
 ) -> Response:
     # from_date = None
     # to_date = None
@@ -1075,11 +1087,11 @@ async def export_payroll_csv(
             return str(bank_json or '')
 
     if from_date and to_date:
-        rep = await payroll_range_report(from_date=from_date, to_date=to_date, month=month, db=db)
+        rep = await build_payroll_range_report(from_date=from_date, to_date=to_date, month=month, db=db)
         rows = [r.model_dump() if hasattr(r, 'model_dump') else dict(r) for r in rep.rows]
         filename = f"payroll_{from_date}_to_{to_date}.csv"
     else:
-        report = await payroll_report(month=month, db=db)
+        report = await build_payroll_report(month=month, db=db)
         rows = [r.model_dump() for r in report.rows]
         filename = f"payroll_{month}.csv"
 
@@ -16,6 +16,8 @@ from fpdf import FPDF
 from pydantic import BaseModel
 
 from app.core.database import get_db
+from app.core.read_replica import get_read_db
+from app.core.responses import json_response
 from app.api.dependencies import require_permission, get_current_active_user
 from app.models.hr.attendance import AttendanceRecord
 from app.models.hr.employee2 import Employee2
@@ -88,8 +90,8 @@ async def payroll2_range_report(
     from_date: str,
     to_date: str,
     month: str | None = None,
-    db: Session = Depends(get_db),
-) -> dict:
+    db: Session = Depends(get_read_db),
+) -> Response:
     """
     Payroll2 range report with correct attendance counting.
     
@@ -450,7 +452,7 @@ async def payroll2_range_report(
         "total_presents": total_presents,
     }
 
-    return {"month": month_label, "summary": summary, "rows": rows}
+    return json_response({"month": month_label, "summary": summary, "rows": rows})
 
 
 class Payroll2RowExport(BaseModel):
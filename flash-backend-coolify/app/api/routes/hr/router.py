@@ -16,6 +16,7 @@ from sqlalchemy import distinct, func, or_
 from sqlalchemy.orm import Session
 
 from app.core.database import get_db
+from app.core.employee_mapping import invalidate_legacy_employee_map
 from app.api.dependencies import require_permission
 from app.models.hr.attendance import AttendanceRecord
 from app.models.hr.employee import Employee
@@ -521,6 +522,7 @@ async def create_employee(
         **payload,
     )
     db.add(db_employee)
+    invalidate_legacy_employee_map(db)
     db.commit()
     db.refresh(db_employee)
 
@@ -706,6 +708,7 @@ async def update_employee(
     if not employee:
         raise HTTPException(status_code=404, detail="Employee not found")
 
+    previous_employee_id = employee.employee_id
     update_data = employee_update.model_dump(exclude_unset=True)
     if isinstance(update_data.get("languages_spoken"), list):
         update_data["languages_spoken"] = json.dumps(update_data["languages_spoken"], ensure_ascii=False)
@@ -718,6 +721,9 @@ async def update_employee(
     for field, value in update_data.items():
         setattr(employee, field, value)
 
+    if {"cnic", "first_name", "last_name", "employee_id"} & update_data.keys():
+        invalidate_legacy_employee_map(db, previous_employee_id)
+
     db.commit()
     db.refresh(employee)
 
@@ -896,6 +902,7 @@ async def bulk_delete_employees(
     # Delete found employees
     for employee in employees:
         db.delete(employee)
+    invalidate_legacy_employee_map(db, *found_ids)
     
     db.commit()
     
@@ -924,6 +931,7 @@ async def delete_employee(
         raise HTTPException(status_code=404, detail="Employee not found")
 
     db.delete(employee)
+    invalidate_legacy_employee_map(db, employee.employee_id)
     db.commit()
 
     return {"message": "Employee deleted successfully"}
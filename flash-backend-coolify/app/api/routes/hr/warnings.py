@@ -7,7 +7,7 @@ from sqlalchemy.orm import Session
 
 from app.core.config import settings
 from app.core.database import get_db
-from app.core.upload_helper import upload_file_with_prefix
+from app.core.upload_helper import delete_upload, upload_file_with_prefix
 from app.models.hr.employee import Employee
 from app.models.hr.employee_warning import EmployeeWarning
 from app.models.hr.employee_warning_document import EmployeeWarningDocument
@@ -92,8 +92,7 @@ async def delete_employee_warning(employee_db_id: int, warning_id: int, db: Sess
     docs = db.query(EmployeeWarningDocument).filter(EmployeeWarningDocument.warning_id == warning_id).all()
     for d in docs:
         try:
-            if d.path and not d.path.startswith("http") and os.path.exists(d.path):
-                os.remove(d.path)
+            delete_upload(d.path)
         except Exception:
             pass
         db.delete(d)
@@ -190,8 +189,7 @@ async def delete_warning_document(warning_id: int, doc_id: int, db: Session = De
         raise HTTPException(status_code=404, detail="Document not found")
 
     try:
-        if doc.path and not doc.path.startswith("http") and os.path.exists(doc.path):
-            os.remove(doc.path)
+        delete_upload(doc.path)
     except Exception:
         pass
 
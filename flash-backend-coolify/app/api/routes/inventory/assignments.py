@@ -1,60 +1,97 @@
 """API routes for lightweight inventory assignment persistence.
 
-This mirrors the frontend's inventoryAssignments map in the database as a
-single JSON blob, without introducing full inventory modelling yet.
+This mirrors the frontend's inventoryAssignments map in the database, stored as one
+row per employee/item. GET still returns the whole map; PATCH replaces only the
+employees it lists. Responses carry an ETag and writes honour ``If-Match`` (412 when
+the map changed since the client read it).
 """
 
-import json
+from typing import Optional
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, Header, HTTPException, Response
 from sqlalchemy.orm import Session
 
 from app.core.database import get_db
 from app.api.dependencies import require_permission
-from app.models.inventory.inventory_assignment import InventoryAssignmentState
-from app.schemas.inventory.inventory_assignment import InventoryAssignmentsState
+from app.core.inventory_assignments import (
+    bump_version,
+    current_version,
+    etag_matches,
+    format_etag,
+    load_assignments,
+    replace_assignments,
+    set_employee_assignments,
+)
+from app.schemas.inventory.inventory_assignment import InventoryAssignmentsPatch, InventoryAssignmentsState
 
 
 router = APIRouter(dependencies=[Depends(require_permission("inventory:view"))])
 
 
+def _start_write(db: Session, if_match: Optional[str]) -> int:
+    """Bump the map version, enforcing ``If-Match`` when given. Returns the new version."""
+
+    expected = None
+    if if_match and if_match.strip() != "*":
+        expected = current_version(db)
+        if not etag_matches(if_match, expected):
+            raise HTTPException(status_code=412, detail="Assignments were changed by another user; reload and retry")
+
+    version = bump_version(db, expected)
+    if version is None:
+        db.rollback()
+        raise HTTPException(status_code=412, detail="Assignments were changed by another user; reload and retry")
+    return version
+
+
 @router.get("/", response_model=InventoryAssignmentsState)
 async def get_inventory_assignments(
+    response: Response,
+    if_none_match: Optional[str] = Header(None),
     db: Session = Depends(get_db),
-) -> InventoryAssignmentsState:
+):
     """Return the current inventory assignments map.
 
-    If no row exists yet, an empty map is returned.
+    If nothing is stored yet, an empty map is returned.
     """
 
-    state = db.query(InventoryAssignmentState).first()
-    if not state:
-        return InventoryAssignmentsState(data={})
-
-    try:
-        data = json.loads(state.data or "{}")
-    except json.JSONDecodeError:
-        data = {}
+    version = current_version(db)
+    if if_none_match and etag_matches(if_none_match, version):
+        return Response(status_code=304, headers={"ETag": format_etag(version)})
 
-    return InventoryAssignmentsState(data=data)
+    response.headers["ETag"] = format_etag(version)
+    return InventoryAssignmentsState(data=load_assignments(db))
 
 
 @router.put("/", response_model=InventoryAssignmentsState)
 async def upsert_inventory_assignments(
     payload: InventoryAssignmentsState,
+    response: Response,
+    if_match: Optional[str] = Header(None),
     db: Session = Depends(get_db),
 ) -> InventoryAssignmentsState:
     """Replace the stored assignments map with the provided payload."""
 
-    state = db.query(InventoryAssignmentState).first()
+    version = _start_write(db, if_match)
+    replace_assignments(db, payload.data or {})
+    db.commit()
+
+    response.headers["ETag"] = format_etag(version)
+    return InventoryAssignmentsState(data=load_assignments(db))
+
 
-    if not state:
-        state = InventoryAssignmentState(data=json.dumps(payload.data or {}))
-        db.add(state)
-    else:
-        state.data = json.dumps(payload.data or {})
+@router.patch("/", response_model=InventoryAssignmentsState)
+async def patch_inventory_assignments(
+    payload: InventoryAssignmentsPatch,
+    response: Response,
+    if_match: Optional[str] = Header(None),
+    db: Session = Depends(get_db),
+) -> InventoryAssignmentsState:
+    """Replace the lists of the employees in the payload; returns just those employees."""
 
+    version = _start_write(db, if_match)
+    set_employee_assignments(db, payload.data)
     db.commit()
-    db.refresh(state)
 
-    return InventoryAssignmentsState(data=payload.data or {})
+    response.headers["ETag"] = format_etag(version)
+    return InventoryAssignmentsState(data=load_assignments(db, payload.data.keys()))
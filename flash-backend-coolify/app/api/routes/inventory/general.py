@@ -7,6 +7,7 @@ from sqlalchemy import distinct
 from sqlalchemy.orm import Session
 
 from app.core.database import get_db
+from app.core.inventory_movements import add_to_balance, apply_kit, put_stock, take_from_balance, take_stock
 from app.api.dependencies import require_permission
 from app.models.hr.employee import Employee
 from app.models.inventory.general_item import GeneralItem
@@ -20,9 +21,11 @@ from app.schemas.inventory.general_inventory import (
     GeneralItemOut,
     GeneralItemUpdate,
     GeneralTransactionOut,
+    BatchIssueRequest,
     IssueRequest,
     ReturnRequest,
 )
+from app.schemas.inventory.inventory_kit import KitLine
 
 
 router = APIRouter(dependencies=[Depends(require_permission("inventory:view"))])
@@ -47,22 +50,6 @@ def _ensure_employee(db: Session, employee_id: str) -> None:
         raise HTTPException(status_code=404, detail="Employee not found")
 
 
-def _get_or_create_balance(db: Session, *, employee_id: str, item_code: str) -> GeneralItemEmployeeBalance:
-    bal = (
-        db.query(GeneralItemEmployeeBalance)
-        .filter(GeneralItemEmployeeBalance.employee_id == employee_id)
-        .filter(GeneralItemEmployeeBalance.item_code == item_code)
-        .first()
-    )
-    if bal:
-        return bal
-
-    bal = GeneralItemEmployeeBalance(employee_id=employee_id, item_code=item_code, quantity_issued=0.0)
-    db.add(bal)
-    db.flush()
-    return bal
-
-
 def _log_tx(
     db: Session,
     *,
@@ -243,12 +230,11 @@ async def issue_item(item_code: str, payload: IssueRequest, db: Session = Depend
     qty = float(payload.quantity or 0.0)
     if qty <= 0:
         raise HTTPException(status_code=400, detail="quantity must be > 0")
-    if float(item.quantity_on_hand or 0.0) < qty:
+    if not take_stock(db, GeneralItem, item_code, qty):
+        db.rollback()
         raise HTTPException(status_code=400, detail="Not enough stock")
 
-    item.quantity_on_hand = float(item.quantity_on_hand or 0.0) - qty
-    bal = _get_or_create_balance(db, employee_id=employee_id, item_code=item_code)
-    bal.quantity_issued = float(bal.quantity_issued or 0.0) + qty
+    add_to_balance(db, GeneralItemEmployeeBalance, employee_id=employee_id, item_code=item_code, qty=qty)
 
     _log_tx(db, item_code=item_code, action="ISSUE", employee_id=employee_id, quantity=qty, notes=payload.notes)
     db.commit()
@@ -263,6 +249,28 @@ async def issue_item(item_code: str, payload: IssueRequest, db: Session = Depend
     return list(reversed(txs))
 
 
+@router.post("/employees/{employee_id}/issue", response_model=List[GeneralTransactionOut])
+async def issue_batch(
+    employee_id: str, payload: BatchIssueRequest, db: Session = Depends(get_db)
+) -> List[GeneralTransactionOut]:
+    """Issue several items to one employee in a single transaction (all or nothing)."""
+    employee_id = (employee_id or "").strip()
+    _ensure_employee(db, employee_id)
+
+    lines = [KitLine(inventory="general", item_code=ln.item_code, quantity=ln.quantity) for ln in payload.items]
+    try:
+        result = apply_kit(db, employee_id=employee_id, lines=lines, action="issue", notes=payload.notes)
+        db.commit()
+    except ValueError as e:
+        db.rollback()
+        raise HTTPException(status_code=400, detail=str(e))
+
+    created = result["transactions"]
+    for tx in created:
+        db.refresh(tx)
+    return created
+
+
 @router.post("/items/{item_code}/return", response_model=List[GeneralTransactionOut])
 async def return_item(item_code: str, payload: ReturnRequest, db: Session = Depends(get_db)) -> List[GeneralTransactionOut]:
     item = db.query(GeneralItem).filter(GeneralItem.item_code == item_code).first()
@@ -289,21 +297,17 @@ async def return_item(item_code: str, payload: ReturnRequest, db: Session = Depe
         .first()
     )
 
-    if not bal:
-        # Fall back to creating balance only if the item exists.
-        if item:
-            bal = _get_or_create_balance(db, employee_id=employee_id, item_code=item_code)
-        else:
-            raise HTTPException(status_code=404, detail="Allocation not found for this employee/item")
+    if not bal and not item:
+        raise HTTPException(status_code=404, detail="Allocation not found for this employee/item")
 
-    if float(bal.quantity_issued or 0.0) < qty:
-        # If there's a mismatch (balance table is behind), just reset to 0
-        bal.quantity_issued = 0.0
-    else:
-        bal.quantity_issued = float(bal.quantity_issued or 0.0) - qty
+    if bal:
+        # If there's a mismatch (balance table is behind), the balance is floored at 0.
+        take_from_balance(
+            db, GeneralItemEmployeeBalance, employee_id=employee_id, item_code=item_code, qty=qty, clamp=True
+        )
 
     if item:
-        item.quantity_on_hand = float(item.quantity_on_hand or 0.0) + qty
+        put_stock(db, GeneralItem, item_code, qty)
 
     # Transactions table has FK constraints; if the item or employee record is missing,
     # writing a transaction row could fail. The allocation/balance update above is the
@@ -346,12 +350,10 @@ async def lost_item(item_code: str, payload: ReturnRequest, db: Session = Depend
     if qty <= 0:
         raise HTTPException(status_code=400, detail="quantity must be > 0")
 
-    bal = _get_or_create_balance(db, employee_id=employee_id, item_code=item_code)
-    if float(bal.quantity_issued or 0.0) < qty:
+    if not take_from_balance(db, GeneralItemEmployeeBalance, employee_id=employee_id, item_code=item_code, qty=qty):
+        db.rollback()
         raise HTTPException(status_code=400, detail="Employee does not have enough issued quantity")
 
-    bal.quantity_issued = float(bal.quantity_issued or 0.0) - qty
-
     _log_tx(db, item_code=item_code, action="LOST", employee_id=employee_id, quantity=qty, notes=payload.notes)
     db.commit()
 
@@ -380,12 +382,10 @@ async def damaged_item(item_code: str, payload: ReturnRequest, db: Session = Dep
     if qty <= 0:
         raise HTTPException(status_code=400, detail="quantity must be > 0")
 
-    bal = _get_or_create_balance(db, employee_id=employee_id, item_code=item_code)
-    if float(bal.quantity_issued or 0.0) < qty:
+    if not take_from_balance(db, GeneralItemEmployeeBalance, employee_id=employee_id, item_code=item_code, qty=qty):
+        db.rollback()
         raise HTTPException(status_code=400, detail="Employee does not have enough issued quantity")
 
-    bal.quantity_issued = float(bal.quantity_issued or 0.0) - qty
-
     _log_tx(
         db,
         item_code=item_code,
@@ -0,0 +1,48 @@
+"""API routes for issuing/returning a kit of general and restricted items to one employee.
+
+A kit is validated as a whole and applied in a single transaction, so onboarding a guard
+is one request instead of one call per item.
+"""
+
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy.orm import Session
+
+from app.core.database import get_db
+from app.core.inventory_movements import apply_kit
+from app.api.dependencies import require_permission
+from app.models.hr.employee import Employee
+from app.schemas.inventory.inventory_kit import KitRequest, KitResult
+
+
+router = APIRouter(dependencies=[Depends(require_permission("inventory:view"))])
+
+
+def _apply(db: Session, employee_id: str, payload: KitRequest, action: str) -> KitResult:
+    employee_id = (employee_id or "").strip()
+    emp = db.query(Employee.id).filter(Employee.employee_id == employee_id).first()
+    if not emp:
+        raise HTTPException(status_code=404, detail="Employee not found")
+
+    try:
+        result = apply_kit(db, employee_id=employee_id, lines=payload.items, action=action, notes=payload.notes)
+        db.commit()
+    except ValueError as e:
+        db.rollback()
+        raise HTTPException(status_code=400, detail=str(e))
+
+    return KitResult(
+        employee_id=employee_id,
+        action=action,
+        lines=result["lines"],
+        transactions=len(result["transactions"]),
+    )
+
+
+@router.post("/employees/{employee_id}/issue", response_model=KitResult)
+async def issue_kit(employee_id: str, payload: KitRequest, db: Session = Depends(get_db)) -> KitResult:
+    return _apply(db, employee_id, payload, "issue")
+
+
+@router.post("/employees/{employee_id}/return", response_model=KitResult)
+async def return_kit(employee_id: str, payload: KitRequest, db: Session = Depends(get_db)) -> KitResult:
+    return _apply(db, employee_id, payload, "return")
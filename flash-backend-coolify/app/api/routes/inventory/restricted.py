@@ -7,6 +7,16 @@ from sqlalchemy import func
 from sqlalchemy.orm import Session
 
 from app.core.database import get_db
+from app.core.image_variants import variant_url
+from app.core.inventory_movements import (
+    add_to_balance,
+    duplicate_serials,
+    move_serial_units,
+    put_stock,
+    take_from_balance,
+    take_stock,
+)
+from app.core.upload_helper import delete_upload
 from app.api.dependencies import require_permission
 from app.models.hr.employee import Employee
 from app.models.inventory.restricted_item import RestrictedItem
@@ -320,33 +330,37 @@ async def employee_quantity_action(
     if qty <= 0:
         raise HTTPException(status_code=400, detail="quantity must be > 0")
 
-    bal = _get_or_create_balance(db, employee_id=employee_id, item_code=item_code)
-
     action_u = (action or "").strip().lower()
     allowed = {"return", "lost", "damaged", "maintenance", "available", "found"}
     if action_u not in allowed:
         raise HTTPException(status_code=400, detail="Invalid action")
 
-    if action_u in {"return", "lost", "damaged", "maintenance"}:
+    not_enough = HTTPException(status_code=400, detail="Employee does not have enough issued quantity")
+
+    if action_u in {"return", "lost", "damaged"}:
+        if not take_from_balance(
+            db, RestrictedItemEmployeeBalance, employee_id=employee_id, item_code=item_code, qty=qty
+        ):
+            db.rollback()
+            raise not_enough
+    elif action_u == "maintenance":
+        bal = _get_or_create_balance(db, employee_id=employee_id, item_code=item_code)
         if float(bal.quantity_issued or 0.0) < qty:
-            raise HTTPException(status_code=400, detail="Employee does not have enough issued quantity")
+            raise not_enough
 
     if action_u == "return":
-        item.quantity_on_hand = float(item.quantity_on_hand or 0.0) + qty
-        bal.quantity_issued = float(bal.quantity_issued or 0.0) - qty
+        put_stock(db, RestrictedItem, item_code, qty)
         _log_tx(db, item_code=item_code, action="RETURN", employee_id=employee_id, quantity=qty, notes=payload.notes)
     elif action_u == "lost":
-        bal.quantity_issued = float(bal.quantity_issued or 0.0) - qty
         _log_tx(db, item_code=item_code, action="LOST", employee_id=employee_id, quantity=qty, notes=payload.notes)
     elif action_u == "damaged":
-        bal.quantity_issued = float(bal.quantity_issued or 0.0) - qty
         _log_tx(db, item_code=item_code, action="DAMAGED", employee_id=employee_id, quantity=qty, notes=payload.notes)
     elif action_u == "maintenance":
         _log_tx(db, item_code=item_code, action="MAINTENANCE", employee_id=employee_id, quantity=qty, notes=payload.notes)
     elif action_u == "available":
         _log_tx(db, item_code=item_code, action="AVAILABLE", employee_id=employee_id, quantity=qty, notes=payload.notes)
     elif action_u == "found":
-        item.quantity_on_hand = float(item.quantity_on_hand or 0.0) + qty
+        put_stock(db, RestrictedItem, item_code, qty)
         _log_tx(db, item_code=item_code, action="FOUND", employee_id=employee_id, quantity=qty, notes=payload.notes)
 
     db.commit()
@@ -494,6 +508,7 @@ async def list_images(item_code: str, db: Session = Depends(get_db)) -> List[Res
                 item_code=img.item_code,
                 filename=img.filename,
                 url=_public_url(img.path),
+                thumbnail_url=variant_url(_public_url(img.path), "thumb"),
                 mime_type=img.mime_type,
                 created_at=img.created_at,
                 updated_at=img.updated_at,
@@ -546,6 +561,7 @@ async def upload_image(
         item_code=img.item_code,
         filename=img.filename,
         url=url,
+        thumbnail_url=variant_url(url, "thumb"),
         mime_type=img.mime_type,
         created_at=img.created_at,
         updated_at=img.updated_at,
@@ -564,8 +580,7 @@ async def delete_image(item_code: str, image_id: int, db: Session = Depends(get_
         raise HTTPException(status_code=404, detail="Image not found")
 
     try:
-        if img.path and os.path.exists(img.path):
-            os.remove(img.path)
+        delete_upload(img.path)
     except Exception:
         pass
 
@@ -631,6 +646,9 @@ async def issue_item(item_code: str, payload: IssueRequest, db: Session = Depend
         sns = [s.strip() for s in sns if s and s.strip()]
         if not sns:
             raise HTTPException(status_code=400, detail="serial_numbers are required for serial-tracked items")
+        dupes = duplicate_serials(sns)
+        if dupes:
+            raise HTTPException(status_code=400, detail=f"Serial(s) listed more than once: {', '.join(dupes)}")
 
         units = (
             db.query(RestrictedItemSerialUnit)
@@ -644,24 +662,27 @@ async def issue_item(item_code: str, payload: IssueRequest, db: Session = Depend
             raise HTTPException(status_code=400, detail=f"Serial(s) not found: {', '.join(missing)}")
 
         for sn in sns:
-            u = found[sn]
-            if u.status != "in_stock":
+            if found[sn].status != "in_stock":
                 raise HTTPException(status_code=400, detail=f"Serial {sn} is not available")
-            u.status = "issued"
-            u.issued_to_employee_id = employee_id
-            _log_tx(db, item_code=item_code, action="ISSUE", employee_id=employee_id, serial_unit_id=u.id, notes=payload.notes)
+
+        unit_ids = [found[sn].id for sn in sns]
+        if not move_serial_units(
+            db, RestrictedItemSerialUnit, unit_ids, from_status="in_stock", to_status="issued", employee_id=employee_id
+        ):
+            db.rollback()
+            raise HTTPException(status_code=409, detail="One or more serials were issued by another request")
+        for unit_id in unit_ids:
+            _log_tx(db, item_code=item_code, action="ISSUE", employee_id=employee_id, serial_unit_id=unit_id, notes=payload.notes)
 
     else:
         qty = payload.quantity
         if qty is None or qty <= 0:
             raise HTTPException(status_code=400, detail="quantity must be > 0")
-        if item.quantity_on_hand < qty:
+        if not take_stock(db, RestrictedItem, item_code, float(qty)):
+            db.rollback()
             raise HTTPException(status_code=400, detail="Not enough stock")
 
-        item.quantity_on_hand = float(item.quantity_on_hand) - float(qty)
-        if employee_id:
-            bal = _get_or_create_balance(db, employee_id=employee_id, item_code=item_code)
-            bal.quantity_issued = float(bal.quantity_issued or 0.0) + float(qty)
+        add_to_balance(db, RestrictedItemEmployeeBalance, employee_id=employee_id, item_code=item_code, qty=float(qty))
         _log_tx(db, item_code=item_code, action="ISSUE", employee_id=employee_id, quantity=float(qty), notes=payload.notes)
 
     db.commit()
@@ -695,6 +716,9 @@ async def return_item(item_code: str, payload: ReturnRequest, db: Session = Depe
         sns = [s.strip() for s in sns if s and s.strip()]
         if not sns:
             raise HTTPException(status_code=400, detail="serial_numbers are required for serial-tracked items")
+        dupes = duplicate_serials(sns)
+        if dupes:
+            raise HTTPException(status_code=400, detail=f"Serial(s) listed more than once: {', '.join(dupes)}")
 
         units = (
             db.query(RestrictedItemSerialUnit)
@@ -708,27 +732,29 @@ async def return_item(item_code: str, payload: ReturnRequest, db: Session = Depe
             raise HTTPException(status_code=400, detail=f"Serial(s) not found: {', '.join(missing)}")
 
         for sn in sns:
-            u = found[sn]
-            if u.status != "issued":
+            if found[sn].status != "issued":
                 raise HTTPException(status_code=400, detail=f"Serial {sn} is not issued")
-            u.status = "in_stock"
-            u.issued_to_employee_id = None
-            _log_tx(db, item_code=item_code, action="RETURN", employee_id=employee_id, serial_unit_id=u.id, notes=payload.notes)
+
+        unit_ids = [found[sn].id for sn in sns]
+        if not move_serial_units(
+            db, RestrictedItemSerialUnit, unit_ids, from_status="issued", to_status="in_stock", employee_id=None
+        ):
+            db.rollback()
+            raise HTTPException(status_code=409, detail="One or more serials were changed by another request")
+        for unit_id in unit_ids:
+            _log_tx(db, item_code=item_code, action="RETURN", employee_id=employee_id, serial_unit_id=unit_id, notes=payload.notes)
 
     else:
         qty = payload.quantity
         if qty is None or qty <= 0:
             raise HTTPException(status_code=400, detail="quantity must be > 0")
 
-        item.quantity_on_hand = float(item.quantity_on_hand) + float(qty)
+        put_stock(db, RestrictedItem, item_code, float(qty))
 
-        if employee_id:
-            bal = _get_or_create_balance(db, employee_id=employee_id, item_code=item_code)
-            if float(bal.quantity_issued or 0.0) < float(qty):
-                # If mismatch, reset balance to 0
-                bal.quantity_issued = 0.0
-            else:
-                bal.quantity_issued = float(bal.quantity_issued or 0.0) - float(qty)
+        # If mismatch, the balance is floored at 0
+        take_from_balance(
+            db, RestrictedItemEmployeeBalance, employee_id=employee_id, item_code=item_code, qty=float(qty), clamp=True
+        )
 
         _log_tx(db, item_code=item_code, action="RETURN", employee_id=employee_id, quantity=float(qty), notes=payload.notes)
 
@@ -755,6 +781,9 @@ async def mark_maintenance(item_code: str, payload: LostRequest, db: Session = D
         sns = [s.strip() for s in sns if s and s.strip()]
         if not sns:
             raise HTTPException(status_code=400, detail="serial_numbers are required for serial-tracked items")
+        dupes = duplicate_serials(sns)
+        if dupes:
+            raise HTTPException(status_code=400, detail=f"Serial(s) listed more than once: {', '.join(dupes)}")
 
         units = (
             db.query(RestrictedItemSerialUnit)
@@ -802,6 +831,9 @@ async def mark_cleaning(item_code: str, payload: LostRequest, db: Session = Depe
         sns = [s.strip() for s in sns if s and s.strip()]
         if not sns:
             raise HTTPException(status_code=400, detail="serial_numbers are required for serial-tracked items")
+        dupes = duplicate_serials(sns)
+        if dupes:
+            raise HTTPException(status_code=400, detail=f"Serial(s) listed more than once: {', '.join(dupes)}")
 
         units = (
             db.query(RestrictedItemSerialUnit)
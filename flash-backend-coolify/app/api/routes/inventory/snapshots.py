@@ -0,0 +1,109 @@
+"""API routes for inventory snapshots and point-in-time (as-of) inventory reports."""
+
+from datetime import date, datetime
+from typing import List, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.orm import Session
+
+from app.core.database import get_db
+from app.core.inventory_snapshots import (
+    end_of_day,
+    inventory_as_of,
+    take_inventory_snapshot,
+)
+from app.api.dependencies import require_permission
+from app.models.inventory.general_item import GeneralItem
+from app.models.inventory.inventory_snapshot import InventorySnapshot
+from app.models.inventory.restricted_item import RestrictedItem
+from app.models.inventory.restricted_item_serial_unit import RestrictedItemSerialUnit
+from app.schemas.inventory.inventory_snapshot import (
+    InventoryAsOf,
+    InventorySnapshotCreate,
+    InventorySnapshotOut,
+)
+
+
+router = APIRouter(dependencies=[Depends(require_permission("inventory:view"))])
+
+
+@router.get("/", response_model=List[InventorySnapshotOut])
+async def list_snapshots(limit: int = Query(50, ge=1, le=500), db: Session = Depends(get_db)) -> List[InventorySnapshotOut]:
+    return db.query(InventorySnapshot).order_by(InventorySnapshot.taken_at.desc()).limit(limit).all()
+
+
+@router.post("/", response_model=InventorySnapshotOut)
+async def create_snapshot(payload: InventorySnapshotCreate, db: Session = Depends(get_db)) -> InventorySnapshotOut:
+    return take_inventory_snapshot(db, note=payload.note)
+
+
+@router.get("/as-of", response_model=InventoryAsOf)
+async def get_inventory_as_of(
+    at: Optional[datetime] = Query(None, description="Point in time (ISO datetime)"),
+    on: Optional[date] = Query(None, description="End of this day; alternative to `at`"),
+    employee_id: Optional[str] = None,
+    db: Session = Depends(get_db),
+) -> InventoryAsOf:
+    if at is None and on is None:
+        raise HTTPException(status_code=400, detail="Provide `at` or `on`")
+    cutoff = at or end_of_day(on)
+
+    state, meta = inventory_as_of(db, cutoff)
+    emp = (employee_id or "").strip() or None
+
+    names = {}
+    for inventory, model in (("general", GeneralItem), ("restricted", RestrictedItem)):
+        for code, name, unit in db.query(model.item_code, model.name, model.unit_name):
+            names[(inventory, code)] = (name, unit)
+
+    stock = []
+    if emp is None:
+        for (inventory, code), qty in sorted(state["stock"].items()):
+            name, unit = names.get((inventory, code), (None, None))
+            stock.append(
+                {"inventory": inventory, "item_code": code, "item_name": name, "unit_name": unit, "quantity_on_hand": qty}
+            )
+
+    balances = []
+    for (inventory, bal_emp, code), qty in sorted(state["balances"].items()):
+        if qty <= 0 or (emp is not None and bal_emp != emp):
+            continue
+        balances.append(
+            {
+                "inventory": inventory,
+                "employee_id": bal_emp,
+                "item_code": code,
+                "item_name": names.get((inventory, code), (None, None))[0],
+                "quantity_issued": qty,
+            }
+        )
+
+    serial_ids = [uid for uid, (_, _, su_emp) in state["serials"].items() if emp is None or su_emp == emp]
+    serial_numbers = {}
+    if serial_ids:
+        serial_numbers = dict(
+            db.query(RestrictedItemSerialUnit.id, RestrictedItemSerialUnit.serial_number).filter(
+                RestrictedItemSerialUnit.id.in_(serial_ids)
+            )
+        )
+    serials = [
+        {
+            "serial_unit_id": uid,
+            "item_code": state["serials"][uid][0],
+            "serial_number": serial_numbers.get(uid),
+            "status": state["serials"][uid][1],
+            "employee_id": state["serials"][uid][2],
+        }
+        for uid in sorted(serial_ids)
+    ]
+
+    return InventoryAsOf(
+        as_of=cutoff,
+        snapshot_id=meta["snapshot_id"],
+        snapshot_taken_at=meta["snapshot_taken_at"],
+        direction=meta["direction"],
+        replayed_transactions=meta["replayed"],
+        stock=stock,
+        balances=balances,
+        serials=serials,
+    )
@@ -0,0 +1,116 @@
+"""
+Account balance helper.
+
+finance_account_balances keeps posted debit/credit totals per account per month. Posting
+a journal adds its lines to the affected (account, period) rows in the same transaction,
+so the trial balance and ledger opening balances are reads over a small table instead
+of a scan of every journal line. A reversal posts swapped lines and nets out naturally.
+"""
+
+from datetime import date
+from decimal import Decimal
+from typing import Dict, Iterable, Optional, Tuple
+
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from app.core.database import dialect_insert
+from app.models.finance.finance_account_balance import FinanceAccountBalance
+from app.models.finance.finance_journal_entry import FinanceJournalEntry
+from app.models.finance.finance_journal_line import FinanceJournalLine
+
+DEBIT_NORMAL_TYPES = {"ASSET", "EXPENSE"}
+
+
+def period_of(d: date) -> str:
+    return d.strftime("%Y-%m")
+
+
+def normal_balance(account_type: Optional[str], debit: Decimal, credit: Decimal) -> Decimal:
+    """Signed balance in the account's normal direction (debit-normal for ASSET/EXPENSE)."""
+
+    if (account_type or "").upper() in DEBIT_NORMAL_TYPES:
+        return debit - credit
+    return credit - debit
+
+
+def _add_totals(db: Session, totals: Dict[Tuple[int, str], Tuple[Decimal, Decimal]]) -> None:
+    if not totals:
+        return
+
+    ins = dialect_insert(db, FinanceAccountBalance)
+    if ins is not None:
+        table = FinanceAccountBalance.__table__
+        stmt = ins.values(
+            [
+                {"account_id": acc_id, "period": period, "debit_total": dr, "credit_total": cr}
+                for (acc_id, period), (dr, cr) in totals.items()
+            ]
+        )
+        stmt = stmt.on_conflict_do_update(
+            index_elements=["account_id", "period"],
+            set_={
+                "debit_total": table.c.debit_total + stmt.excluded.debit_total,
+                "credit_total": table.c.credit_total + stmt.excluded.credit_total,
+                "updated_at": func.now(),
+            },
+        )
+        db.execute(stmt)
+        return
+
+    for (acc_id, period), (dr, cr) in totals.items():
+        row = (
+            db.query(FinanceAccountBalance)
+            .filter(FinanceAccountBalance.account_id == acc_id, FinanceAccountBalance.period == period)
+            .with_for_update()
+            .first()
+        )
+        if row is None:
+            db.add(FinanceAccountBalance(account_id=acc_id, period=period, debit_total=dr, credit_total=cr))
+        else:
+            row.debit_total = Decimal(str(row.debit_total or 0)) + dr
+            row.credit_total = Decimal(str(row.credit_total or 0)) + cr
+    db.flush()
+
+
+def apply_entry_to_balances(db: Session, entry: FinanceJournalEntry) -> None:
+    """Add a journal entry's lines to the monthly balances. Call in the posting transaction."""
+
+    apply_lines_to_balances(db, entry.entry_date, entry.lines)
+
+
+def apply_lines_to_balances(db: Session, entry_date: date, lines: Iterable[FinanceJournalLine]) -> None:
+    period = period_of(entry_date)
+    totals: Dict[Tuple[int, str], Tuple[Decimal, Decimal]] = {}
+    for ln in lines:
+        key = (ln.account_id, period)
+        dr, cr = totals.get(key, (Decimal("0"), Decimal("0")))
+        totals[key] = (dr + Decimal(str(ln.debit or 0)), cr + Decimal(str(ln.credit or 0)))
+    _add_totals(db, totals)
+
+
+def rebuild_account_balances(db: Session) -> int:
+    """Recompute every balance row from posted journal lines. Returns the number of rows."""
+
+    rows = (
+        db.query(
+            FinanceJournalLine.account_id,
+            FinanceJournalEntry.entry_date,
+            func.coalesce(func.sum(FinanceJournalLine.debit), 0),
+            func.coalesce(func.sum(FinanceJournalLine.credit), 0),
+        )
+        .join(FinanceJournalEntry, FinanceJournalEntry.id == FinanceJournalLine.entry_id)
+        .filter(FinanceJournalEntry.status == "POSTED")
+        .group_by(FinanceJournalLine.account_id, FinanceJournalEntry.entry_date)
+        .all()
+    )
+
+    totals: Dict[Tuple[int, str], Tuple[Decimal, Decimal]] = {}
+    for acc_id, entry_date, dr, cr in rows:
+        key = (acc_id, period_of(entry_date))
+        cur_dr, cur_cr = totals.get(key, (Decimal("0"), Decimal("0")))
+        totals[key] = (cur_dr + Decimal(str(dr)), cur_cr + Decimal(str(cr)))
+
+    db.query(FinanceAccountBalance).delete(synchronize_session=False)
+    _add_totals(db, totals)
+    return len(totals)
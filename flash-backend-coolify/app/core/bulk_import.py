@@ -0,0 +1,133 @@
+"""
+Bulk import helper.
+
+Shared engine for spreadsheet/JSON imports: parses rows, prefetches existing keys
+with one query per key column, drops duplicates (against the database and within the
+file), inserts in multi-row batches inside a single transaction and reports per-row
+errors without aborting the whole import. Supports a dry-run preview.
+"""
+
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence
+
+from sqlalchemy import insert
+from sqlalchemy.orm import Session
+
+from app.core.database import begin_sqlite_transaction
+
+
+class SkipRow(Exception):
+    """Raised by a row parser to skip a row (header, blank, category marker, ...).
+
+    ``counted=False`` leaves the row out of the ``skipped`` total, for layout rows that
+    an import never reported as skipped.
+    """
+
+    def __init__(self, counted: bool = True):
+        super().__init__()
+        self.counted = counted
+
+
+def _norm_key(v: Any) -> Optional[str]:
+    s = str(v or "").strip()
+    return s or None
+
+
+def run_bulk_import(
+    db: Session,
+    model,
+    rows: Iterable[Any],
+    parse_row: Callable[[int, Any], Dict[str, Any]],
+    *,
+    key_columns: Sequence[str] = (),
+    dry_run: bool = False,
+    batch_size: int = 500,
+    preview_limit: int = 20,
+) -> dict:
+    """Import ``rows`` into ``model``.
+
+    ``parse_row(index, row)`` returns the column dict for a row, raises ``SkipRow`` to
+    skip it, or raises any other exception to record a row error. A row is a duplicate
+    when any of its non-empty ``key_columns`` values already exists (in the table or
+    earlier in the file).
+
+    Returns ``{"created", "skipped", "duplicates", "errors", "total_rows", "dry_run", "preview"}``
+    where ``errors`` is a list of ``{"row": index, "error": message}``.
+    """
+
+    result: dict = {
+        "created": 0,
+        "skipped": 0,
+        "duplicates": 0,
+        "errors": [],
+        "total_rows": 0,
+        "dry_run": dry_run,
+        "preview": [],
+    }
+
+    parsed: List[tuple[int, Dict[str, Any]]] = []
+    for idx, row in enumerate(rows):
+        result["total_rows"] += 1
+        try:
+            values = parse_row(idx, row)
+        except SkipRow as skip:
+            if skip.counted:
+                result["skipped"] += 1
+            continue
+        except Exception as e:
+            result["errors"].append({"row": idx, "error": str(e)})
+            continue
+        parsed.append((idx, values))
+
+    # Prefetch existing keys: one query per key column for the whole file.
+    seen: Dict[str, set] = {}
+    for col in key_columns:
+        keys = {k for _, v in parsed if (k := _norm_key(v.get(col))) is not None}
+        existing = set()
+        if keys:
+            column = getattr(model, col)
+            existing = {_norm_key(k) for (k,) in db.query(column).filter(column.in_(keys))}
+        seen[col] = existing
+
+    to_insert: List[tuple[int, Dict[str, Any]]] = []
+    for idx, values in parsed:
+        row_keys = {col: _norm_key(values.get(col)) for col in key_columns}
+        if any(k is not None and k in seen[col] for col, k in row_keys.items()):
+            result["duplicates"] += 1
+            continue
+        for col, k in row_keys.items():
+            if k is not None:
+                seen[col].add(k)
+        to_insert.append((idx, values))
+
+    if dry_run:
+        result["created"] = len(to_insert)
+        result["preview"] = [values for _, values in to_insert[:preview_limit]]
+        return result
+
+    # Without this, each per-batch SAVEPOINT would commit on its own on SQLite.
+    begin_sqlite_transaction(db)
+    table = model.__table__
+    for start in range(0, len(to_insert), batch_size):
+        batch = to_insert[start:start + batch_size]
+        # executemany needs a uniform key set per statement.
+        by_shape: Dict[frozenset, List[tuple[int, Dict[str, Any]]]] = {}
+        for idx, values in batch:
+            by_shape.setdefault(frozenset(values.keys()), []).append((idx, values))
+
+        for group in by_shape.values():
+            try:
+                with db.begin_nested():
+                    db.execute(insert(table), [values for _, values in group])
+                result["created"] += len(group)
+            except Exception:
+                # Isolate the failing rows so the rest of the batch still lands.
+                for idx, values in group:
+                    try:
+                        with db.begin_nested():
+                            db.execute(insert(table), [values])
+                        result["created"] += 1
+                    except Exception as e:
+                        result["errors"].append({"row": idx, "error": str(getattr(e, "orig", e))})
+
+    db.commit()
+    return result
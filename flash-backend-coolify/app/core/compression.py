@@ -0,0 +1,187 @@
+"""
+Response compression.
+
+``CompressionMiddleware`` compresses textual responses (JSON, CSV, HTML, JS, SVG, ...)
+with Brotli when the client accepts it and the ``brotli`` package is installed, otherwise
+with gzip. Starlette's ``GZipMiddleware`` would also recompress PDFs, XLSX and images that
+are already compressed, and has no Brotli support.
+
+Skipped: bodies below ``COMPRESSION_MIN_SIZE``, responses that already carry a
+``Content-Encoding``, partial content (206), and 204/304. Single-body responses are
+compressed in one pass with the correct ``Content-Length``; streamed responses are
+compressed chunk by chunk. A strong ``ETag`` is weakened (``W/``) on compressed
+responses, since the bytes on the wire no longer match the original representation.
+"""
+
+import gzip
+import zlib
+from typing import Optional
+
+from app.core.config import settings
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - optional dependency
+    brotli = None
+
+_COMPRESSIBLE_PREFIXES = ("text/",)
+_COMPRESSIBLE_TYPES = {
+    "application/json",
+    "application/javascript",
+    "application/xml",
+    "application/x-ndjson",
+    "image/svg+xml",
+}
+_SKIP_STATUSES = {204, 206, 304}
+
+
+def accepted_encodings(accept_encoding: str) -> set:
+    out = set()
+    for part in accept_encoding.split(","):
+        name, _, params = part.strip().partition(";")
+        name = name.strip().lower()
+        if not name:
+            continue
+        q = params.strip()
+        if q.startswith("q="):
+            try:
+                if float(q[2:]) <= 0:
+                    continue
+            except ValueError:
+                pass
+        out.add(name)
+    return out
+
+
+def choose_encoding(accept_encoding: str) -> Optional[str]:
+    """``br`` or ``gzip`` if the client accepts it (Brotli preferred when available)."""
+
+    accepted = accepted_encodings(accept_encoding or "")
+    if brotli is not None and "br" in accepted:
+        return "br"
+    if "gzip" in accepted or "*" in accepted:
+        return "gzip"
+    return None
+
+
+def is_compressible(content_type: str) -> bool:
+    media_type = (content_type or "").split(";", 1)[0].strip().lower()
+    if not media_type:
+        return False
+    return (
+        media_type.startswith(_COMPRESSIBLE_PREFIXES)
+        or media_type in _COMPRESSIBLE_TYPES
+        or media_type.endswith("+json")
+    )
+
+
+def compress(data: bytes, encoding: str) -> bytes:
+    if encoding == "br":
+        return brotli.compress(data, quality=settings.COMPRESSION_BROTLI_QUALITY)
+    return gzip.compress(data, compresslevel=settings.COMPRESSION_GZIP_LEVEL, mtime=0)
+
+
+class _StreamCompressor:
+    def __init__(self, encoding: str):
+        if encoding == "br":
+            self._obj = brotli.Compressor(quality=settings.COMPRESSION_BROTLI_QUALITY)
+            self._compress = self._obj.process
+            self._flush = self._obj.finish
+        else:
+            self._obj = zlib.compressobj(settings.COMPRESSION_GZIP_LEVEL, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+            self._compress = self._obj.compress
+            self._flush = self._obj.flush
+
+    def chunk(self, data: bytes) -> bytes:
+        return self._compress(data) if data else b""
+
+    def finish(self) -> bytes:
+        return self._flush()
+
+
+class CompressionMiddleware:
+    def __init__(self, app, minimum_size: Optional[int] = None):
+        self.app = app
+        self.minimum_size = settings.COMPRESSION_MIN_SIZE if minimum_size is None else minimum_size
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        headers = dict(scope.get("headers") or [])
+        encoding = choose_encoding(headers.get(b"accept-encoding", b"").decode("latin-1"))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        state = {"start": None, "compressor": None, "passthrough": False}
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                response_headers = {k.lower(): v for k, v in message.get("headers", [])}
+                if (
+                    message["status"] in _SKIP_STATUSES
+                    or b"content-encoding" in response_headers
+                    or not is_compressible(response_headers.get(b"content-type", b"").decode("latin-1"))
+                ):
+                    state["passthrough"] = True
+                    await send(message)
+                    return
+                # Hold the start message until the first body chunk tells us the size.
+                state["start"] = message
+                return
+
+            if message["type"] != "http.response.body" or state["passthrough"]:
+                await send(message)
+                return
+
+            body = message.get("body", b"")
+            more_body = message.get("more_body", False)
+
+            if state["compressor"] is None:
+                start = state["start"]
+                if not more_body:
+                    if len(body) < self.minimum_size:
+                        await send(start)
+                        await send(message)
+                        return
+                    compressed = compress(body, encoding)
+                    await send(_compressed_start(start, encoding, len(compressed)))
+                    await send({"type": "http.response.body", "body": compressed})
+                    return
+                state["compressor"] = _StreamCompressor(encoding)
+                await send(_compressed_start(start, encoding, None))
+
+            compressor = state["compressor"]
+            chunk = compressor.chunk(body)
+            if not more_body:
+                chunk += compressor.finish()
+            if chunk or not more_body:
+                await send({"type": "http.response.body", "body": chunk, "more_body": more_body})
+
+        await self.app(scope, receive, send_wrapper)
+
+
+def _compressed_start(start: dict, encoding: str, length: Optional[int]) -> dict:
+    headers = []
+    vary = None
+    for key, value in start.get("headers", []):
+        name = key.lower()
+        if name == b"content-length":
+            continue
+        if name == b"vary":
+            vary = value
+            continue
+        if name == b"etag" and not value.startswith(b"W/"):
+            value = b"W/" + value
+        headers.append((key, value))
+    if vary is None:
+        vary = b"Accept-Encoding"
+    elif b"accept-encoding" not in vary.lower():
+        vary = vary + b", Accept-Encoding"
+    headers.append((b"vary", vary))
+    headers.append((b"content-encoding", encoding.encode("latin-1")))
+    if length is not None:
+        headers.append((b"content-length", str(length).encode("latin-1")))
+    return {**start, "headers": headers}
@@ -1,5 +1,5 @@
 import os
-from typing import List
+from typing import Dict, List
 from urllib.parse import urlparse, urlunparse, unquote, parse_qsl, urlencode
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
@@ -29,14 +29,88 @@ class Settings(BaseSettings):
     # Database - Local SQLite (workspace root)
     DATABASE_URL: str = "sqlite:///" + os.path.abspath(os.path.join(_PROJECT_ROOT, "..", "flash_erp.db")).replace("\\", "/")
 
+    # Optional read replica for GET reporting routes (payroll reports, analytics, exports).
+    # After a user's own write, their reads stay on the primary for DB_READ_AFTER_WRITE_SECONDS;
+    # all reads fall back to the primary while the replica lags more than DB_READ_MAX_LAG_SECONDS.
+    DATABASE_READ_URL: str = ""
+    DB_READ_AFTER_WRITE_SECONDS: int = 15
+    DB_READ_MAX_LAG_SECONDS: int = 30
+
+    # Connection pool (per worker process; size workers x (pool + overflow) below the server's limit)
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_RECYCLE: int = 3600
+    DB_POOL_TIMEOUT: int = 30
+
+    # Postgres statement timeout in ms (0 = server default; Supabase hosts fall back to 10000).
+    # Per-route overrides as "path_prefix=ms" pairs, longest prefix wins, e.g.
+    # "/api/exports=120000,/api/analytics=60000,/api/employees2=15000"
+    DB_STATEMENT_TIMEOUT_MS: int = 0
+    DB_ROUTE_STATEMENT_TIMEOUTS: str = ""
+
+    # SQLite pragmas, applied to every new connection
+    SQLITE_JOURNAL_MODE: str = "WAL"
+    SQLITE_SYNCHRONOUS: str = "NORMAL"
+    SQLITE_BUSY_TIMEOUT_MS: int = 5000
+    SQLITE_MMAP_SIZE: int = 268435456
+    # Negative values are KiB (SQLite convention): -65536 = 64 MiB page cache per connection
+    SQLITE_CACHE_SIZE: int = -65536
+
     # Uploads
     UPLOADS_DIR: str = os.path.join(_PROJECT_ROOT, "uploads")
+    # max-age for uniquely named (never overwritten) uploads, sent with "immutable"
+    UPLOADS_CACHE_MAX_AGE: int = 31536000
+    # Serve <file>.br / <file>.gz siblings of textual uploads when the client accepts them
+    UPLOADS_PRECOMPRESSED: bool = True
+    # Downscaled image variants (thumb / medium / pdf), written by a thread pool after upload
+    IMAGE_VARIANTS_ENABLED: bool = True
+    # Threads of that pool; it also writes the .br / .gz siblings
+    IMAGE_VARIANT_WORKERS: int = 2
+    IMAGE_VARIANT_QUALITY: int = 82
     
     # Security
     SECRET_KEY: str = "your-super-secret-key-change-this-in-production"
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
     
+    # Server (python -m app.server)
+    HOST: str = "0.0.0.0"
+    PORT: int = 8000
+    # Worker processes; 0 = one per CPU, capped at MAX_WORKERS
+    WEB_CONCURRENCY: int = 0
+    MAX_WORKERS: int = 8
+    # Run table creation and startup tasks once in the launcher instead of in each worker
+    SERVER_PRELOAD: bool = True
+    # Restart on code changes (development; runs a single worker)
+    SERVER_RELOAD: bool = False
+    # Replace a worker after it has served this many requests (0 = never)
+    WORKER_MAX_REQUESTS: int = 0
+    # Seconds a worker gets to finish in-flight requests on shutdown or SIGHUP restart
+    WORKER_GRACEFUL_TIMEOUT: int = 30
+    # Seconds to wait for another process's startup tasks before giving up
+    STARTUP_LOCK_TIMEOUT: int = 600
+    # How often the launcher checks whether an inventory snapshot is due (0 = only at startup)
+    INVENTORY_SNAPSHOT_SECONDS: int = 3600
+
+    # Metrics (/metrics in Prometheus text format, Server-Timing response header)
+    METRICS_ENABLED: bool = True
+    SERVER_TIMING_ENABLED: bool = True
+    # /metrics requires "Authorization: Bearer <token>"; it is not served while this is empty
+    METRICS_TOKEN: str = ""
+
+    # Response compression for textual responses (Brotli when the client accepts it and the
+    # brotli package is installed, else gzip). Bodies below COMPRESSION_MIN_SIZE bytes are sent as is.
+    COMPRESSION_ENABLED: bool = True
+    COMPRESSION_MIN_SIZE: int = 1024
+    COMPRESSION_GZIP_LEVEL: int = 6
+    COMPRESSION_BROTLI_QUALITY: int = 4
+
+    # SQL diagnostics: log repeated (N+1) and slow statements per request.
+    # Can also be switched at runtime via /api/admin/diagnostics/sql.
+    SQL_DIAGNOSTICS_ENABLED: bool = False
+    SQL_DIAGNOSTICS_REPEAT_THRESHOLD: int = 10
+    SQL_DIAGNOSTICS_SLOW_QUERY_MS: float = 250.0
+
     # CORS
     ALLOWED_ORIGINS: str = "http://localhost:5173,http://127.0.0.1:5173,http://localhost:3000,http://127.0.0.1:3000,http://localhost:3001,http://127.0.0.1:3001,http://localhost:8000,http://127.0.0.1:8000"
     
@@ -44,7 +118,17 @@ class Settings(BaseSettings):
     def allowed_origins_list(self) -> List[str]:
         """Convert comma-separated string to list."""
         return [origin.strip() for origin in self.ALLOWED_ORIGINS.split(",")]
-    
+
+    @property
+    def route_statement_timeouts(self) -> Dict[str, int]:
+        """Parse DB_ROUTE_STATEMENT_TIMEOUTS into {path_prefix: ms}; malformed pairs are skipped."""
+        out: Dict[str, int] = {}
+        for pair in self.DB_ROUTE_STATEMENT_TIMEOUTS.split(","):
+            prefix, _, ms = pair.partition("=")
+            if prefix.strip() and ms.strip().isdigit():
+                out[prefix.strip()] = int(ms.strip())
+        return out
+
 settings = Settings()
 
 
@@ -93,3 +177,6 @@ def _normalize_database_url(database_url: str) -> str:
 # Log the database being used
 settings.DATABASE_URL = _normalize_database_url(settings.DATABASE_URL)
 print(f"[Config] Using database: {_redact_database_url(settings.DATABASE_URL)}")
+if settings.DATABASE_READ_URL:
+    settings.DATABASE_READ_URL = _normalize_database_url(settings.DATABASE_READ_URL)
+    print(f"[Config] Using read replica: {_redact_database_url(settings.DATABASE_READ_URL)}")
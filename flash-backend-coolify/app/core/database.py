@@ -1,50 +1,190 @@
-from sqlalchemy import create_engine
+import atexit
+from typing import Any, Dict, Optional
+
+from fastapi import Request
+from sqlalchemy import create_engine, event
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 from app.core.config import settings
 from urllib.parse import urlparse
 
-_connect_args = {}
-try:
-    parsed = urlparse(settings.DATABASE_URL)
-    if parsed.scheme.startswith("postgres"):
-        hostname = parsed.hostname or ""
-        _connect_args = {
-            "connect_timeout": 30,
-            "keepalives": 1,
-            "keepalives_idle": 30,
-            "keepalives_interval": 10,
-            "keepalives_count": 5,
-        }
-        if "pooler.supabase.com" in hostname or hostname.endswith(".supabase.co"):
-            _connect_args["options"] = "-c statement_timeout=10000"
-    elif parsed.scheme.startswith("sqlite"):
-        _connect_args = {"check_same_thread": False}
-except Exception:
-    _connect_args = {}
+def sqlite_pragmas() -> Dict[str, Any]:
+    """PRAGMA statements applied to each new SQLite connection (empty values are skipped)."""
+
+    return {
+        "journal_mode": settings.SQLITE_JOURNAL_MODE,
+        "synchronous": settings.SQLITE_SYNCHRONOUS,
+        "busy_timeout": settings.SQLITE_BUSY_TIMEOUT_MS,
+        "mmap_size": settings.SQLITE_MMAP_SIZE,
+        "cache_size": settings.SQLITE_CACHE_SIZE,
+    }
+
+
+def _apply_sqlite_pragmas(dbapi_connection, connection_record):
+    # WAL lets readers run while one writer commits; busy_timeout makes writers wait
+    # for the lock instead of failing immediately with "database is locked".
+    cursor = dbapi_connection.cursor()
+    try:
+        for name, value in sqlite_pragmas().items():
+            if value is None or value == "":
+                continue
+            cursor.execute(f"PRAGMA {name}={value}")
+    finally:
+        cursor.close()
+
+
+def _create_engine(database_url: str, read_only: bool = False):
+    connect_args = {}
+    try:
+        parsed = urlparse(database_url)
+        if parsed.scheme.startswith("postgres"):
+            hostname = parsed.hostname or ""
+            connect_args = {
+                "connect_timeout": 30,
+                "keepalives": 1,
+                "keepalives_idle": 30,
+                "keepalives_interval": 10,
+                "keepalives_count": 5,
+            }
+            options = []
+            statement_timeout = settings.DB_STATEMENT_TIMEOUT_MS
+            if not statement_timeout and ("pooler.supabase.com" in hostname or hostname.endswith(".supabase.co")):
+                statement_timeout = 10000
+            if statement_timeout:
+                options.append(f"-c statement_timeout={int(statement_timeout)}")
+            if read_only:
+                options.append("-c default_transaction_read_only=on")
+            if options:
+                connect_args["options"] = " ".join(options)
+        elif parsed.scheme.startswith("sqlite"):
+            connect_args = {"check_same_thread": False}
+    except Exception:
+        connect_args = {}
+
+    eng = create_engine(
+        database_url,
+        pool_pre_ping=True,
+        pool_recycle=settings.DB_POOL_RECYCLE,
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+        pool_timeout=settings.DB_POOL_TIMEOUT,
+        connect_args=connect_args,
+        echo=False,
+    )
+    if eng.dialect.name == "sqlite":
+        event.listen(eng, "connect", _apply_sqlite_pragmas)
+    return eng
+
 
 # Create database engine
-engine = create_engine(
-    settings.DATABASE_URL,
-    pool_pre_ping=True,
-    pool_recycle=3600,
-    pool_size=5,
-    max_overflow=10,
-    pool_timeout=30,
-    connect_args=_connect_args,
-    echo=False,
-)
+engine = _create_engine(settings.DATABASE_URL)
+
+# Optional read replica for reporting routes (see app.core.read_replica.get_read_db)
+read_engine = _create_engine(settings.DATABASE_READ_URL, read_only=True) if settings.DATABASE_READ_URL else None
+
+# Close pooled connections on exit; with WAL the last SQLite connection to close
+# checkpoints and removes the -wal/-shm files.
+atexit.register(engine.dispose)
+if read_engine is not None:
+    atexit.register(read_engine.dispose)
+
+
+def pool_status(bind=None) -> Dict[str, Any]:
+    """Current connection pool counters of ``bind`` (default: the primary engine)."""
+
+    pool = (bind or engine).pool
+    out: Dict[str, Any] = {"pool": type(pool).__name__}
+    for key, attr in (("size", "size"), ("checked_in", "checkedin"), ("checked_out", "checkedout"), ("overflow", "overflow")):
+        fn = getattr(pool, attr, None)
+        if callable(fn):
+            out[key] = fn()
+    out["max_overflow"] = settings.DB_MAX_OVERFLOW
+    out["timeout_seconds"] = settings.DB_POOL_TIMEOUT
+    out["recycle_seconds"] = settings.DB_POOL_RECYCLE
+    return out
+
+
+_route_timeouts = settings.route_statement_timeouts
+
+
+def route_statement_timeout(path: str) -> Optional[int]:
+    """Statement timeout (ms) configured for the longest matching path prefix, if any."""
+
+    best: Optional[str] = None
+    for prefix in _route_timeouts:
+        if path.startswith(prefix) and (best is None or len(prefix) > len(best)):
+            best = prefix
+    return _route_timeouts[best] if best is not None else None
+
 
 # Create session factory
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+ReadSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=read_engine) if read_engine is not None else None
 
 # Create base class for models
 Base = declarative_base()
 
 
-def get_db():
-    """Dependency to get database session."""
-    db = SessionLocal()
+def dialect_insert(db, model):
+    """Return a dialect-specific INSERT for ``model`` that supports ``on_conflict_do_update``.
+
+    Postgres and SQLite only; returns None for other backends so callers can fall back
+    to read-modify-write through the ORM.
+    """
+    bind = db.get_bind() if hasattr(db, "get_bind") else db
+    name = getattr(getattr(bind, "dialect", None), "name", None)
+    if name == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert as pg_insert
+        return pg_insert(model)
+    if name == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+        return sqlite_insert(model)
+    return None
+
+
+def begin_sqlite_transaction(db, immediate: bool = False) -> None:
+    """Open the transaction now on SQLite (no-op on other backends or when one is open).
+
+    pysqlite only issues BEGIN before the first INSERT/UPDATE/DELETE, so earlier SELECTs
+    each see the latest commit and a leading SAVEPOINT acts as the outermost transaction
+    (releasing it commits). ``immediate`` also takes the write lock up front, so no other
+    writer can commit between this transaction's reads and its writes.
+    """
+    conn = db.connection()
+    if conn.dialect.name == "sqlite" and not conn.connection.dbapi_connection.in_transaction:
+        conn.exec_driver_sql("BEGIN IMMEDIATE" if immediate else "BEGIN")
+
+
+def _apply_statement_timeout(session, transaction, connection):
+    ms = session.info.get("statement_timeout_ms")
+    if ms and connection.dialect.name == "postgresql":
+        # SET LOCAL only lasts until the end of this transaction, so pooled
+        # connections go back with the server/connection default.
+        connection.exec_driver_sql(f"SET LOCAL statement_timeout = {int(ms)}")
+
+
+event.listen(SessionLocal, "after_begin", _apply_statement_timeout)
+if ReadSessionLocal is not None:
+    event.listen(ReadSessionLocal, "after_begin", _apply_statement_timeout)
+
+
+def new_session(factory=None, request: Request = None):
+    """Open a session from ``factory`` (default: primary) tagged with the route's statement timeout."""
+    db = (factory or SessionLocal)()
+    if request is not None:
+        ms = route_statement_timeout(request.url.path)
+        if ms:
+            db.info["statement_timeout_ms"] = ms
+    return db
+
+
+def get_db(request: Request = None):
+    """Dependency to get database session.
+
+    On Postgres the session applies the per-route statement timeout from
+    DB_ROUTE_STATEMENT_TIMEOUTS to every transaction it opens.
+    """
+    db = new_session(request=request)
     try:
         yield db
     finally:
@@ -0,0 +1,189 @@
+"""
+Employee2 -> legacy Employee mapping helper.
+
+Inventory modules are keyed by legacy employees.employee_id. Matches are resolved in
+batches (CNIC, then normalized full name, then FSS/serial number equal to the legacy id)
+and cached in employee_legacy_map so later lookups are a single indexed read.
+"""
+
+import re
+from typing import Dict, Iterable, List, Optional
+
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from app.core.database import dialect_insert
+from app.models.hr.employee import Employee
+from app.models.hr.employee2 import Employee2
+from app.models.hr.employee_legacy_map import EmployeeLegacyMap
+
+
+def _normalize_name(v: Optional[str]) -> str:
+    return re.sub(r"\s+", " ", (v or "").strip().lower())
+
+
+def refresh_legacy_employee_map(db: Session, employees: Iterable[Employee2]) -> Dict[int, Optional[str]]:
+    """Recompute mapping rows for the given employees (3 lookups per batch) and stage them."""
+
+    employees = [e for e in employees if e is not None and e.id is not None]
+    if not employees:
+        return {}
+
+    cnics = {(e.cnic or "").strip() for e in employees} - {""}
+    names = {_normalize_name(e.name) for e in employees} - {""}
+    codes = {(v or "").strip() for e in employees for v in (e.fss_no, e.serial_no)} - {""}
+
+    by_cnic: Dict[str, str] = {}
+    if cnics:
+        for cnic, emp_id in (
+            db.query(Employee.cnic, Employee.employee_id)
+            .filter(Employee.cnic.in_(cnics))
+            .order_by(Employee.id.asc())
+        ):
+            by_cnic.setdefault((cnic or "").strip(), str(emp_id))
+
+    by_name: Dict[str, str] = {}
+    if names:
+        # Trim the whole concatenation too: an empty first or last name must not leave a
+        # stray space that no normalized Employee2 name can match.
+        full_name = func.lower(
+            func.trim(
+                func.coalesce(func.trim(Employee.first_name), "") + " " + func.coalesce(func.trim(Employee.last_name), "")
+            )
+        )
+        for full, emp_id in (
+            db.query(full_name, Employee.employee_id)
+            .filter(full_name.in_(names))
+            .order_by(Employee.id.asc())
+        ):
+            by_name.setdefault(_normalize_name(full), str(emp_id))
+
+    legacy_codes = set()
+    if codes:
+        legacy_codes = {
+            str(emp_id) for (emp_id,) in db.query(Employee.employee_id).filter(Employee.employee_id.in_(codes))
+        }
+
+    resolved: Dict[int, Optional[str]] = {}
+    rows = []
+    for e in employees:
+        legacy_id, method = None, None
+        cnic = (e.cnic or "").strip()
+        name = _normalize_name(e.name)
+        if cnic and cnic in by_cnic:
+            legacy_id, method = by_cnic[cnic], "cnic"
+        elif name and name in by_name:
+            legacy_id, method = by_name[name], "name"
+        else:
+            for field in ("fss_no", "serial_no"):
+                code = (getattr(e, field) or "").strip()
+                if code and code in legacy_codes:
+                    legacy_id, method = code, field
+                    break
+        resolved[e.id] = legacy_id
+        rows.append({"employee2_id": e.id, "legacy_employee_id": legacy_id, "match_method": method})
+
+    _upsert_rows(db, rows)
+    return resolved
+
+
+def _upsert_rows(db: Session, rows: List[dict]) -> None:
+    # Upsert rather than delete + insert: two requests resolving the same uncached
+    # employee at once would otherwise both insert and one would fail on the primary key.
+    ins = dialect_insert(db, EmployeeLegacyMap)
+    if ins is not None:
+        stmt = ins.values(rows)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=["employee2_id"],
+            set_={
+                "legacy_employee_id": stmt.excluded.legacy_employee_id,
+                "match_method": stmt.excluded.match_method,
+                "updated_at": func.now(),
+            },
+        )
+        db.execute(stmt)
+        return
+
+    existing = {
+        r.employee2_id: r
+        for r in db.query(EmployeeLegacyMap).filter(
+            EmployeeLegacyMap.employee2_id.in_([row["employee2_id"] for row in rows])
+        )
+    }
+    for row in rows:
+        current = existing.get(row["employee2_id"])
+        if current is None:
+            db.add(EmployeeLegacyMap(**row))
+        else:
+            current.legacy_employee_id = row["legacy_employee_id"]
+            current.match_method = row["match_method"]
+    db.flush()
+
+
+def get_legacy_employee_ids(db: Session, employees: Iterable[Employee2]) -> Dict[int, Optional[str]]:
+    """Return {Employee2.id: legacy employee_id or None}.
+
+    Employees without a cached row are resolved on the fly and the new rows are committed.
+    """
+
+    employees = [e for e in employees if e is not None and e.id is not None]
+    if not employees:
+        return {}
+
+    ids = [e.id for e in employees]
+    mapped: Dict[int, Optional[str]] = dict(
+        db.query(EmployeeLegacyMap.employee2_id, EmployeeLegacyMap.legacy_employee_id).filter(
+            EmployeeLegacyMap.employee2_id.in_(ids)
+        )
+    )
+
+    missing = [e for e in employees if e.id not in mapped]
+    if missing:
+        mapped.update(refresh_legacy_employee_map(db, missing))
+        db.commit()
+
+    return mapped
+
+
+def invalidate_legacy_employee_map(db: Session, *legacy_employee_ids: Optional[str]) -> None:
+    """Drop cached misses, and rows pointing at the given legacy employees (changed,
+    renumbered or deleted), so they are re-resolved on the next lookup."""
+
+    q = db.query(EmployeeLegacyMap).filter(EmployeeLegacyMap.legacy_employee_id.is_(None))
+    q.delete(synchronize_session=False)
+    ids = {str(v) for v in legacy_employee_ids if v}
+    if ids:
+        db.query(EmployeeLegacyMap).filter(EmployeeLegacyMap.legacy_employee_id.in_(ids)).delete(
+            synchronize_session=False
+        )
+
+
+def forget_employee2_mappings(db: Session, employee2_ids: Optional[Iterable[int]] = None) -> None:
+    """Delete the rows of removed Employee2 records (all rows when ``employee2_ids`` is None).
+
+    Without this a reused Employee2 id would inherit the deleted employee's legacy match.
+    """
+
+    q = db.query(EmployeeLegacyMap)
+    if employee2_ids is not None:
+        ids = [i for i in employee2_ids if i is not None]
+        if not ids:
+            return
+        q = q.filter(EmployeeLegacyMap.employee2_id.in_(ids))
+    q.delete(synchronize_session=False)
+
+
+def refresh_unmapped_employees(db: Session, batch_size: int = 500) -> int:
+    """Resolve and stage rows for every Employee2 without one, e.g. after a bulk import."""
+
+    unmapped = (
+        db.query(Employee2.id)
+        .outerjoin(EmployeeLegacyMap, EmployeeLegacyMap.employee2_id == Employee2.id)
+        .filter(EmployeeLegacyMap.employee2_id.is_(None))
+        .order_by(Employee2.id.asc())
+    )
+    ids = [i for (i,) in unmapped]
+    for start in range(0, len(ids), batch_size):
+        batch = db.query(Employee2).filter(Employee2.id.in_(ids[start:start + batch_size])).all()
+        refresh_legacy_employee_map(db, batch)
+    return len(ids)
@@ -0,0 +1,190 @@
+"""
+Fleet assignment statistics helper.
+
+vehicle_assignment_month_stats keeps per-vehicle monthly totals of completed
+assignments (count, km, amount, rate sum/count, min/max cost per km). Routes that
+change an assignment refresh the affected months in the same transaction, so the
+year-period analytics sum at most twelve rows per vehicle instead of aggregating a
+year of assignments.
+"""
+
+from datetime import date
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from sqlalchemy import case, func, text
+from sqlalchemy.orm import Session
+
+from app.core.database import dialect_insert
+from app.models.fleet.vehicle_assignment import VehicleAssignment
+from app.models.fleet.vehicle_assignment_month_stat import VehicleAssignmentMonthStat
+
+
+def month_of(d: date) -> str:
+    return d.strftime("%Y-%m")
+
+
+def month_bounds(month: str) -> Tuple[date, date]:
+    """Return [start, end) dates for a ``YYYY-MM`` month."""
+
+    y_s, m_s = month.split("-", 1)
+    y_i, m_i = int(y_s), int(m_s)
+    start = date(y_i, m_i, 1)
+    end = date(y_i + 1, 1, 1) if m_i == 12 else date(y_i, m_i + 1, 1)
+    return start, end
+
+
+def assignment_rate():
+    """SQL expression for an assignment's rate: rate_per_km, or amount/km when missing."""
+
+    return func.coalesce(VehicleAssignment.rate_per_km, VehicleAssignment.amount / VehicleAssignment.distance_km)
+
+
+def _daily_totals(db: Session, start: Optional[date] = None, end: Optional[date] = None):
+    rate = assignment_rate()
+    cost = func.coalesce(VehicleAssignment.amount, 0.0) / VehicleAssignment.distance_km
+
+    q = (
+        db.query(
+            VehicleAssignment.vehicle_id,
+            VehicleAssignment.assignment_date,
+            func.count(VehicleAssignment.id),
+            func.sum(VehicleAssignment.distance_km),
+            func.sum(func.coalesce(VehicleAssignment.amount, 0.0)),
+            func.sum(case((rate >= 0, rate), else_=None)),
+            func.count(case((rate >= 0, 1), else_=None)),
+            func.min(cost),
+            func.max(cost),
+        )
+        .filter(VehicleAssignment.status == "Complete")
+        .filter(VehicleAssignment.distance_km > 0)
+        .filter(VehicleAssignment.assignment_date.isnot(None))
+    )
+    if start is not None:
+        q = q.filter(VehicleAssignment.assignment_date >= start)
+    if end is not None:
+        q = q.filter(VehicleAssignment.assignment_date < end)
+    return q.group_by(VehicleAssignment.vehicle_id, VehicleAssignment.assignment_date).all()
+
+
+def _fold_by_month(rows) -> Dict[Tuple[str, str], Dict[str, object]]:
+    out: Dict[Tuple[str, str], Dict[str, object]] = {}
+    for vid, d, n, km, amount, rate_sum, rate_n, min_c, max_c in rows:
+        key = (vid, month_of(d))
+        s = out.get(key)
+        if s is None:
+            s = out[key] = {
+                "vehicle_id": vid,
+                "month": key[1],
+                "assignments": 0,
+                "total_km": 0.0,
+                "total_amount": 0.0,
+                "rate_sum": 0.0,
+                "rate_count": 0,
+                "min_cost_per_km": None,
+                "max_cost_per_km": None,
+            }
+        s["assignments"] += int(n or 0)
+        s["total_km"] += float(km or 0)
+        s["total_amount"] += float(amount or 0)
+        s["rate_sum"] += float(rate_sum or 0)
+        s["rate_count"] += int(rate_n or 0)
+        if min_c is not None:
+            s["min_cost_per_km"] = float(min_c) if s["min_cost_per_km"] is None else min(s["min_cost_per_km"], float(min_c))
+        if max_c is not None:
+            s["max_cost_per_km"] = float(max_c) if s["max_cost_per_km"] is None else max(s["max_cost_per_km"], float(max_c))
+    return out
+
+
+_STAT_COLUMNS = (
+    "assignments",
+    "total_km",
+    "total_amount",
+    "rate_sum",
+    "rate_count",
+    "min_cost_per_km",
+    "max_cost_per_km",
+)
+
+
+# Advisory lock namespace for months ("FLT"); two-int keys do not clash with single-key locks.
+_MONTH_LOCK_NAMESPACE = 0x464C54
+
+
+def _lock_month(db: Session, month: str) -> None:
+    """Hold ``month`` until the transaction ends, so refreshes of it run one at a time.
+
+    Postgres: transaction-level advisory lock on the month. Under READ COMMITTED the
+    aggregate that follows then sees every refresh committed before it. Other backends
+    without upsert lock the month's existing rows, which does not cover a month that has
+    no rows yet. SQLite needs nothing, since it admits one writer at a time and the
+    route's own write comes first.
+    """
+
+    dialect = db.get_bind().dialect.name
+    if dialect == "postgresql":
+        year, mon = month.split("-", 1)
+        db.execute(
+            text("SELECT pg_advisory_xact_lock(:ns, :key)"),
+            {"ns": _MONTH_LOCK_NAMESPACE, "key": int(year) * 100 + int(mon)},
+        )
+    elif dialect != "sqlite":
+        db.query(VehicleAssignmentMonthStat.id).filter(VehicleAssignmentMonthStat.month == month).with_for_update().all()
+
+
+def _upsert_month(db: Session, month: str, stats: List[Dict[str, object]]) -> None:
+    if stats:
+        ins = dialect_insert(db, VehicleAssignmentMonthStat)
+        if ins is not None:
+            stmt = ins.values(stats)
+            set_ = {col: getattr(stmt.excluded, col) for col in _STAT_COLUMNS}
+            set_["updated_at"] = func.now()
+            db.execute(stmt.on_conflict_do_update(index_elements=["vehicle_id", "month"], set_=set_))
+        else:
+            existing = {
+                r.vehicle_id: r
+                for r in db.query(VehicleAssignmentMonthStat).filter(VehicleAssignmentMonthStat.month == month)
+            }
+            for s in stats:
+                row = existing.get(s["vehicle_id"])
+                if row is None:
+                    db.add(VehicleAssignmentMonthStat(**s))
+                else:
+                    for col in _STAT_COLUMNS:
+                        setattr(row, col, s[col])
+
+    # Vehicles with no completed assignments left in the month.
+    stale = db.query(VehicleAssignmentMonthStat).filter(VehicleAssignmentMonthStat.month == month)
+    if stats:
+        stale = stale.filter(VehicleAssignmentMonthStat.vehicle_id.notin_([s["vehicle_id"] for s in stats]))
+    stale.delete(synchronize_session=False)
+
+
+def refresh_month_stats(db: Session, months: Iterable[str]) -> None:
+    """Recompute the stats rows of the given ``YYYY-MM`` months. Does not commit.
+
+    Call after flushing the assignment change. Each month is locked until commit before it
+    is aggregated, in month order so two requests cannot deadlock. A concurrent request
+    editing another assignment of the same month therefore waits, then aggregates with this
+    request's change committed, and the last writer's totals are complete. Rows are upserted
+    on (vehicle_id, month), so the unique key never collides either.
+    """
+
+    for month in sorted(set(m for m in months if m)):
+        _lock_month(db, month)
+        start, end = month_bounds(month)
+        _upsert_month(db, month, list(_fold_by_month(_daily_totals(db, start, end)).values()))
+    db.flush()
+
+
+def rebuild_month_stats(db: Session) -> int:
+    """Recompute every stats row from vehicle_assignments. Returns the number of rows."""
+
+    stats = _fold_by_month(_daily_totals(db))
+    db.query(VehicleAssignmentMonthStat).delete(synchronize_session=False)
+    db.add_all(VehicleAssignmentMonthStat(**s) for s in stats.values())
+    db.flush()
+    return len(stats)
+
+
+def months_touched(*dates: Optional[date]) -> Set[str]:
+    return {month_of(d) for d in dates if d is not None}
@@ -0,0 +1,179 @@
+"""
+Resized derivatives of uploaded images.
+
+Uploads are stored at camera resolution. For every stored image a small pool of worker
+threads writes downscaled copies next to the original:
+
+    vehicle_20250101_101010_ab12cd34.jpg
+    vehicle_20250101_101010_ab12cd34.thumb.jpg   (256 px, list pages)
+    vehicle_20250101_101010_ab12cd34.medium.jpg  (800 px, detail views)
+    vehicle_20250101_101010_ab12cd34.pdf.jpg     (1200 px, flattened for FPDF)
+
+PNG / GIF sources produce PNG variants so transparency survives (the ``pdf`` variant is
+flattened onto white, which FPDF requires); everything else produces JPEG.
+
+Clients pick a size with ``/uploads/...?size=thumb`` (see ``UploadsStaticFiles``); a
+variant that does not exist yet, e.g. for images uploaded before this pipeline, is
+generated on first request. PDF exports use ``pdf_image_path``.
+"""
+
+import asyncio
+import os
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Dict, List, Optional
+
+from app.core.config import settings
+
+try:
+    from PIL import Image, ImageOps
+except ImportError:  # pragma: no cover - Pillow ships with reportlab
+    Image = None
+
+# Name -> longest edge in pixels
+VARIANT_SIZES: Dict[str, int] = {"thumb": 256, "medium": 800, "pdf": 1200}
+
+_SOURCE_EXTS = {".jpg", ".jpeg", ".png", ".gif", ".webp", ".bmp", ".tif", ".tiff"}
+_LOSSLESS_EXTS = {".png", ".gif"}
+
+_pool: Optional[ThreadPoolExecutor] = None
+_pool_lock = threading.Lock()
+
+
+def is_source_image(path: str) -> bool:
+    name = os.path.basename(path)
+    stem, ext = os.path.splitext(name)
+    if ext.lower() not in _SOURCE_EXTS:
+        return False
+    # Never derive variants of variants.
+    return os.path.splitext(stem)[1][1:] not in VARIANT_SIZES
+
+
+def variant_path(path: str, size: str) -> str:
+    """Path (or URL) of the ``size`` variant of ``path``."""
+
+    stem, ext = os.path.splitext(path)
+    out_ext = ".png" if ext.lower() in _LOSSLESS_EXTS else ".jpg"
+    return f"{stem}.{size}{out_ext}"
+
+
+def variant_url(url: Optional[str], size: str) -> Optional[str]:
+    """Size-selectable URL for a local upload; other URLs are returned unchanged."""
+
+    if not url or not url.startswith("/uploads/") or size not in VARIANT_SIZES or not is_source_image(url):
+        return url
+    return f"{url}?size={size}"
+
+
+def _render(image, max_edge: int, flatten: bool):
+    has_alpha = image.mode in ("RGBA", "LA") or (image.mode == "P" and "transparency" in image.info)
+    if image.mode not in ("RGB", "L") and not (has_alpha and image.mode == "RGBA"):
+        # Palette / CMYK / 16-bit sources: convert first so LANCZOS applies.
+        image = image.convert("RGBA" if has_alpha else "RGB")
+    out = image.copy()
+    out.thumbnail((max_edge, max_edge), Image.LANCZOS)
+    if has_alpha and flatten:
+        background = Image.new("RGB", out.size, (255, 255, 255))
+        background.paste(out, mask=out.getchannel("A"))
+        return background
+    return out
+
+
+def _save(image, target: str) -> None:
+    # Write under a temporary name and rename, so a concurrent request never serves
+    # a half-written file.
+    tmp = f"{target}.{os.getpid()}.{threading.get_ident()}.tmp"
+    try:
+        if target.endswith(".png"):
+            image.save(tmp, format="PNG", optimize=True)
+        else:
+            image.save(tmp, format="JPEG", quality=settings.IMAGE_VARIANT_QUALITY, optimize=True, progressive=True)
+        os.replace(tmp, target)
+    finally:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+
+
+def generate_variants(path: str, sizes: Optional[List[str]] = None) -> List[str]:
+    """Write the requested (default: all) variants of ``path``; returns the written paths.
+
+    Variants at least as new as the source are left alone. Unreadable images are skipped.
+    """
+    path = os.fspath(path)
+    if Image is None or not is_source_image(path):
+        return []
+    try:
+        source_mtime = os.stat(path).st_mtime
+    except OSError:
+        return []
+
+    todo = []
+    for size in sizes or list(VARIANT_SIZES):
+        target = variant_path(path, size)
+        try:
+            if os.stat(target).st_mtime >= source_mtime:
+                continue
+        except OSError:
+            pass
+        todo.append((size, target))
+    if not todo:
+        return []
+
+    written = []
+    try:
+        with Image.open(path) as image:
+            image = ImageOps.exif_transpose(image)
+            for size, target in todo:
+                flatten = size == "pdf" or not target.endswith(".png")
+                _save(_render(image, VARIANT_SIZES[size], flatten), target)
+                written.append(target)
+    except (OSError, ValueError, Image.DecompressionBombError):
+        pass
+    return written
+
+
+def _executor() -> ThreadPoolExecutor:
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ThreadPoolExecutor(
+                max_workers=max(1, settings.IMAGE_VARIANT_WORKERS), thread_name_prefix="image-variants"
+            )
+        return _pool
+
+
+def submit_upload_task(fn, *args) -> Future:
+    """Run ``fn(*args)`` on the upload worker pool (also used by ``precompress_upload``)."""
+
+    return _executor().submit(fn, *args)
+
+
+def schedule_variants(path) -> Optional[Future]:
+    """Queue variant generation for a stored upload without waiting for it."""
+
+    path = os.fspath(path)
+    if not settings.IMAGE_VARIANTS_ENABLED or Image is None or not is_source_image(path):
+        return None
+    return _executor().submit(generate_variants, path)
+
+
+async def ensure_variant(path: str, size: str) -> Optional[str]:
+    """Path of the ``size`` variant of ``path``, generating it on the pool if missing."""
+
+    if size not in VARIANT_SIZES or Image is None or not is_source_image(path):
+        return None
+    target = variant_path(path, size)
+    if not os.path.exists(target):
+        await asyncio.wrap_future(_executor().submit(generate_variants, path, [size]))
+    return target if os.path.exists(target) else None
+
+
+def pdf_image_path(path):
+    """Downscaled, FPDF-compatible copy of ``path`` when one can be made, else ``path``."""
+
+    if not settings.IMAGE_VARIANTS_ENABLED or not is_source_image(os.fspath(path)):
+        return path
+    target = variant_path(os.fspath(path), "pdf")
+    if not os.path.exists(target):
+        generate_variants(path, ["pdf"])
+    return type(path)(target) if os.path.exists(target) else path
@@ -0,0 +1,175 @@
+"""
+Inventory assignment store.
+
+The frontend's inventoryAssignments map (employee -> [{itemId, quantity}]) is kept as
+one inventory_assignments row per (employee, item). Writes only insert, update or
+delete the rows whose quantity actually changed, so saving one guard's kit no longer
+rewrites everyone else's.
+
+Every write bumps ``InventoryAssignmentState.version`` with a conditional UPDATE
+(``WHERE version = :expected``) before touching rows. The version is served as the
+ETag; a client sending a stale ``If-Match`` gets no row updated and the route answers
+412 instead of silently overwriting a concurrent edit. The state row stays locked until
+commit, so writers are serialised.
+"""
+
+import json
+from typing import Any, Dict, Iterable, List, Optional
+
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from app.models.inventory.inventory_assignment import InventoryAssignment, InventoryAssignmentState
+
+
+def _state(db: Session) -> InventoryAssignmentState:
+    state = db.query(InventoryAssignmentState).order_by(InventoryAssignmentState.id.asc()).first()
+    if state is None:
+        state = InventoryAssignmentState(data="{}", version=0)
+        db.add(state)
+        db.flush()
+    return state
+
+
+def current_version(db: Session) -> int:
+    v = db.query(InventoryAssignmentState.version).order_by(InventoryAssignmentState.id.asc()).limit(1).scalar()
+    return int(v or 0)
+
+
+def format_etag(version: int) -> str:
+    return f'"{version}"'
+
+
+def etag_matches(header: Optional[str], version: int) -> bool:
+    """True when an If-Match / If-None-Match header value names ``version`` (or is ``*``)."""
+
+    for tag in (header or "").split(","):
+        tag = tag.strip()
+        if tag == "*":
+            return True
+        if tag.startswith("W/"):
+            tag = tag[2:]
+        if tag.strip('"') == str(version):
+            return True
+    return False
+
+
+def bump_version(db: Session, expected: Optional[int] = None) -> Optional[int]:
+    """Increment the map version. Returns the new version, or None if it was not ``expected``."""
+
+    state = _state(db)
+    q = db.query(InventoryAssignmentState).filter(InventoryAssignmentState.id == state.id)
+    if expected is not None:
+        q = q.filter(InventoryAssignmentState.version == expected)
+    n = q.update(
+        {
+            InventoryAssignmentState.version: InventoryAssignmentState.version + 1,
+            InventoryAssignmentState.updated_at: func.now(),
+        },
+        synchronize_session=False,
+    )
+    if n != 1:
+        return None
+    return current_version(db)
+
+
+def load_assignments(db: Session, employee_ids: Optional[Iterable[str]] = None) -> Dict[str, List[Dict[str, Any]]]:
+    """Return the assignments map, optionally limited to ``employee_ids``."""
+
+    q = db.query(InventoryAssignment)
+    if employee_ids is not None:
+        ids = list(employee_ids)
+        if not ids:
+            return {}
+        q = q.filter(InventoryAssignment.employee_id.in_(ids))
+
+    out: Dict[str, List[Dict[str, Any]]] = {}
+    for r in q.order_by(InventoryAssignment.employee_id.asc(), InventoryAssignment.id.asc()):
+        out.setdefault(r.employee_id, []).append({"itemId": r.item_id, "quantity": int(r.quantity or 0)})
+    return out
+
+
+def set_employee_assignments(db: Session, changes: Dict[str, Iterable[Any]]) -> int:
+    """Make each listed employee's entries equal to the given list. Does not commit.
+
+    Entries are ``{itemId, quantity}`` objects or dicts; repeated items are summed and an
+    empty list removes the employee. Employees not in ``changes`` are left untouched.
+    Returns the number of rows inserted, updated or deleted.
+    """
+
+    wanted: Dict[str, Dict[str, int]] = {}
+    for emp_id, entries in changes.items():
+        items: Dict[str, int] = {}
+        for e in entries or []:
+            item_id = e["itemId"] if isinstance(e, dict) else e.itemId
+            qty = e["quantity"] if isinstance(e, dict) else e.quantity
+            items[str(item_id)] = items.get(str(item_id), 0) + int(qty or 0)
+        wanted[str(emp_id)] = items
+
+    if not wanted:
+        return 0
+
+    existing = (
+        db.query(InventoryAssignment)
+        .filter(InventoryAssignment.employee_id.in_(list(wanted.keys())))
+        .all()
+    )
+
+    touched = 0
+    seen = set()
+    for row in existing:
+        items = wanted[row.employee_id]
+        seen.add((row.employee_id, row.item_id))
+        if row.item_id not in items:
+            db.delete(row)
+            touched += 1
+        elif int(row.quantity or 0) != items[row.item_id]:
+            row.quantity = items[row.item_id]
+            touched += 1
+
+    new_rows = [
+        InventoryAssignment(employee_id=emp_id, item_id=item_id, quantity=qty)
+        for emp_id, items in wanted.items()
+        for item_id, qty in items.items()
+        if (emp_id, item_id) not in seen
+    ]
+    db.add_all(new_rows)
+    db.flush()
+    return touched + len(new_rows)
+
+
+def replace_assignments(db: Session, data: Dict[str, Iterable[Any]]) -> int:
+    """Make the whole map equal to ``data`` (employees missing from it are cleared)."""
+
+    changes: Dict[str, Iterable[Any]] = {
+        emp_id: [] for (emp_id,) in db.query(InventoryAssignment.employee_id).distinct()
+    }
+    changes.update(data)
+    return set_employee_assignments(db, changes)
+
+
+def migrate_legacy_blob(db: Session) -> int:
+    """Copy the old JSON blob into rows once and empty it. Does not commit."""
+
+    state = db.query(InventoryAssignmentState).order_by(InventoryAssignmentState.id.asc()).first()
+    if state is None or not state.data or state.data.strip() in {"", "{}"}:
+        return 0
+
+    try:
+        data = json.loads(state.data)
+    except json.JSONDecodeError:
+        data = {}
+
+    n = 0
+    if isinstance(data, dict) and db.query(InventoryAssignment.id).first() is None:
+        n = set_employee_assignments(
+            db,
+            {
+                emp_id: [e for e in entries if isinstance(e, dict) and "itemId" in e]
+                for emp_id, entries in data.items()
+                if isinstance(entries, list)
+            },
+        )
+    state.data = "{}"
+    state.version = int(state.version or 0) + 1
+    return n
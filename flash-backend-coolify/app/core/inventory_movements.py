@@ -0,0 +1,326 @@
+"""
+Inventory movement helper.
+
+Stock and per-employee balances are changed with single conditional UPDATE statements
+(``SET quantity_on_hand = quantity_on_hand - :qty WHERE quantity_on_hand >= :qty``)
+instead of read-check-write in Python. The database evaluates the condition against the
+current row under its row lock, so two storekeepers issuing the last units of an item
+cannot both succeed. Callers log the transaction row in the same database transaction
+and roll back when a movement reports it could not be applied.
+
+Works for both general and restricted inventory; pass the item / balance / serial models.
+``apply_kit`` issues or returns a mixed list of general and restricted items for one
+employee after validating the whole list up front.
+"""
+
+from typing import Any, Dict, Iterable, List, Optional
+
+from sqlalchemy import case, func
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.models.inventory.general_item import GeneralItem
+from app.models.inventory.general_item_employee_balance import GeneralItemEmployeeBalance
+from app.models.inventory.general_item_transaction import GeneralItemTransaction
+from app.models.inventory.restricted_item import RestrictedItem
+from app.models.inventory.restricted_item_employee_balance import RestrictedItemEmployeeBalance
+from app.models.inventory.restricted_item_serial_unit import RestrictedItemSerialUnit
+from app.models.inventory.restricted_item_transaction import RestrictedItemTransaction
+
+
+def take_stock(db: Session, item_model, item_code: str, qty: float) -> bool:
+    """Decrement on-hand stock if at least ``qty`` is available. Returns False otherwise."""
+
+    n = (
+        db.query(item_model)
+        .filter(item_model.item_code == item_code)
+        .filter(item_model.quantity_on_hand >= qty)
+        .update(
+            {item_model.quantity_on_hand: item_model.quantity_on_hand - qty, item_model.updated_at: func.now()},
+            synchronize_session=False,
+        )
+    )
+    return n == 1
+
+
+def put_stock(db: Session, item_model, item_code: str, qty: float) -> bool:
+    """Increment on-hand stock. Returns False when the item does not exist."""
+
+    n = (
+        db.query(item_model)
+        .filter(item_model.item_code == item_code)
+        .update(
+            {item_model.quantity_on_hand: item_model.quantity_on_hand + qty, item_model.updated_at: func.now()},
+            synchronize_session=False,
+        )
+    )
+    return n == 1
+
+
+def _balance_query(db: Session, balance_model, employee_id: str, item_code: str):
+    return (
+        db.query(balance_model)
+        .filter(balance_model.employee_id == employee_id)
+        .filter(balance_model.item_code == item_code)
+    )
+
+
+def add_to_balance(db: Session, balance_model, *, employee_id: str, item_code: str, qty: float) -> None:
+    """Increase an employee's issued quantity, creating the balance row when missing."""
+
+    values = {balance_model.quantity_issued: balance_model.quantity_issued + qty, balance_model.updated_at: func.now()}
+    if _balance_query(db, balance_model, employee_id, item_code).update(values, synchronize_session=False):
+        return
+
+    try:
+        with db.begin_nested():
+            db.add(balance_model(employee_id=employee_id, item_code=item_code, quantity_issued=qty))
+    except IntegrityError:
+        # Created concurrently by another request.
+        _balance_query(db, balance_model, employee_id, item_code).update(values, synchronize_session=False)
+
+
+def take_from_balance(
+    db: Session,
+    balance_model,
+    *,
+    employee_id: str,
+    item_code: str,
+    qty: float,
+    clamp: bool = False,
+) -> bool:
+    """Decrease an employee's issued quantity.
+
+    Strict mode only applies when at least ``qty`` is issued and returns False otherwise.
+    With ``clamp=True`` the balance is floored at 0 (returns False only if there is no row).
+    """
+
+    q = _balance_query(db, balance_model, employee_id, item_code)
+    if clamp:
+        new_value = case(
+            (balance_model.quantity_issued >= qty, balance_model.quantity_issued - qty),
+            else_=0.0,
+        )
+    else:
+        q = q.filter(balance_model.quantity_issued >= qty)
+        new_value = balance_model.quantity_issued - qty
+
+    n = q.update(
+        {balance_model.quantity_issued: new_value, balance_model.updated_at: func.now()},
+        synchronize_session=False,
+    )
+    return n > 0
+
+
+def move_serial_units(
+    db: Session,
+    serial_model,
+    unit_ids: Iterable[int],
+    *,
+    from_status: str,
+    to_status: str,
+    employee_id,
+) -> bool:
+    """Move serial units from ``from_status`` to ``to_status`` only if every unit is still there.
+
+    ``employee_id`` is written to issued_to_employee_id (None unassigns). Returns False when
+    any unit changed status concurrently; the caller should roll back.
+    """
+
+    ids = list(dict.fromkeys(unit_ids))
+    if not ids:
+        return True
+    n = (
+        db.query(serial_model)
+        .filter(serial_model.id.in_(ids))
+        .filter(serial_model.status == from_status)
+        .update(
+            {
+                serial_model.status: to_status,
+                serial_model.issued_to_employee_id: employee_id,
+                serial_model.updated_at: func.now(),
+            },
+            synchronize_session=False,
+        )
+    )
+    return n == len(ids)
+
+
+def duplicate_serials(serial_numbers: Iterable[str]) -> List[str]:
+    """Serial numbers that appear more than once, in first-repeat order.
+
+    Requests must reject these up front: moving the same unit twice would otherwise
+    surface as a concurrent-change failure of ``move_serial_units``.
+    """
+
+    seen, dupes = set(), []
+    for sn in serial_numbers:
+        if sn in seen and sn not in dupes:
+            dupes.append(sn)
+        seen.add(sn)
+    return dupes
+
+
+def _fmt_qty(v: float) -> str:
+    return f"{v:g}"
+
+
+def apply_kit(
+    db: Session,
+    *,
+    employee_id: str,
+    lines: Iterable[Any],
+    action: str,
+    notes: Optional[str] = None,
+) -> Dict[str, Any]:
+    """Issue or return a list of items for one employee. Does not commit.
+
+    Each line has ``inventory`` ("general" | "restricted"), ``item_code`` and either
+    ``quantity`` or ``serial_numbers``. The whole list is validated first (one query per
+    inventory table) and every problem is reported in a single ``ValueError``; the
+    movements themselves are still conditional, so a concurrent change also raises
+    ``ValueError`` and the caller should roll back.
+
+    Returns ``{"lines": [...], "transactions": [GeneralItemTransaction | RestrictedItemTransaction]}``.
+    """
+
+    if action not in {"issue", "return"}:
+        raise ValueError("action must be 'issue' or 'return'")
+
+    general_qty: Dict[str, float] = {}
+    restricted_qty: Dict[str, float] = {}
+    restricted_serials: Dict[str, List[str]] = {}
+    errors: List[str] = []
+
+    for ln in lines:
+        code = (ln.item_code or "").strip()
+        if not code:
+            errors.append("item_code is required")
+            continue
+        sns = [sn.strip() for sn in (ln.serial_numbers or []) if sn and sn.strip()]
+        if ln.inventory == "restricted" and sns:
+            restricted_serials.setdefault(code, []).extend(sns)
+            continue
+        qty = float(ln.quantity or 0.0)
+        if qty <= 0:
+            errors.append(f"{code}: quantity must be > 0")
+            continue
+        target = restricted_qty if ln.inventory == "restricted" else general_qty
+        target[code] = target.get(code, 0.0) + qty
+
+    if not (general_qty or restricted_qty or restricted_serials) and not errors:
+        errors.append("items are required")
+
+    general_stock: Dict[str, float] = {}
+    if general_qty:
+        general_stock = {
+            code: float(on_hand or 0.0)
+            for code, on_hand in db.query(GeneralItem.item_code, GeneralItem.quantity_on_hand).filter(
+                GeneralItem.item_code.in_(general_qty.keys())
+            )
+        }
+
+    restricted_codes = set(restricted_qty) | set(restricted_serials)
+    restricted_info: Dict[str, tuple] = {}
+    if restricted_codes:
+        restricted_info = {
+            code: (float(on_hand or 0.0), bool(serial_tracked))
+            for code, on_hand, serial_tracked in db.query(
+                RestrictedItem.item_code, RestrictedItem.quantity_on_hand, RestrictedItem.is_serial_tracked
+            ).filter(RestrictedItem.item_code.in_(restricted_codes))
+        }
+
+    units: Dict[tuple, Any] = {}
+    all_sns = [sn for sns in restricted_serials.values() for sn in sns]
+    if all_sns:
+        for u in db.query(
+            RestrictedItemSerialUnit.id,
+            RestrictedItemSerialUnit.item_code,
+            RestrictedItemSerialUnit.serial_number,
+            RestrictedItemSerialUnit.status,
+            RestrictedItemSerialUnit.issued_to_employee_id,
+        ).filter(
+            RestrictedItemSerialUnit.item_code.in_(restricted_serials.keys()),
+            RestrictedItemSerialUnit.serial_number.in_(all_sns),
+        ):
+            units[(u.item_code, u.serial_number)] = u
+
+    for code, qty in general_qty.items():
+        if code not in general_stock:
+            errors.append(f"{code}: item not found")
+        elif action == "issue" and general_stock[code] < qty:
+            errors.append(f"{code}: not enough stock ({_fmt_qty(general_stock[code])} on hand)")
+
+    for code, qty in restricted_qty.items():
+        info = restricted_info.get(code)
+        if info is None:
+            errors.append(f"{code}: item not found")
+        elif info[1]:
+            errors.append(f"{code}: serial_numbers are required for serial-tracked items")
+        elif action == "issue" and info[0] < qty:
+            errors.append(f"{code}: not enough stock ({_fmt_qty(info[0])} on hand)")
+
+    wanted_status = "in_stock" if action == "issue" else "issued"
+    for code, sns in restricted_serials.items():
+        if code not in restricted_info:
+            errors.append(f"{code}: item not found")
+            continue
+        dupes = duplicate_serials(sns)
+        for sn in dupes:
+            errors.append(f"{code}: serial {sn} is listed more than once")
+        for sn in dict.fromkeys(sns):
+            u = units.get((code, sn))
+            if u is None:
+                errors.append(f"{code}: serial {sn} not found")
+            elif u.status != wanted_status:
+                errors.append(f"{code}: serial {sn} is not {'available' if action == 'issue' else 'issued'}")
+            elif action == "return" and u.issued_to_employee_id != employee_id:
+                errors.append(f"{code}: serial {sn} is not assigned to this employee")
+
+    if errors:
+        raise ValueError("; ".join(errors))
+
+    txs: List[Any] = []
+    out_lines: List[Dict[str, Any]] = []
+    tx_action = "ISSUE" if action == "issue" else "RETURN"
+
+    def _move_qty(item_model, balance_model, tx_model, code: str, qty: float) -> None:
+        if action == "issue":
+            if not take_stock(db, item_model, code, qty):
+                raise ValueError(f"{code}: not enough stock")
+            add_to_balance(db, balance_model, employee_id=employee_id, item_code=code, qty=qty)
+        else:
+            put_stock(db, item_model, code, qty)
+            take_from_balance(db, balance_model, employee_id=employee_id, item_code=code, qty=qty, clamp=True)
+        txs.append(tx_model(item_code=code, employee_id=employee_id, action=tx_action, quantity=qty, notes=notes))
+
+    for code, qty in general_qty.items():
+        _move_qty(GeneralItem, GeneralItemEmployeeBalance, GeneralItemTransaction, code, qty)
+        out_lines.append({"inventory": "general", "item_code": code, "quantity": qty})
+
+    for code, qty in restricted_qty.items():
+        _move_qty(RestrictedItem, RestrictedItemEmployeeBalance, RestrictedItemTransaction, code, qty)
+        out_lines.append({"inventory": "restricted", "item_code": code, "quantity": qty})
+
+    for code, sns in restricted_serials.items():
+        unit_ids = [units[(code, sn)].id for sn in sns]
+        moved = move_serial_units(
+            db,
+            RestrictedItemSerialUnit,
+            unit_ids,
+            from_status=wanted_status,
+            to_status="issued" if action == "issue" else "in_stock",
+            employee_id=employee_id if action == "issue" else None,
+        )
+        if not moved:
+            raise ValueError(f"{code}: serials were changed by another request")
+        for unit_id in unit_ids:
+            txs.append(
+                RestrictedItemTransaction(
+                    item_code=code, employee_id=employee_id, action=tx_action, serial_unit_id=unit_id, notes=notes
+                )
+            )
+        out_lines.append({"inventory": "restricted", "item_code": code, "serial_numbers": sns})
+
+    db.add_all(txs)
+    return {"lines": out_lines, "transactions": txs}
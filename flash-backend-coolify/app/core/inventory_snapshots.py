@@ -0,0 +1,304 @@
+"""
+Inventory snapshot helper.
+
+``take_inventory_snapshot`` copies current stock, non-zero employee balances and serial
+assignments into inventory_snapshots / inventory_snapshot_lines together with the last
+general/restricted transaction ids. ``inventory_as_of`` answers "what was on hand and
+issued to whom at time X" by loading the latest snapshot taken at or before X and
+replaying only the transaction log rows after its watermarks, instead of the whole log.
+
+Without an earlier snapshot it unwinds from the nearest later snapshot (or the live
+tables) instead. A new snapshot is taken at startup and by the launcher's timer whenever
+the newest one is older than ``SNAPSHOT_INTERVAL``, or on demand through the POST
+endpoint; as-of reports only read. Stock set directly on items (create/update without a
+transaction row) is only captured by snapshots.
+"""
+
+from datetime import date, datetime, time, timedelta, timezone
+from typing import Any, Dict, Optional, Tuple
+
+from sqlalchemy import func, text
+from sqlalchemy.orm import Session
+
+from app.core.database import begin_sqlite_transaction
+from app.models.inventory.general_item import GeneralItem
+from app.models.inventory.general_item_employee_balance import GeneralItemEmployeeBalance
+from app.models.inventory.general_item_transaction import GeneralItemTransaction
+from app.models.inventory.inventory_snapshot import InventorySnapshot, InventorySnapshotLine
+from app.models.inventory.restricted_item import RestrictedItem
+from app.models.inventory.restricted_item_employee_balance import RestrictedItemEmployeeBalance
+from app.models.inventory.restricted_item_serial_unit import RestrictedItemSerialUnit
+from app.models.inventory.restricted_item_transaction import RestrictedItemTransaction
+
+SNAPSHOT_INTERVAL = timedelta(days=1)
+
+# Effect of a quantity transaction on (stock, employee balance).
+_STOCK_DELTA = {"ISSUE": -1, "RETURN": 1, "FOUND": 1}
+_BALANCE_DELTA = {"ISSUE": 1, "RETURN": -1, "LOST": -1, "DAMAGED": -1}
+
+# Serial transactions: action -> (status, keeps assignment)
+_SERIAL_ACTIONS = {
+    "ISSUE": ("issued", True),
+    "RETURN": ("in_stock", False),
+    "AVAILABLE": ("in_stock", False),
+    "FOUND": ("in_stock", False),
+    "LOST": ("lost", True),
+    "DAMAGED": ("maintenance", True),
+    "MAINTENANCE": ("maintenance", True),
+}
+
+
+def end_of_day(d: date) -> datetime:
+    """Cut-off used for date-based as-of reports."""
+    return datetime.combine(d, time.max)
+
+
+def _new_state() -> Dict[str, Any]:
+    # stock[(inventory, item_code)], balances[(inventory, employee_id, item_code)],
+    # serials[serial_unit_id] = [item_code, status, employee_id]
+    return {"stock": {}, "balances": {}, "serials": {}}
+
+
+def _live_state(db: Session) -> Dict[str, Any]:
+    state = _new_state()
+    for inventory, item_model in (("general", GeneralItem), ("restricted", RestrictedItem)):
+        for code, qty in db.query(item_model.item_code, item_model.quantity_on_hand):
+            state["stock"][(inventory, code)] = float(qty or 0.0)
+    for inventory, bal_model in (("general", GeneralItemEmployeeBalance), ("restricted", RestrictedItemEmployeeBalance)):
+        rows = db.query(bal_model.employee_id, bal_model.item_code, func.sum(bal_model.quantity_issued)).group_by(
+            bal_model.employee_id, bal_model.item_code
+        )
+        for emp, code, qty in rows:
+            if qty:
+                state["balances"][(inventory, emp, code)] = float(qty)
+    for uid, code, status, emp in db.query(
+        RestrictedItemSerialUnit.id,
+        RestrictedItemSerialUnit.item_code,
+        RestrictedItemSerialUnit.status,
+        RestrictedItemSerialUnit.issued_to_employee_id,
+    ):
+        state["serials"][uid] = [code, status, emp]
+    return state
+
+
+def take_inventory_snapshot(db: Session, note: Optional[str] = None) -> InventorySnapshot:
+    """Store the current inventory state as a snapshot. Commits (pending work first)."""
+
+    # Read watermarks and state from one consistent view, so a movement committed in
+    # between is neither missed nor replayed twice. That needs a transaction of its own
+    # (the isolation level can only be set before it begins).
+    db.commit()
+    if db.get_bind().dialect.name == "postgresql":
+        db.connection(execution_options={"isolation_level": "REPEATABLE READ"})
+        # Ids come from a sequence at insert time but rows only become visible at commit,
+        # so max(id) can pass a movement that is still in flight; replay would then skip
+        # it for good. SHARE mode waits for in-flight movements and holds off new ones
+        # until the snapshot commits. The transaction's view is taken by the first query,
+        # i.e. after the lock is granted.
+        db.execute(
+            text(
+                f"LOCK TABLE {GeneralItemTransaction.__tablename__}, "
+                f"{RestrictedItemTransaction.__tablename__} IN SHARE MODE"
+            )
+        )
+    else:
+        # Writers are serialized and commit in id order; the write lock keeps them out.
+        begin_sqlite_transaction(db, immediate=True)
+
+    general_tx_id = db.query(func.coalesce(func.max(GeneralItemTransaction.id), 0)).scalar()
+    restricted_tx_id = db.query(func.coalesce(func.max(RestrictedItemTransaction.id), 0)).scalar()
+    state = _live_state(db)
+
+    snap = InventorySnapshot(note=note, general_tx_id=general_tx_id, restricted_tx_id=restricted_tx_id)
+    db.add(snap)
+    db.flush()
+
+    rows = []
+    for (inventory, code), qty in state["stock"].items():
+        rows.append({"snapshot_id": snap.id, "inventory": inventory, "kind": "stock", "item_code": code, "quantity": qty})
+    for (inventory, emp, code), qty in state["balances"].items():
+        rows.append(
+            {"snapshot_id": snap.id, "inventory": inventory, "kind": "balance", "item_code": code, "employee_id": emp, "quantity": qty}
+        )
+    for uid, (code, status, emp) in state["serials"].items():
+        rows.append(
+            {
+                "snapshot_id": snap.id,
+                "inventory": "restricted",
+                "kind": "serial",
+                "item_code": code,
+                "serial_unit_id": uid,
+                "employee_id": emp,
+                "status": status,
+            }
+        )
+    if rows:
+        # Uniform key sets for executemany.
+        keys = ("snapshot_id", "inventory", "kind", "item_code", "employee_id", "serial_unit_id", "quantity", "status")
+        db.execute(InventorySnapshotLine.__table__.insert(), [{k: r.get(k) for k in keys} for r in rows])
+
+    db.commit()
+    db.refresh(snap)
+    return snap
+
+
+def take_inventory_snapshot_if_stale(db: Session, max_age: timedelta = SNAPSHOT_INTERVAL) -> Optional[InventorySnapshot]:
+    """Take a snapshot when the newest one is older than ``max_age`` (or there is none).
+
+    Called at startup and periodically by the launcher, so a report replays at most about
+    one interval of transactions past the last snapshot. Commits when it takes one.
+    """
+
+    latest = db.query(func.max(InventorySnapshot.taken_at)).scalar()
+    if latest is not None:
+        if latest.tzinfo is None:
+            # SQLite's CURRENT_TIMESTAMP is UTC without an offset.
+            latest = latest.replace(tzinfo=timezone.utc)
+        if datetime.now(timezone.utc) - latest < max_age:
+            return None
+    return take_inventory_snapshot(db, note="auto")
+
+
+def _load_snapshot(db: Session, snap: InventorySnapshot) -> Dict[str, Any]:
+    state = _new_state()
+    for ln in db.query(InventorySnapshotLine).filter(InventorySnapshotLine.snapshot_id == snap.id):
+        if ln.kind == "stock":
+            state["stock"][(ln.inventory, ln.item_code)] = float(ln.quantity or 0.0)
+        elif ln.kind == "balance":
+            state["balances"][(ln.inventory, ln.employee_id, ln.item_code)] = float(ln.quantity or 0.0)
+        elif ln.kind == "serial":
+            state["serials"][ln.serial_unit_id] = [ln.item_code, ln.status, ln.employee_id]
+    return state
+
+
+def _apply_quantity_tx(state: Dict[str, Any], inventory: str, tx) -> None:
+    qty = float(tx.quantity or 0.0)
+    stock_key = (inventory, tx.item_code)
+    if tx.action == "ADJUST":
+        # Adjust transactions record the new on-hand quantity.
+        state["stock"][stock_key] = qty
+        return
+    if tx.action in _STOCK_DELTA:
+        state["stock"][stock_key] = state["stock"].get(stock_key, 0.0) + _STOCK_DELTA[tx.action] * qty
+    if tx.action in _BALANCE_DELTA and tx.employee_id:
+        bal_key = (inventory, tx.employee_id, tx.item_code)
+        # Returns floor the balance at 0, as the live endpoints do.
+        state["balances"][bal_key] = max(0.0, state["balances"].get(bal_key, 0.0) + _BALANCE_DELTA[tx.action] * qty)
+
+
+def _apply_serial_tx(state: Dict[str, Any], tx) -> None:
+    rule = _SERIAL_ACTIONS.get(tx.action)
+    if rule is None:
+        return
+    status, keeps_assignment = rule
+    cur = state["serials"].get(tx.serial_unit_id) or [tx.item_code, "in_stock", None]
+    emp = (tx.employee_id if tx.action == "ISSUE" else cur[2]) if keeps_assignment else None
+    state["serials"][tx.serial_unit_id] = [tx.item_code, status, emp]
+
+
+def _unwind_quantity_tx(state: Dict[str, Any], inventory: str, tx) -> None:
+    # ADJUST stores only the new quantity, so the value before it cannot be recovered.
+    qty = float(tx.quantity or 0.0)
+    if tx.action in _STOCK_DELTA:
+        stock_key = (inventory, tx.item_code)
+        state["stock"][stock_key] = state["stock"].get(stock_key, 0.0) - _STOCK_DELTA[tx.action] * qty
+    if tx.action in _BALANCE_DELTA and tx.employee_id:
+        bal_key = (inventory, tx.employee_id, tx.item_code)
+        state["balances"][bal_key] = max(0.0, state["balances"].get(bal_key, 0.0) - _BALANCE_DELTA[tx.action] * qty)
+
+
+def _unwind_serial_tx(state: Dict[str, Any], tx) -> None:
+    if tx.action not in _SERIAL_ACTIONS:
+        return
+    if tx.action == "ISSUE" or not tx.employee_id:
+        state["serials"][tx.serial_unit_id] = [tx.item_code, "in_stock", None]
+    else:
+        state["serials"][tx.serial_unit_id] = [tx.item_code, "issued", tx.employee_id]
+
+
+def inventory_as_of(db: Session, at: datetime) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+    """Return ``(state, meta)`` for time ``at``.
+
+    Starts from the latest snapshot taken at or before ``at`` and replays later
+    transactions forward. When there is none, starts from the earliest later snapshot
+    (or the live tables) and unwinds transactions back to ``at``; unwinding cannot undo
+    ADJUST rows, so that direction is best-effort.
+
+    ``meta`` has ``snapshot_id``, ``snapshot_taken_at``, ``direction`` and ``replayed``.
+    """
+
+    snap = (
+        db.query(InventorySnapshot)
+        .filter(InventorySnapshot.taken_at <= at)
+        .order_by(InventorySnapshot.taken_at.desc(), InventorySnapshot.id.desc())
+        .first()
+    )
+    if snap:
+        return _replay_forward(db, snap, at)
+
+    later = (
+        db.query(InventorySnapshot)
+        .filter(InventorySnapshot.taken_at > at)
+        .order_by(InventorySnapshot.taken_at.asc(), InventorySnapshot.id.asc())
+        .first()
+    )
+    return _unwind_backward(db, later, at)
+
+
+def _replay_forward(db: Session, snap: InventorySnapshot, at: datetime) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+    state = _load_snapshot(db, snap)
+
+    replayed = 0
+    general_txs = (
+        db.query(GeneralItemTransaction)
+        .filter(GeneralItemTransaction.id > snap.general_tx_id, GeneralItemTransaction.created_at <= at)
+        .order_by(GeneralItemTransaction.id.asc())
+    )
+    for tx in general_txs:
+        _apply_quantity_tx(state, "general", tx)
+        replayed += 1
+
+    restricted_txs = (
+        db.query(RestrictedItemTransaction)
+        .filter(RestrictedItemTransaction.id > snap.restricted_tx_id, RestrictedItemTransaction.created_at <= at)
+        .order_by(RestrictedItemTransaction.id.asc())
+    )
+    for tx in restricted_txs:
+        if tx.serial_unit_id is not None:
+            _apply_serial_tx(state, tx)
+        else:
+            _apply_quantity_tx(state, "restricted", tx)
+        replayed += 1
+
+    meta = {"snapshot_id": snap.id, "snapshot_taken_at": snap.taken_at, "direction": "forward", "replayed": replayed}
+    return state, meta
+
+
+def _unwind_backward(db: Session, snap: Optional[InventorySnapshot], at: datetime) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+    general_q = db.query(GeneralItemTransaction).filter(GeneralItemTransaction.created_at > at)
+    restricted_q = db.query(RestrictedItemTransaction).filter(RestrictedItemTransaction.created_at > at)
+    if snap:
+        state = _load_snapshot(db, snap)
+        general_q = general_q.filter(GeneralItemTransaction.id <= snap.general_tx_id)
+        restricted_q = restricted_q.filter(RestrictedItemTransaction.id <= snap.restricted_tx_id)
+    else:
+        state = _live_state(db)
+
+    replayed = 0
+    for tx in general_q.order_by(GeneralItemTransaction.id.desc()):
+        _unwind_quantity_tx(state, "general", tx)
+        replayed += 1
+    for tx in restricted_q.order_by(RestrictedItemTransaction.id.desc()):
+        if tx.serial_unit_id is not None:
+            _unwind_serial_tx(state, tx)
+        else:
+            _unwind_quantity_tx(state, "restricted", tx)
+        replayed += 1
+
+    meta = {
+        "snapshot_id": snap.id if snap else None,
+        "snapshot_taken_at": snap.taken_at if snap else None,
+        "direction": "backward",
+        "replayed": replayed,
+    }
+    return state, meta
@@ -0,0 +1,192 @@
+"""
+Request metrics.
+
+``RequestMetricsMiddleware`` times every HTTP request and, through SQLAlchemy cursor
+events on the engine, counts the SQL statements it ran and the time spent in them.
+Per-route latency / statement / DB-time histograms are kept in process memory and
+rendered in the Prometheus text format by ``render_prometheus``; each response also
+gets a ``Server-Timing`` header (``app``, ``db``) that shows up in browser dev tools.
+
+Routes are labelled by their path template (``/api/employees2/{employee_id}``), not the
+raw URL, so label cardinality stays bounded. With several worker processes every worker
+keeps its own numbers: each series carries a ``pid`` label, a scrape is answered by
+whichever worker accepted it, and fleet-wide figures are summed over ``pid`` in the
+query (``sum without (pid) (...)``).
+"""
+
+import os
+import threading
+import time
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import event
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+STATEMENT_BUCKETS = (1, 2, 5, 10, 20, 50, 100, 200, 500)
+
+
+@dataclass
+class RequestStats:
+    """SQL activity of the request currently being handled."""
+
+    statements: int = 0
+    db_seconds: float = 0.0
+    route: Optional[str] = None
+
+
+_current: ContextVar[Optional[RequestStats]] = ContextVar("request_stats", default=None)
+
+
+def current_request_stats() -> Optional[RequestStats]:
+    return _current.get()
+
+
+class _Histogram:
+    def __init__(self, buckets: Iterable[float]):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * len(self.buckets)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        self.count += 1
+        self.sum += value
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[i] += 1
+
+
+class _Registry:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.latency: Dict[Tuple[str, str], _Histogram] = {}
+        self.statements: Dict[Tuple[str, str], _Histogram] = {}
+        self.db_time: Dict[Tuple[str, str], _Histogram] = {}
+        self.responses: Dict[Tuple[str, str, str], int] = {}
+
+    def record(self, method: str, route: str, status: int, seconds: float, stats: RequestStats) -> None:
+        key = (method, route)
+        with self._lock:
+            self.latency.setdefault(key, _Histogram(LATENCY_BUCKETS)).observe(seconds)
+            self.statements.setdefault(key, _Histogram(STATEMENT_BUCKETS)).observe(stats.statements)
+            self.db_time.setdefault(key, _Histogram(LATENCY_BUCKETS)).observe(stats.db_seconds)
+            rkey = (method, route, str(status))
+            self.responses[rkey] = self.responses.get(rkey, 0) + 1
+
+    def reset(self) -> None:
+        with self._lock:
+            self.latency.clear()
+            self.statements.clear()
+            self.db_time.clear()
+            self.responses.clear()
+
+
+registry = _Registry()
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(method: str, route: str, **extra: str) -> str:
+    pairs = [("method", method), ("route", route), *extra.items(), ("pid", str(os.getpid()))]
+    return ",".join(f'{k}="{_escape(v)}"' for k, v in pairs)
+
+
+def _render_histogram(lines: List[str], name: str, help_text: str, data: Dict[Tuple[str, str], _Histogram]) -> None:
+    lines.append(f"# HELP {name} {help_text}")
+    lines.append(f"# TYPE {name} histogram")
+    for (method, route), h in sorted(data.items()):
+        for bound, n in zip(h.buckets, h.counts):
+            lines.append(f"{name}_bucket{{{_labels(method, route, le=f'{bound:g}')}}} {n}")
+        lines.append(f"{name}_bucket{{{_labels(method, route, le='+Inf')}}} {h.count}")
+        lines.append(f"{name}_sum{{{_labels(method, route)}}} {h.sum:.6f}")
+        lines.append(f"{name}_count{{{_labels(method, route)}}} {h.count}")
+
+
+def render_prometheus(extra_gauges: Optional[Dict[str, float]] = None) -> str:
+    """Return all collected metrics in the Prometheus text exposition format."""
+
+    lines: List[str] = []
+    with registry._lock:
+        _render_histogram(
+            lines, "http_request_duration_seconds", "HTTP request latency by route.", registry.latency
+        )
+        _render_histogram(
+            lines, "http_request_db_statements", "SQL statements executed per request.", registry.statements
+        )
+        _render_histogram(
+            lines, "http_request_db_duration_seconds", "Time spent in SQL per request.", registry.db_time
+        )
+        lines.append("# HELP http_responses_total HTTP responses by route and status.")
+        lines.append("# TYPE http_responses_total counter")
+        for (method, route, status), n in sorted(registry.responses.items()):
+            lines.append(f"http_responses_total{{{_labels(method, route, status=status)}}} {n}")
+
+    for name, value in (extra_gauges or {}).items():
+        lines.append(f"# TYPE {name} gauge")
+        lines.append(f'{name}{{pid="{os.getpid()}"}} {value:g}')
+    return "\n".join(lines) + "\n"
+
+
+def install_sql_metrics(engine) -> None:
+    """Attach the statement counters to ``engine``. Safe to call once per engine."""
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_start_time", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        starts = conn.info.get("query_start_time")
+        if not starts:
+            return
+        elapsed = time.perf_counter() - starts.pop()
+        stats = _current.get()
+        if stats is None:
+            return
+        stats.statements += 1
+        stats.db_seconds += elapsed
+
+
+def _route_template(scope) -> str:
+    return getattr(scope.get("route"), "path", None) or "unmatched"
+
+
+class RequestMetricsMiddleware:
+    """ASGI middleware recording per-route latency and SQL statistics."""
+
+    def __init__(self, app, server_timing: bool = True):
+        self.app = app
+        self.server_timing = server_timing
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestStats()
+        token = _current.set(stats)
+        started = time.perf_counter()
+        status_holder = {"status": 500}
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                status_holder["status"] = message["status"]
+                if self.server_timing:
+                    app_ms = (time.perf_counter() - started) * 1000
+                    value = (
+                        f'app;dur={app_ms:.1f}, db;dur={stats.db_seconds * 1000:.1f};desc="{stats.statements} queries"'
+                    )
+                    message["headers"] = list(message.get("headers", [])) + [(b"server-timing", value.encode("latin-1"))]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - started
+            stats.route = _route_template(scope)
+            registry.record(scope.get("method", "GET"), stats.route, status_holder["status"], elapsed, stats)
+            _current.reset(token)
@@ -0,0 +1,94 @@
+"""
+Document numbering helper.
+
+Numbers such as ``JE-202401-0007`` come from a per-prefix counter in
+document_sequences that is incremented atomically (``UPDATE ... RETURNING``, or
+``INSERT ... ON CONFLICT DO UPDATE ... RETURNING`` for a new prefix), so issuing a number
+is a single-row operation and parallel requests never receive the same value. The
+counter row stays locked until the caller commits. Other backends lock the row with
+``SELECT ... FOR UPDATE`` and increment it through the ORM.
+
+The first time a prefix is used, the counter is seeded from the highest number already
+stored for it, so numbering continues where the old scan-based generators left off.
+"""
+
+from typing import Callable, Optional
+
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from app.core.database import dialect_insert
+from app.models.core.document_sequence import DocumentSequence
+
+
+def max_numeric_suffix(db: Session, column, prefix: str) -> int:
+    """Highest integer tail among ``column`` values starting with ``prefix`` (0 if none)."""
+
+    best = 0
+    for (value,) in db.query(column).filter(column.like(f"{prefix}%")):
+        tail = str(value or "")[len(prefix):]
+        if tail.isdigit():
+            best = max(best, int(tail))
+    return best
+
+
+def next_sequence_value(db: Session, prefix: str, seed: Optional[Callable[[], int]] = None) -> int:
+    """Atomically increment and return the counter for ``prefix``.
+
+    ``seed`` is only called when the counter does not exist yet and returns the last
+    value already in use.
+    """
+
+    ins = dialect_insert(db, DocumentSequence)
+    if ins is None:
+        return _next_sequence_value_orm(db, prefix, seed)
+
+    table = DocumentSequence.__table__
+
+    n = db.execute(
+        table.update()
+        .where(table.c.prefix == prefix)
+        .values(last_value=table.c.last_value + 1, updated_at=func.now())
+        .returning(table.c.last_value)
+    ).scalar()
+    if n is not None:
+        return int(n)
+
+    start = int(seed()) if seed else 0
+
+    stmt = ins.values(prefix=prefix, last_value=start + 1)
+    # Another request may have created the row since the UPDATE above.
+    stmt = stmt.on_conflict_do_update(
+        index_elements=["prefix"],
+        set_={"last_value": table.c.last_value + 1, "updated_at": func.now()},
+    ).returning(table.c.last_value)
+    return int(db.execute(stmt).scalar())
+
+
+def _next_sequence_value_orm(db: Session, prefix: str, seed: Optional[Callable[[], int]]) -> int:
+    # Backends without ON CONFLICT (e.g. MySQL, where UPDATE has no RETURNING either):
+    # lock the counter row and increment it through the ORM.
+    row = db.query(DocumentSequence).filter(DocumentSequence.prefix == prefix).with_for_update().first()
+    if row is None:
+        row = DocumentSequence(prefix=prefix, last_value=int(seed()) if seed else 0)
+        db.add(row)
+    row.last_value = int(row.last_value or 0) + 1
+    db.flush()
+    return row.last_value
+
+
+def next_document_no(
+    db: Session,
+    prefix: str,
+    width: int = 4,
+    seed_column=None,
+) -> str:
+    """Return ``prefix`` followed by the next zero-padded number.
+
+    ``seed_column`` is the column holding existing numbers for this prefix; it is scanned
+    once to seed a new counter.
+    """
+
+    seed = (lambda: max_numeric_suffix(db, seed_column, prefix)) if seed_column is not None else None
+    n = next_sequence_value(db, prefix, seed)
+    return f"{prefix}{n:0{width}d}"
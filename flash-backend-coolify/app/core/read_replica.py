@@ -0,0 +1,169 @@
+"""
+Read-replica routing.
+
+When ``DATABASE_READ_URL`` is set, GET reporting routes depend on ``get_read_db`` instead
+of ``get_db`` and run their queries on the replica, so long payroll / analytics / export
+queries stop competing with attendance marking on the primary. Without a replica
+``get_read_db`` simply returns the request's primary session.
+
+Two guards keep users from seeing stale data:
+
+* Read-your-writes: ``ReadAfterWriteMiddleware`` stamps ``user_write_marks`` on the
+  primary whenever an authenticated non-GET request succeeds. For
+  ``DB_READ_AFTER_WRITE_SECONDS`` afterwards that user's reports are served from the
+  primary. The mark lives in the database, so it holds across worker processes.
+* Lag: the replica's replay delay is sampled at most every few seconds per process;
+  while it exceeds ``DB_READ_MAX_LAG_SECONDS`` (or cannot be read) every report falls
+  back to the primary.
+"""
+
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Optional
+
+from anyio import to_thread
+from fastapi import Depends, Request
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.database import ReadSessionLocal, SessionLocal, dialect_insert, get_db, new_session, read_engine
+from app.core.security import decode_access_token
+from app.models.core.user_write_mark import UserWriteMark
+
+_SAFE_METHODS = {"GET", "HEAD", "OPTIONS"}
+_LAG_SAMPLE_SECONDS = 5.0
+
+_lag_lock = threading.Lock()
+_lag_sample = {"at": 0.0, "seconds": None}
+
+
+def replica_enabled() -> bool:
+    return read_engine is not None
+
+
+def token_subject(authorization: Optional[str]) -> Optional[str]:
+    """``sub`` of a valid bearer token, or None."""
+
+    if not authorization or not authorization.lower().startswith("bearer "):
+        return None
+    payload = decode_access_token(authorization[7:].strip())
+    return (payload or {}).get("sub")
+
+
+def mark_write(subject: str) -> None:
+    """Record that ``subject`` just wrote to the primary."""
+
+    db = SessionLocal()
+    try:
+        now = datetime.utcnow()
+        ins = dialect_insert(db, UserWriteMark)
+        if ins is not None:
+            db.execute(
+                ins.values(subject=subject, written_at=now).on_conflict_do_update(
+                    index_elements=["subject"], set_={"written_at": now}
+                )
+            )
+        else:
+            db.merge(UserWriteMark(subject=subject, written_at=now))
+        db.commit()
+    except Exception:
+        db.rollback()
+    finally:
+        db.close()
+
+
+def wrote_recently(db: Session, subject: Optional[str]) -> bool:
+    if not subject:
+        return False
+    written_at = db.query(UserWriteMark.written_at).filter(UserWriteMark.subject == subject).scalar()
+    if written_at is None:
+        return False
+    return datetime.utcnow() - written_at < timedelta(seconds=settings.DB_READ_AFTER_WRITE_SECONDS)
+
+
+def _measure_lag() -> Optional[float]:
+    with read_engine.connect() as conn:
+        if conn.dialect.name != "postgresql":
+            return 0.0
+        # NULL on a primary or before anything was replayed; an idle standby also reports
+        # a growing value, so treat "nothing left to replay" as caught up.
+        row = conn.execute(
+            text(
+                "SELECT CASE WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0 "
+                "ELSE EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()) END"
+            )
+        ).scalar()
+        return float(row or 0.0)
+
+
+def replica_lag_seconds() -> Optional[float]:
+    """Replication delay sampled at most every few seconds; None when the replica is unreachable."""
+
+    now = time.monotonic()
+    with _lag_lock:
+        if now - _lag_sample["at"] < _LAG_SAMPLE_SECONDS:
+            return _lag_sample["seconds"]
+        _lag_sample["at"] = now
+    try:
+        lag = _measure_lag()
+    except Exception:
+        lag = None
+    with _lag_lock:
+        _lag_sample["seconds"] = lag
+    return lag
+
+
+def use_replica(db: Session, request: Request) -> bool:
+    if not replica_enabled():
+        return False
+    lag = replica_lag_seconds()
+    if lag is None or lag > settings.DB_READ_MAX_LAG_SECONDS:
+        return False
+    return not wrote_recently(db, token_subject(request.headers.get("authorization")))
+
+
+def get_read_db(request: Request, db: Session = Depends(get_db)):
+    """Session for read-only reporting routes: the replica when it is safe, else the primary.
+
+    Depends on ``get_db`` so that, without a replica, the route shares the primary session
+    already opened for authentication instead of checking out a second connection.
+    """
+    if not use_replica(db, request):
+        yield db
+        return
+    read_db = new_session(ReadSessionLocal, request)
+    read_db.info["read_replica"] = True
+    try:
+        yield read_db
+    finally:
+        read_db.close()
+
+
+class ReadAfterWriteMiddleware:
+    """Stamp the caller's write mark before a successful non-GET response is sent.
+
+    Marking before the status line goes out means the client cannot issue its follow-up
+    GET before the mark exists.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope.get("method", "GET") in _SAFE_METHODS:
+            await self.app(scope, receive, send)
+            return
+
+        headers = dict(scope.get("headers") or [])
+        authorization = headers.get(b"authorization", b"").decode("latin-1")
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start" and message["status"] < 400:
+                subject = token_subject(authorization)
+                if subject:
+                    await to_thread.run_sync(mark_write, subject)
+            await send(message)
+
+        await self.app(scope, receive, send_wrapper)
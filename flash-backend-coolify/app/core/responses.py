@@ -0,0 +1,49 @@
+"""
+JSON response helpers.
+
+``DefaultJSONResponse`` is the application's default response class: orjson when it is
+installed (several times faster than ``json.dumps`` for large payloads), otherwise
+FastAPI's standard ``JSONResponse``.
+
+For the largest endpoints the usual FastAPI path (validate the returned object against
+``response_model``, dump it to Python objects, then encode) is skipped:
+
+* ``model_json_response`` serialises an already-built pydantic model in one pass with
+  ``model_dump_json`` (pydantic-core, in Rust);
+* ``json_response`` encodes plain dicts / lists directly with orjson, which handles
+  ``date`` / ``datetime`` itself, falling back to ``jsonable_encoder``.
+
+Routes using them keep ``response_model=`` for the OpenAPI schema.
+"""
+
+from typing import Any
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse, Response
+from pydantic import BaseModel
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional dependency
+    orjson = None
+
+if orjson is not None:
+    from fastapi.responses import ORJSONResponse as DefaultJSONResponse
+else:  # pragma: no cover - optional dependency
+    DefaultJSONResponse = JSONResponse
+
+
+def model_json_response(model: BaseModel, status_code: int = 200) -> Response:
+    return Response(content=model.model_dump_json(), status_code=status_code, media_type="application/json")
+
+
+def _orjson_default(value: Any) -> Any:
+    # Decimal (Postgres numeric sums), UUID subclasses, pydantic models, ...
+    return jsonable_encoder(value)
+
+
+def json_response(content: Any, status_code: int = 200) -> Response:
+    if orjson is not None:
+        body = orjson.dumps(content, default=_orjson_default, option=orjson.OPT_NON_STR_KEYS)
+        return Response(content=body, status_code=status_code, media_type="application/json")
+    return JSONResponse(content=jsonable_encoder(content), status_code=status_code)
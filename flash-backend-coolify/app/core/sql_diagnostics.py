@@ -0,0 +1,197 @@
+"""
+SQL diagnostics (slow query and N+1 detector).
+
+When enabled, every statement run while handling a request is normalised to a
+fingerprint (literals and bind parameters replaced, ``IN (...)`` lists collapsed,
+whitespace folded). At the end of the request, fingerprints executed more than
+``repeat_threshold`` times are reported as probable N+1 loops, and any single statement
+slower than ``slow_query_ms`` is reported as it finishes. Each finding carries the route
+and the innermost application frame that issued the statement, is logged on the
+``app.sql_diagnostics`` logger and kept in a small in-memory ring for the admin API.
+
+The switches start from Settings (``SQL_DIAGNOSTICS_*``) and can be changed at runtime
+through ``/api/admin/diagnostics/sql`` without restarting. Switches and findings live in
+process memory: a change applies only to the worker process that receives it (the
+response names it by ``worker_pid``), and the other workers keep their own until they are
+switched too or restarted with the settings changed.
+"""
+
+import hashlib
+import logging
+import os
+import re
+import threading
+import time
+import traceback
+from collections import deque
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Deque, Dict, List, Optional
+
+from sqlalchemy import event
+
+from app.core.config import settings
+
+logger = logging.getLogger("app.sql_diagnostics")
+
+_APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# Middleware wraps every request, so its frames are on the stack of every statement; they
+# are never the code that issued it.
+_SKIPPED_FILES = frozenset(
+    os.path.join(_APP_DIR, "core", f"{name}.py") for name in ("compression", "metrics", "read_replica", "sql_diagnostics")
+)
+
+
+@dataclass
+class SqlDiagnosticsConfig:
+    enabled: bool = False
+    repeat_threshold: int = 10
+    slow_query_ms: float = 250.0
+
+
+config = SqlDiagnosticsConfig(
+    enabled=settings.SQL_DIAGNOSTICS_ENABLED,
+    repeat_threshold=settings.SQL_DIAGNOSTICS_REPEAT_THRESHOLD,
+    slow_query_ms=settings.SQL_DIAGNOSTICS_SLOW_QUERY_MS,
+)
+
+
+@dataclass
+class _Fingerprint:
+    sql: str
+    count: int = 0
+    seconds: float = 0.0
+    location: Optional[str] = None
+
+
+@dataclass
+class _RequestTrace:
+    scope: Dict[str, Any]
+    fingerprints: Dict[str, _Fingerprint] = field(default_factory=dict)
+
+    @property
+    def route(self) -> str:
+        # The router stores the matched route in the scope before calling the handler.
+        path = getattr(self.scope.get("route"), "path", None) or self.scope.get("path", "")
+        return f"{self.scope.get('method', 'GET')} {path}"
+
+
+_trace: ContextVar[Optional[_RequestTrace]] = ContextVar("sql_diagnostics_trace", default=None)
+
+_findings: Deque[Dict[str, Any]] = deque(maxlen=200)
+_findings_lock = threading.Lock()
+
+_STRING_RE = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_RE = re.compile(r"\b\d+(?:\.\d+)?\b")
+_PARAM_RE = re.compile(r"%\(\w+\)s|%s|:\w+|\$\d+|\?")
+_IN_LIST_RE = re.compile(r"\(\s*\?(?:\s*,\s*\?)*\s*\)")
+_SPACE_RE = re.compile(r"\s+")
+
+
+def normalize_sql(statement: str) -> str:
+    """Reduce a statement to its shape so repeated executions with other values match."""
+
+    s = _STRING_RE.sub("?", statement)
+    s = _PARAM_RE.sub("?", s)
+    s = _NUMBER_RE.sub("?", s)
+    s = _IN_LIST_RE.sub("(?)", s)
+    s = _SPACE_RE.sub(" ", s).strip()
+    return s
+
+
+def fingerprint(normalized: str) -> str:
+    return hashlib.sha1(normalized.encode("utf-8")).hexdigest()[:12]
+
+
+def _app_location() -> Optional[str]:
+    """Innermost stack frame inside the application package, skipping the middleware modules."""
+
+    for frame in reversed(traceback.extract_stack()):
+        path = os.path.abspath(frame.filename)
+        if path.startswith(_APP_DIR) and path not in _SKIPPED_FILES:
+            return f"{os.path.relpath(path, os.path.dirname(_APP_DIR))}:{frame.lineno} in {frame.name}"
+    return None
+
+
+def _report(kind: str, route: str, **details: Any) -> None:
+    finding = {"kind": kind, "route": route, "at": datetime.utcnow().isoformat(timespec="seconds"), **details}
+    with _findings_lock:
+        _findings.append(finding)
+    logger.warning("%s on %s: %s", kind, route, details)
+
+
+def recent_findings(limit: int = 50) -> List[Dict[str, Any]]:
+    with _findings_lock:
+        items = list(_findings)
+    return list(reversed(items))[:limit]
+
+
+def clear_findings() -> None:
+    with _findings_lock:
+        _findings.clear()
+
+
+def install_sql_diagnostics(engine) -> None:
+    """Attach the fingerprinting listeners to ``engine``; they do nothing while disabled."""
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        if _trace.get() is not None:
+            conn.info.setdefault("diagnostics_start_time", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        trace = _trace.get()
+        starts = conn.info.get("diagnostics_start_time")
+        if trace is None or not starts:
+            return
+        elapsed = time.perf_counter() - starts.pop()
+
+        normalized = normalize_sql(statement)
+        key = fingerprint(normalized)
+        fp = trace.fingerprints.get(key)
+        if fp is None:
+            fp = trace.fingerprints[key] = _Fingerprint(sql=normalized, location=_app_location())
+        fp.count += 1
+        fp.seconds += elapsed
+
+        if elapsed * 1000 >= config.slow_query_ms:
+            _report(
+                "slow_query",
+                trace.route,
+                fingerprint=key,
+                ms=round(elapsed * 1000, 1),
+                sql=normalized[:500],
+                location=_app_location(),
+            )
+
+
+class SqlDiagnosticsMiddleware:
+    """ASGI middleware that scopes fingerprints to a request and reports repeats at the end."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not config.enabled:
+            await self.app(scope, receive, send)
+            return
+
+        trace = _RequestTrace(scope=scope)
+        token = _trace.set(trace)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            _trace.reset(token)
+            for key, fp in trace.fingerprints.items():
+                if fp.count > config.repeat_threshold:
+                    _report(
+                        "repeated_query",
+                        trace.route,
+                        fingerprint=key,
+                        count=fp.count,
+                        ms=round(fp.seconds * 1000, 1),
+                        sql=fp.sql[:500],
+                        location=fp.location,
+                    )
@@ -1,8 +1,15 @@
+import hashlib
 import os
 import shutil
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from typing import Optional
 from sqlalchemy import text, func
 from sqlalchemy.orm import Session
-from app.core.database import engine
+from app.core.config import settings
+from app.core.database import Base, engine
 from app.core.security import get_password_hash
 from app.models.core.rbac import Permission, Role
 from app.models.core.user import User
@@ -526,6 +533,134 @@ def _ensure_attendance_columns_exist() -> None:
         except Exception:
             pass
 
+def _ensure_attendance_indexes_exist() -> None:
+    # create_all() does not add new indexes to tables that already exist.
+    with engine.begin() as conn:
+        try:
+            conn.execute(
+                text(
+                    "CREATE INDEX IF NOT EXISTS ix_attendance_records_employee_date_status "
+                    "ON attendance_records (employee_id, date, status)"
+                )
+            )
+        except Exception:
+            pass
+
+def _backfill_employee_last_present() -> None:
+    # Seed the summary once; afterwards attendance and leave writes keep it current.
+    with engine.begin() as conn:
+        try:
+            has_rows = conn.execute(text("SELECT 1 FROM employee_last_present LIMIT 1")).first()
+            if has_rows:
+                return
+            conn.execute(
+                text(
+                    "INSERT INTO employee_last_present (employee_id, last_present_date) "
+                    "SELECT employee_id, MAX(date) FROM attendance_records "
+                    "WHERE status IN ('present', 'late') GROUP BY employee_id"
+                )
+            )
+        except Exception:
+            pass
+
+def _ensure_finance_journal_indexes_exist() -> None:
+    with engine.begin() as conn:
+        try:
+            conn.execute(
+                text(
+                    "CREATE INDEX IF NOT EXISTS ix_finance_journal_entries_date_status "
+                    "ON finance_journal_entries (entry_date, status)"
+                )
+            )
+        except Exception:
+            pass
+
+def _ensure_expense_indexes_exist() -> None:
+    with engine.begin() as conn:
+        try:
+            conn.execute(
+                text("CREATE INDEX IF NOT EXISTS ix_expenses_active_date ON expenses (is_active, expense_date)")
+            )
+        except Exception:
+            pass
+
+def _backfill_finance_account_balances() -> None:
+    # Seed monthly balances once from posted journals; posting keeps them current afterwards.
+    from app.core.account_balances import rebuild_account_balances
+    from app.models.finance.finance_account_balance import FinanceAccountBalance
+
+    db = Session(bind=engine)
+    try:
+        if db.query(FinanceAccountBalance.id).first() is not None:
+            return
+        rebuild_account_balances(db)
+        db.commit()
+    except Exception:
+        db.rollback()
+    finally:
+        db.close()
+
+def _take_inventory_snapshot_if_stale() -> None:
+    # Keeps as-of inventory reports replaying at most about a day of transactions.
+    from app.core.inventory_snapshots import take_inventory_snapshot_if_stale
+
+    db = Session(bind=engine)
+    try:
+        take_inventory_snapshot_if_stale(db)
+    except Exception:
+        db.rollback()
+    finally:
+        db.close()
+
+def _ensure_inventory_assignment_columns_exist() -> None:
+    with engine.begin() as conn:
+        try:
+            if engine.dialect.name == "sqlite":
+                rows = conn.execute(text("PRAGMA table_info(inventory_assignments_state)")).fetchall()
+                existing = {r[1] for r in rows}
+            else:
+                rows = conn.execute(
+                    text(
+                        "SELECT column_name FROM information_schema.columns "
+                        "WHERE table_name='inventory_assignments_state'"
+                    )
+                ).fetchall()
+                existing = {r[0] for r in rows}
+
+            if "version" not in existing:
+                conn.execute(text("ALTER TABLE inventory_assignments_state ADD COLUMN version INTEGER NOT NULL DEFAULT 0"))
+        except Exception:
+            pass
+
+def _migrate_inventory_assignment_blob() -> None:
+    # Older databases kept the whole assignments map as one JSON string; move it to rows once.
+    from app.core.inventory_assignments import migrate_legacy_blob
+
+    db = Session(bind=engine)
+    try:
+        migrate_legacy_blob(db)
+        db.commit()
+    except Exception:
+        db.rollback()
+    finally:
+        db.close()
+
+def _backfill_vehicle_assignment_month_stats() -> None:
+    # Seed monthly vehicle totals once; assignment updates keep them current afterwards.
+    from app.core.fleet_assignment_stats import rebuild_month_stats
+    from app.models.fleet.vehicle_assignment_month_stat import VehicleAssignmentMonthStat
+
+    db = Session(bind=engine)
+    try:
+        if db.query(VehicleAssignmentMonthStat.id).first() is not None:
+            return
+        rebuild_month_stats(db)
+        db.commit()
+    except Exception:
+        db.rollback()
+    finally:
+        db.close()
+
 def _ensure_vehicle_columns_exist() -> None:
     vehicle_columns = {
         "chassis_number": "VARCHAR(100)",
@@ -731,9 +866,111 @@ def run_startup_tasks():
     _ensure_general_item_columns_exist()
     _ensure_client_guard_requirement_columns_exist()
     _ensure_attendance_columns_exist()
+    _ensure_attendance_indexes_exist()
+    _backfill_employee_last_present()
+    _ensure_finance_journal_indexes_exist()
+    _ensure_expense_indexes_exist()
+    _backfill_finance_account_balances()
+    _take_inventory_snapshot_if_stale()
+    _ensure_inventory_assignment_columns_exist()
+    _migrate_inventory_assignment_blob()
     _ensure_vehicle_columns_exist()
     _ensure_vehicle_assignment_columns_exist()
+    _backfill_vehicle_assignment_month_stats()
     _ensure_payroll_payment_status_columns_exist()
     _ensure_payroll_sheet_entry_columns_exist()
     _ensure_payroll_sheet_entry_employee_fk()
     _ensure_client_site_guard_allocation_columns_exist()
+
+
+# Set by app.server after it has run the startup tasks, so worker processes skip them.
+STARTUP_DONE_ENV = "FLASH_STARTUP_DONE"
+# Arbitrary constant shared by every process of this app ("Flash" in ASCII).
+_STARTUP_ADVISORY_LOCK_KEY = 0x466C617368
+
+try:
+    import fcntl
+except ImportError:  # Windows: single-process development only
+    fcntl = None
+
+
+def _startup_lock_file() -> str:
+    digest = hashlib.sha1(settings.DATABASE_URL.encode("utf-8")).hexdigest()[:12]
+    return os.path.join(tempfile.gettempdir(), f"flash-erp-startup-{digest}.lock")
+
+
+@contextmanager
+def startup_lock(timeout: int):
+    """Serialize startup tasks across processes.
+
+    Postgres: session-level advisory lock, so it also covers several containers sharing
+    one database. Other backends (SQLite): an exclusive ``flock`` on a file derived from
+    DATABASE_URL. Raises ``TimeoutError`` after ``timeout`` seconds.
+    """
+    deadline = time.monotonic() + timeout
+    if engine.dialect.name == "postgresql":
+        with engine.connect() as conn:
+            while not conn.execute(text("SELECT pg_try_advisory_lock(:key)"), {"key": _STARTUP_ADVISORY_LOCK_KEY}).scalar():
+                if time.monotonic() > deadline:
+                    raise TimeoutError("Timed out waiting for the startup advisory lock")
+                time.sleep(0.5)
+            try:
+                yield
+            finally:
+                conn.execute(text("SELECT pg_advisory_unlock(:key)"), {"key": _STARTUP_ADVISORY_LOCK_KEY})
+                conn.commit()
+        return
+
+    if fcntl is None:
+        yield
+        return
+    with open(_startup_lock_file(), "a+") as f:
+        while True:
+            try:
+                fcntl.flock(f.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+                break
+            except BlockingIOError:
+                if time.monotonic() > deadline:
+                    raise TimeoutError(f"Timed out waiting for {f.name}")
+                time.sleep(0.5)
+        try:
+            yield
+        finally:
+            fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+
+
+def run_startup_once(uploads_dir: str) -> bool:
+    """Create tables, run startup tasks and migrate legacy uploads under ``startup_lock``.
+
+    Returns False without doing anything when the launcher already ran them (see
+    ``STARTUP_DONE_ENV``).
+    """
+    if os.environ.get(STARTUP_DONE_ENV) == "1":
+        return False
+    import app.models  # noqa: F401  (register every table on Base.metadata)
+
+    with startup_lock(settings.STARTUP_LOCK_TIMEOUT):
+        Base.metadata.create_all(bind=engine)
+        run_startup_tasks()
+        os.makedirs(uploads_dir, exist_ok=True)
+        migrate_legacy_uploads(uploads_dir)
+    return True
+
+
+def start_inventory_snapshot_timer(interval: int) -> Optional[threading.Thread]:
+    """Check every ``interval`` seconds, in a daemon thread, whether an inventory snapshot is due.
+
+    Run by the launcher (app.server), which lives as long as the deployment while workers
+    are recycled, so as-of reports never have to write one. Returns None when disabled.
+    """
+    if interval <= 0:
+        return None
+
+    def _run() -> None:
+        while True:
+            time.sleep(interval)
+            _take_inventory_snapshot_if_stale()
+
+    thread = threading.Thread(target=_run, name="inventory-snapshots", daemon=True)
+    thread.start()
+    return thread
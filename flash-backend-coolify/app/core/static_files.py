@@ -0,0 +1,284 @@
+"""
+Static file serving for ``/uploads``.
+
+``UploadsStaticFiles`` replaces Starlette's ``StaticFiles`` defaults with HTTP caching
+suited to uploads:
+
+* Upload helpers name files ``<prefix>_<YYYYmmdd_HHMMSS>_<uuid8>.<ext>`` and never
+  overwrite them, so such files are sent with ``Cache-Control: public, max-age=...,
+  immutable`` and browsers stop re-requesting avatars and vehicle images. Files with
+  other names (legacy copies) get ``no-cache`` and are revalidated.
+* Strong ``ETag`` (mtime + size) and ``Last-Modified``; ``If-None-Match`` /
+  ``If-Modified-Since`` answer 304.
+* Single ``Range`` requests (with ``If-Range``) answer 206, so PDF viewers can fetch
+  large scans page by page; unsatisfiable ranges answer 416.
+* ``?size=thumb|medium|pdf`` on an image serves its downscaled variant (see
+  ``app.core.image_variants``), generating it on first request.
+* When ``UPLOADS_PRECOMPRESSED`` is on and a fresh ``<file>.br`` / ``<file>.gz`` sibling
+  exists (written in the background by ``schedule_precompress``), it is served with
+  ``Content-Encoding`` to clients that accept it.
+"""
+
+import gzip
+import mimetypes
+import os
+import re
+import stat
+import threading
+from concurrent.futures import Future
+from email.utils import formatdate, parsedate_to_datetime
+from typing import Dict, Optional, Tuple
+from urllib.parse import parse_qs
+
+import anyio
+from starlette.datastructures import Headers
+from starlette.responses import Response
+from starlette.staticfiles import StaticFiles
+
+from app.core.compression import accepted_encodings, brotli, is_compressible
+from app.core.config import settings
+from app.core.image_variants import ensure_variant, submit_upload_task
+
+# <YYYYmmdd>_<HHMMSS>_<8 hex chars of a uuid4>, optionally followed by an extension
+_UNIQUE_NAME = re.compile(r"\d{8}_\d{6}_[0-9a-f]{8}(\.[A-Za-z0-9]+)*$")
+_PRECOMPRESSED = (("br", ".br"), ("gzip", ".gz"))
+
+
+def is_immutable_name(filename: str) -> bool:
+    return bool(_UNIQUE_NAME.search(os.path.basename(filename)))
+
+
+def cache_control_for(filename: str) -> str:
+    if is_immutable_name(filename):
+        return f"public, max-age={settings.UPLOADS_CACHE_MAX_AGE}, immutable"
+    return "no-cache"
+
+
+def file_etag(stat_result: os.stat_result, suffix: str = "") -> str:
+    return f'"{stat_result.st_mtime_ns:x}-{stat_result.st_size:x}{suffix}"'
+
+
+def _etag_list(header: str):
+    return [tag.strip() for tag in header.split(",") if tag.strip()]
+
+
+def _weak_match(etag: str, header: str) -> bool:
+    bare = etag[2:] if etag.startswith("W/") else etag
+    for tag in _etag_list(header):
+        if tag == "*" or (tag[2:] if tag.startswith("W/") else tag) == bare:
+            return True
+    return False
+
+
+def _http_date(value: str) -> Optional[float]:
+    try:
+        return parsedate_to_datetime(value).timestamp()
+    except (TypeError, ValueError, IndexError):
+        return None
+
+
+def parse_range(header: str, size: int) -> Optional[Tuple[int, int]]:
+    """``(start, end)`` inclusive for a single ``bytes=`` range.
+
+    Returns None when the header should be ignored (malformed or several ranges) and
+    raises ``ValueError`` when it is syntactically valid but unsatisfiable.
+    """
+    unit, _, spec = header.partition("=")
+    if unit.strip().lower() != "bytes" or "," in spec:
+        return None
+    first, sep, last = spec.strip().partition("-")
+    if not sep:
+        return None
+    first, last = first.strip(), last.strip()
+    if not first:
+        if not last.isdigit():
+            return None
+        length = int(last)
+        if length == 0 or size == 0:
+            raise ValueError(header)
+        return max(size - length, 0), size - 1
+    if not first.isdigit() or (last and not last.isdigit()):
+        return None
+    start = int(first)
+    end = min(int(last), size - 1) if last else size - 1
+    if last and int(last) < start:
+        return None
+    if start >= size:
+        raise ValueError(header)
+    return start, end
+
+
+class FileRangeResponse(Response):
+    """Send ``length`` bytes of ``path`` starting at ``start`` (nothing for HEAD)."""
+
+    chunk_size = 64 * 1024
+
+    def __init__(self, path: str, start: int, length: int, status_code: int,
+                 headers: Dict[str, str], media_type: Optional[str]):
+        self.path = path
+        self.start = start
+        self.length = length
+        self.status_code = status_code
+        self.media_type = media_type
+        self.background = None
+        self.body = b""
+        self.init_headers({**headers, "content-length": str(length)})
+
+    async def __call__(self, scope, receive, send):
+        await send({"type": "http.response.start", "status": self.status_code, "headers": self.raw_headers})
+        if scope.get("method", "GET").upper() == "HEAD" or not self.length:
+            await send({"type": "http.response.body", "body": b"", "more_body": False})
+            return
+        remaining = self.length
+        async with await anyio.open_file(self.path, mode="rb") as f:
+            await f.seek(self.start)
+            while remaining > 0:
+                chunk = await f.read(min(self.chunk_size, remaining))
+                if not chunk:
+                    break
+                remaining -= len(chunk)
+                await send({"type": "http.response.body", "body": chunk, "more_body": remaining > 0})
+        if remaining:
+            # File shrank underneath us; end the response instead of hanging.
+            await send({"type": "http.response.body", "body": b"", "more_body": False})
+
+
+class UploadsStaticFiles(StaticFiles):
+    async def get_response(self, path: str, scope) -> Response:
+        size = parse_qs(scope.get("query_string", b"").decode("latin-1")).get("size", [None])[0]
+        if size and settings.IMAGE_VARIANTS_ENABLED and scope["method"] in ("GET", "HEAD"):
+            full_path, stat_result = await anyio.to_thread.run_sync(self.lookup_path, path)
+            if stat_result is not None and stat.S_ISREG(stat_result.st_mode):
+                target = await ensure_variant(full_path, size)
+                if target is not None:
+                    return self.file_response(target, os.stat(target), scope)
+        return await super().get_response(path, scope)
+
+    def file_response(self, full_path, stat_result, scope, status_code: int = 200) -> Response:
+        full_path = os.fspath(full_path)
+        request_headers = Headers(scope=scope)
+        media_type = mimetypes.guess_type(full_path)[0] or "text/plain"
+
+        serve_path, serve_stat, encoding = full_path, stat_result, None
+        variants = self._precompressed_variants(full_path, stat_result, media_type)
+        if variants:
+            accepted = accepted_encodings(request_headers.get("accept-encoding", ""))
+            for name, path, variant_stat in variants:
+                if name in accepted:
+                    serve_path, serve_stat, encoding = path, variant_stat, name
+                    break
+
+        etag = file_etag(stat_result, f"-{encoding}" if encoding else "")
+        last_modified = formatdate(stat_result.st_mtime, usegmt=True)
+        headers = {
+            "etag": etag,
+            "last-modified": last_modified,
+            "cache-control": cache_control_for(full_path),
+            "accept-ranges": "none" if encoding else "bytes",
+        }
+        if variants:
+            headers["vary"] = "Accept-Encoding"
+        if encoding:
+            headers["content-encoding"] = encoding
+
+        if_none_match = request_headers.get("if-none-match")
+        if if_none_match is not None:
+            if _weak_match(etag, if_none_match):
+                return Response(status_code=304, headers=headers)
+        else:
+            since = _http_date(request_headers.get("if-modified-since", ""))
+            if since is not None and int(stat_result.st_mtime) <= since:
+                return Response(status_code=304, headers=headers)
+
+        size = serve_stat.st_size
+        range_header = request_headers.get("range")
+        if range_header and not encoding and status_code == 200 and self._if_range_ok(request_headers, etag, last_modified):
+            try:
+                byte_range = parse_range(range_header, size)
+            except ValueError:
+                headers["content-range"] = f"bytes */{size}"
+                return Response(status_code=416, headers=headers)
+            if byte_range is not None:
+                start, end = byte_range
+                headers["content-range"] = f"bytes {start}-{end}/{size}"
+                return FileRangeResponse(serve_path, start, end - start + 1, 206, headers, media_type)
+
+        return FileRangeResponse(serve_path, 0, size, status_code, headers, media_type)
+
+    @staticmethod
+    def _if_range_ok(request_headers: Headers, etag: str, last_modified: str) -> bool:
+        if_range = request_headers.get("if-range")
+        if if_range is None:
+            return True
+        if_range = if_range.strip()
+        if if_range.startswith('"') or if_range.startswith("W/"):
+            return if_range == etag
+        return if_range == last_modified
+
+    @staticmethod
+    def _precompressed_variants(full_path: str, stat_result: os.stat_result, media_type: str):
+        if not settings.UPLOADS_PRECOMPRESSED or not is_compressible(media_type):
+            return []
+        variants = []
+        for name, suffix in _PRECOMPRESSED:
+            try:
+                variant_stat = os.stat(full_path + suffix)
+            except OSError:
+                continue
+            # A stale variant (older than the file) is ignored rather than served.
+            if stat.S_ISREG(variant_stat.st_mode) and variant_stat.st_mtime >= stat_result.st_mtime:
+                variants.append((name, full_path + suffix, variant_stat))
+        return variants
+
+
+def precompressed_paths(path: str) -> list:
+    """Paths of the ``.br`` / ``.gz`` siblings ``precompress_upload`` may write for ``path``."""
+
+    return [path + suffix for _, suffix in _PRECOMPRESSED]
+
+
+def _wants_precompress(path: str) -> bool:
+    return settings.UPLOADS_PRECOMPRESSED and is_compressible(mimetypes.guess_type(path)[0] or "")
+
+
+def precompress_upload(path) -> None:
+    """Write ``.br`` / ``.gz`` siblings of a stored textual upload (SVG, CSV, ...).
+
+    Variants that do not save at least 10% are not kept. No-op unless
+    ``UPLOADS_PRECOMPRESSED`` is on; failures are ignored, the original is always served.
+    Runs at maximum compression, so call it through ``schedule_precompress``.
+    """
+    path = os.fspath(path)
+    if not _wants_precompress(path):
+        return
+    try:
+        with open(path, "rb") as f:
+            data = f.read()
+        if len(data) < settings.COMPRESSION_MIN_SIZE:
+            return
+        variants = {".gz": gzip.compress(data, compresslevel=9, mtime=0)}
+        if brotli is not None:
+            variants[".br"] = brotli.compress(data, quality=11)
+        for suffix, body in variants.items():
+            if len(body) > len(data) * 0.9:
+                continue
+            # Renamed into place so the file server never picks up a half-written sibling.
+            tmp = f"{path}{suffix}.{os.getpid()}.{threading.get_ident()}.tmp"
+            try:
+                with open(tmp, "wb") as f:
+                    f.write(body)
+                os.replace(tmp, path + suffix)
+            finally:
+                if os.path.exists(tmp):
+                    os.remove(tmp)
+    except OSError:
+        pass
+
+
+def schedule_precompress(path) -> Optional[Future]:
+    """Queue ``precompress_upload`` on the upload worker pool without waiting for it."""
+
+    path = os.fspath(path)
+    if not _wants_precompress(path):
+        return None
+    return submit_upload_task(precompress_upload, path)
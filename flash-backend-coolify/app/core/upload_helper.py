@@ -8,9 +8,11 @@ import os
 import uuid
 from datetime import datetime
 from pathlib import Path
-from typing import Tuple
+from typing import Optional, Tuple
 
 from app.core.config import settings
+from app.core.image_variants import VARIANT_SIZES, is_source_image, schedule_variants, variant_path
+from app.core.static_files import precompressed_paths, schedule_precompress
 
 
 async def upload_file_to_storage(
@@ -46,6 +48,8 @@ async def upload_file_to_storage(
     file_path = local_dir / new_filename
     with open(file_path, "wb") as f:
         f.write(content)
+    schedule_precompress(file_path)
+    schedule_variants(file_path)
     
     local_url = f"/uploads/{local_subdir}/{new_filename}"
     return local_url, "local"
@@ -86,6 +90,46 @@ async def upload_file_with_prefix(
     file_path = local_dir / new_filename
     with open(file_path, "wb") as f:
         f.write(content)
+    schedule_precompress(file_path)
+    schedule_variants(file_path)
     
     local_url = f"/uploads/{local_subdir}/{new_filename}"
     return local_url, new_filename, "local"
+
+
+def local_upload_path(path_or_url: Optional[str]) -> Optional[str]:
+    """
+    Filesystem path of a stored upload.
+
+    ``/uploads/...`` URLs (what the upload helpers return) resolve under UPLOADS_DIR;
+    other local paths, stored by older code, are returned as is. Remote (http) URLs and
+    URLs escaping UPLOADS_DIR give None.
+    """
+    if not path_or_url or path_or_url.startswith("http"):
+        return None
+    if not path_or_url.startswith("/uploads/"):
+        return path_or_url
+    root = os.path.abspath(settings.UPLOADS_DIR)
+    path = os.path.abspath(os.path.join(root, path_or_url[len("/uploads/"):]))
+    return path if path.startswith(root + os.sep) else None
+
+
+def delete_upload(path_or_url: Optional[str]) -> None:
+    """
+    Remove a stored upload together with its derived files.
+
+    Deletes the image variants (thumb / medium / pdf) and the ``.gz`` / ``.br`` siblings
+    of each. Files that are already gone are skipped.
+    """
+    path = local_upload_path(path_or_url)
+    if path is None:
+        return
+    files = [path]
+    if is_source_image(path):
+        files += [variant_path(path, size) for size in VARIANT_SIZES]
+    for f in files:
+        for candidate in (f, *precompressed_paths(f)):
+            try:
+                os.remove(candidate)
+            except FileNotFoundError:
+                pass
@@ -1,28 +1,37 @@
 import os
+import secrets
 
 from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
-from fastapi.staticfiles import StaticFiles
+from fastapi.responses import JSONResponse, PlainTextResponse
 from sqlalchemy import text
 from app.core.config import settings
-from app.core.database import engine, Base
+from app.core.database import engine, pool_status, read_engine
+from app.core.metrics import RequestMetricsMiddleware, install_sql_metrics, render_prometheus
+from app.core.sql_diagnostics import SqlDiagnosticsMiddleware, install_sql_diagnostics
+from app.core.read_replica import ReadAfterWriteMiddleware
+from app.core.compression import CompressionMiddleware
+from app.core.responses import DefaultJSONResponse
+from app.core.static_files import UploadsStaticFiles
 from app.api.routes import api_router
-from app.core.startup_tasks import run_startup_tasks, migrate_legacy_uploads
+from app.core.startup_tasks import run_startup_once
 import fastadmin
 import app.models  # Import models to create tables
 
-# Create database tables
-Base.metadata.create_all(bind=engine)
+# Serve uploads from project root so previously uploaded files remain accessible.
+_uploads_dir = os.path.abspath(settings.UPLOADS_DIR)
 
-# Run startup tasks (migrations, seeding, checks)
-run_startup_tasks()
+# Create database tables, run startup tasks (migrations, seeding, checks) and migrate
+# legacy uploads. Serialized across processes; skipped in workers started by app.server,
+# which runs them once before forking.
+run_startup_once(_uploads_dir)
 
 # Create FastAPI app
 app = FastAPI(
     title=settings.APP_NAME,
     version=settings.APP_VERSION,
     description="A modern ERP system built with FastAPI and React",
+    default_response_class=DefaultJSONResponse,
 )
 
 app.add_middleware(
@@ -34,6 +43,23 @@ app.add_middleware(
     expose_headers=["*"],
 )
 
+if settings.COMPRESSION_ENABLED:
+    app.add_middleware(CompressionMiddleware)
+
+# Always installed; idle until switched on via settings or /api/admin/diagnostics/sql
+install_sql_diagnostics(engine)
+app.add_middleware(SqlDiagnosticsMiddleware)
+
+if read_engine is not None:
+    install_sql_diagnostics(read_engine)
+    app.add_middleware(ReadAfterWriteMiddleware)
+
+if settings.METRICS_ENABLED:
+    install_sql_metrics(engine)
+    if read_engine is not None:
+        install_sql_metrics(read_engine)
+    app.add_middleware(RequestMetricsMiddleware, server_timing=settings.SERVER_TIMING_ENABLED)
+
 
 @app.exception_handler(Exception)
 async def global_exception_handler(request: Request, exc: Exception):
@@ -55,14 +81,8 @@ app.include_router(api_router, prefix="/api")
 # Include fastadmin router
 app.include_router(fastadmin.api.frameworks.fastapi.app.api_router, prefix="/admin")
 
-# Serve uploads from project root so previously uploaded files remain accessible.
-_uploads_dir = os.path.abspath(settings.UPLOADS_DIR)
 os.makedirs(_uploads_dir, exist_ok=True)
-
-# Migrate legacy uploads
-migrate_legacy_uploads(_uploads_dir)
-
-app.mount("/uploads", StaticFiles(directory=_uploads_dir), name="uploads")
+app.mount("/uploads", UploadsStaticFiles(directory=_uploads_dir), name="uploads")
 
 
 @app.get("/")
@@ -84,3 +104,22 @@ async def health_check():
         return {"status": "healthy"}
     except Exception as e:
         return JSONResponse(status_code=500, content={"status": "unhealthy", "detail": str(e)})
+
+
+@app.get("/metrics", include_in_schema=False)
+async def metrics(request: Request):
+    """Per-route latency and SQL statistics in Prometheus text format.
+
+    Only served when METRICS_TOKEN is set, to callers sending it as a bearer token.
+    """
+    if not settings.METRICS_ENABLED or not settings.METRICS_TOKEN:
+        return JSONResponse(status_code=404, content={"detail": "Not Found"})
+    expected = f"Bearer {settings.METRICS_TOKEN}"
+    if not secrets.compare_digest(request.headers.get("authorization", ""), expected):
+        return JSONResponse(status_code=401, content={"detail": "Not authenticated"})
+    pool = pool_status()
+    gauges = {f"db_pool_{k}": v for k, v in pool.items() if k in ("size", "checked_in", "checked_out", "overflow")}
+    if read_engine is not None:
+        read_pool = pool_status(read_engine)
+        gauges.update({f"db_read_pool_{k}": v for k, v in read_pool.items() if k in ("size", "checked_in", "checked_out", "overflow")})
+    return PlainTextResponse(render_prometheus(extra_gauges=gauges), media_type="text/plain; version=0.0.4")
@@ -5,6 +5,7 @@ from app.models.core.file import File
 from app.models.fleet.vehicle import Vehicle
 from app.models.fleet.vehicle_document import VehicleDocument
 from app.models.fleet.vehicle_assignment import VehicleAssignment
+from app.models.fleet.vehicle_assignment_month_stat import VehicleAssignmentMonthStat
 from app.models.hr.employee_document import EmployeeDocument
 from app.models.hr.employee_warning import EmployeeWarning
 from app.models.hr.employee_warning_document import EmployeeWarningDocument
@@ -18,6 +19,7 @@ from app.models.hr.employee_advance_deduction import EmployeeAdvanceDeduction
 from app.models.finance.payroll_sheet_entry import PayrollSheetEntry
 from app.models.finance.expense import Expense
 from app.models.hr.attendance import AttendanceRecord
+from app.models.hr.employee_last_present import EmployeeLastPresent
 from app.models.client.client import Client
 from app.models.client.client_address import ClientAddress
 from app.models.client.client_contact import ClientContact
@@ -30,15 +32,21 @@ from app.models.client.client_site import ClientSite
 from app.models.client.client_site_guard_allocation import ClientSiteGuardAllocation
 from app.models.hr.employee2 import Employee2
 from app.models.hr.employee_inactive import EmployeeInactive
+from app.models.hr.pending_deactivation import PendingDeactivation
+from app.models.hr.employee_legacy_map import EmployeeLegacyMap
 from app.models.finance.finance_account import FinanceAccount
+from app.models.finance.finance_account_balance import FinanceAccountBalance
 from app.models.finance.finance_journal_entry import FinanceJournalEntry
 from app.models.finance.finance_journal_line import FinanceJournalLine
 from app.models.inventory.general_item import GeneralItem
 from app.models.inventory.general_item_employee_balance import GeneralItemEmployeeBalance
 from app.models.inventory.general_item_transaction import GeneralItemTransaction
-from app.models.inventory.inventory_assignment import InventoryAssignmentState
+from app.models.inventory.inventory_assignment import InventoryAssignment, InventoryAssignmentState
+from app.models.inventory.inventory_snapshot import InventorySnapshot, InventorySnapshotLine
 from app.models.hr.leave_period import LeavePeriod
 from app.models.core.rbac import Role, Permission
+from app.models.core.document_sequence import DocumentSequence
+from app.models.core.user_write_mark import UserWriteMark
 from app.models.inventory.restricted_item import RestrictedItem
 from app.models.inventory.restricted_item_employee_balance import RestrictedItemEmployeeBalance
 from app.models.inventory.restricted_item_image import RestrictedItemImage
@@ -50,6 +58,7 @@ __all__ = [
     "File",
     "Vehicle",
     "VehicleDocument",
+    "VehicleAssignmentMonthStat",
     "EmployeeDocument",
     "EmployeeWarning",
     "EmployeeWarningDocument",
@@ -63,6 +72,7 @@ __all__ = [
     "PayrollSheetEntry",
     "Expense",
     "AttendanceRecord",
+    "EmployeeLastPresent",
     "Client",
     "ClientAddress",
     "ClientContact",
@@ -75,16 +85,24 @@ __all__ = [
     "ClientSiteGuardAllocation",
     "Employee2",
     "EmployeeInactive",
+    "PendingDeactivation",
+    "EmployeeLegacyMap",
     "FinanceAccount",
+    "FinanceAccountBalance",
     "FinanceJournalEntry",
     "FinanceJournalLine",
     "GeneralItem",
     "GeneralItemEmployeeBalance",
     "GeneralItemTransaction",
+    "InventoryAssignment",
     "InventoryAssignmentState",
+    "InventorySnapshot",
+    "InventorySnapshotLine",
     "LeavePeriod",
     "Role",
     "Permission",
+    "DocumentSequence",
+    "UserWriteMark",
     "RestrictedItem",
     "RestrictedItemEmployeeBalance",
     "RestrictedItemImage",
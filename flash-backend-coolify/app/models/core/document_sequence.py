@@ -0,0 +1,15 @@
+from sqlalchemy import Column, DateTime, Integer, String
+from sqlalchemy.sql import func
+
+from app.core.database import Base
+
+
+class DocumentSequence(Base):
+    """Last number issued per document-number prefix (e.g. ``JE-202401-``)."""
+
+    __tablename__ = "document_sequences"
+
+    prefix = Column(String(100), primary_key=True)
+    last_value = Column(Integer, nullable=False, default=0)
+
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
@@ -0,0 +1,13 @@
+from sqlalchemy import Column, DateTime, String
+
+from app.core.database import Base
+
+
+class UserWriteMark(Base):
+    """Time of a user's latest write request, used to keep their reads off a lagging replica."""
+
+    __tablename__ = "user_write_marks"
+
+    subject = Column(String(255), primary_key=True)
+    # Naive UTC, written by the application clock so all workers compare like with like.
+    written_at = Column(DateTime, nullable=False)
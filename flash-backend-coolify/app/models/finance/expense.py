@@ -1,4 +1,4 @@
-from sqlalchemy import Boolean, Column, Date, DateTime, ForeignKey, Integer, Numeric, String, Text
+from sqlalchemy import Boolean, Column, Date, DateTime, ForeignKey, Index, Integer, Numeric, String, Text
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 
@@ -11,6 +11,10 @@ from app.models.finance.finance_account import FinanceAccount  # noqa: F401
 class Expense(Base):
     __tablename__ = "expenses"
 
+    __table_args__ = (
+        Index("ix_expenses_active_date", "is_active", "expense_date"),
+    )
+
     id = Column(Integer, primary_key=True, index=True)
     
     # Basic expense information
@@ -0,0 +1,25 @@
+from sqlalchemy import Column, DateTime, ForeignKey, Integer, Numeric, String, UniqueConstraint
+from sqlalchemy.sql import func
+
+from app.core.database import Base
+
+
+class FinanceAccountBalance(Base):
+    """Posted debit/credit totals per account per month, maintained when journals are posted."""
+
+    __tablename__ = "finance_account_balances"
+
+    __table_args__ = (
+        UniqueConstraint("account_id", "period", name="uq_fin_account_balance_period"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+
+    account_id = Column(Integer, ForeignKey("finance_accounts.id"), nullable=False, index=True)
+    # YYYY-MM of the journal entry_date
+    period = Column(String(7), nullable=False, index=True)
+
+    debit_total = Column(Numeric(14, 2), nullable=False, default=0)
+    credit_total = Column(Numeric(14, 2), nullable=False, default=0)
+
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Date, DateTime, Integer, String, event
+from sqlalchemy import Column, Date, DateTime, Index, Integer, String, event, inspect
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 
@@ -8,6 +8,10 @@ from app.core.database import Base
 class FinanceJournalEntry(Base):
     __tablename__ = "finance_journal_entries"
 
+    __table_args__ = (
+        Index("ix_finance_journal_entries_date_status", "entry_date", "status"),
+    )
+
     id = Column(Integer, primary_key=True, index=True)
 
     entry_no = Column(String(50), unique=True, nullable=False, index=True)
@@ -30,9 +34,19 @@ class FinanceJournalEntry(Base):
     )
 
 
+def _persisted_status(target):
+    # Status as loaded from the database, so the DRAFT -> POSTED transition itself is allowed.
+    hist = inspect(target).attrs.status.history
+    if hist.deleted:
+        return hist.deleted[0]
+    if hist.unchanged:
+        return hist.unchanged[0]
+    return None
+
+
 @event.listens_for(FinanceJournalEntry, "before_update")
 def _prevent_posted_entry_update(mapper, connection, target):
-    if getattr(target, "status", None) == "POSTED":
+    if _persisted_status(target) == "POSTED":
         raise ValueError("Posted journal entries cannot be modified")
 
 
@@ -0,0 +1,37 @@
+"""Per-vehicle monthly totals of completed vehicle assignments."""
+
+from sqlalchemy import Column, DateTime, Float, Integer, String, UniqueConstraint
+from sqlalchemy.sql import func
+
+from app.core.database import Base
+
+
+class VehicleAssignmentMonthStat(Base):
+    """Completed-assignment totals per vehicle per month, refreshed when assignments change.
+
+    Only assignments with a positive distance are counted. Year-period analytics sum
+    these rows instead of scanning a year of assignments.
+    """
+
+    __tablename__ = "vehicle_assignment_month_stats"
+
+    __table_args__ = (
+        UniqueConstraint("vehicle_id", "month", name="uq_vehicle_assignment_month_stat"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+
+    vehicle_id = Column(String(50), nullable=False, index=True)
+    # YYYY-MM of assignment_date
+    month = Column(String(7), nullable=False, index=True)
+
+    assignments = Column(Integer, nullable=False, default=0)
+    total_km = Column(Float, nullable=False, default=0.0)
+    total_amount = Column(Float, nullable=False, default=0.0)
+    # Sum and count of non-negative rate_per_km (or amount/km), for the average rate
+    rate_sum = Column(Float, nullable=False, default=0.0)
+    rate_count = Column(Integer, nullable=False, default=0)
+    min_cost_per_km = Column(Float, nullable=True)
+    max_cost_per_km = Column(Float, nullable=True)
+
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
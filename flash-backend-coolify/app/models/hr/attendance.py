@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Date, DateTime, UniqueConstraint, Float
+from sqlalchemy import Column, Integer, String, Date, DateTime, UniqueConstraint, Float, Index
 from sqlalchemy.sql import func
 
 from app.core.database import Base
@@ -6,7 +6,10 @@ from app.core.database import Base
 
 class AttendanceRecord(Base):
     __tablename__ = "attendance_records"
-    __table_args__ = (UniqueConstraint("employee_id", "date", name="uq_attendance_employee_date"),)
+    __table_args__ = (
+        UniqueConstraint("employee_id", "date", name="uq_attendance_employee_date"),
+        Index("ix_attendance_records_employee_date_status", "employee_id", "date", "status"),
+    )
 
     id = Column(Integer, primary_key=True, autoincrement=True, index=True)
     employee_id = Column(String(255), index=True, nullable=False)
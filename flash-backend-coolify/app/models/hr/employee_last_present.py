@@ -0,0 +1,15 @@
+from sqlalchemy import Column, Date, DateTime, String
+from sqlalchemy.sql import func
+
+from app.core.database import Base
+
+
+class EmployeeLastPresent(Base):
+    """Last day each employee was marked present/late, kept current by attendance writes."""
+
+    __tablename__ = "employee_last_present"
+
+    employee_id = Column(String(255), primary_key=True)
+    last_present_date = Column(Date, index=True, nullable=False)
+
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
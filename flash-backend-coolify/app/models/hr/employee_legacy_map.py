@@ -0,0 +1,20 @@
+from sqlalchemy import Column, DateTime, Integer, String
+from sqlalchemy.sql import func
+
+from app.core.database import Base
+
+
+class EmployeeLegacyMap(Base):
+    """Resolved Employee2 -> legacy Employee.employee_id mapping.
+
+    Inventory balances and serial units are keyed by the legacy employee id. A row with a
+    NULL legacy_employee_id means "checked, no match" so lookups don't re-scan.
+    """
+
+    __tablename__ = "employee_legacy_map"
+
+    employee2_id = Column(Integer, primary_key=True)
+    legacy_employee_id = Column(String(100), index=True)
+    match_method = Column(String(20))  # cnic | name | fss_no | serial_no
+
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
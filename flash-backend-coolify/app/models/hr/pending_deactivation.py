@@ -0,0 +1,37 @@
+from sqlalchemy import Column, DateTime, Integer, String, Text
+from sqlalchemy.sql import func
+
+from app.core.database import Base
+
+
+class PendingDeactivation(Base):
+    """Employee queued for deactivation, with the settlement snapshot computed at submit time."""
+
+    __tablename__ = "pending_deactivations"
+
+    id = Column(Integer, primary_key=True, index=True)
+    # One pending request per employee; the unique index also guards concurrent submits.
+    employee_db_id = Column(Integer, unique=True, index=True, nullable=False)
+
+    employee_id = Column(String(255), nullable=False, default="")
+    name = Column(Text, nullable=False, default="")
+    serial_no = Column(String(100))
+    fss_no = Column(String(100))
+    rank = Column(Text)
+    category = Column(Text)
+    unit = Column(Text)
+    cnic = Column(String(100))
+    mobile_no = Column(Text)
+    avatar_url = Column(Text)
+    bank_name = Column(Text)
+    bank_account_number = Column(Text)
+    base_salary = Column(Integer)
+    deactivation_date = Column(String(20), nullable=False)
+
+    # Settlement snapshot (JSON strings)
+    inventory_items = Column(Text, nullable=False, default="[]")
+    attendance_summary = Column(Text, nullable=False, default="{}")
+    salary_calculation = Column(Text, nullable=False, default="{}")
+    settlement = Column(Text, nullable=False, default="{}")
+
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), index=True)
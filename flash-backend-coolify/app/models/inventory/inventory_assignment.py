@@ -1,20 +1,21 @@
-"""Inventory assignment state stored as a single JSON blob.
+"""Inventory assignment persistence for the frontend's inventoryAssignments map.
 
-This is a lightweight persistence layer for the frontend's inventoryAssignments
-map (item/employee quantities), so that the state survives server restarts and
-browser refreshes.
+Assignments are stored one row per (employee, item) in ``inventory_assignments`` so that
+an edit only touches the rows it changes. ``inventory_assignments_state`` keeps a single
+row whose ``version`` is bumped on every write and served as the ETag; its ``data``
+column is the legacy JSON blob and is only read once to migrate older databases.
 """
 
-from sqlalchemy import Column, Integer, Text, DateTime
+from sqlalchemy import Column, DateTime, Integer, String, Text, UniqueConstraint
 from sqlalchemy.sql import func
 
 from app.core.database import Base
 
 
 class InventoryAssignmentState(Base):
-    """Stores all inventory assignment data as a JSON string.
+    """Version counter for the assignments map (plus the legacy JSON blob).
 
-    The frontend currently manages a dictionary structure like:
+    The frontend manages a dictionary structure like:
 
         {
             "EMP-001": [{"itemId": "INV-0001", "quantity": 4}, ...],
@@ -22,14 +23,29 @@ class InventoryAssignmentState(Base):
             ...
         }
 
-    Instead of modeling this in a normalized way, we keep a single row
-    with a JSON Text column to mirror the localStorage structure.
+    Before rows were introduced the whole map was kept in ``data`` as a JSON string.
     """
 
     __tablename__ = "inventory_assignments_state"
 
     id = Column(Integer, primary_key=True, index=True)
-    # JSON string for the entire assignments map
+    # Legacy JSON string for the entire assignments map; "{}" once migrated to rows
     data = Column(Text, nullable=False, default="{}")
+    version = Column(Integer, nullable=False, default=0, server_default="0")
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+
+
+class InventoryAssignment(Base):
+    """Quantity of one frontend inventory item assigned to one employee."""
+
+    __tablename__ = "inventory_assignments"
+    __table_args__ = (UniqueConstraint("employee_id", "item_id", name="uq_inventory_assignment_employee_item"),)
+
+    id = Column(Integer, primary_key=True, index=True)
+    employee_id = Column(String(100), index=True, nullable=False)
+    item_id = Column(String(100), nullable=False)
+    quantity = Column(Integer, nullable=False, default=0)
+
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
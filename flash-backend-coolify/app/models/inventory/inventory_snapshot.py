@@ -0,0 +1,47 @@
+from sqlalchemy import Column, DateTime, Float, ForeignKey, Index, Integer, String
+from sqlalchemy.orm import relationship
+from sqlalchemy.sql import func
+
+from app.core.database import Base
+
+
+class InventorySnapshot(Base):
+    """Point-in-time copy of stock, employee balances and serial assignments.
+
+    The transaction-id watermarks mark the last log rows already reflected in the lines,
+    so an as-of query replays only transactions after them.
+    """
+
+    __tablename__ = "inventory_snapshots"
+
+    id = Column(Integer, primary_key=True, index=True)
+    taken_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False, index=True)
+    note = Column(String(255), nullable=True)
+
+    general_tx_id = Column(Integer, nullable=False, default=0)
+    restricted_tx_id = Column(Integer, nullable=False, default=0)
+
+    lines = relationship("InventorySnapshotLine", back_populates="snapshot", cascade="all, delete-orphan", passive_deletes=True)
+
+
+class InventorySnapshotLine(Base):
+    __tablename__ = "inventory_snapshot_lines"
+
+    __table_args__ = (
+        Index("ix_inventory_snapshot_lines_snapshot_kind", "snapshot_id", "kind"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    snapshot_id = Column(Integer, ForeignKey("inventory_snapshots.id", ondelete="CASCADE"), nullable=False)
+
+    inventory = Column(String(20), nullable=False)  # general | restricted
+    kind = Column(String(20), nullable=False)  # stock | balance | serial
+
+    item_code = Column(String(50), nullable=False)
+    employee_id = Column(String(50), nullable=True)
+    serial_unit_id = Column(Integer, nullable=True)
+
+    quantity = Column(Float, nullable=True)
+    status = Column(String(30), nullable=True)
+
+    snapshot = relationship("InventorySnapshot", back_populates="lines")
@@ -0,0 +1,58 @@
+from __future__ import annotations
+
+from typing import Any, Dict, Literal, Optional
+
+from pydantic import BaseModel, Field
+
+
+class SqlDiagnosticsSettings(BaseModel):
+    enabled: bool
+    repeat_threshold: int
+    slow_query_ms: float
+    # Settings and findings belong to the worker process that answered the request.
+    scope: Literal["worker"] = "worker"
+    worker_pid: int
+
+
+class SqlDiagnosticsUpdate(BaseModel):
+    enabled: Optional[bool] = None
+    repeat_threshold: Optional[int] = Field(default=None, ge=1)
+    slow_query_ms: Optional[float] = Field(default=None, ge=0)
+
+
+class SqlDiagnosticsFinding(BaseModel):
+    kind: str
+    route: str
+    at: str
+    fingerprint: str
+    sql: str
+    ms: float
+    count: Optional[int] = None
+    location: Optional[str] = None
+
+    model_config = {"extra": "allow"}
+
+
+class SqlDiagnosticsFindings(BaseModel):
+    settings: SqlDiagnosticsSettings
+    findings: list[SqlDiagnosticsFinding]
+
+
+class DatabasePoolStatus(BaseModel):
+    pool: str
+    size: Optional[int] = None
+    checked_in: Optional[int] = None
+    checked_out: Optional[int] = None
+    overflow: Optional[int] = None
+    max_overflow: int
+    timeout_seconds: int
+    recycle_seconds: int
+
+
+class DatabaseDiagnostics(BaseModel):
+    dialect: str
+    pool: DatabasePoolStatus
+    read_pool: Optional[DatabasePoolStatus] = None
+    statement_timeout_ms: int
+    route_statement_timeouts: Dict[str, int]
+    sqlite_pragmas: Dict[str, Any] = {}
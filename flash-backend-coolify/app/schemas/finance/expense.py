@@ -1,6 +1,6 @@
 from datetime import date, datetime
 from decimal import Decimal
-from typing import Optional
+from typing import List, Optional
 
 from pydantic import BaseModel, Field
 
@@ -49,10 +49,17 @@ class Expense(ExpenseBase):
         from_attributes = True
 
 
+class ExpenseSummaryTrendPoint(BaseModel):
+    month: str  # YYYY-MM
+    total: Decimal
+    count: int
+
+
 class ExpenseSummary(BaseModel):
     total_expenses: Decimal
     pending_expenses: Decimal
     approved_expenses: Decimal
     paid_expenses: Decimal
     expense_count: int
-    categories: dict[str, Decimal]  # category -> total amount
\ No newline at end of file
+    categories: dict[str, Decimal]  # category -> total amount
+    trend: Optional[List[ExpenseSummaryTrendPoint]] = None  # oldest month first, when requested
\ No newline at end of file
@@ -80,3 +80,52 @@ class FinanceJournalEntry(FinanceJournalEntryBase):
 
     class Config:
         from_attributes = True
+
+
+class TrialBalanceRow(BaseModel):
+    account_id: int
+    code: str
+    name: str
+    account_type: str
+    parent_id: Optional[int] = None
+    debit_total: Decimal = Decimal("0")
+    credit_total: Decimal = Decimal("0")
+    balance: Decimal = Decimal("0")
+    # Own totals plus every descendant account's totals.
+    rollup_debit_total: Decimal = Decimal("0")
+    rollup_credit_total: Decimal = Decimal("0")
+    rollup_balance: Decimal = Decimal("0")
+
+
+class TrialBalance(BaseModel):
+    period: Optional[str] = None
+    rows: List[TrialBalanceRow] = Field(default_factory=list)
+    total_debit: Decimal = Decimal("0")
+    total_credit: Decimal = Decimal("0")
+
+
+class GeneralLedgerLine(BaseModel):
+    line_id: int
+    entry_id: int
+    entry_no: str
+    entry_date: date
+    memo: Optional[str] = None
+    account_id: int
+    description: Optional[str] = None
+    debit: Decimal = Decimal("0")
+    credit: Decimal = Decimal("0")
+    balance: Decimal = Decimal("0")
+
+
+class GeneralLedger(BaseModel):
+    account_id: int
+    code: str
+    name: str
+    account_type: str
+    from_date: Optional[date] = None
+    to_date: Optional[date] = None
+    opening_balance: Decimal = Decimal("0")
+    closing_balance: Decimal = Decimal("0")
+    total_debit: Decimal = Decimal("0")
+    total_credit: Decimal = Decimal("0")
+    lines: List[GeneralLedgerLine] = Field(default_factory=list)
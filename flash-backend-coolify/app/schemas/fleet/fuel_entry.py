@@ -53,6 +53,38 @@ class FuelMileageTip(BaseModel):
     detail: str
 
 
+class FuelVehicleEfficiencyRow(BaseModel):
+    # 1 = best km/L; None when the vehicle has no usable odometer interval
+    rank: Optional[int] = None
+    vehicle_id: str
+
+    entries: int
+    total_liters: float
+    total_cost: float
+
+    start_odometer_km: Optional[int] = None
+    end_odometer_km: Optional[int] = None
+    distance_km: Optional[float] = None
+
+    avg_km_per_liter: Optional[float] = None
+    avg_cost_per_km: Optional[float] = None
+
+
+class FuelAnomalyRow(BaseModel):
+    entry_id: int
+    vehicle_id: str
+    entry_date: date
+    kind: str
+    detail: str
+
+    odometer_km: int
+    prev_odometer_km: int
+    delta_km: int
+    liters: float
+    km_per_liter: Optional[float] = None
+    vehicle_avg_km_per_liter: Optional[float] = None
+
+
 class FuelMileageSummary(BaseModel):
     vehicle_id: Optional[str] = None
     from_date: Optional[date] = None
@@ -69,4 +101,8 @@ class FuelMileageSummary(BaseModel):
     avg_km_per_liter: Optional[float] = None
     avg_cost_per_km: Optional[float] = None
 
+    # Ranked by km/L, best first
+    vehicles: list[FuelVehicleEfficiencyRow] = []
+    anomalies: list[FuelAnomalyRow] = []
+
     tips: list[FuelMileageTip]
@@ -9,6 +9,7 @@ class VehicleImageOut(BaseModel):
     vehicle_id: str
     filename: str
     url: str
+    thumbnail_url: Optional[str] = None
     mime_type: str
     created_at: datetime
     updated_at: Optional[datetime] = None
@@ -1,7 +1,8 @@
 """Employee2 schemas."""
 
-from typing import Optional, List
-from pydantic import BaseModel
+from functools import lru_cache
+from typing import Any, Dict, Optional, List, Tuple, Type
+from pydantic import BaseModel, create_model
 from datetime import datetime
 
 
@@ -249,3 +250,37 @@ class Employee2List(BaseModel):
     """Schema for Employee2 list response."""
     employees: List[Employee2ListItem]
     total: int
+
+
+# Named column sets for ``GET /employees2/?fields=``; ``id`` is always included.
+EMPLOYEE2_FIELD_PRESETS: Dict[str, Tuple[str, ...]] = {
+    "grid": tuple(f for f in Employee2ListItem.model_fields if f != "id"),
+    "picker": ("serial_no", "fss_no", "name", "designation", "status"),
+    "payroll": (
+        "serial_no",
+        "fss_no",
+        "name",
+        "rank",
+        "designation",
+        "category",
+        "unit",
+        "status",
+        "cnic",
+        "mobile_no",
+        "salary",
+        "eobi_no",
+        "bank_accounts",
+    ),
+}
+
+
+@lru_cache(maxsize=64)
+def employee2_projection_list_model(fields: Tuple[Tuple[str, Any], ...]) -> Type[BaseModel]:
+    """Build (and cache) a list response model holding only ``fields`` ((name, python type) pairs)."""
+
+    item = create_model(
+        "Employee2Projection",
+        __config__={"from_attributes": True},
+        **{name: (Optional[py_type], None) for name, py_type in fields},
+    )
+    return create_model("Employee2ProjectionList", employees=(List[item], ...), total=(int, ...))
@@ -70,6 +70,16 @@ class IssueRequest(BaseModel):
     notes: Optional[str] = None
 
 
+class BatchIssueLine(BaseModel):
+    item_code: str
+    quantity: float
+
+
+class BatchIssueRequest(BaseModel):
+    items: List[BatchIssueLine]
+    notes: Optional[str] = None
+
+
 class ReturnRequest(BaseModel):
     employee_id: str
     quantity: float
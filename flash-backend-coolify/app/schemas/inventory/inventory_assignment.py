@@ -22,3 +22,9 @@ class InventoryAssignmentsState(BaseModel):
 
     class Config:
         from_attributes = True
+
+
+class InventoryAssignmentsPatch(BaseModel):
+    """Partial update: each listed employee's list is replaced, an empty list clears it."""
+
+    data: InventoryAssignmentsMap
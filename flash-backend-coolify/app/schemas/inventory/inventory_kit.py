@@ -0,0 +1,29 @@
+from typing import List, Literal, Optional
+
+from pydantic import BaseModel, Field
+
+
+class KitLine(BaseModel):
+    inventory: Literal["general", "restricted"] = "general"
+    item_code: str
+    quantity: Optional[float] = None
+    serial_numbers: Optional[List[str]] = None  # restricted serial-tracked items only
+
+
+class KitRequest(BaseModel):
+    items: List[KitLine] = Field(default_factory=list)
+    notes: Optional[str] = None
+
+
+class KitResultLine(BaseModel):
+    inventory: str
+    item_code: str
+    quantity: Optional[float] = None
+    serial_numbers: Optional[List[str]] = None
+
+
+class KitResult(BaseModel):
+    employee_id: str
+    action: str  # issue | return
+    lines: List[KitResultLine]
+    transactions: int
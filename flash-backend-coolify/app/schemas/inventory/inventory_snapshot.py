@@ -0,0 +1,54 @@
+from datetime import datetime
+from typing import List, Optional
+
+from pydantic import BaseModel
+
+
+class InventorySnapshotCreate(BaseModel):
+    note: Optional[str] = None
+
+
+class InventorySnapshotOut(BaseModel):
+    id: int
+    taken_at: datetime
+    note: Optional[str] = None
+    general_tx_id: int
+    restricted_tx_id: int
+
+    class Config:
+        from_attributes = True
+
+
+class AsOfStockRow(BaseModel):
+    inventory: str
+    item_code: str
+    item_name: Optional[str] = None
+    unit_name: Optional[str] = None
+    quantity_on_hand: float
+
+
+class AsOfBalanceRow(BaseModel):
+    inventory: str
+    employee_id: str
+    item_code: str
+    item_name: Optional[str] = None
+    quantity_issued: float
+
+
+class AsOfSerialRow(BaseModel):
+    serial_unit_id: int
+    item_code: str
+    serial_number: Optional[str] = None
+    status: Optional[str] = None
+    employee_id: Optional[str] = None
+
+
+class InventoryAsOf(BaseModel):
+    as_of: datetime
+    snapshot_id: Optional[int] = None
+    snapshot_taken_at: Optional[datetime] = None
+    direction: str  # forward (from an earlier snapshot) | backward (unwound from a later one)
+    replayed_transactions: int
+    stock: List[AsOfStockRow]
+    balances: List[AsOfBalanceRow]
+    serials: List[AsOfSerialRow]
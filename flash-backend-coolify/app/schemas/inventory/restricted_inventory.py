@@ -69,6 +69,7 @@ class RestrictedItemImageOut(BaseModel):
     item_code: str
     filename: str
     url: str
+    thumbnail_url: Optional[str] = None
     mime_type: str
     created_at: datetime
     updated_at: Optional[datetime] = None
@@ -0,0 +1,107 @@
+"""
+Production launcher.
+
+    python -m app.server
+
+Importing ``app.main`` creates tables and runs the startup tasks, which several workers
+booting together would race on. This launcher runs them exactly once, under the startup
+lock (Postgres advisory lock, file lock for SQLite), then starts uvicorn's process
+supervisor with ``WEB_CONCURRENCY`` workers (default: one per CPU, at most
+``MAX_WORKERS``). Workers inherit ``FLASH_STARTUP_DONE=1`` and skip the tasks on import.
+
+The launcher also takes an inventory snapshot whenever the newest one is a day old
+(checked every ``INVENTORY_SNAPSHOT_SECONDS``), so as-of reports stay read-only.
+
+The supervisor replaces workers that exit, which is how ``WORKER_MAX_REQUESTS`` recycling
+works. ``kill -HUP <launcher pid>`` restarts the workers one at a time, each finishing its
+in-flight requests first (``WORKER_GRACEFUL_TIMEOUT``); ``SIGTTIN`` / ``SIGTTOU`` add or
+remove a worker.
+"""
+
+import logging
+import os
+
+import uvicorn
+from uvicorn.supervisors import ChangeReload, Multiprocess
+from uvicorn.supervisors.multiprocess import Process
+
+from app.core.config import settings
+
+logger = logging.getLogger("uvicorn.error")
+
+
+class Supervisor(Multiprocess):
+    """uvicorn's supervisor with in-place worker replacement.
+
+    uvicorn 0.30's ``keep_subprocess_alive`` deletes dead workers by a stale index while
+    iterating, so after a recycle it can start two replacements for one worker and the
+    pool grows. Replace each dead worker in its own slot instead.
+    """
+
+    def keep_subprocess_alive(self) -> None:
+        if self.should_exit.is_set():
+            return
+        for idx, process in enumerate(self.processes):
+            if process.is_alive():
+                continue
+            process.kill()  # hung rather than exited
+            process.join()
+            if self.should_exit.is_set():
+                return
+            logger.info(f"Worker [{process.pid}] exited, starting a replacement")
+            replacement = Process(self.config, self.target, self.sockets)
+            replacement.start()
+            self.processes[idx] = replacement
+
+
+def worker_count() -> int:
+    if settings.WEB_CONCURRENCY > 0:
+        return settings.WEB_CONCURRENCY
+    return max(1, min(os.cpu_count() or 1, settings.MAX_WORKERS))
+
+
+def preload() -> None:
+    """Run table creation and startup tasks in the launcher, before any worker starts."""
+
+    from app.core.database import engine
+    from app.core.startup_tasks import STARTUP_DONE_ENV, run_startup_once
+
+    run_startup_once(os.path.abspath(settings.UPLOADS_DIR))
+    # Workers are separate processes with their own pools; hold no connections here.
+    engine.dispose()
+    os.environ[STARTUP_DONE_ENV] = "1"
+
+
+def main() -> None:
+    reload = settings.SERVER_RELOAD
+    workers = 1 if reload else worker_count()
+    if settings.SERVER_PRELOAD and not reload:
+        preload()
+    if not reload:
+        from app.core.startup_tasks import start_inventory_snapshot_timer
+
+        start_inventory_snapshot_timer(settings.INVENTORY_SNAPSHOT_SECONDS)
+
+    config = uvicorn.Config(
+        "app.main:app",
+        host=settings.HOST,
+        port=settings.PORT,
+        workers=workers,
+        reload=reload,
+        limit_max_requests=settings.WORKER_MAX_REQUESTS or None,
+        timeout_graceful_shutdown=settings.WORKER_GRACEFUL_TIMEOUT or None,
+    )
+    server = uvicorn.Server(config)
+    print(f"[Server] {workers} worker(s) on {settings.HOST}:{settings.PORT}"
+          f"{' (reload)' if reload else ''}")
+
+    sock = config.bind_socket()
+    if reload:
+        ChangeReload(config, target=server.run, sockets=[sock]).run()
+    else:
+        # Supervise even a single worker, so recycling and SIGHUP restarts still work.
+        Supervisor(config, target=server.run, sockets=[sock]).run()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1 @@
+"""Benchmark harness: synthetic data generator and endpoint timings (see README.md)."""
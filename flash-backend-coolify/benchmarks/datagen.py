@@ -0,0 +1,333 @@
+"""
+Synthetic ERP data for the benchmark harness.
+
+``generate`` fills an empty database with a deterministic, roughly realistic data set:
+guards in ``employees2`` (a share of them mirrored in ``employees`` so the legacy payroll
+and inventory balances have something to join to), daily attendance over the last
+``months`` months, clients with contracts, sites, guard requirements and allocations,
+and general / restricted inventory with issue transactions and per-employee balances.
+
+Rows are written with Core ``INSERT ... executemany`` in chunks, so the large scale
+(5k guards, 12 months of attendance, ~1.7M rows) loads in about a minute on SQLite.
+The same ``seed`` and ``end_month`` always produce the same rows.
+"""
+
+import random
+from calendar import monthrange
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta
+from typing import Dict, List, Tuple
+
+from sqlalchemy import insert
+from sqlalchemy.orm import Session
+
+from app.models.client.client import Client
+from app.models.client.client_contract import ClientContract
+from app.models.client.client_guard_requirement import ClientGuardRequirement
+from app.models.client.client_site import ClientSite
+from app.models.client.client_site_guard_allocation import ClientSiteGuardAllocation
+from app.models.hr.attendance import AttendanceRecord
+from app.models.hr.employee import Employee
+from app.models.hr.employee2 import Employee2
+from app.models.inventory.general_item import GeneralItem
+from app.models.inventory.general_item_employee_balance import GeneralItemEmployeeBalance
+from app.models.inventory.general_item_transaction import GeneralItemTransaction
+from app.models.inventory.restricted_item import RestrictedItem
+from app.models.inventory.restricted_item_employee_balance import RestrictedItemEmployeeBalance
+from app.models.inventory.restricted_item_transaction import RestrictedItemTransaction
+
+CHUNK_SIZE = 5000
+
+
+@dataclass(frozen=True)
+class Scale:
+    employees: int
+    months: int
+    clients: int
+    sites_per_client: int
+    general_items: int
+    restricted_items: int
+    # Share of guards that are also legacy ``employees`` rows holding inventory.
+    inventory_holders: float
+    transactions_per_holder: int
+
+
+SCALES: Dict[str, Scale] = {
+    "tiny": Scale(
+        employees=200, months=2, clients=10, sites_per_client=2,
+        general_items=10, restricted_items=5, inventory_holders=0.3, transactions_per_holder=3,
+    ),
+    "small": Scale(
+        employees=1000, months=3, clients=40, sites_per_client=2,
+        general_items=25, restricted_items=10, inventory_holders=0.3, transactions_per_holder=4,
+    ),
+    "large": Scale(
+        employees=5000, months=12, clients=200, sites_per_client=3,
+        general_items=60, restricted_items=20, inventory_holders=0.3, transactions_per_holder=6,
+    ),
+}
+
+# Daily attendance mix; unmarked days are simply missing rows.
+_STATUS_WEIGHTS: List[Tuple[str, float]] = [
+    ("present", 0.80),
+    ("late", 0.05),
+    ("absent", 0.04),
+    ("leave", 0.04),
+    (None, 0.07),
+]
+
+_FIRST_NAMES = ["Ahmed", "Ali", "Bilal", "Faisal", "Hamza", "Imran", "Kashif", "Naveed", "Omar", "Shahid", "Tariq", "Usman", "Waqas", "Zubair"]
+_LAST_NAMES = ["Khan", "Malik", "Hussain", "Iqbal", "Raza", "Shah", "Butt", "Chaudhry", "Qureshi", "Abbasi"]
+_CITIES = ["Lahore", "Karachi", "Islamabad", "Rawalpindi", "Peshawar", "Multan", "Faisalabad"]
+_RANKS = ["Guard", "Guard", "Guard", "Lady Guard", "Supervisor", "Driver"]
+
+
+def month_range(end_month: str, months: int) -> Tuple[date, date]:
+    """First day of the earliest month and last day of ``end_month`` (``YYYY-MM``)."""
+
+    y, m = map(int, end_month.split("-"))
+    end = date(y, m, monthrange(y, m)[1])
+    for _ in range(months - 1):
+        y, m = (y - 1, 12) if m == 1 else (y, m - 1)
+    return date(y, m, 1), end
+
+
+def _insert(db: Session, model, rows: List[dict]) -> None:
+    table = model.__table__
+    for i in range(0, len(rows), CHUNK_SIZE):
+        db.execute(insert(table), rows[i:i + CHUNK_SIZE])
+
+
+def employee_key(index: int) -> str:
+    """Attendance / inventory key of the ``index``-th guard (``Employee2.fss_no``)."""
+
+    return f"FSS-{index:05d}"
+
+
+def _employees(db: Session, rnd: random.Random, scale: Scale, start: date) -> List[str]:
+    created = datetime.combine(start - timedelta(days=30), datetime.min.time())
+    rows = []
+    for i in range(1, scale.employees + 1):
+        first, last = rnd.choice(_FIRST_NAMES), rnd.choice(_LAST_NAMES)
+        rows.append(
+            {
+                "serial_no": str(i),
+                "fss_no": employee_key(i),
+                "employee_id": f"E{i:05d}",
+                "name": f"{first} {last}",
+                "father_name": f"{rnd.choice(_FIRST_NAMES)} {last}",
+                "rank": rnd.choice(_RANKS),
+                "salary": str(rnd.randrange(28000, 60000, 500)),
+                "status": rnd.choice(["Army", "Civil", "PAF", "Navy"]),
+                "unit": rnd.choice(_CITIES),
+                "cnic": f"{rnd.randrange(10000, 99999)}-{rnd.randrange(1000000, 9999999)}-{rnd.randrange(1, 9)}",
+                "mobile_no": f"03{rnd.randrange(0, 99999999):09d}",
+                "district": rnd.choice(_CITIES),
+                "category": rnd.choice(["Operational Staff", "Operational Staff", "Office Staff"]),
+                "designation": "Security Guard",
+                "allocation_status": "Free",
+                "created_at": created,
+            }
+        )
+    _insert(db, Employee2, rows)
+    return [r["fss_no"] for r in rows]
+
+
+def _legacy_employees(db: Session, rnd: random.Random, keys: List[str]) -> None:
+    rows = []
+    for key in keys:
+        salary = rnd.randrange(28000, 60000, 500)
+        rows.append(
+            {
+                "employee_id": key,
+                "first_name": rnd.choice(_FIRST_NAMES),
+                "last_name": rnd.choice(_LAST_NAMES),
+                "basic_salary": str(salary),
+                "total_salary": str(salary),
+                "employment_status": "Active",
+            }
+        )
+    _insert(db, Employee, rows)
+
+
+def _attendance(db: Session, rnd: random.Random, keys: List[str], start: date, end: date) -> int:
+    statuses = [s for s, _ in _STATUS_WEIGHTS]
+    weights = [w for _, w in _STATUS_WEIGHTS]
+    total = 0
+    day = start
+    while day <= end:
+        rows = []
+        picks = rnd.choices(statuses, weights=weights, k=len(keys))
+        for key, status in zip(keys, picks):
+            if status is None:
+                continue
+            # executemany needs the same keys in every row.
+            row = {
+                "employee_id": key,
+                "date": day,
+                "status": status,
+                "late_minutes": None,
+                "leave_type": None,
+                "overtime_minutes": None,
+            }
+            if status == "late":
+                row["late_minutes"] = rnd.randrange(5, 90, 5)
+            elif status == "leave":
+                row["leave_type"] = rnd.choice(["paid", "unpaid"])
+            elif status == "present" and rnd.random() < 0.05:
+                row["overtime_minutes"] = rnd.randrange(60, 480, 30)
+            rows.append(row)
+        _insert(db, AttendanceRecord, rows)
+        total += len(rows)
+        day += timedelta(days=1)
+    return total
+
+
+def _clients(db: Session, rnd: random.Random, scale: Scale, employee_count: int, start: date, end: date) -> Dict[str, int]:
+    clients, contracts, sites, requirements = [], [], [], []
+    for c in range(1, scale.clients + 1):
+        clients.append(
+            {
+                "id": c,
+                "client_code": f"CL-{c:04d}",
+                "client_name": f"Client {c}",
+                "client_type": rnd.choice(["Corporate", "Corporate", "Government", "Individual"]),
+                "industry_type": rnd.choice(["Bank", "Hospital", "Commercial", "Industrial", "Residential"]),
+                "status": "Active",
+                "location": rnd.choice(_CITIES),
+            }
+        )
+        contracts.append(
+            {
+                "id": c,
+                "client_id": c,
+                "contract_number": f"CT-{c:04d}",
+                "start_date": start - timedelta(days=rnd.randrange(0, 365)),
+                "end_date": end + timedelta(days=rnd.randrange(30, 365)),
+                "contract_type": "Guarding",
+                "billing_cycle": "Monthly",
+                "monthly_cost": float(rnd.randrange(200000, 3000000, 10000)),
+                "status": "Active",
+            }
+        )
+        for s in range(scale.sites_per_client):
+            site_id = (c - 1) * scale.sites_per_client + s + 1
+            sites.append(
+                {
+                    "id": site_id,
+                    "client_id": c,
+                    "site_name": f"Client {c} site {s + 1}",
+                    "site_type": rnd.choice(["Office", "Factory", "Warehouse", "ATM"]),
+                    "city": rnd.choice(_CITIES),
+                    "risk_level": rnd.choice(["Low", "Medium", "High"]),
+                    "status": "Active",
+                }
+            )
+            requirements.append(
+                {
+                    "id": site_id,
+                    "site_id": site_id,
+                    "guard_type": rnd.choice(["Armed", "Unarmed", "Supervisor"]),
+                    "number_of_guards": rnd.randrange(2, 12),
+                    "shift_type": rnd.choice(["Day", "Night", "Rotational"]),
+                    "monthly_amount": float(rnd.randrange(35000, 70000, 1000)),
+                }
+            )
+
+    _insert(db, Client, clients)
+    _insert(db, ClientContract, contracts)
+    _insert(db, ClientSite, sites)
+    _insert(db, ClientGuardRequirement, requirements)
+
+    # About 70% of guards are allocated to a site; a fifth of those moved on mid-period.
+    span = (end - start).days
+    allocations = []
+    for emp_db_id in range(1, employee_count + 1):
+        if rnd.random() >= 0.7:
+            continue
+        site = rnd.choice(sites)
+        alloc_start = start + timedelta(days=rnd.randrange(0, max(1, span // 2)))
+        alloc_end = alloc_start + timedelta(days=rnd.randrange(30, max(31, span))) if rnd.random() < 0.2 else None
+        allocations.append(
+            {
+                "site_id": site["id"],
+                "contract_id": site["client_id"],
+                "requirement_id": site["id"],
+                "employee_db_id": emp_db_id,
+                "start_date": alloc_start,
+                "end_date": alloc_end,
+                "status": "Released" if alloc_end and alloc_end < end else "Allocated",
+            }
+        )
+    _insert(db, ClientSiteGuardAllocation, allocations)
+    return {"clients": len(clients), "sites": len(sites), "allocations": len(allocations)}
+
+
+def _inventory(db: Session, rnd: random.Random, scale: Scale, holders: List[str], start: date, end: date) -> Dict[str, int]:
+    general = [
+        {
+            "item_code": f"GEN-{i:03d}",
+            "category": rnd.choice(["bag", "walkie_talkie", "uniform", "flashlight", "other"]),
+            "name": f"General item {i}",
+            "unit_name": "unit",
+            "quantity_on_hand": float(rnd.randrange(500, 5000)),
+            "status": "Active",
+        }
+        for i in range(1, scale.general_items + 1)
+    ]
+    restricted = [
+        {
+            "item_code": f"RES-{i:03d}",
+            "category": rnd.choice(["ammo", "tactical", "equipment"]),
+            "name": f"Restricted item {i}",
+            "is_serial_tracked": False,
+            "unit_name": rnd.choice(["round", "box", "pcs"]),
+            "quantity_on_hand": float(rnd.randrange(1000, 20000)),
+            "status": "Active",
+        }
+        for i in range(1, scale.restricted_items + 1)
+    ]
+    _insert(db, GeneralItem, general)
+    _insert(db, RestrictedItem, restricted)
+
+    span_seconds = int((end - start).total_seconds()) + 86400
+    epoch = datetime.combine(start, datetime.min.time())
+    g_tx, r_tx = [], []
+    g_bal: Dict[Tuple[str, str], float] = {}
+    r_bal: Dict[Tuple[str, str], float] = {}
+    for key in holders:
+        for _ in range(scale.transactions_per_holder):
+            at = epoch + timedelta(seconds=rnd.randrange(span_seconds))
+            if rnd.random() < 0.75:
+                code = rnd.choice(general)["item_code"]
+                qty = float(rnd.randrange(1, 4))
+                g_tx.append({"item_code": code, "employee_id": key, "action": "ISSUE", "quantity": qty, "created_at": at})
+                g_bal[(key, code)] = g_bal.get((key, code), 0.0) + qty
+            else:
+                code = rnd.choice(restricted)["item_code"]
+                qty = float(rnd.randrange(10, 60))
+                r_tx.append({"item_code": code, "employee_id": key, "action": "ISSUE", "quantity": qty, "created_at": at})
+                r_bal[(key, code)] = r_bal.get((key, code), 0.0) + qty
+
+    _insert(db, GeneralItemTransaction, g_tx)
+    _insert(db, RestrictedItemTransaction, r_tx)
+    _insert(db, GeneralItemEmployeeBalance, [{"employee_id": k, "item_code": c, "quantity_issued": q} for (k, c), q in g_bal.items()])
+    _insert(db, RestrictedItemEmployeeBalance, [{"employee_id": k, "item_code": c, "quantity_issued": q} for (k, c), q in r_bal.items()])
+    return {"inventory_transactions": len(g_tx) + len(r_tx), "inventory_balances": len(g_bal) + len(r_bal)}
+
+
+def generate(db: Session, scale: Scale, *, end_month: str, seed: int = 1) -> Dict[str, int]:
+    """Insert the synthetic data set and commit. Returns row counts per entity."""
+
+    rnd = random.Random(seed)
+    start, end = month_range(end_month, scale.months)
+
+    keys = _employees(db, rnd, scale, start)
+    holders = keys[: int(len(keys) * scale.inventory_holders)]
+    _legacy_employees(db, rnd, holders)
+    counts: Dict[str, int] = {"employees2": len(keys), "employees": len(holders)}
+    counts["attendance"] = _attendance(db, rnd, keys, start, end)
+    counts.update(_clients(db, rnd, scale, len(keys), start, end))
+    counts.update(_inventory(db, rnd, scale, holders, start, end))
+    db.commit()
+    return counts
@@ -0,0 +1,308 @@
+"""
+Benchmark runner.
+
+    python -m benchmarks.run --scale large --out bench.json
+    python -m benchmarks.run --scale large --reuse --compare bench.json
+
+Seeds a database with ``benchmarks.datagen`` (a fresh SQLite file by default, or the
+throwaway database given with ``--database-url``), then drives the real application
+in-process through ``TestClient`` and times each case. Results (latency percentiles,
+response size, SQL statements and DB time from the ``Server-Timing`` header) are
+written to JSON; ``--compare`` checks them against an earlier file and exits with
+status 1 when a case regressed.
+"""
+
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, List, Optional
+
+_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, _ROOT)
+
+
+class Case:
+    """One timed request. ``body`` gets the iteration number so writes can alternate."""
+
+    def __init__(self, name: str, method: str, path: str, params: Optional[dict] = None,
+                 body: Optional[Callable[[int], Any]] = None):
+        self.name = name
+        self.method = method
+        self.path = path
+        self.params = params or {}
+        self.body = body
+
+
+def _month_bounds(month: str):
+    from benchmarks.datagen import month_range
+    return month_range(month, 1)
+
+
+def _previous_month(month: str) -> str:
+    first, _ = _month_bounds(month)
+    return (first - timedelta(days=1)).strftime("%Y-%m")
+
+
+def build_cases(end_month: str, upsert_size: int) -> List[Case]:
+    from benchmarks.datagen import employee_key
+
+    first, last = _month_bounds(end_month)
+    next_first = (last + timedelta(days=1)).isoformat()
+
+    def attendance_payload(i: int) -> dict:
+        status = "present" if i % 2 == 0 else "late"
+        return {
+            "date": last.isoformat(),
+            "records": [{"employee_id": employee_key(n), "status": status} for n in range(1, upsert_size + 1)],
+        }
+
+    return [
+        Case(
+            "payroll2_range_report",
+            "GET",
+            "/api/_bench/payroll2/range-report",
+            {"from_date": first.isoformat(), "to_date": next_first, "month": end_month},
+        ),
+        Case(
+            "clients_compare_months_all",
+            "GET",
+            "/api/client-management/clients/compare-months/all",
+            {"month1": _previous_month(end_month), "month2": end_month},
+        ),
+        Case(
+            "analytics_dashboard",
+            "GET",
+            "/api/analytics/dashboard",
+            {"from_date": first.isoformat(), "to_date": last.isoformat()},
+        ),
+        Case("attendance_bulk_upsert", "PUT", "/api/employees/", body=attendance_payload),
+        Case("export_accounts_monthly_pdf", "GET", "/api/exports/accounts/monthly/pdf", {"month": end_month}),
+        Case("export_inventory_employees_pdf", "GET", "/api/exports/inventory/employees/pdf", {"include_zero": "false"}),
+    ]
+
+
+def _percentile(values: List[float], pct: float) -> float:
+    ordered = sorted(values)
+    index = max(0, min(len(ordered) - 1, int(round(pct / 100.0 * len(ordered) + 0.5)) - 1))
+    return ordered[index]
+
+
+def _parse_server_timing(header: Optional[str]) -> Dict[str, float]:
+    # app;dur=12.3, db;dur=4.5;desc="17 queries"
+    out: Dict[str, float] = {}
+    for part in (header or "").split(","):
+        fields = [f.strip() for f in part.split(";")]
+        name = fields[0]
+        for f in fields[1:]:
+            if f.startswith("dur="):
+                out[f"{name}_ms"] = float(f[4:])
+            elif f.startswith("desc=") and f.endswith('queries"'):
+                out["statements"] = float(f[6:].split()[0])
+    return out
+
+
+def run_case(client, case: Case, iterations: int, warmup: int) -> Dict[str, Any]:
+    timings: List[float] = []
+    statements: List[float] = []
+    db_ms: List[float] = []
+    size = 0
+    wire_bytes = 0
+    encoding = None
+    status = None
+    for i in range(warmup + iterations):
+        kwargs: Dict[str, Any] = {"params": case.params}
+        if case.body is not None:
+            kwargs["json"] = case.body(i)
+        started = time.perf_counter()
+        resp = client.request(case.method, case.path, **kwargs)
+        elapsed = (time.perf_counter() - started) * 1000
+        status = resp.status_code
+        if status >= 400:
+            return {"method": case.method, "path": case.path, "status": status, "error": resp.text[:500]}
+        if i < warmup:
+            continue
+        timing = _parse_server_timing(resp.headers.get("server-timing"))
+        timings.append(elapsed)
+        statements.append(timing.get("statements", 0.0))
+        db_ms.append(timing.get("db_ms", 0.0))
+        size = len(resp.content)
+        wire_bytes = resp.num_bytes_downloaded
+        encoding = resp.headers.get("content-encoding")
+
+    return {
+        "method": case.method,
+        "path": case.path,
+        "status": status,
+        "iterations": iterations,
+        "median_ms": round(_percentile(timings, 50), 2),
+        "p95_ms": round(_percentile(timings, 95), 2),
+        "min_ms": round(min(timings), 2),
+        "max_ms": round(max(timings), 2),
+        "mean_ms": round(sum(timings) / len(timings), 2),
+        "bytes": size,
+        "wire_bytes": wire_bytes,
+        "content_encoding": encoding,
+        "sql_statements": int(_percentile(statements, 50)),
+        "db_ms": round(_percentile(db_ms, 50), 2),
+    }
+
+
+def compare(current: Dict[str, Any], baseline: Dict[str, Any], threshold: float, min_delta_ms: float) -> List[str]:
+    """Print a comparison table and return the names of regressed cases."""
+
+    regressions = []
+    print(f"\n{'case':34} {'base ms':>10} {'now ms':>10} {'change':>8} {'base sql':>9} {'now sql':>8}")
+    for name, now in current["cases"].items():
+        base = baseline.get("cases", {}).get(name)
+        if not base or "median_ms" not in base or "median_ms" not in now:
+            print(f"{name:34} {'-':>10} {now.get('median_ms', '-'):>10}")
+            continue
+        change = now["median_ms"] / base["median_ms"] - 1 if base["median_ms"] else 0.0
+        slower = change > threshold and now["median_ms"] - base["median_ms"] > min_delta_ms
+        more_sql = now["sql_statements"] > base["sql_statements"]
+        flag = "  REGRESSION" if slower or more_sql else ""
+        if flag:
+            regressions.append(name)
+        print(
+            f"{name:34} {base['median_ms']:>10.1f} {now['median_ms']:>10.1f} {change:>+8.0%} "
+            f"{base['sql_statements']:>9} {now['sql_statements']:>8}{flag}"
+        )
+    return regressions
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        out = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=_ROOT, capture_output=True, text=True, timeout=5
+        )
+        return out.stdout.strip() or None
+    except Exception:
+        return None
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Seed synthetic ERP data and time key endpoints.")
+    parser.add_argument("--scale", default="small", help="tiny, small or large (see benchmarks.datagen.SCALES)")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--end-month", default="2025-12", help="last month of generated data (YYYY-MM)")
+    parser.add_argument("--database-url", help="throwaway database to seed (default: a SQLite file in the temp dir)")
+    parser.add_argument("--reuse", action="store_true", help="keep data already in the database instead of seeding")
+    parser.add_argument("--iterations", type=int, default=5)
+    parser.add_argument("--warmup", type=int, default=1)
+    parser.add_argument("--upsert-size", type=int, default=500, help="records per attendance bulk upsert")
+    parser.add_argument("--case", action="append", help="run only these cases (repeatable)")
+    parser.add_argument("--out", help="write results to this JSON file")
+    parser.add_argument("--compare", help="baseline JSON file to compare against")
+    parser.add_argument("--threshold", type=float, default=0.2, help="allowed median slowdown before flagging (0.2 = 20%%)")
+    parser.add_argument("--min-delta-ms", type=float, default=5.0, help="ignore slowdowns smaller than this")
+    args = parser.parse_args(argv)
+
+    url = args.database_url
+    if not url:
+        path = os.path.join(tempfile.gettempdir(), f"flash-bench-{args.scale}-{args.seed}.db")
+        if os.path.exists(path) and not args.reuse:
+            os.remove(path)
+        url = "sqlite:///" + path.replace("\\", "/")
+
+    # Settings are read when app.core.config is first imported (app.models, benchmarks.datagen
+    # and app.main all pull it in), so configure the environment before any of those imports.
+    os.environ["DATABASE_URL"] = url
+    os.environ["METRICS_ENABLED"] = "true"
+    os.environ["SERVER_TIMING_ENABLED"] = "true"
+
+    from app.core.config import _normalize_database_url, settings
+
+    if settings.DATABASE_URL != _normalize_database_url(url):
+        print("Settings did not pick up the benchmark database; refusing to seed the configured one.")
+        return 2
+
+    from fastapi.testclient import TestClient
+
+    from app.api.dependencies import get_current_user
+    from app.api.routes.hr.payroll2 import router as payroll2_router
+    from app.core.database import SessionLocal, engine
+    from app.main import app
+    from app.models.core.user import User
+    from app.models.hr.employee2 import Employee2
+    from benchmarks.datagen import SCALES, generate
+
+    if args.scale not in SCALES:
+        parser.error(f"--scale must be one of {', '.join(sorted(SCALES))}")
+
+    db = SessionLocal()
+    try:
+        existing = db.query(Employee2.id).limit(1).first()
+        counts = None
+        if existing and not args.reuse:
+            print("Database already has employees; pass --reuse or point --database-url at an empty database.")
+            return 2
+        if not existing:
+            started = time.perf_counter()
+            counts = generate(db, SCALES[args.scale], end_month=args.end_month, seed=args.seed)
+            print(f"Seeded {counts} in {time.perf_counter() - started:.1f}s")
+    finally:
+        db.close()
+
+    # payroll's /range-report is registered first under /api/employees and shadows payroll2's,
+    # so mount payroll2 on its own prefix for the benchmark.
+    app.include_router(payroll2_router, prefix="/api/_bench/payroll2")
+    app.dependency_overrides[get_current_user] = lambda: User(id=1, username="bench", is_active=True, is_superuser=True)
+
+    cases = build_cases(args.end_month, min(args.upsert_size, SCALES[args.scale].employees))
+    if args.case:
+        cases = [c for c in cases if c.name in set(args.case)]
+
+    results: Dict[str, Any] = {
+        "meta": {
+            "created_at": datetime.now().astimezone().isoformat(timespec="seconds"),
+            "git_commit": _git_commit(),
+            "scale": args.scale,
+            "seed": args.seed,
+            "end_month": args.end_month,
+            "database": engine.dialect.name,
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "iterations": args.iterations,
+            "rows": counts,
+        },
+        "cases": {},
+    }
+
+    with TestClient(app) as client:
+        for case in cases:
+            result = run_case(client, case, args.iterations, args.warmup)
+            results["cases"][case.name] = result
+            if "error" in result:
+                print(f"{case.name:34} HTTP {result['status']}: {result['error'][:120]}")
+            else:
+                print(
+                    f"{case.name:34} median {result['median_ms']:>9.1f} ms  p95 {result['p95_ms']:>9.1f} ms  "
+                    f"{result['sql_statements']:>5} sql  {result['bytes']:>10} bytes  {result['wire_bytes']:>9} on the wire"
+                )
+
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+        print(f"Results written to {args.out}")
+
+    status = 0
+    if any("error" in r for r in results["cases"].values()):
+        status = 1
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, args.threshold, args.min_delta_ms)
+        if regressions:
+            print(f"\nRegressed: {', '.join(regressions)}")
+            status = 1
+    return status
+
+
+if __name__ == "__main__":
+    sys.exit(main())
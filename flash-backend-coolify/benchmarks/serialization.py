@@ -0,0 +1,120 @@
+"""
+Serialization and compression benchmark for the payroll report.
+
+    python -m benchmarks.serialization --scale large --month 2025-12
+
+Builds the payroll report once (seeding a benchmark database like ``benchmarks.run`` when
+it is empty), then measures the CPU time of each way of turning it into a response body
+and the size of that body raw, gzip-compressed and (if ``brotli`` is installed)
+Brotli-compressed.
+"""
+
+import argparse
+import asyncio
+import gzip
+import json
+import os
+import sys
+import tempfile
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, _ROOT)
+
+
+def _cpu_ms(fn: Callable[[], Any], repeat: int) -> float:
+    """Median CPU time of ``fn`` in ms over ``repeat`` runs."""
+
+    samples: List[float] = []
+    for _ in range(repeat):
+        started = time.process_time()
+        fn()
+        samples.append((time.process_time() - started) * 1000)
+    samples.sort()
+    return samples[len(samples) // 2]
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Time JSON serialization and compression of the payroll report.")
+    parser.add_argument("--scale", default="small", help="tiny, small or large (see benchmarks.datagen.SCALES)")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--month", default="2025-12", help="report month; also the last seeded month")
+    parser.add_argument("--database-url", help="database to read (default: the benchmarks.run SQLite file)")
+    parser.add_argument("--repeat", type=int, default=10)
+    parser.add_argument("--out", help="write results to this JSON file")
+    args = parser.parse_args(argv)
+
+    url = args.database_url or "sqlite:///" + os.path.join(
+        tempfile.gettempdir(), f"flash-bench-{args.scale}-{args.seed}.db"
+    ).replace("\\", "/")
+    os.environ["DATABASE_URL"] = url
+
+    from app.core.config import _normalize_database_url, settings
+
+    if settings.DATABASE_URL != _normalize_database_url(url):
+        print("Settings did not pick up the benchmark database; refusing to seed the configured one.")
+        return 2
+
+    import app.main  # noqa: F401  (creates tables)
+    from fastapi.encoders import jsonable_encoder
+    from fastapi.responses import JSONResponse
+
+    from app.api.routes.hr.payroll import build_payroll_report
+    from app.core.compression import brotli
+    from app.core.database import SessionLocal
+    from app.core.responses import orjson
+    from app.models.hr.employee2 import Employee2
+    from benchmarks.datagen import SCALES, generate
+
+    db = SessionLocal()
+    try:
+        if not db.query(Employee2.id).limit(1).first():
+            generate(db, SCALES[args.scale], end_month=args.month, seed=args.seed)
+        report = asyncio.run(build_payroll_report(month=args.month, db=db))
+    finally:
+        db.close()
+
+    # FastAPI's path for a returned model without a custom response class:
+    # jsonable_encoder, then json.dumps in JSONResponse.render.
+    serializers: Dict[str, Callable[[], bytes]] = {
+        "fastapi_default": lambda: JSONResponse(content=None).render(jsonable_encoder(report)),
+        "model_dump_json": lambda: report.model_dump_json().encode("utf-8"),
+    }
+    if orjson is not None:
+        serializers["orjson_jsonable"] = lambda: orjson.dumps(jsonable_encoder(report))
+        serializers["orjson_model_dump"] = lambda: orjson.dumps(report.model_dump(mode="json"))
+
+    results: Dict[str, Any] = {"month": args.month, "scale": args.scale, "rows": len(report.rows), "serializers": {}, "compression": {}}
+    print(f"payroll report {args.month}: {len(report.rows)} rows")
+    body = b""
+    for name, fn in serializers.items():
+        body = fn()
+        ms = _cpu_ms(fn, args.repeat)
+        results["serializers"][name] = {"cpu_ms": round(ms, 2), "bytes": len(body)}
+        print(f"  {name:20} {ms:>9.2f} ms cpu  {len(body):>10} bytes")
+
+    compressors: Dict[str, Callable[[bytes], bytes]] = {
+        "identity": lambda data: data,
+        "gzip-1": lambda data: gzip.compress(data, compresslevel=1),
+        "gzip-6": lambda data: gzip.compress(data, compresslevel=6),
+        "gzip-9": lambda data: gzip.compress(data, compresslevel=9),
+    }
+    if brotli is not None:
+        for quality in (1, 4, 11):
+            compressors[f"br-{quality}"] = lambda data, q=quality: brotli.compress(data, quality=q)
+    for name, fn in compressors.items():
+        size = len(fn(body))
+        ms = _cpu_ms(lambda: fn(body), args.repeat)
+        results["compression"][name] = {"cpu_ms": round(ms, 2), "bytes": size}
+        print(f"  {name:20} {ms:>9.2f} ms cpu  {size:>10} bytes")
+
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+        print(f"Results written to {args.out}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
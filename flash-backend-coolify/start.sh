@@ -1,3 +1,3 @@
 #!/bin/bash
 # Start backend
-cd /app && uvicorn app.main:app --host 0.0.0.0 --port 8000
+cd /app && exec python -m app.server
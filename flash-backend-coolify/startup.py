@@ -49,15 +49,9 @@ if __name__ == "__main__":
     print(f"🌐 Starting server on port {port}")
     
     try:
-        import uvicorn
-        from app.main import app
+        from app.server import main as run_server
         
-        uvicorn.run(
-            app,
-            host="0.0.0.0",
-            port=port,
-            log_level="info"
-        )
+        run_server()
     except ImportError as e:
         print(f"❌ Failed to import application: {e}")
         sys.exit(1)
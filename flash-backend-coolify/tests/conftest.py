@@ -0,0 +1,56 @@
+import os
+import sys
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+# Add project root to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import app.models  # noqa: E402,F401  (registers every table on Base.metadata)
+from app.core.database import Base  # noqa: E402
+from app.models.core.user import User  # noqa: E402
+
+
+@pytest.fixture
+def db(tmp_path):
+    """Session on a fresh SQLite database with every table created."""
+
+    engine = create_engine(f"sqlite:///{tmp_path / 'test.db'}", connect_args={"check_same_thread": False})
+    Base.metadata.create_all(bind=engine)
+    session = sessionmaker(autocommit=False, autoflush=False, bind=engine)()
+    try:
+        yield session
+    finally:
+        session.close()
+        engine.dispose()
+
+
+def superuser() -> User:
+    return User(id=1, username="testuser", is_active=True, is_superuser=True)
+
+
+@pytest.fixture
+def make_client(db):
+    """Build a TestClient for a bare app with ``(router, prefix)`` pairs mounted on ``db``.
+
+    Routers are mounted on their own so that catch-all routes of the full app (e.g.
+    ``/api/employees/{employee_id}``) do not shadow the route under test.
+    """
+
+    from fastapi import FastAPI
+    from fastapi.testclient import TestClient
+
+    from app.api.dependencies import get_current_user
+    from app.core.database import get_db
+
+    def _make(*routers):
+        app = FastAPI()
+        for router, prefix in routers:
+            app.include_router(router, prefix=prefix)
+        app.dependency_overrides[get_db] = lambda: db
+        app.dependency_overrides[get_current_user] = superuser
+        return TestClient(app)
+
+    return _make
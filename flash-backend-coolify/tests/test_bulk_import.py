@@ -0,0 +1,49 @@
+import json
+
+from app.api.routes.hr.employees2 import router
+from app.core.bulk_import import SkipRow, run_bulk_import
+from app.models.hr.employee2 import Employee2
+
+
+def test_import_json_counts_only_nameless_rows_as_skipped(db, make_client):
+    rows = [
+        {"A": "#", "B": "FSS #", "D": "Name"},  # header
+        {},  # blank
+        {"A": "Guards"},  # category marker
+        {"A": "1", "B": "F1"},  # no name
+        {"A": "2", "B": "F2", "D": "Ali Raza", "N": "35202-1111111-1"},
+        {"A": "3", "B": "F2", "D": "Ali Again"},  # FSS # seen earlier in the file
+    ]
+    client = make_client((router, "/api/employees2"))
+
+    res = client.post(
+        "/api/employees2/import-json",
+        files={"file": ("employees.json", json.dumps(rows).encode("utf-8"), "application/json")},
+    )
+    assert res.status_code == 200, res.text
+    body = res.json()
+    assert (body["created"], body["skipped"], body["duplicates"], body["total_rows"]) == (1, 1, 1, 6)
+
+    (employee,) = db.query(Employee2).all()
+    assert (employee.name, employee.fss_no, employee.category) == ("Ali Raza", "F2", "Guards")
+
+
+def test_batches_commit_together_and_bad_rows_are_isolated(db, monkeypatch):
+    def parse(idx, row):
+        if row is None:
+            raise SkipRow()
+        return {"name": row or None, "fss_no": f"F{idx}"}
+
+    commits = []
+    monkeypatch.setattr(db, "commit", lambda: commits.append(True))
+
+    # batch_size=1 gives one savepoint per row; the NULL name fails inside its own.
+    result = run_bulk_import(db, Employee2, ["A", None, "B", ""], parse, batch_size=1)
+    assert result["created"] == 2
+    assert result["skipped"] == 1
+    assert [e["row"] for e in result["errors"]] == [3]
+    assert commits == [True]
+
+    # Nothing was committed by the savepoints on their own.
+    db.rollback()
+    assert db.query(Employee2).count() == 0
@@ -0,0 +1,90 @@
+import gzip
+
+import pytest
+from fastapi import FastAPI, Response
+from fastapi.responses import StreamingResponse
+from fastapi.testclient import TestClient
+
+from app.core.compression import CompressionMiddleware, choose_encoding, compress
+
+BIG = b'{"rows": [' + b",".join(b'{"id": %d}' % i for i in range(200)) + b"]}"
+
+
+@pytest.fixture
+def client():
+    app = FastAPI()
+    app.add_middleware(CompressionMiddleware, minimum_size=500)
+
+    @app.get("/json")
+    def big_json():
+        return Response(BIG, media_type="application/json", headers={"ETag": '"v1"', "Vary": "Origin"})
+
+    @app.get("/small")
+    def small_json():
+        return Response(b'{"ok": true}', media_type="application/json")
+
+    @app.get("/pdf")
+    def pdf():
+        return Response(b"%PDF" + b"x" * 2000, media_type="application/pdf")
+
+    @app.get("/encoded")
+    def already_encoded():
+        return Response(gzip.compress(BIG), media_type="application/json", headers={"Content-Encoding": "gzip"})
+
+    @app.get("/status/{code}")
+    def bare_status(code: int):
+        return Response(BIG if code == 206 else None, status_code=code, media_type="application/json")
+
+    @app.get("/stream")
+    def stream():
+        return StreamingResponse(iter([BIG, BIG]), media_type="text/csv")
+
+    return TestClient(app)
+
+
+def _get(client, path, accept="gzip, deflate"):
+    return client.get(path, headers={"Accept-Encoding": accept})
+
+
+def test_large_text_response_is_gzipped_with_matching_headers(client):
+    res = _get(client, "/json")
+    assert res.headers["content-encoding"] == "gzip"
+    assert res.content == BIG  # decoded by the client
+    assert int(res.headers["content-length"]) == len(compress(BIG, "gzip")) < len(BIG)
+    assert res.headers["etag"] == 'W/"v1"'
+    assert res.headers["vary"] == "Origin, Accept-Encoding"
+
+
+def test_streamed_response_is_compressed_chunk_by_chunk(client):
+    res = _get(client, "/stream")
+    assert res.headers["content-encoding"] == "gzip"
+    assert "content-length" not in res.headers
+    assert res.content == BIG + BIG
+
+
+@pytest.mark.parametrize(
+    "path",
+    ["/small", "/pdf", "/status/204", "/status/304", "/status/206"],
+)
+def test_skipped_responses_are_sent_as_is(client, path):
+    res = _get(client, path)
+    assert "content-encoding" not in res.headers
+    assert "vary" not in res.headers
+
+
+def test_existing_content_encoding_is_left_alone(client):
+    res = _get(client, "/encoded")
+    assert res.headers["content-encoding"] == "gzip"
+    assert res.content == BIG
+
+
+def test_nothing_is_compressed_for_clients_that_do_not_ask(client):
+    assert "content-encoding" not in _get(client, "/json", accept="identity").headers
+    assert "content-encoding" not in _get(client, "/json", accept="gzip;q=0").headers
+
+
+def test_choose_encoding():
+    assert choose_encoding("gzip, deflate") == "gzip"
+    assert choose_encoding("*") == "gzip"
+    assert choose_encoding("gzip;q=0, identity") is None
+    assert choose_encoding("") is None
@@ -0,0 +1,126 @@
+import json
+
+from app.api.routes.hr.employees2 import router
+from app.core.employee_mapping import (
+    get_legacy_employee_ids,
+    invalidate_legacy_employee_map,
+    refresh_legacy_employee_map,
+)
+from app.models.hr.employee import Employee
+from app.models.hr.employee2 import Employee2
+from app.models.hr.employee_legacy_map import EmployeeLegacyMap
+
+
+def _legacy(db, employee_id, first, last, cnic=None):
+    db.add(Employee(employee_id=employee_id, first_name=first, last_name=last, cnic=cnic))
+
+
+def _employee2(db, name, **kwargs):
+    e = Employee2(name=name, **kwargs)
+    db.add(e)
+    db.flush()
+    return e
+
+
+def test_name_match_ignores_padding_and_empty_last_name(db):
+    _legacy(db, "SEC-0001", "  Sara ", " Khan  ")
+    _legacy(db, "SEC-0002", "Ali", "")
+    sara = _employee2(db, "sara   KHAN")
+    ali = _employee2(db, "Ali")
+    nobody = _employee2(db, "Nobody Here")
+    db.commit()
+
+    assert get_legacy_employee_ids(db, [sara, ali, nobody]) == {
+        sara.id: "SEC-0001",
+        ali.id: "SEC-0002",
+        nobody.id: None,
+    }
+    methods = dict(db.query(EmployeeLegacyMap.employee2_id, EmployeeLegacyMap.match_method))
+    assert methods == {sara.id: "name", ali.id: "name", nobody.id: None}
+
+
+def test_cnic_wins_over_name(db):
+    _legacy(db, "SEC-0001", "Sara", "Khan")
+    _legacy(db, "SEC-0002", "Other", "Person", cnic="35202-1234567-1")
+    e = _employee2(db, "Sara Khan", cnic="35202-1234567-1")
+    db.commit()
+
+    assert get_legacy_employee_ids(db, [e]) == {e.id: "SEC-0002"}
+
+
+def test_refresh_twice_upserts_instead_of_conflicting(db):
+    e = _employee2(db, "Sara Khan")
+    db.commit()
+    assert refresh_legacy_employee_map(db, [e]) == {e.id: None}
+    db.commit()
+
+    # A second resolver (e.g. a concurrent cold lookup) writes the same key again.
+    _legacy(db, "SEC-0001", "Sara", "Khan")
+    db.flush()
+    assert refresh_legacy_employee_map(db, [e]) == {e.id: "SEC-0001"}
+    db.commit()
+
+    rows = db.query(EmployeeLegacyMap).all()
+    assert [(r.employee2_id, r.legacy_employee_id) for r in rows] == [(e.id, "SEC-0001")]
+
+
+def test_invalidate_drops_rows_of_deleted_legacy_employee(db):
+    _legacy(db, "SEC-0001", "Sara", "Khan")
+    _legacy(db, "SEC-0002", "Ali", "Raza")
+    sara = _employee2(db, "Sara Khan")
+    ali = _employee2(db, "Ali Raza")
+    db.commit()
+    get_legacy_employee_ids(db, [sara, ali])
+
+    db.query(Employee).filter(Employee.employee_id == "SEC-0001").delete()
+    invalidate_legacy_employee_map(db, "SEC-0001")
+    db.commit()
+
+    assert dict(db.query(EmployeeLegacyMap.employee2_id, EmployeeLegacyMap.legacy_employee_id)) == {
+        ali.id: "SEC-0002"
+    }
+    assert get_legacy_employee_ids(db, [sara, ali]) == {sara.id: None, ali.id: "SEC-0002"}
+
+
+def _import(client, *rows):
+    res = client.post(
+        "/api/employees2/import-json",
+        files={"file": ("employees.json", json.dumps(list(rows)).encode("utf-8"), "application/json")},
+    )
+    assert res.status_code == 200, res.text
+    return res.json()
+
+
+def _mapping(db):
+    db.expire_all()
+    return dict(db.query(EmployeeLegacyMap.employee2_id, EmployeeLegacyMap.legacy_employee_id))
+
+
+def test_import_maps_the_imported_rows(db, make_client):
+    _legacy(db, "SEC-0001", "Sara", "Khan")
+    db.commit()
+    client = make_client((router, "/api/employees2"))
+
+    body = _import(client, {"A": "1", "B": "F1", "D": "Sara Khan"}, {"A": "2", "B": "F2", "D": "Ali Raza"})
+    assert body["created"] == 2
+    ids = dict(db.query(Employee2.name, Employee2.id))
+    assert _mapping(db) == {ids["Sara Khan"]: "SEC-0001", ids["Ali Raza"]: None}
+
+
+def test_deleted_employee_does_not_leave_its_mapping_to_a_reused_id(db, make_client):
+    _legacy(db, "SEC-0001", "Sara", "Khan")
+    db.commit()
+    client = make_client((router, "/api/employees2"))
+    _import(client, {"A": "1", "B": "F1", "D": "Ali Raza"}, {"A": "2", "B": "F2", "D": "Sara Khan"})
+    sara_id = db.query(Employee2.id).filter(Employee2.name == "Sara Khan").scalar()
+
+    assert client.delete(f"/api/employees2/{sara_id}").status_code == 200
+    assert sara_id not in _mapping(db)
+
+    # SQLite hands the freed id to the next row; it must be resolved afresh.
+    _import(client, {"A": "3", "B": "F3", "D": "Omar Farooq"})
+    assert db.query(Employee2.id).filter(Employee2.name == "Omar Farooq").scalar() == sara_id
+    assert _mapping(db)[sara_id] is None
+
+    assert client.delete("/api/employees2/").status_code == 200
+    assert _mapping(db) == {}
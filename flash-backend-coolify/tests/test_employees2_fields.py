@@ -0,0 +1,47 @@
+import pytest
+
+from app.api.routes.hr.employees2 import router
+from app.models.hr.employee2 import Employee2
+from app.schemas.hr.employee2 import EMPLOYEE2_FIELD_PRESETS
+
+
+@pytest.fixture
+def client(db, make_client):
+    db.add_all(
+        [
+            Employee2(serial_no="1", fss_no="F1", name="Ali Raza", designation="Guard", status="Army", salary="30000"),
+            Employee2(serial_no="2", fss_no="F2", name="Sara Khan", designation="Supervisor", status="Civil"),
+        ]
+    )
+    db.commit()
+    return make_client((router, "/api/employees2"))
+
+
+def _list(client, **params):
+    res = client.get("/api/employees2/", params=params)
+    assert res.status_code == 200, res.text
+    return res.json()
+
+
+def test_fields_returns_only_the_requested_columns(client):
+    body = _list(client, fields="fss_no, name", search="Ali")
+    assert body == {"employees": [{"id": 1, "fss_no": "F1", "name": "Ali Raza"}], "total": 1}
+
+
+def test_presets_expand_and_mix_with_columns(client):
+    body = _list(client, fields="picker,salary,name")
+    assert body["total"] == 2
+    first = body["employees"][0]
+    assert list(first) == ["id", *EMPLOYEE2_FIELD_PRESETS["picker"], "salary"]
+    assert (first["designation"], first["salary"]) == ("Guard", "30000")
+
+
+def test_default_listing_uses_the_grid_columns(client):
+    body = _list(client)
+    assert set(body["employees"][0]) == {"id", *EMPLOYEE2_FIELD_PRESETS["grid"]}
+
+
+def test_unknown_fields_are_rejected(client):
+    res = client.get("/api/employees2/", params={"fields": "name,password,grid"})
+    assert res.status_code == 400
+    assert res.json()["detail"].startswith("Unknown fields: password.")
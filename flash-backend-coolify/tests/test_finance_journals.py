@@ -0,0 +1,71 @@
+from datetime import date
+from decimal import Decimal
+
+from app.api.routes.finance.router import router
+from app.models.finance.finance_account import FinanceAccount
+from app.models.finance.finance_journal_entry import FinanceJournalEntry
+from app.models.finance.finance_journal_line import FinanceJournalLine
+
+
+def _seed(db):
+    cash = FinanceAccount(code="1100", name="Cash", account_type="ASSET")
+    bank = FinanceAccount(code="1200", name="Bank", account_type="ASSET")
+    revenue = FinanceAccount(code="4000", name="Revenue", account_type="INCOME")
+    db.add_all([cash, bank, revenue])
+    db.flush()
+
+    # Two entries share 2025-01-10, so the cursor has to break ties on id.
+    days = [date(2025, 1, 5), date(2025, 1, 10), date(2025, 1, 10), date(2025, 2, 1), date(2025, 2, 20)]
+    entries = []
+    for n, d in enumerate(days, start=1):
+        debit_account = bank if n % 2 == 0 else cash
+        entry = FinanceJournalEntry(entry_no=f"JE-{n:04d}", entry_date=d, status="POSTED" if n != 3 else "DRAFT")
+        entry.lines = [
+            FinanceJournalLine(account_id=debit_account.id, debit=Decimal("10"), credit=Decimal("0")),
+            FinanceJournalLine(account_id=revenue.id, debit=Decimal("0"), credit=Decimal("10")),
+        ]
+        db.add(entry)
+        entries.append(entry)
+    db.commit()
+    return {"cash": cash.id, "bank": bank.id}, [e.id for e in entries]
+
+
+def _all_pages(client, limit, **params):
+    pages, cursor = [], None
+    while True:
+        query = {**params, "limit": limit, **({"cursor": cursor} if cursor else {})}
+        res = client.get("/api/finance/journals", params=query)
+        assert res.status_code == 200, res.text
+        pages.append([e["entry_no"] for e in res.json()])
+        cursor = res.headers.get("x-next-cursor")
+        if not cursor:
+            return pages
+
+
+def test_cursor_pages_cover_every_entry_once_newest_first(db, make_client):
+    _seed(db)
+    client = make_client((router, "/api/finance"))
+
+    pages = _all_pages(client, 2)
+    assert pages == [["JE-0005", "JE-0004"], ["JE-0003", "JE-0002"], ["JE-0001"]]
+
+    # Lines are included with each entry.
+    first = client.get("/api/finance/journals", params={"limit": 1}).json()[0]
+    assert len(first["lines"]) == 2
+
+
+def test_filters_combine_with_the_cursor(db, make_client):
+    accounts, _ = _seed(db)
+    client = make_client((router, "/api/finance"))
+
+    assert _all_pages(client, 1, status="posted", from_date="2025-01-06", to_date="2025-02-10") == [
+        ["JE-0004"],
+        ["JE-0002"],
+    ]
+    assert _all_pages(client, 10, account_id=accounts["bank"]) == [["JE-0004", "JE-0002"]]
+
+
+def test_invalid_cursor_is_rejected(make_client):
+    client = make_client((router, "/api/finance"))
+
+    assert client.get("/api/finance/journals", params={"cursor": "yesterday"}).status_code == 400
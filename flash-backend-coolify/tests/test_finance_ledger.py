@@ -0,0 +1,98 @@
+from decimal import Decimal
+
+import pytest
+
+from app.api.routes.finance.router import _claim_draft_for_posting, router
+from app.models.finance.finance_account import FinanceAccount
+from app.models.finance.finance_account_balance import FinanceAccountBalance
+
+
+@pytest.fixture
+def accounts(db):
+    assets = FinanceAccount(code="1000", name="Assets", account_type="ASSET")
+    db.add(assets)
+    db.flush()
+    cash = FinanceAccount(code="1100", name="Cash", account_type="ASSET", parent_id=assets.id)
+    revenue = FinanceAccount(code="4000", name="Revenue", account_type="INCOME")
+    db.add_all([cash, revenue])
+    db.commit()
+    return {"assets": assets.id, "cash": cash.id, "revenue": revenue.id}
+
+
+def _journal(client, accounts, entry_date, amount):
+    res = client.post(
+        "/api/finance/journals",
+        json={
+            "entry_date": entry_date,
+            "lines": [
+                {"account_id": accounts["cash"], "debit": amount},
+                {"account_id": accounts["revenue"], "credit": amount},
+            ],
+        },
+    )
+    assert res.status_code == 200, res.text
+    return res.json()
+
+
+def _trial_balance(client, period=None):
+    res = client.get("/api/finance/trial-balance", params={"period": period} if period else {})
+    assert res.status_code == 200, res.text
+    body = res.json()
+    rows = {r["code"]: r for r in body["rows"]}
+    return body, {code: Decimal(str(r["balance"])) for code, r in rows.items()}, rows
+
+
+def test_trial_balance_after_post_and_reverse(db, make_client, accounts):
+    client = make_client((router, "/api/finance"))
+    jan = _journal(client, accounts, "2025-01-15", "100.00")
+    feb = _journal(client, accounts, "2025-02-03", "40.00")
+
+    # Drafts do not count.
+    _, balances, _ = _trial_balance(client)
+    assert set(balances.values()) == {Decimal("0")}
+
+    for entry in (jan, feb):
+        assert client.post(f"/api/finance/journals/{entry['id']}/post").json()["status"] == "POSTED"
+    # Posting again is a no-op, not a second application of the balances.
+    assert client.post(f"/api/finance/journals/{jan['id']}/post").status_code == 200
+
+    body, balances, rows = _trial_balance(client)
+    assert balances == {"1000": Decimal("0"), "1100": Decimal("140"), "4000": Decimal("140")}
+    assert Decimal(str(rows["1000"]["rollup_balance"])) == Decimal("140")
+    assert Decimal(str(body["total_debit"])) == Decimal(str(body["total_credit"])) == Decimal("140")
+
+    _, balances, _ = _trial_balance(client, "2025-01")
+    assert balances["1100"] == Decimal("100")
+
+    reversal = client.post(f"/api/finance/journals/{jan['id']}/reverse").json()
+    assert reversal["status"] == "POSTED"
+    assert reversal["source_type"] == "REVERSAL"
+    # Reversing twice returns the existing reversal.
+    assert client.post(f"/api/finance/journals/{jan['id']}/reverse").json()["id"] == reversal["id"]
+
+    body, balances, _ = _trial_balance(client)
+    assert balances == {"1000": Decimal("0"), "1100": Decimal("40"), "4000": Decimal("40")}
+    assert Decimal(str(body["total_debit"])) == Decimal(str(body["total_credit"])) == Decimal("240")
+
+    _, balances, _ = _trial_balance(client, "2025-01")
+    assert balances["1100"] == Decimal("0")
+
+    assert db.query(FinanceAccountBalance).filter(FinanceAccountBalance.period == "2025-01").count() == 2
+
+
+def test_only_one_post_claims_a_draft(db, make_client, accounts):
+    client = make_client((router, "/api/finance"))
+    entry = _journal(client, accounts, "2025-01-15", "10.00")
+
+    assert _claim_draft_for_posting(db, entry["id"]) is True
+    # A second request reaching the UPDATE after the first no longer sees DRAFT.
+    assert _claim_draft_for_posting(db, entry["id"]) is False
+    db.rollback()
+
+
+def test_reverse_requires_posted_entry(make_client, accounts):
+    client = make_client((router, "/api/finance"))
+    entry = _journal(client, accounts, "2025-01-15", "10.00")
+
+    res = client.post(f"/api/finance/journals/{entry['id']}/reverse")
+    assert res.status_code == 400
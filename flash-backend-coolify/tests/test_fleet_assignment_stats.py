@@ -0,0 +1,101 @@
+from datetime import date
+
+import pytest
+
+from app.core import fleet_assignment_stats
+from app.core.fleet_assignment_stats import rebuild_month_stats, refresh_month_stats
+from app.models.fleet.vehicle_assignment import VehicleAssignment
+from app.models.fleet.vehicle_assignment_month_stat import VehicleAssignmentMonthStat
+
+
+@pytest.fixture(params=["upsert", "orm"])
+def dialect_path(request, monkeypatch):
+    if request.param == "orm":
+        monkeypatch.setattr(fleet_assignment_stats, "dialect_insert", lambda db, model: None)
+    return request.param
+
+
+def _assignment(db, vehicle_id, d, km, amount, status="Complete", rate=None):
+    a = VehicleAssignment(
+        vehicle_id=vehicle_id,
+        employee_ids="[]",
+        route_from="A",
+        route_to="B",
+        assignment_date=d,
+        status=status,
+        distance_km=km,
+        amount=amount,
+        rate_per_km=rate,
+    )
+    db.add(a)
+    return a
+
+
+def _stats(db):
+    return {
+        (r.vehicle_id, r.month): (r.assignments, r.total_km, r.total_amount, r.min_cost_per_km, r.max_cost_per_km)
+        for r in db.query(VehicleAssignmentMonthStat)
+    }
+
+
+def test_refresh_upserts_changed_vehicles_and_drops_emptied_ones(db, dialect_path):
+    _assignment(db, "V1", date(2025, 1, 5), 100, 1000)
+    _assignment(db, "V1", date(2025, 1, 20), 50, 1000)
+    v2 = _assignment(db, "V2", date(2025, 1, 7), 10, 50)
+    _assignment(db, "V2", date(2025, 2, 1), 20, 100)
+    _assignment(db, "V3", date(2025, 1, 9), 30, 300, status="Incomplete")
+    db.commit()
+
+    assert rebuild_month_stats(db) == 3
+    db.commit()
+    assert _stats(db) == {
+        ("V1", "2025-01"): (2, 150.0, 2000.0, 10.0, 20.0),
+        ("V2", "2025-01"): (1, 10.0, 50.0, 5.0, 5.0),
+        ("V2", "2025-02"): (1, 20.0, 100.0, 5.0, 5.0),
+    }
+    ids = {(r.vehicle_id, r.month): r.id for r in db.query(VehicleAssignmentMonthStat)}
+
+    # V2's only January trip is cancelled, V1 gets another one.
+    v2.status = "Cancelled"
+    _assignment(db, "V1", date(2025, 1, 25), 50, 250)
+    db.flush()
+    refresh_month_stats(db, ["2025-01"])
+    refresh_month_stats(db, ["2025-01"])  # refreshing again is harmless
+    db.commit()
+
+    assert _stats(db) == {
+        ("V1", "2025-01"): (3, 200.0, 2250.0, 5.0, 20.0),
+        ("V2", "2025-02"): (1, 20.0, 100.0, 5.0, 5.0),
+    }
+    # Rows are updated in place, not re-created.
+    assert db.query(VehicleAssignmentMonthStat.id).filter_by(vehicle_id="V1").scalar() == ids[("V1", "2025-01")]
+
+
+def test_refresh_of_an_emptied_month_removes_its_rows(db, dialect_path):
+    a = _assignment(db, "V1", date(2025, 3, 5), 100, 1000)
+    db.commit()
+    refresh_month_stats(db, ["2025-03"])
+    db.commit()
+    assert list(_stats(db)) == [("V1", "2025-03")]
+
+    db.delete(a)
+    db.flush()
+    refresh_month_stats(db, ["2025-03", None])
+    db.commit()
+    assert _stats(db) == {}
+
+
+def test_each_month_is_locked_before_it_is_aggregated(db, monkeypatch):
+    calls = []
+    daily_totals = fleet_assignment_stats._daily_totals
+    monkeypatch.setattr(fleet_assignment_stats, "_lock_month", lambda db, month: calls.append(("lock", month)))
+    monkeypatch.setattr(
+        fleet_assignment_stats,
+        "_daily_totals",
+        lambda db, start, end: calls.append(("aggregate", start.strftime("%Y-%m"))) or daily_totals(db, start, end),
+    )
+
+    refresh_month_stats(db, ["2025-03", "2025-01", "2025-03"])
+
+    # Sorted, so two requests touching the same months take the locks in the same order.
+    assert calls == [("lock", "2025-01"), ("aggregate", "2025-01"), ("lock", "2025-03"), ("aggregate", "2025-03")]
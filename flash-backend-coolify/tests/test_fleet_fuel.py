@@ -0,0 +1,49 @@
+from datetime import date
+
+import pytest
+
+from app.api.routes.fleet.fuel import router
+from app.models.fleet.fuel_entry import FuelEntry
+
+
+@pytest.fixture
+def client(db, make_client):
+    """V1 fills up every 400 km on 40 L; V2 has one fill-up before the range and one inside it."""
+
+    db.add_all(
+        [
+            FuelEntry(vehicle_id="V1", entry_date=date(2025, 1, 1), liters=40, total_cost=4000, odometer_km=1000),
+            FuelEntry(vehicle_id="V1", entry_date=date(2025, 1, 12), liters=40, total_cost=4000, odometer_km=1400),
+            FuelEntry(vehicle_id="V1", entry_date=date(2025, 1, 20), liters=40, total_cost=4000, odometer_km=1800),
+            FuelEntry(vehicle_id="V2", entry_date=date(2025, 1, 2), liters=20, total_cost=2000, odometer_km=500),
+            FuelEntry(vehicle_id="V2", entry_date=date(2025, 1, 15), liters=20, total_cost=2000, odometer_km=700),
+        ]
+    )
+    db.commit()
+    return make_client((router, "/api/fleet/fuel"))
+
+
+def _summary(client, **params):
+    res = client.get("/api/fleet/fuel/summary", params=params)
+    assert res.status_code == 200, res.text
+    return res.json()
+
+
+def test_first_fill_up_in_range_closes_the_interval_before_it(client):
+    body = _summary(client, vehicle_id="V1", from_date="2025-01-10")
+    assert body["entries"] == 2
+    assert body["distance_km"] == 800
+    assert body["avg_km_per_liter"] == 10
+    assert (body["start_odometer_km"], body["end_odometer_km"]) == (1000, 1800)
+
+    body = _summary(client, vehicle_id="V1", to_date="2025-01-12")
+    assert body["distance_km"] == 400
+
+
+def test_vehicles_are_measured_separately_within_the_range(client):
+    body = _summary(client, from_date="2025-01-10")
+    rows = {v["vehicle_id"]: v for v in body["vehicles"]}
+    assert (rows["V1"]["distance_km"], rows["V1"]["avg_km_per_liter"], rows["V1"]["rank"]) == (800, 10, 1)
+    assert (rows["V2"]["distance_km"], rows["V2"]["avg_km_per_liter"], rows["V2"]["rank"]) == (200, 10, 1)
+    assert body["distance_km"] == 1000
+    assert body["anomalies"] == []
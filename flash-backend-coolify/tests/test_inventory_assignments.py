@@ -0,0 +1,102 @@
+import json
+
+import pytest
+
+from app.api.routes.inventory.assignments import router
+from app.core.inventory_assignments import load_assignments, migrate_legacy_blob
+from app.models.inventory.inventory_assignment import InventoryAssignment, InventoryAssignmentState
+
+URL = "/api/inventory-assignments/"
+
+
+@pytest.fixture
+def client(make_client):
+    return make_client((router, "/api/inventory-assignments"))
+
+
+def _rows(db):
+    db.expire_all()
+    return sorted(db.query(InventoryAssignment.employee_id, InventoryAssignment.item_id, InventoryAssignment.quantity))
+
+
+def test_get_serves_an_etag_and_304_while_unchanged(client):
+    res = client.get(URL)
+    assert res.status_code == 200, res.text
+    assert res.json() == {"data": {}}
+    etag = res.headers["etag"]
+
+    assert client.get(URL, headers={"If-None-Match": etag}).status_code == 304
+    assert client.get(URL, headers={"If-None-Match": f"W/{etag}"}).status_code == 304
+
+    client.patch(URL, json={"data": {"EMP-1": [{"itemId": "BAG", "quantity": 1}]}})
+    res = client.get(URL, headers={"If-None-Match": etag})
+    assert res.status_code == 200
+    assert res.headers["etag"] != etag
+
+
+def test_patch_only_touches_the_listed_employees(db, client):
+    client.put(URL, json={"data": {"EMP-1": [{"itemId": "BAG", "quantity": 1}], "EMP-2": [{"itemId": "CAP", "quantity": 2}]}})
+
+    res = client.patch(URL, json={"data": {"EMP-1": [{"itemId": "BAG", "quantity": 1}, {"itemId": "BAG", "quantity": 2}]}})
+    assert res.status_code == 200, res.text
+    assert res.json() == {"data": {"EMP-1": [{"itemId": "BAG", "quantity": 3}]}}
+    assert _rows(db) == [("EMP-1", "BAG", 3), ("EMP-2", "CAP", 2)]
+
+    client.patch(URL, json={"data": {"EMP-2": []}})
+    assert _rows(db) == [("EMP-1", "BAG", 3)]
+
+
+@pytest.mark.parametrize("method", ["patch", "put"])
+def test_stale_if_match_is_rejected_without_changing_rows(db, client, method):
+    stale = client.get(URL).headers["etag"]
+    client.patch(URL, json={"data": {"EMP-1": [{"itemId": "BAG", "quantity": 1}]}})
+    version = db.query(InventoryAssignmentState.version).scalar()
+
+    res = getattr(client, method)(
+        URL, json={"data": {"EMP-1": [{"itemId": "BAG", "quantity": 9}]}}, headers={"If-Match": stale}
+    )
+    assert res.status_code == 412
+    assert _rows(db) == [("EMP-1", "BAG", 1)]
+    assert db.query(InventoryAssignmentState.version).scalar() == version
+
+
+@pytest.mark.parametrize("method", ["patch", "put"])
+@pytest.mark.parametrize("weak", [False, True])
+def test_matching_if_match_writes_and_bumps_the_version(db, client, method, weak):
+    etag = client.get(URL).headers["etag"]
+    header = f"W/{etag}" if weak else etag
+
+    res = getattr(client, method)(
+        URL, json={"data": {"EMP-1": [{"itemId": "BAG", "quantity": 4}]}}, headers={"If-Match": header}
+    )
+    assert res.status_code == 200, res.text
+    assert res.headers["etag"] != etag
+    assert _rows(db) == [("EMP-1", "BAG", 4)]
+
+    # The old tag no longer matches; the new one does.
+    assert client.patch(URL, json={"data": {}}, headers={"If-Match": etag}).status_code == 412
+    assert client.patch(URL, json={"data": {}}, headers={"If-Match": res.headers["etag"]}).status_code == 200
+
+
+def test_legacy_blob_is_migrated_into_rows_once(db):
+    legacy = {
+        "EMP-1": [{"itemId": "BAG", "quantity": 2}, {"itemId": "CAP", "quantity": 1}],
+        "EMP-2": [{"itemId": "BAG", "quantity": 1}, "garbage"],
+        "EMP-3": "not a list",
+    }
+    db.add(InventoryAssignmentState(data=json.dumps(legacy), version=5))
+    db.commit()
+
+    assert migrate_legacy_blob(db) == 3
+    db.commit()
+
+    state = db.query(InventoryAssignmentState).one()
+    assert (state.data, state.version) == ("{}", 6)  # cached ETags from before are invalid
+    assert load_assignments(db) == {
+        "EMP-1": [{"itemId": "BAG", "quantity": 2}, {"itemId": "CAP", "quantity": 1}],
+        "EMP-2": [{"itemId": "BAG", "quantity": 1}],
+    }
+
+    # Already migrated: a second run is a no-op.
+    assert migrate_legacy_blob(db) == 0
+    assert db.query(InventoryAssignmentState.version).scalar() == 6
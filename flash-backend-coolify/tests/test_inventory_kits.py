@@ -0,0 +1,103 @@
+import pytest
+
+from app.api.routes.inventory.kits import router
+from app.models.hr.employee import Employee
+from app.models.inventory.general_item import GeneralItem
+from app.models.inventory.general_item_employee_balance import GeneralItemEmployeeBalance
+from app.models.inventory.general_item_transaction import GeneralItemTransaction
+from app.models.inventory.restricted_item import RestrictedItem
+from app.models.inventory.restricted_item_employee_balance import RestrictedItemEmployeeBalance
+from app.models.inventory.restricted_item_serial_unit import RestrictedItemSerialUnit
+from app.models.inventory.restricted_item_transaction import RestrictedItemTransaction
+
+KIT = {
+    "items": [
+        {"inventory": "general", "item_code": "BAG", "quantity": 1},
+        {"inventory": "general", "item_code": "BAG", "quantity": 1},  # lines for one item add up
+        {"inventory": "restricted", "item_code": "AMMO", "quantity": 30},
+        {"inventory": "restricted", "item_code": "PISTOL", "serial_numbers": ["S1"]},
+    ],
+    "notes": "onboarding",
+}
+
+
+@pytest.fixture
+def client(db, make_client):
+    db.add(Employee(employee_id="SEC-0001", first_name="Sara", last_name="Khan"))
+    db.add(GeneralItem(item_code="BAG", category="bag", name="Bag", quantity_on_hand=5))
+    db.add(RestrictedItem(item_code="AMMO", category="ammo", name="9mm", unit_name="round", quantity_on_hand=100))
+    db.add(RestrictedItem(item_code="PISTOL", category="firearm", name="Pistol", is_serial_tracked=True))
+    db.add_all([RestrictedItemSerialUnit(item_code="PISTOL", serial_number=sn) for sn in ("S1", "S2")])
+    db.commit()
+    return make_client((router, "/api/inventory-kits"))
+
+
+def _state(db):
+    db.expire_all()
+    on_hand = dict(db.query(GeneralItem.item_code, GeneralItem.quantity_on_hand))
+    on_hand.update(db.query(RestrictedItem.item_code, RestrictedItem.quantity_on_hand))
+    issued = dict(db.query(GeneralItemEmployeeBalance.item_code, GeneralItemEmployeeBalance.quantity_issued))
+    issued.update(db.query(RestrictedItemEmployeeBalance.item_code, RestrictedItemEmployeeBalance.quantity_issued))
+    units = dict(db.query(RestrictedItemSerialUnit.serial_number, RestrictedItemSerialUnit.issued_to_employee_id))
+    return on_hand, issued, units
+
+
+def test_issue_then_return_kit(db, client):
+    res = client.post("/api/inventory-kits/employees/SEC-0001/issue", json=KIT)
+    assert res.status_code == 200, res.text
+    body = res.json()
+    assert body["transactions"] == 3
+    assert {(ln["item_code"], ln.get("quantity")) for ln in body["lines"]} == {
+        ("BAG", 2.0),
+        ("AMMO", 30.0),
+        ("PISTOL", None),
+    }
+
+    on_hand, issued, units = _state(db)
+    assert on_hand == {"BAG": 3, "AMMO": 70, "PISTOL": 0}
+    assert issued == {"BAG": 2, "AMMO": 30}
+    assert units == {"S1": "SEC-0001", "S2": None}
+
+    res = client.post("/api/inventory-kits/employees/SEC-0001/return", json=KIT)
+    assert res.status_code == 200, res.text
+
+    on_hand, issued, units = _state(db)
+    assert on_hand == {"BAG": 5, "AMMO": 100, "PISTOL": 0}
+    assert issued == {"BAG": 0, "AMMO": 0}
+    assert units == {"S1": None, "S2": None}
+
+    actions = [a for (a,) in db.query(GeneralItemTransaction.action).order_by(GeneralItemTransaction.id)]
+    actions += [a for (a,) in db.query(RestrictedItemTransaction.action).order_by(RestrictedItemTransaction.id)]
+    assert sorted(actions) == ["ISSUE"] * 3 + ["RETURN"] * 3
+
+
+def test_invalid_kit_changes_nothing_and_lists_every_problem(db, client):
+    kit = {
+        "items": [
+            {"inventory": "general", "item_code": "BAG", "quantity": 6},
+            {"inventory": "restricted", "item_code": "AMMO", "quantity": 10},
+            {"inventory": "restricted", "item_code": "PISTOL", "quantity": 1},
+            {"inventory": "general", "item_code": "NOPE", "quantity": 1},
+        ]
+    }
+    res = client.post("/api/inventory-kits/employees/SEC-0001/issue", json=kit)
+    assert res.status_code == 400
+    assert res.json()["detail"] == (
+        "BAG: not enough stock (5 on hand); NOPE: item not found; "
+        "PISTOL: serial_numbers are required for serial-tracked items"
+    )
+
+    on_hand, issued, _ = _state(db)
+    assert on_hand == {"BAG": 5, "AMMO": 100, "PISTOL": 0}
+    assert issued == {}
+
+
+def test_returning_a_serial_issued_to_someone_else_fails(db, client):
+    db.add(Employee(employee_id="SEC-0002", first_name="Ali", last_name="Raza"))
+    db.commit()
+    kit = {"items": [{"inventory": "restricted", "item_code": "PISTOL", "serial_numbers": ["S2"]}]}
+    assert client.post("/api/inventory-kits/employees/SEC-0002/issue", json=kit).status_code == 200
+
+    res = client.post("/api/inventory-kits/employees/SEC-0001/return", json=kit)
+    assert res.status_code == 400
+    assert res.json()["detail"] == "PISTOL: serial S2 is not assigned to this employee"
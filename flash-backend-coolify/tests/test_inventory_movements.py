@@ -0,0 +1,75 @@
+from types import SimpleNamespace
+
+import pytest
+
+from app.api.routes.inventory.restricted import router
+from app.core.inventory_movements import apply_kit, duplicate_serials, move_serial_units, take_stock
+from app.models.hr.employee import Employee
+from app.models.inventory.general_item import GeneralItem
+from app.models.inventory.restricted_item import RestrictedItem
+from app.models.inventory.restricted_item_serial_unit import RestrictedItemSerialUnit
+from app.models.inventory.restricted_item_transaction import RestrictedItemTransaction
+
+
+@pytest.fixture
+def stock(db):
+    db.add(Employee(employee_id="SEC-0001", first_name="Sara", last_name="Khan"))
+    db.add(GeneralItem(item_code="BAG", category="bag", name="Bag", quantity_on_hand=3))
+    db.add(RestrictedItem(item_code="PISTOL", category="firearm", name="Pistol", is_serial_tracked=True))
+    db.add_all(
+        [RestrictedItemSerialUnit(item_code="PISTOL", serial_number=sn) for sn in ("S1", "S2", "S3")]
+    )
+    db.commit()
+
+
+def _unit_status(db):
+    return {
+        u.serial_number: (u.status, u.issued_to_employee_id)
+        for u in db.query(RestrictedItemSerialUnit).order_by(RestrictedItemSerialUnit.serial_number)
+    }
+
+
+def test_take_stock_never_goes_negative(db, stock):
+    assert take_stock(db, GeneralItem, "BAG", 2)
+    assert not take_stock(db, GeneralItem, "BAG", 2)
+    assert take_stock(db, GeneralItem, "BAG", 1)
+    db.commit()
+    assert db.query(GeneralItem.quantity_on_hand).scalar() == 0
+
+
+def test_move_serial_units_fails_when_a_unit_moved_concurrently(db, stock):
+    ids = [u.id for u in db.query(RestrictedItemSerialUnit).order_by(RestrictedItemSerialUnit.id)]
+    assert move_serial_units(db, RestrictedItemSerialUnit, ids[:1], from_status="in_stock", to_status="issued", employee_id="X")
+    assert not move_serial_units(db, RestrictedItemSerialUnit, ids[:2], from_status="in_stock", to_status="issued", employee_id="Y")
+    # The same id twice is one unit, not a lost race.
+    assert move_serial_units(db, RestrictedItemSerialUnit, [ids[2], ids[2]], from_status="in_stock", to_status="issued", employee_id="Y")
+
+
+def test_duplicate_serials():
+    assert duplicate_serials(["S1", "S2", "S2", "S1", "S2"]) == ["S2", "S1"]
+    assert duplicate_serials(["S1", "S2"]) == []
+
+
+def test_issue_rejects_repeated_serial_as_a_validation_error(db, make_client, stock):
+    client = make_client((router, "/api/restricted-inventory"))
+
+    res = client.post(
+        "/api/restricted-inventory/items/PISTOL/issue",
+        json={"employee_id": "SEC-0001", "serial_numbers": ["S1", "S2", "S2"]},
+    )
+    assert res.status_code == 400
+    assert res.json()["detail"] == "Serial(s) listed more than once: S2"
+    assert all(status == "in_stock" for status, _ in _unit_status(db).values())
+    assert db.query(RestrictedItemTransaction).count() == 0
+
+
+def test_kit_reports_repeated_serials_with_the_other_errors(db, stock):
+    lines = [
+        SimpleNamespace(inventory="restricted", item_code="PISTOL", quantity=None, serial_numbers=["S1", "S2"]),
+        SimpleNamespace(inventory="restricted", item_code="PISTOL", quantity=None, serial_numbers=["S2"]),
+        SimpleNamespace(inventory="general", item_code="BAG", quantity=5, serial_numbers=None),
+    ]
+
+    with pytest.raises(ValueError) as exc:
+        apply_kit(db, employee_id="SEC-0001", lines=lines, action="issue")
+    assert str(exc.value) == "BAG: not enough stock (3 on hand); PISTOL: serial S2 is listed more than once"
@@ -0,0 +1,150 @@
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from sqlalchemy import create_engine, text
+from sqlalchemy.exc import OperationalError
+
+from app.api.routes.inventory.snapshots import router
+from app.core import inventory_snapshots as snapshots
+from app.core.inventory_snapshots import take_inventory_snapshot, take_inventory_snapshot_if_stale
+from app.models.hr.employee import Employee
+from app.models.inventory.general_item import GeneralItem
+from app.models.inventory.general_item_employee_balance import GeneralItemEmployeeBalance
+from app.models.inventory.general_item_transaction import GeneralItemTransaction
+from app.models.inventory.inventory_snapshot import InventorySnapshot
+
+
+@pytest.fixture
+def history(db):
+    """BAG: 10 on hand at a 2025-01-01 snapshot, 3 issued to SEC-0001 on the 2nd, 1 returned on the 3rd."""
+
+    db.add(Employee(employee_id="SEC-0001", first_name="Sara", last_name="Khan"))
+    db.add(GeneralItem(item_code="BAG", category="bag", name="Bag", quantity_on_hand=10))
+    db.commit()
+    snap = take_inventory_snapshot(db, note="first")
+    snap.taken_at = datetime(2025, 1, 1, 12, 0)
+
+    db.add_all(
+        [
+            GeneralItemTransaction(
+                item_code="BAG", employee_id="SEC-0001", action="ISSUE", quantity=3, created_at=datetime(2025, 1, 2, 9, 0)
+            ),
+            GeneralItemTransaction(
+                item_code="BAG", employee_id="SEC-0001", action="RETURN", quantity=1, created_at=datetime(2025, 1, 3, 9, 0)
+            ),
+        ]
+    )
+    db.query(GeneralItem).update({GeneralItem.quantity_on_hand: 8})
+    db.add(GeneralItemEmployeeBalance(employee_id="SEC-0001", item_code="BAG", quantity_issued=2))
+    db.commit()
+    return snap.id
+
+
+def _as_of(client, **params):
+    res = client.get("/api/inventory-snapshots/as-of", params=params)
+    assert res.status_code == 200, res.text
+    body = res.json()
+    stock = {r["item_code"]: r["quantity_on_hand"] for r in body["stock"]}
+    issued = {(r["employee_id"], r["item_code"]): r["quantity_issued"] for r in body["balances"]}
+    return body, stock, issued
+
+
+def test_as_of_replays_from_the_latest_earlier_snapshot(db, make_client, history):
+    client = make_client((router, "/api/inventory-snapshots"))
+
+    body, stock, issued = _as_of(client, on="2025-01-02")
+    assert (body["snapshot_id"], body["direction"], body["replayed_transactions"]) == (history, "forward", 1)
+    assert stock == {"BAG": 7}
+    assert issued == {("SEC-0001", "BAG"): 3}
+
+    body, stock, issued = _as_of(client, on="2025-01-03")
+    assert body["replayed_transactions"] == 2
+    assert stock == {"BAG": 8}
+    assert issued == {("SEC-0001", "BAG"): 2}
+
+    # Before the first snapshot: unwound backwards from it.
+    body, stock, issued = _as_of(client, at="2024-12-31T00:00:00")
+    assert (body["snapshot_id"], body["direction"]) == (history, "backward")
+    assert stock == {"BAG": 10}
+    assert issued == {}
+
+
+def test_as_of_report_only_reads(db, make_client, history):
+    client = make_client((router, "/api/inventory-snapshots"))
+    _as_of(client, on="2025-01-03")
+    assert db.query(InventorySnapshot).count() == 1
+
+
+def test_stale_check_takes_a_snapshot_only_when_the_newest_is_old(db, make_client, history):
+    snap = take_inventory_snapshot_if_stale(db)
+    assert snap is not None and snap.note == "auto"
+    # The new snapshot's watermark covers both transactions and matches the live tables.
+    assert snap.general_tx_id == 2
+    assert take_inventory_snapshot_if_stale(db) is None
+
+    client = make_client((router, "/api/inventory-snapshots"))
+    body, stock, issued = _as_of(client, at=datetime.now(timezone.utc).isoformat())
+    assert (body["snapshot_id"], body["replayed_transactions"]) == (snap.id, 0)
+    assert stock == {"BAG": 8}
+    assert issued == {("SEC-0001", "BAG"): 2}
+
+
+def test_snapshot_holds_off_writers_between_watermark_and_state(db, monkeypatch):
+    db.add(GeneralItem(item_code="BAG", category="bag", name="Bag", quantity_on_hand=4))
+    db.commit()
+    other = create_engine(db.get_bind().url, connect_args={"timeout": 0})
+    live_state = snapshots._live_state
+
+    def live_state_with_concurrent_write(session):
+        # A movement committed here would be in the state but above the watermark.
+        with pytest.raises(OperationalError, match="locked"):
+            with other.begin() as conn:
+                conn.execute(
+                    text("INSERT INTO general_item_transactions (item_code, action, quantity) VALUES ('BAG', 'ADJUST', 1)")
+                )
+        return live_state(session)
+
+    monkeypatch.setattr(snapshots, "_live_state", live_state_with_concurrent_write)
+    try:
+        snap = take_inventory_snapshot(db)
+    finally:
+        other.dispose()
+    assert snap.general_tx_id == 0
+
+
+def test_movement_in_flight_when_the_snapshot_starts_is_in_it_exactly_once(db):
+    """A movement that already has its id but commits after the snapshot began must not be lost."""
+
+    db.add(GeneralItem(item_code="BAG", category="bag", name="Bag", quantity_on_hand=4))
+    db.commit()
+    other = create_engine(db.get_bind().url)
+    started = threading.Event()
+
+    def movement():
+        with other.begin() as conn:
+            conn.execute(
+                text(
+                    "INSERT INTO general_item_transactions (item_code, action, quantity, created_at) "
+                    "VALUES ('BAG', 'RETURN', 1, '2025-01-01 09:00:00')"
+                )
+            )
+            conn.execute(text("UPDATE general_items SET quantity_on_hand = 5 WHERE item_code = 'BAG'"))
+            started.set()
+            time.sleep(0.3)  # still uncommitted while the snapshot starts
+
+    writer = threading.Thread(target=movement)
+    writer.start()
+    started.wait(5)
+    try:
+        snap = take_inventory_snapshot(db)
+    finally:
+        writer.join()
+        other.dispose()
+
+    # The snapshot waited for the movement: it is below the watermark and in the state.
+    assert snap.general_tx_id == 1
+    state, meta = snapshots.inventory_as_of(db, snap.taken_at + timedelta(days=1))
+    assert meta["replayed"] == 0
+    assert state["stock"] == {("general", "BAG"): 5.0}
@@ -0,0 +1,70 @@
+from datetime import date
+
+from app.api.routes.hr.leave_periods import router
+from app.models.hr.attendance import AttendanceRecord
+
+
+def _attendance(db, employee_id):
+    rows = (
+        db.query(AttendanceRecord)
+        .filter(AttendanceRecord.employee_id == employee_id)
+        .order_by(AttendanceRecord.date.asc())
+    )
+    return {r.date.isoformat(): (r.status, r.leave_type) for r in rows}
+
+
+def test_bulk_apply_marks_every_day_and_delete_reverts(db, make_client):
+    db.add(AttendanceRecord(employee_id="E1", date=date(2025, 1, 2), status="present"))
+    db.add(AttendanceRecord(employee_id="E1", date=date(2025, 1, 6), status="absent"))
+    db.commit()
+    client = make_client((router, "/api/leave-periods"))
+
+    res = client.post(
+        "/api/leave-periods/bulk",
+        json=[
+            {"employee_id": "E1", "from_date": "2025-01-01", "to_date": "2025-01-03", "leave_type": "Paid"},
+            {"employee_id": "E2", "from_date": "2025-01-30", "to_date": "2025-02-01", "leave_type": "unpaid"},
+        ],
+    )
+    assert res.status_code == 200, res.text
+    periods = res.json()
+    assert [p["leave_type"] for p in periods] == ["paid", "unpaid"]
+
+    assert _attendance(db, "E1") == {
+        "2025-01-01": ("leave", "paid"),
+        "2025-01-02": ("leave", "paid"),  # existing row is overwritten, not duplicated
+        "2025-01-03": ("leave", "paid"),
+        "2025-01-06": ("absent", None),
+    }
+    # The series crosses a month boundary.
+    assert list(_attendance(db, "E2")) == ["2025-01-30", "2025-01-31", "2025-02-01"]
+
+    # A day edited by hand after the leave was applied survives the revert.
+    db.query(AttendanceRecord).filter(
+        AttendanceRecord.employee_id == "E1", AttendanceRecord.date == date(2025, 1, 3)
+    ).update({AttendanceRecord.status: "present", AttendanceRecord.leave_type: None})
+    db.commit()
+
+    assert client.delete(f"/api/leave-periods/{periods[0]['id']}").status_code == 200
+    db.expire_all()
+    assert _attendance(db, "E1") == {
+        "2025-01-01": ("unmarked", None),
+        "2025-01-02": ("unmarked", None),
+        "2025-01-03": ("present", None),
+        "2025-01-06": ("absent", None),
+    }
+    assert all(status == "leave" for status, _ in _attendance(db, "E2").values())
+
+
+def test_bulk_apply_validates_every_period_before_writing(db, make_client):
+    client = make_client((router, "/api/leave-periods"))
+
+    res = client.post(
+        "/api/leave-periods/bulk",
+        json=[
+            {"employee_id": "E1", "from_date": "2025-01-01", "to_date": "2025-01-02"},
+            {"employee_id": "E1", "from_date": "2025-01-05", "to_date": "2025-01-04"},
+        ],
+    )
+    assert res.status_code == 400
+    assert db.query(AttendanceRecord).count() == 0
@@ -0,0 +1,44 @@
+import os
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.core.config import settings
+from app.core.metrics import RequestStats, registry, render_prometheus
+from app.main import app
+
+
+@pytest.fixture
+def client():
+    return TestClient(app)
+
+
+def test_metrics_is_off_without_a_token(client, monkeypatch):
+    monkeypatch.setattr(settings, "METRICS_TOKEN", "")
+    assert client.get("/metrics").status_code == 404
+    assert client.get("/metrics", headers={"Authorization": "Bearer "}).status_code == 404
+
+
+def test_metrics_requires_the_bearer_token(client, monkeypatch):
+    monkeypatch.setattr(settings, "METRICS_TOKEN", "s3cret")
+    assert client.get("/metrics").status_code == 401
+    assert client.get("/metrics", headers={"Authorization": "Bearer nope"}).status_code == 401
+
+    res = client.get("/metrics", headers={"Authorization": "Bearer s3cret"})
+    assert res.status_code == 200
+    assert res.headers["content-type"].startswith("text/plain")
+
+
+def test_every_series_is_labelled_with_the_worker_pid(monkeypatch):
+    monkeypatch.setattr(registry, "responses", {})
+    monkeypatch.setattr(registry, "latency", {})
+    monkeypatch.setattr(registry, "statements", {})
+    monkeypatch.setattr(registry, "db_time", {})
+    registry.record("GET", "/api/things", 200, 0.02, RequestStats(statements=3, db_seconds=0.01))
+
+    text = render_prometheus(extra_gauges={"db_pool_size": 5})
+    pid = f'pid="{os.getpid()}"'
+    samples = [line for line in text.splitlines() if not line.startswith("#")]
+    assert samples and all(pid in line for line in samples)
+    assert f'http_responses_total{{method="GET",route="/api/things",status="200",{pid}}} 1' in samples
+    assert f"db_pool_size{{{pid}}} 5" in samples
@@ -0,0 +1,40 @@
+from datetime import date
+
+import pytest
+
+from app.core import numbering
+from app.core.numbering import next_document_no
+from app.models.core.document_sequence import DocumentSequence
+from app.models.finance.finance_journal_entry import FinanceJournalEntry
+
+
+@pytest.fixture(params=["upsert", "orm"])
+def dialect_path(request, monkeypatch):
+    if request.param == "orm":
+        # Behave like a backend without ON CONFLICT / RETURNING support.
+        monkeypatch.setattr(numbering, "dialect_insert", lambda db, model: None)
+    return request.param
+
+
+def test_numbers_continue_from_existing_documents(db, dialect_path):
+    for n in (3, 7):
+        db.add(FinanceJournalEntry(entry_no=f"JE-202501-{n:04d}", entry_date=date(2025, 1, 1)))
+    db.add(FinanceJournalEntry(entry_no="JE-202501-legacy", entry_date=date(2025, 1, 1)))
+    db.commit()
+
+    seed_column = FinanceJournalEntry.entry_no
+    assert next_document_no(db, "JE-202501-", seed_column=seed_column) == "JE-202501-0008"
+    assert next_document_no(db, "JE-202501-", seed_column=seed_column) == "JE-202501-0009"
+    assert next_document_no(db, "JE-202502-", seed_column=seed_column) == "JE-202502-0001"
+    db.commit()
+
+    counters = dict(db.query(DocumentSequence.prefix, DocumentSequence.last_value))
+    assert counters == {"JE-202501-": 9, "JE-202502-": 1}
+
+
+def test_rolled_back_numbers_are_reissued(db, dialect_path):
+    assert next_document_no(db, "EXP-", width=5) == "EXP-00001"
+    db.commit()
+    assert next_document_no(db, "EXP-", width=5) == "EXP-00002"
+    db.rollback()
+    assert next_document_no(db, "EXP-", width=5) == "EXP-00002"
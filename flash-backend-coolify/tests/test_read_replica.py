@@ -0,0 +1,102 @@
+from datetime import datetime, timedelta
+
+import pytest
+from fastapi import Depends, FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy.orm import sessionmaker
+
+from app.core import read_replica
+from app.core.config import settings
+from app.core.database import get_db
+from app.core.read_replica import ReadAfterWriteMiddleware, get_read_db, mark_write, wrote_recently
+from app.core.security import create_access_token
+from app.models.core.user_write_mark import UserWriteMark
+
+AUTH = {"Authorization": f"Bearer {create_access_token({'sub': 'clerk'})}"}
+
+
+@pytest.fixture
+def lag(db, monkeypatch):
+    """A "replica" on the test database whose measured lag the test sets."""
+
+    factory = sessionmaker(autocommit=False, autoflush=False, bind=db.get_bind())
+    sample = {"seconds": 0.0}
+    monkeypatch.setattr(read_replica, "SessionLocal", factory)
+    monkeypatch.setattr(read_replica, "ReadSessionLocal", factory)
+    monkeypatch.setattr(read_replica, "read_engine", db.get_bind())
+    monkeypatch.setattr(read_replica, "_lag_sample", {"at": 0.0, "seconds": None})
+    monkeypatch.setattr(read_replica, "_LAG_SAMPLE_SECONDS", 0.0)
+    monkeypatch.setattr(read_replica, "_measure_lag", lambda: sample["seconds"])
+    monkeypatch.setattr(settings, "DB_READ_AFTER_WRITE_SECONDS", 15)
+    monkeypatch.setattr(settings, "DB_READ_MAX_LAG_SECONDS", 30)
+    return sample
+
+
+def _client(db):
+    app = FastAPI()
+    app.add_middleware(ReadAfterWriteMiddleware)
+
+    @app.post("/things")
+    def write():
+        return {"ok": True}
+
+    @app.post("/fails")
+    def failed_write():
+        return app.state.missing  # 500: no mark
+
+    @app.get("/report")
+    def report(read_db=Depends(get_read_db), primary=Depends(get_db)):
+        return {"replica": bool(read_db.info.get("read_replica")), "shared": read_db is primary}
+
+    app.dependency_overrides[get_db] = lambda: db
+    return TestClient(app, raise_server_exceptions=False)
+
+
+def test_write_then_get_stays_on_the_primary(db, lag):
+    client = _client(db)
+    assert client.get("/report", headers=AUTH).json()["replica"] is True
+
+    assert client.post("/fails", headers=AUTH).status_code == 500
+    assert client.post("/things").status_code == 200  # anonymous: nobody to mark
+    assert db.query(UserWriteMark).count() == 0
+
+    assert client.post("/things", headers=AUTH).status_code == 200
+    assert client.get("/report", headers=AUTH).json() == {"replica": False, "shared": True}
+    # Other users keep reading from the replica.
+    other = {"Authorization": f"Bearer {create_access_token({'sub': 'auditor'})}"}
+    assert client.get("/report", headers=other).json()["replica"] is True
+
+
+def test_expired_mark_returns_to_the_replica(db, lag):
+    mark_write("clerk")
+    mark_write("clerk")  # second write refreshes the same row
+    assert wrote_recently(db, "clerk")
+
+    db.query(UserWriteMark).update({UserWriteMark.written_at: datetime.utcnow() - timedelta(seconds=16)})
+    db.commit()
+    assert not wrote_recently(db, "clerk")
+    assert _client(db).get("/report", headers=AUTH).json()["replica"] is True
+
+
+@pytest.mark.parametrize("seconds", [None, 31.0])
+def test_unreachable_or_lagging_replica_falls_back_to_the_primary(db, lag, seconds):
+    client = _client(db)
+    lag["seconds"] = seconds
+    assert client.get("/report").json() == {"replica": False, "shared": True}
+
+    lag["seconds"] = 30.0
+    assert client.get("/report").json()["replica"] is True
+
+
+def test_unreachable_replica_is_reported_as_none(lag, monkeypatch):
+    def refuse():
+        raise ConnectionError("replica down")
+
+    monkeypatch.setattr(read_replica, "_measure_lag", refuse)
+    assert read_replica.replica_lag_seconds() is None
+
+
+def test_without_a_replica_the_primary_session_is_shared(db, monkeypatch):
+    monkeypatch.setattr(read_replica, "read_engine", None)
+    monkeypatch.setattr(read_replica, "_measure_lag", lambda: pytest.fail("no replica to measure"))
+    assert _client(db).get("/report", headers=AUTH).json() == {"replica": False, "shared": True}
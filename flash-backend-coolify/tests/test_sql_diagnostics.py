@@ -0,0 +1,50 @@
+import os
+
+import pytest
+
+from app.api.routes.core.diagnostics.router import router
+from app.core import sql_diagnostics
+from app.core.sql_diagnostics import _APP_DIR, _app_location
+
+
+def _function_in(relpath: str, source: str, name: str):
+    """Define ``name`` from ``source`` as if it were written in ``app/<relpath>``."""
+
+    namespace = {"_app_location": _app_location}
+    exec(compile(source, os.path.join(_APP_DIR, relpath), "exec"), namespace)
+    return namespace[name]
+
+
+def test_location_skips_middleware_frames():
+    middleware = _function_in("core/metrics.py", "def middleware(call):\n    return call()\n", "middleware")
+    handler = _function_in(
+        "api/routes/fleet/fuel.py", "def handler():\n    return middleware(_app_location)\n", "handler"
+    )
+    handler.__globals__["middleware"] = middleware
+
+    assert handler() == "app/api/routes/fleet/fuel.py:2 in handler"
+    # Called from middleware only: no application frame issued it.
+    assert middleware(_app_location) is None
+
+
+@pytest.fixture
+def diagnostics_config(monkeypatch):
+    monkeypatch.setattr(sql_diagnostics, "config", sql_diagnostics.SqlDiagnosticsConfig())
+    return sql_diagnostics.config
+
+
+def test_toggle_reports_the_worker_it_applied_to(make_client, diagnostics_config):
+    client = make_client((router, "/api/admin/diagnostics"))
+
+    res = client.put("/api/admin/diagnostics/sql", json={"enabled": True, "slow_query_ms": 100})
+    assert res.status_code == 200, res.text
+    assert res.json() == {
+        "enabled": True,
+        "repeat_threshold": 10,
+        "slow_query_ms": 100.0,
+        "scope": "worker",
+        "worker_pid": os.getpid(),
+    }
+    assert diagnostics_config.enabled
+
+    assert client.get("/api/admin/diagnostics/sql").json()["settings"]["worker_pid"] == os.getpid()
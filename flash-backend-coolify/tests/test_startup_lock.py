@@ -0,0 +1,64 @@
+import threading
+import time
+
+import pytest
+
+from app.core import startup_tasks
+from app.core.startup_tasks import STARTUP_DONE_ENV, run_startup_once, startup_lock
+
+pytestmark = pytest.mark.skipif(startup_tasks.fcntl is None, reason="file locks need fcntl")
+
+
+@pytest.fixture(autouse=True)
+def lock_file(tmp_path, monkeypatch):
+    monkeypatch.setattr(startup_tasks.engine.dialect, "name", "sqlite")
+    monkeypatch.setattr(startup_tasks, "_startup_lock_file", lambda: str(tmp_path / "startup.lock"))
+
+
+def test_second_process_waits_for_the_lock():
+    events = []
+
+    def other_process():
+        with startup_lock(timeout=10):
+            events.append("other ran")
+
+    with startup_lock(timeout=10):
+        waiter = threading.Thread(target=other_process)
+        waiter.start()
+        time.sleep(0.3)
+        events.append("first done")
+    waiter.join(timeout=10)
+
+    assert events == ["first done", "other ran"]
+
+
+def test_waiting_past_the_timeout_raises():
+    with startup_lock(timeout=10):
+        with pytest.raises(TimeoutError):
+            with startup_lock(timeout=0):
+                pass
+    # Released again afterwards.
+    with startup_lock(timeout=0):
+        pass
+
+
+@pytest.fixture
+def tasks(monkeypatch):
+    calls = []
+    monkeypatch.setattr(startup_tasks.Base.metadata, "create_all", lambda bind: calls.append("create_all"))
+    monkeypatch.setattr(startup_tasks, "run_startup_tasks", lambda: calls.append("tasks"))
+    monkeypatch.setattr(startup_tasks, "migrate_legacy_uploads", lambda d: calls.append("uploads"))
+    return calls
+
+
+def test_run_startup_once_runs_everything_under_the_lock(tmp_path, monkeypatch, tasks):
+    monkeypatch.delenv(STARTUP_DONE_ENV, raising=False)
+    assert run_startup_once(str(tmp_path / "uploads")) is True
+    assert tasks == ["create_all", "tasks", "uploads"]
+    assert (tmp_path / "uploads").is_dir()
+
+
+def test_workers_started_by_the_launcher_skip_startup(tmp_path, monkeypatch, tasks):
+    monkeypatch.setenv(STARTUP_DONE_ENV, "1")
+    assert run_startup_once(str(tmp_path / "uploads")) is False
+    assert tasks == []
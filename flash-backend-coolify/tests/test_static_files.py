@@ -0,0 +1,84 @@
+import gzip
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.core.static_files import UploadsStaticFiles, schedule_precompress
+
+CSV = b"".join(b"%d,guard,present\n" % i for i in range(500))
+NAME = "report_20250101_101010_ab12cd34.csv"
+
+
+@pytest.fixture
+def uploads(tmp_path):
+    (tmp_path / NAME).write_bytes(CSV)
+    app = FastAPI()
+    app.mount("/uploads", UploadsStaticFiles(directory=tmp_path), name="uploads")
+    return tmp_path, TestClient(app)
+
+
+def _get(client, **headers):
+    return client.get(f"/uploads/{NAME}", headers={"Accept-Encoding": "identity", **headers})
+
+
+def test_full_response_and_conditional_requests(uploads):
+    _, client = uploads
+    res = _get(client)
+    assert res.status_code == 200
+    assert res.content == CSV
+    assert res.headers["accept-ranges"] == "bytes"
+    assert res.headers["cache-control"].endswith("immutable")
+    etag, last_modified = res.headers["etag"], res.headers["last-modified"]
+
+    assert _get(client, **{"If-None-Match": etag}).status_code == 304
+    assert _get(client, **{"If-None-Match": f"W/{etag}"}).status_code == 304
+    assert _get(client, **{"If-None-Match": '"other"'}).status_code == 200
+    assert _get(client, **{"If-Modified-Since": last_modified}).status_code == 304
+
+
+def test_range_requests(uploads):
+    _, client = uploads
+    size = len(CSV)
+
+    res = _get(client, Range="bytes=0-9")
+    assert (res.status_code, res.content) == (206, CSV[:10])
+    assert res.headers["content-range"] == f"bytes 0-9/{size}"
+
+    res = _get(client, Range="bytes=-5")
+    assert (res.status_code, res.content) == (206, CSV[-5:])
+
+    res = _get(client, Range=f"bytes={size}-")
+    assert res.status_code == 416
+    assert res.headers["content-range"] == f"bytes */{size}"
+
+    # A stale If-Range validator gets the whole file instead of a piece of a newer one.
+    res = _get(client, Range="bytes=0-9", **{"If-Range": '"stale"'})
+    assert (res.status_code, res.content) == (200, CSV)
+
+
+def test_precompressed_sibling_is_written_in_the_background_and_served(uploads):
+    root, client = uploads
+    future = schedule_precompress(root / NAME)
+    assert future is not None
+    future.result(timeout=10)
+    assert gzip.decompress((root / f"{NAME}.gz").read_bytes()) == CSV
+    assert not list(root.glob("*.tmp"))
+
+    res = _get(client, **{"Accept-Encoding": "gzip", "Range": "bytes=0-9"})
+    assert res.status_code == 200  # ranges are not served from the compressed copy
+    assert res.headers["content-encoding"] == "gzip"
+    assert res.headers["vary"] == "Accept-Encoding"
+    assert res.content == CSV
+
+    plain = _get(client)
+    assert "content-encoding" not in plain.headers
+    assert plain.headers["etag"] != res.headers["etag"]
+
+
+def test_precompress_skips_binary_and_small_files(tmp_path):
+    (tmp_path / "photo.jpg").write_bytes(b"\xff\xd8" * 2000)
+    (tmp_path / "small.csv").write_bytes(b"a,b\n")
+    assert schedule_precompress(tmp_path / "photo.jpg") is None
+    schedule_precompress(tmp_path / "small.csv").result(timeout=10)
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["photo.jpg", "small.csv"]
@@ -0,0 +1,85 @@
+import pytest
+from PIL import Image
+
+from app.api.routes.fleet.images import router as vehicle_images_router
+from app.api.routes.inventory.restricted import router as restricted_router
+from app.core.config import settings
+from app.core.image_variants import generate_variants
+from app.core.upload_helper import delete_upload, local_upload_path
+from app.models.fleet.vehicle_image import VehicleImage
+from app.models.inventory.restricted_item_image import RestrictedItemImage
+
+
+@pytest.fixture
+def uploads(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "UPLOADS_DIR", str(tmp_path))
+    return tmp_path
+
+
+def _stored_image(root, subdir, name):
+    """An uploaded PNG with its thumb/medium/pdf variants and a stray .gz sibling."""
+
+    folder = root / subdir
+    folder.mkdir(parents=True)
+    path = folder / name
+    Image.new("RGB", (1600, 900), (200, 30, 30)).save(path)
+    assert len(generate_variants(path)) == 3
+    (folder / f"{name}.gz").write_bytes(b"")
+    (folder / "other_20250101_101010_ffffffff.png").write_bytes(b"keep")
+    return f"/uploads/{subdir}/{name}"
+
+
+def test_local_upload_path(uploads):
+    assert local_upload_path("/uploads/vehicles/images/a.png") == str(uploads / "vehicles" / "images" / "a.png")
+    assert local_upload_path("/uploads/../secrets.txt") is None
+    assert local_upload_path("https://cdn.example.com/a.png") is None
+    assert local_upload_path("/srv/legacy/a.png") == "/srv/legacy/a.png"
+    assert local_upload_path(None) is None
+
+
+def test_delete_upload_removes_variants_and_compressed_siblings(uploads):
+    csv_dir = uploads / "reports"
+    csv_dir.mkdir()
+    for name in ("r.csv", "r.csv.gz", "r.csv.br"):
+        (csv_dir / name).write_bytes(b"x")
+
+    delete_upload("/uploads/reports/r.csv")
+    delete_upload("/uploads/reports/r.csv")  # already gone: nothing to do
+    assert list(csv_dir.iterdir()) == []
+
+
+@pytest.mark.parametrize(
+    "router, prefix, delete_url, model, owner, subdir",
+    [
+        (
+            vehicle_images_router,
+            "/api/vehicles",
+            "/api/vehicles/V1/images/{id}",
+            VehicleImage,
+            {"vehicle_id": "V1"},
+            "vehicles/images",
+        ),
+        (
+            restricted_router,
+            "/api/restricted-inventory",
+            "/api/restricted-inventory/items/PISTOL/images/{id}",
+            RestrictedItemImage,
+            {"item_code": "PISTOL"},
+            "restricted-inventory/images",
+        ),
+    ],
+)
+def test_image_delete_endpoints_clean_up_every_file(
+    db, make_client, uploads, router, prefix, delete_url, model, owner, subdir
+):
+    url = _stored_image(uploads, subdir, "img_20250101_101010_ab12cd34.png")
+    img = model(filename="photo.png", path=url, mime_type="image/png", **owner)
+    db.add(img)
+    db.commit()
+
+    client = make_client((router, prefix))
+    res = client.delete(delete_url.format(id=img.id))
+    assert res.status_code == 200, res.text
+
+    assert [p.name for p in (uploads / subdir).iterdir()] == ["other_20250101_101010_ffffffff.png"]
+    assert db.query(model).count() == 0